@@ -15,6 +15,10 @@ from supabase import Client
 import logging
 import uuid
 
+from services.resource_optimization_backend import (
+    AllocationProblem, AllocationSolution, ResourceOptimizationBackend, build_allocation_problem
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -695,6 +699,7 @@ class ResourceOptimizerAgent(AIAgentBase):
         self.skill_match_threshold = 0.6
         self.utilization_target_min = 60.0
         self.utilization_target_max = 85.0
+        self.optimization_backend = ResourceOptimizationBackend()
     
     async def optimize_resources(
         self,
@@ -703,7 +708,11 @@ class ResourceOptimizerAgent(AIAgentBase):
         constraints: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """
-        Optimize resource allocations using PuLP linear programming.
+        Optimize resource allocations using a sparse linear programming model.
+        
+        The model is solved in a worker process under a time budget
+        (constraints['time_limit_seconds'] overrides the default); repeated
+        calls for the same organization warm-start from the previous solution.
         
         Args:
             organization_id: Organization ID for filtering data
@@ -744,19 +753,17 @@ class ResourceOptimizerAgent(AIAgentBase):
                     "constraints_satisfied": False
                 }
             
-            # Build PuLP linear programming model
-            model, allocation_vars = self._build_optimization_model(resources, projects, constraints or {})
-            
-            # Solve the model
-            import pulp
-            model.solve(pulp.PULP_CBC_CMD(msg=0))  # Silent solver
+            # Build and solve the sparse linear programming model off the event loop
+            problem, solution = await self.optimization_backend.optimize(
+                resources, projects, constraints or {}, warm_start_key=organization_id
+            )
             
             # Check solution status
-            status = pulp.LpStatus[model.status]
+            status = solution.status
             
             if status != "Optimal":
                 # Handle infeasible solutions
-                error_msg = self._get_infeasibility_message(model, status, constraints)
+                error_msg = self._get_infeasibility_message(problem, status, constraints)
                 await self._log_audit(user_id, organization_id, "optimize_resources", False, error_msg)
                 return {
                     "error": error_msg,
@@ -768,10 +775,10 @@ class ResourceOptimizerAgent(AIAgentBase):
                 }
             
             # Extract recommendations from solved model
-            recommendations = self._extract_recommendations(model, allocation_vars, resources, projects)
+            recommendations = self._extract_recommendations(problem, solution, resources, projects)
             
             # Calculate confidence scores based on solution quality
-            confidence_score = self._calculate_confidence(model, recommendations)
+            confidence_score = self._calculate_confidence(solution, recommendations)
             
             # Calculate total cost savings
             total_cost_savings = self._calculate_cost_savings(recommendations, resources, projects)
@@ -790,7 +797,9 @@ class ResourceOptimizerAgent(AIAgentBase):
                 outputs={
                     "num_recommendations": len(recommendations),
                     "total_cost_savings": total_cost_savings,
-                    "solver_status": status
+                    "solver_status": status,
+                    "model_variables": problem.n_variables,
+                    "warm_started": solution.warm_started
                 },
                 response_time_ms=response_time,
                 success=True,
@@ -816,6 +825,7 @@ class ResourceOptimizerAgent(AIAgentBase):
                 "model_confidence": confidence_score,
                 "constraints_satisfied": True,
                 "solver_status": status,
+                "warm_started": solution.warm_started,
                 "operation_id": operation_id,
                 "response_time_ms": response_time
             }
@@ -848,7 +858,7 @@ class ResourceOptimizerAgent(AIAgentBase):
         resources: List[Dict],
         projects: List[Dict],
         constraints: Dict
-    ):
+    ) -> AllocationProblem:
         """
         Build linear programming model for resource optimization.
         
@@ -859,102 +869,24 @@ class ResourceOptimizerAgent(AIAgentBase):
         - Project requirements: Σ(allocations per project) ≥ required_hours
         - Skill matching: resource_skills ⊇ project_required_skills
         
+        Skill matching is applied up front through a skill index, so variables
+        exist only for skill-matched (resource, project) pairs and the
+        constraint matrix is sparse.
+        
         Args:
             resources: List of resource dictionaries
             projects: List of project dictionaries
             constraints: Additional constraints
             
         Returns:
-            Tuple of (model, allocation_vars)
+            AllocationProblem
         """
-        import pulp
-        
-        # Create the model
-        model = pulp.LpProblem("Resource_Optimization", pulp.LpMinimize)
-        
-        # Define decision variables: allocation[resource_id, project_id] = hours allocated
-        allocation_vars = {}
-        for resource in resources:
-            for project in projects:
-                var_name = f"alloc_{resource['id']}_{project['id']}"
-                allocation_vars[(resource['id'], project['id'])] = pulp.LpVariable(
-                    var_name,
-                    lowBound=0,
-                    cat='Continuous'
-                )
-        
-        # Set objective: minimize Σ(resource_cost × allocation_hours)
-        cost_expr = []
-        for resource in resources:
-            resource_cost = resource.get('hourly_rate', resource.get('cost_per_hour', 100))
-            for project in projects:
-                var = allocation_vars[(resource['id'], project['id'])]
-                cost_expr.append(resource_cost * var)
-        
-        model += pulp.lpSum(cost_expr), "Total_Cost"
-        
-        # Add constraints: resource availability
-        for resource in resources:
-            available_hours = resource.get('available_hours', resource.get('capacity', 160))
-            resource_allocations = [
-                allocation_vars[(resource['id'], project['id'])]
-                for project in projects
-            ]
-            model += (
-                pulp.lpSum(resource_allocations) <= available_hours,
-                f"Resource_Availability_{resource['id']}"
-            )
-        
-        # Add constraints: project requirements
-        for project in projects:
-            required_hours = project.get('required_hours', project.get('estimated_effort', 160))
-            project_allocations = [
-                allocation_vars[(resource['id'], project['id'])]
-                for resource in resources
-            ]
-            model += (
-                pulp.lpSum(project_allocations) >= required_hours,
-                f"Project_Requirements_{project['id']}"
-            )
-        
-        # Add constraints: skill matching
-        for resource in resources:
-            resource_skills = set(resource.get('skills', []))
-            for project in projects:
-                required_skills = set(project.get('required_skills', []))
-                
-                # If project requires skills that resource doesn't have, set allocation to 0
-                if required_skills and not required_skills.issubset(resource_skills):
-                    model += (
-                        allocation_vars[(resource['id'], project['id'])] == 0,
-                        f"Skill_Match_{resource['id']}_{project['id']}"
-                    )
-        
-        # Add custom constraints if provided
-        if constraints.get('max_allocation_per_resource'):
-            max_alloc = constraints['max_allocation_per_resource']
-            for resource in resources:
-                for project in projects:
-                    model += (
-                        allocation_vars[(resource['id'], project['id'])] <= max_alloc,
-                        f"Max_Allocation_{resource['id']}_{project['id']}"
-                    )
-        
-        if constraints.get('min_allocation_per_project'):
-            min_alloc = constraints['min_allocation_per_project']
-            for project in projects:
-                for resource in resources:
-                    var = allocation_vars[(resource['id'], project['id'])]
-                    # If allocated, must be at least min_alloc
-                    # This is a simplified version; proper implementation would use binary variables
-                    pass  # Skip for now as it requires binary variables
-        
-        return model, allocation_vars
+        return build_allocation_problem(resources, projects, constraints)
     
     def _extract_recommendations(
         self,
-        model,
-        allocation_vars: Dict,
+        problem: AllocationProblem,
+        solution: AllocationSolution,
         resources: List[Dict],
         projects: List[Dict]
     ) -> List[Dict]:
@@ -962,8 +894,8 @@ class ResourceOptimizerAgent(AIAgentBase):
         Extract recommendations from solved optimization model.
         
         Args:
-            model: Solved PuLP model
-            allocation_vars: Dictionary of allocation variables
+            problem: Allocation model
+            solution: Optimal solution of the model
             resources: List of resources
             projects: List of projects
             
@@ -972,35 +904,36 @@ class ResourceOptimizerAgent(AIAgentBase):
         """
         recommendations = []
         
-        for resource in resources:
-            for project in projects:
-                var = allocation_vars[(resource['id'], project['id'])]
-                allocated_hours = var.varValue
-                
-                if allocated_hours and allocated_hours > 0:
-                    resource_cost = resource.get('hourly_rate', resource.get('cost_per_hour', 100))
-                    total_cost = allocated_hours * resource_cost
-                    
-                    # Calculate cost savings compared to average cost
-                    avg_cost = sum(r.get('hourly_rate', r.get('cost_per_hour', 100)) for r in resources) / len(resources)
-                    cost_savings = (avg_cost - resource_cost) * allocated_hours
-                    
-                    recommendations.append({
-                        "resource_id": resource['id'],
-                        "resource_name": resource.get('name', 'Unknown'),
-                        "project_id": project['id'],
-                        "project_name": project.get('name', 'Unknown'),
-                        "allocated_hours": round(allocated_hours, 2),
-                        "cost_savings": round(cost_savings, 2),
-                        "total_cost": round(total_cost, 2),
-                        "confidence": 0.0  # Will be calculated separately
-                    })
+        rates = [r.get('hourly_rate', r.get('cost_per_hour', 100)) for r in resources]
+        avg_cost = sum(rates) / len(resources)
+        
+        for variable in np.flatnonzero(solution.allocations > 1e-9):
+            resource = resources[problem.pair_resource[variable]]
+            project = projects[problem.pair_project[variable]]
+            allocated_hours = float(solution.allocations[variable])
+            resource_cost = rates[problem.pair_resource[variable]]
+            total_cost = allocated_hours * resource_cost
+            
+            # Calculate cost savings compared to average cost
+            cost_savings = (avg_cost - resource_cost) * allocated_hours
+            
+            recommendations.append({
+                "resource_id": resource['id'],
+                "resource_name": resource.get('name', 'Unknown'),
+                "project_id": project['id'],
+                "project_name": project.get('name', 'Unknown'),
+                "allocated_hours": round(allocated_hours, 2),
+                "cost_savings": round(cost_savings, 2),
+                "total_cost": round(total_cost, 2),
+                "skill_match_score": round(float(problem.skill_scores[variable]), 2),
+                "confidence": 0.0  # Will be calculated separately
+            })
         
         return recommendations
     
     def _calculate_confidence(
         self,
-        model,
+        solution: AllocationSolution,
         recommendations: List[Dict]
     ) -> float:
         """
@@ -1014,15 +947,13 @@ class ResourceOptimizerAgent(AIAgentBase):
         - 0.0: No feasible solution
         
         Args:
-            model: Solved PuLP model
+            solution: Solver outcome
             recommendations: List of recommendations
             
         Returns:
             Confidence score between 0.0 and 1.0
         """
-        import pulp
-        
-        status = pulp.LpStatus[model.status]
+        status = solution.status
         
         if status == "Optimal":
             # Check if all constraints are satisfied
@@ -1065,7 +996,7 @@ class ResourceOptimizerAgent(AIAgentBase):
     
     def _get_infeasibility_message(
         self,
-        model,
+        problem: AllocationProblem,
         status: str,
         constraints: Dict
     ) -> str:
@@ -1073,7 +1004,7 @@ class ResourceOptimizerAgent(AIAgentBase):
         Generate user-friendly error message for infeasible solutions.
         
         Args:
-            model: PuLP model
+            problem: Allocation model
             status: Solver status
             constraints: Applied constraints
             
@@ -1083,7 +1014,7 @@ class ResourceOptimizerAgent(AIAgentBase):
         if status == "Infeasible":
             messages = ["Cannot find feasible resource allocation. Possible reasons:"]
             
-            if constraints and constraints.get('required_skills'):
+            if problem.unstaffable_projects or (constraints and constraints.get('required_skills')):
                 messages.append("- Required skills not available in resource pool")
             
             messages.append("- Project requirements exceed available resource capacity")
@@ -1099,6 +1030,8 @@ class ResourceOptimizerAgent(AIAgentBase):
             return "Optimization problem is unbounded. Please check constraints."
         elif status == "Undefined":
             return "Optimization problem is undefined. Please check input data."
+        elif status == "Not Solved":
+            return "Optimization did not finish within its time budget. Please retry or narrow the scope."
         else:
             return f"Optimization failed with status: {status}"
     
@@ -11,12 +11,13 @@ This module provides a comprehensive caching system for RBAC permissions with:
 Requirements: 8.1, 8.2
 """
 
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import UUID
 
+from utils.json_codec import dumps, loads
+
 from .rbac import Permission
 from .enhanced_rbac_models import PermissionContext
 
@@ -508,7 +509,7 @@ class PermissionCache:
         try:
             cached = await self.redis.get(cache_key)
             if cached is not None:
-                return json.loads(cached)
+                return loads(cached)
             return None
         except Exception as e:
             logger.warning(f"Redis get error for key {cache_key}: {e}")
@@ -523,7 +524,7 @@ class PermissionCache:
             await self.redis.setex(
                 cache_key,
                 self.cache_ttl,
-                json.dumps(value)
+                dumps(value)
             )
         except Exception as e:
             logger.warning(f"Redis set error for key {cache_key}: {e}")
@@ -17,6 +17,8 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import UUID
 from collections import defaultdict
 
+from utils.hdr_histogram import HdrHistogram
+
 from .rbac import Permission, UserRole
 from .enhanced_rbac_models import PermissionContext, EffectiveRole
 from .permission_cache import PermissionCache
@@ -33,8 +35,8 @@ class PerformanceMetrics:
     
     def __init__(self):
         """Initialize performance metrics."""
-        self._operation_times: Dict[str, List[float]] = defaultdict(list)
-        self._operation_counts: Dict[str, int] = defaultdict(int)
+        # Durations in microseconds; constant memory per operation
+        self._operation_times: Dict[str, HdrHistogram] = defaultdict(HdrHistogram)
         self._slow_queries: List[Dict[str, Any]] = []
         self._slow_query_threshold = 1.0  # seconds
         
@@ -52,8 +54,7 @@ class PerformanceMetrics:
             duration: Duration in seconds
             metadata: Optional metadata about the operation
         """
-        self._operation_times[operation_name].append(duration)
-        self._operation_counts[operation_name] += 1
+        self._operation_times[operation_name].record(int(duration * 1_000_000 + 0.5))
         
         # Track slow queries
         if duration >= self._slow_query_threshold:
@@ -78,8 +79,8 @@ class PerformanceMetrics:
         Returns:
             Dictionary with operation statistics
         """
-        times = self._operation_times.get(operation_name, [])
-        if not times:
+        times = self._operation_times.get(operation_name)
+        if not times or not times.count:
             return {
                 "operation": operation_name,
                 "count": 0,
@@ -89,16 +90,17 @@ class PerformanceMetrics:
                 "total_duration": 0.0
             }
         
+        percentiles = times.percentiles((50, 95, 99))
         return {
             "operation": operation_name,
-            "count": len(times),
-            "avg_duration": sum(times) / len(times),
-            "min_duration": min(times),
-            "max_duration": max(times),
-            "total_duration": sum(times),
-            "p50_duration": self._percentile(times, 50),
-            "p95_duration": self._percentile(times, 95),
-            "p99_duration": self._percentile(times, 99),
+            "count": times.count,
+            "avg_duration": times.mean / 1_000_000,
+            "min_duration": times.min / 1_000_000,
+            "max_duration": times.max / 1_000_000,
+            "total_duration": times.total / 1_000_000,
+            "p50_duration": percentiles[50] / 1_000_000,
+            "p95_duration": percentiles[95] / 1_000_000,
+            "p99_duration": percentiles[99] / 1_000_000,
         }
     
     def get_all_stats(self) -> Dict[str, Any]:
@@ -115,24 +117,14 @@ class PerformanceMetrics:
         return {
             "operations": stats,
             "slow_queries": self._slow_queries[-20:],  # Last 20 slow queries
-            "total_operations": sum(self._operation_counts.values()),
+            "total_operations": sum(times.count for times in self._operation_times.values()),
             "slow_query_threshold": self._slow_query_threshold
         }
     
     def reset(self) -> None:
         """Reset all metrics."""
         self._operation_times.clear()
-        self._operation_counts.clear()
         self._slow_queries.clear()
-    
-    @staticmethod
-    def _percentile(values: List[float], percentile: int) -> float:
-        """Calculate percentile of values."""
-        if not values:
-            return 0.0
-        sorted_values = sorted(values)
-        index = int(len(sorted_values) * percentile / 100)
-        return sorted_values[min(index, len(sorted_values) - 1)]
 
 
 class SessionPerformanceOptimizer:
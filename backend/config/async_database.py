@@ -0,0 +1,280 @@
+"""
+Async database access for async handlers
+
+Non-blocking counterpart of config.database:
+- PostgrestAsyncDatabase runs queries on an async PostgREST client over one
+  shared HTTP/2 keep-alive connection pool sized by DATABASE_POOL_CONFIG
+- ThreadedAsyncDatabase runs a synchronous client's queries on a bounded
+  thread pool; it is the local stand-in for tests and the fallback when no
+  PostgREST endpoint is configured
+- Both keep the Supabase query-builder API: build queries as before and
+  await execute()
+- Pool saturation (connections in use, waiting queries, wait times,
+  timeouts) is tracked per pool
+
+max_queries in DATABASE_POOL_CONFIG applies to direct Postgres connections;
+HTTP connections are recycled by the keep-alive expiry instead.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient
+
+from .database import DATABASE_POOL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class DatabasePoolTimeout(RuntimeError):
+    """No pooled connection became available within the pool timeout"""
+
+
+@dataclass
+class PoolMetrics:
+    """Saturation counters of one connection pool"""
+    max_size: int
+    in_use: int = 0
+    waiting: int = 0
+    peak_in_use: int = 0
+    peak_waiting: int = 0
+    total_queries: int = 0
+    failed_queries: int = 0
+    waited_queries: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    total_query_seconds: float = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool metrics, including derived utilization and average times"""
+        return {
+            "max_size": self.max_size,
+            "in_use": self.in_use,
+            "available": self.max_size - self.in_use,
+            "waiting": self.waiting,
+            "utilization": round(self.in_use / self.max_size, 3) if self.max_size else 0.0,
+            "saturated": self.waiting > 0,
+            "peak_in_use": self.peak_in_use,
+            "peak_waiting": self.peak_waiting,
+            "total_queries": self.total_queries,
+            "failed_queries": self.failed_queries,
+            "waited_queries": self.waited_queries,
+            "timeouts": self.timeouts,
+            "average_wait_ms": round(self.total_wait_seconds / self.total_queries * 1000, 3)
+            if self.total_queries else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "average_query_ms": round(self.total_query_seconds / self.total_queries * 1000, 3)
+            if self.total_queries else 0.0
+        }
+
+
+class AsyncQuery:
+    """
+    Query builder whose execute() is awaited through the pool.
+
+    Builder methods (select, eq, order, ...) are passed through to the
+    underlying builder unchanged.
+    """
+
+    def __init__(self, database: "AsyncDatabase", builder: Any):
+        self._database = database
+        self._builder = builder
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._builder, name)
+        if callable(attribute):
+            def call(*args, **kwargs):
+                return self._wrap(attribute(*args, **kwargs))
+            return call
+        return self._wrap(attribute)
+
+    def _wrap(self, value: Any) -> Any:
+        return AsyncQuery(self._database, value) if hasattr(value, "execute") else value
+
+    async def execute(self) -> Any:
+        return await self._database.run(lambda: self._database.execute_builder(self._builder))
+
+
+class AsyncDatabase:
+    """Pooled async query execution with saturation metrics"""
+
+    def __init__(self, pool_config: Optional[Dict[str, Any]] = None):
+        self.pool_config = {**DATABASE_POOL_CONFIG, **(pool_config or {})}
+        self.max_size = int(self.pool_config["max_size"])
+        self.metrics = PoolMetrics(max_size=self.max_size)
+        self._semaphore = asyncio.Semaphore(self.max_size)
+
+    def table(self, table_name: str) -> AsyncQuery:
+        return AsyncQuery(self, self.client.table(table_name))
+
+    def from_(self, table_name: str) -> AsyncQuery:
+        return self.table(table_name)
+
+    def rpc(self, function_name: str, params: Dict[str, Any]) -> AsyncQuery:
+        return AsyncQuery(self, self.client.rpc(function_name, params))
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        return {"backend": self.backend, **self.metrics.snapshot()}
+
+    async def run(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run one query on a pooled connection.
+
+        Waits up to the pool timeout for a free connection and up to the
+        command timeout for the query itself.
+        """
+        metrics = self.metrics
+        wait_start = time.time()
+
+        if not self._semaphore.locked():
+            # A connection is free: acquire() completes without suspending
+            await self._semaphore.acquire()
+        else:
+            metrics.waited_queries += 1
+            metrics.waiting += 1
+            metrics.peak_waiting = max(metrics.peak_waiting, metrics.waiting)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.pool_config["timeout"])
+            except asyncio.TimeoutError:
+                metrics.timeouts += 1
+                raise DatabasePoolTimeout(
+                    f"No database connection available within {self.pool_config['timeout']}s "
+                    f"({metrics.in_use}/{self.max_size} in use, {metrics.waiting - 1} waiting)"
+                )
+            finally:
+                metrics.waiting -= 1
+
+        waited = time.time() - wait_start
+        metrics.total_wait_seconds += waited
+        metrics.max_wait_seconds = max(metrics.max_wait_seconds, waited)
+        metrics.in_use += 1
+        metrics.peak_in_use = max(metrics.peak_in_use, metrics.in_use)
+        metrics.total_queries += 1
+
+        query_start = time.time()
+        try:
+            return await asyncio.wait_for(operation(), timeout=self.pool_config["command_timeout"])
+        except Exception:
+            metrics.failed_queries += 1
+            raise
+        finally:
+            metrics.total_query_seconds += time.time() - query_start
+            metrics.in_use -= 1
+            self._semaphore.release()
+
+    async def aclose(self) -> None:
+        pass
+
+
+class PostgrestAsyncDatabase(AsyncDatabase):
+    """Async PostgREST client over a shared HTTP/2 keep-alive connection pool"""
+
+    backend = "postgrest"
+
+    def __init__(
+        self,
+        rest_url: str,
+        api_key: str,
+        pool_config: Optional[Dict[str, Any]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            rest_url: PostgREST endpoint, e.g. https://<project>.supabase.co/rest/v1
+            api_key: Supabase API key
+            pool_config: Overrides of DATABASE_POOL_CONFIG
+            transport: Custom HTTP transport (for tests)
+        """
+        super().__init__(pool_config)
+        self.client = AsyncPostgrestClient(
+            rest_url, headers={"apiKey": api_key, "Authorization": f"Bearer {api_key}"}
+        )
+        # Replace the client's default session with the pooled one
+        default_session = self.client.session
+        self.client.session = httpx.AsyncClient(
+            base_url=rest_url,
+            headers=default_session.headers,
+            timeout=httpx.Timeout(self.pool_config["command_timeout"], pool=self.pool_config["timeout"]),
+            limits=httpx.Limits(
+                max_connections=self.max_size,
+                max_keepalive_connections=int(self.pool_config["min_size"]),
+                keepalive_expiry=self.pool_config["max_inactive_connection_lifetime"]
+            ),
+            http2=True,
+            transport=transport
+        )
+
+    def execute_builder(self, builder: Any) -> Awaitable[Any]:
+        return builder.execute()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class ThreadedAsyncDatabase(AsyncDatabase):
+    """Runs a synchronous client's queries on a bounded thread pool"""
+
+    backend = "threaded"
+
+    def __init__(self, client: Any, pool_config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            client: Synchronous Supabase-compatible client
+            pool_config: Overrides of DATABASE_POOL_CONFIG
+        """
+        super().__init__(pool_config)
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=self.max_size, thread_name_prefix="db")
+
+    def execute_builder(self, builder: Any) -> Awaitable[Any]:
+        return asyncio.get_running_loop().run_in_executor(self._executor, builder.execute)
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_async_db: Optional[AsyncDatabase] = None
+_async_db_lock = threading.Lock()
+
+
+def get_async_db() -> Optional[AsyncDatabase]:
+    """
+    Get the shared async database.
+
+    Uses the PostgREST endpoint of the configured Supabase client, or runs
+    queries of any other client on the thread pool. Returns None when no
+    database is available.
+    """
+    global _async_db
+    if _async_db is None:
+        with _async_db_lock:
+            if _async_db is None:
+                from .database import supabase
+                if supabase is None:
+                    return None
+                if getattr(supabase, "rest_url", None) and getattr(supabase, "supabase_key", None):
+                    _async_db = PostgrestAsyncDatabase(supabase.rest_url, supabase.supabase_key)
+                else:
+                    _async_db = ThreadedAsyncDatabase(supabase)
+                logger.info(f"Async database pool created ({_async_db.backend}, max_size={_async_db.max_size})")
+    return _async_db
+
+
+def get_async_db_metrics() -> Optional[Dict[str, Any]]:
+    """Pool metrics of the shared async database, if it has been created"""
+    return _async_db.get_pool_metrics() if _async_db else None
+
+
+async def close_async_db() -> None:
+    """Close the shared async database connections"""
+    global _async_db
+    if _async_db is not None:
+        await _async_db.aclose()
+        _async_db = None
@@ -54,15 +54,8 @@ def create_supabase_client() -> Optional[Client]:
         supabase = create_client(supabase_url, supabase_key)
         print(f"✅ Supabase client created successfully")
         
-        # Test connection with graceful failure
-        try:
-            # Simple test query with timeout
-            test_response = supabase.table("portfolios").select("count", count="exact").limit(1).execute()
-            print(f"✅ Supabase connection test successful")
-        except Exception as test_error:
-            print(f"⚠️ Supabase connection test failed: {test_error}")
-            print(f"⚠️ Continuing with degraded functionality")
-        
+        # The connection test runs in the startup warm-up (check_database_connection),
+        # not here, so importing this module makes no network calls
         return supabase
         
     except Exception as e:
@@ -93,6 +86,28 @@ def create_service_supabase_client() -> Optional[Client]:
 supabase: Optional[Client] = create_supabase_client()
 service_supabase: Optional[Client] = create_service_supabase_client()
 
+def check_database_connection(client: Optional[Client] = None) -> bool:
+    """
+    Run a simple test query against the database.
+    
+    Called by the startup warm-up after the server accepts traffic; failures
+    are reported and the application continues with degraded functionality.
+    
+    Returns:
+        bool: True if the test query succeeded
+    """
+    client = client if client is not None else supabase
+    if client is None:
+        return False
+    try:
+        client.table("portfolios").select("count", count="exact").limit(1).execute()
+        print(f"✅ Supabase connection test successful")
+        return True
+    except Exception as test_error:
+        print(f"⚠️ Supabase connection test failed: {test_error}")
+        print(f"⚠️ Continuing with degraded functionality")
+        return False
+
 def get_db() -> Optional[Client]:
     """
     Get the Supabase database client.
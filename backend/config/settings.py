@@ -38,6 +38,18 @@ class Settings:
     # Redis Configuration (optional)
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
     
+    # Metrics Configuration (optional) - bearer token required by /metrics when set
+    METRICS_TOKEN: Optional[str] = os.getenv("METRICS_TOKEN")
+
+    # Request Tracing Configuration
+    TRACE_SLOW_REQUEST_SECONDS: float = float(os.getenv("TRACE_SLOW_REQUEST_SECONDS", "1.0"))
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.0"))  # Share of other requests kept
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+    TRACE_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("TRACE_N_PLUS_ONE_THRESHOLD", "10"))
+    # Return X-Trace-Id and Server-Timing headers; they expose internal timings, so off in production
+    TRACE_RESPONSE_HEADERS: bool = os.getenv("TRACE_RESPONSE_HEADERS", "false").lower() == "true"
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")  # e.g. http://localhost:4318
+
     # Application Configuration
     APP_NAME: str = "PPM SaaS MVP API"
     APP_VERSION: str = "1.0.0"
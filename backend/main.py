@@ -2,14 +2,29 @@
 FastAPI application entry point - Refactored modular architecture
 """
 
-from fastapi import FastAPI, Request, HTTPException, Depends
+# Time every import from here on (reported by /api/admin/performance/startup)
+from utils.startup_profiler import startup_profiler, FirstRequestMiddleware
+startup_profiler.install_import_timer()
+
+from fastapi import FastAPI, Request, Response, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
+import asyncio
+import hmac
 import os
 
 # Import configuration
 from config.settings import settings
-from config.database import supabase
+from config.database import supabase, check_database_connection
+from config.async_database import close_async_db
+from services.share_link_cache import close_access_log_buffer
+from services.audit_ingestion_stream import start_ingestion_consumer, stop_ingestion_consumer
+from services.request_metrics import (
+    OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, render_metrics,
+    start_metrics_publisher, stop_metrics_publisher
+)
+from utils.json_codec import EncodedJSONResponse, FastJSONResponse
+from utils.lazy_import import preload as preload_optional_modules
 
 # Import authentication
 from auth.dependencies import get_current_user
@@ -40,17 +55,25 @@ from routers.ai_resource_optimizer import router as ai_resource_optimizer_router
 from routers.enhanced_pmr import router as enhanced_pmr_router
 from routers.shareable_urls import router as shareable_urls_router
 from routers.po_breakdown import router as po_breakdown_router
-from routers.feature_flags import router as feature_flags_router
+from routers.feature_flags import router as feature_flags_router, feature_flag_service
 from routers.audit import router as audit_router
 from routers.admin_performance import router as admin_performance_router
 from routers.workflows import router as workflows_router
 from routers.rbac import router as rbac_router
 from routers.viewer_restrictions_router import router as viewer_restrictions_router
 from routers.imports import router as imports_router
+startup_profiler.mark("routers_imported")
 
 # Import performance tracking middleware
 from middleware.performance_tracker import PerformanceMiddleware, performance_tracker
 
+# Trace Supabase, Redis and LLM calls made while handling a request
+from middleware.tracing import TracingMiddleware
+from services.performance_monitor import get_performance_monitor
+from services.tracing import tracer, start_trace_exporter, stop_trace_exporter
+from services.tracing_instrumentation import instrument_libraries
+instrument_libraries(tracer, database_monitor=get_performance_monitor())
+
 # Import AI agents and services
 try:
     from ai_agents import create_ai_agents
@@ -121,7 +144,8 @@ app = FastAPI(
     description=settings.APP_DESCRIPTION,
     version=settings.APP_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # Store components in app state for access in endpoints
@@ -218,6 +242,67 @@ app.include_router(imports_router)
 app.add_middleware(PerformanceMiddleware, tracker=performance_tracker)
 print("✅ Performance tracking middleware enabled")
 
+# Outside every BaseHTTPMiddleware, so the trace reaches the endpoints
+app.add_middleware(TracingMiddleware, tracer=tracer, response_headers=settings.TRACE_RESPONSE_HEADERS)
+
+# Outermost middleware, so the first request is recorded on arrival
+app.add_middleware(FirstRequestMiddleware, profiler=startup_profiler)
+startup_profiler.mark("app_created")
+
+def _load_feature_flags():
+    if feature_flag_service:
+        return feature_flag_service.refresh(True)
+
+@app.on_event("startup")
+async def start_warm_up():
+    """
+    Warm up the database connection, feature flags and heavy optional modules
+    in the background, so the server accepts traffic without waiting for them.
+    Anything not warmed up yet is loaded on first use.
+    """
+    startup_profiler.mark("startup_complete")
+    startup_profiler.start_warm_up({
+        "database": check_database_connection,
+        "feature_flags": _load_feature_flags,
+        "metrics_publisher": start_metrics_publisher,
+        "trace_exporter": start_trace_exporter,
+        "optional_modules": preload_optional_modules
+    })
+
+@app.on_event("startup")
+async def start_audit_ingestion():
+    """
+    Consume the audit ingestion stream in the background when Redis is
+    configured; without it, audit batches are inserted directly.
+    """
+    if settings.REDIS_URL:
+        await start_ingestion_consumer()
+
+@app.on_event("shutdown")
+async def shutdown_audit_ingestion():
+    """Finish the current audit ingestion batch and disconnect the stream"""
+    await stop_ingestion_consumer()
+
+@app.on_event("shutdown")
+async def shutdown_async_database():
+    """Close pooled async database connections"""
+    await close_async_db()
+
+@app.on_event("shutdown")
+async def flush_share_access_logs():
+    """Write share access logs still buffered"""
+    await asyncio.to_thread(close_access_log_buffer)
+
+@app.on_event("shutdown")
+async def shutdown_metrics_publisher():
+    """Stop publishing this worker's request metrics"""
+    await asyncio.to_thread(stop_metrics_publisher)
+
+@app.on_event("shutdown")
+async def shutdown_trace_exporter():
+    """Send traces still queued for export"""
+    await asyncio.to_thread(stop_trace_exporter)
+
 # Basic endpoints
 @app.get("/")
 async def root():
@@ -276,6 +361,21 @@ async def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus / OpenMetrics exposition of the request metrics of all workers"""
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    
+    openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+    body = await asyncio.to_thread(render_metrics, openmetrics)
+    return Response(
+        content=body,
+        media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+    )
+
 @app.get("/debug")
 async def debug_info():
     """Debug endpoint to check environment variables and system status"""
@@ -375,10 +475,10 @@ async def get_dashboard_data(request: Request, current_user = Depends(get_curren
         cache_manager = getattr(request.app.state, 'cache_manager', None)
         if cache_manager:
             cache_key = f"dashboard:{current_user['user_id']}"
-            cached_data = await cache_manager.get(cache_key)
+            cached_data = await cache_manager.get_encoded(cache_key)
             if cached_data:
-                cached_data["cache_status"] = "cached"
-                return cached_data
+                # Stored with cache_status "cached": sent as is, without decoding
+                return EncodedJSONResponse(cached_data)
         
         if supabase is None:
             raise HTTPException(status_code=503, detail="Database service unavailable")
@@ -427,7 +527,7 @@ async def get_dashboard_data(request: Request, current_user = Depends(get_curren
         
         # Cache the result for 60 seconds
         if cache_manager:
-            await cache_manager.set(cache_key, dashboard_data, ttl=60)
+            await cache_manager.set(cache_key, {**dashboard_data, "cache_status": "cached"}, ttl=60)
         
         return dashboard_data
         
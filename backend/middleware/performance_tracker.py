@@ -2,60 +2,62 @@
 Performance Tracking Middleware
 
 Tracks all API requests with timing, status codes, and error information.
-Stores metrics in memory for real-time dashboard display.
+Latencies are recorded per route template in the shared request metrics
+core (HDR histograms), which provides percentiles and request rates for the
+real-time dashboard and the Prometheus exposition.
 """
 
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from collections import defaultdict
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Any, Optional
 import logging
 
+from services.request_metrics import RequestMetrics, UNMATCHED_ROUTE, request_metrics
+
 logger = logging.getLogger(__name__)
 
 
 class PerformanceTracker:
     """
-    In-memory performance metrics tracker.
+    Performance metrics tracker.
     
     Tracks:
     - Request counts per endpoint
-    - Response times (min, max, avg)
+    - Response times (min, max, avg, p50, p95, p99, p99.9)
     - Error rates
     - Recent slow queries
     - Requests per minute
     """
     
-    def __init__(self, slow_query_threshold: float = 1.0):
+    def __init__(self, slow_query_threshold: float = 1.0, metrics: Optional[RequestMetrics] = None):
         """
         Initialize performance tracker.
         
         Args:
             slow_query_threshold: Threshold in seconds for slow query detection
+            metrics: Request metrics to record into; a private instance by default
         """
         self.slow_query_threshold = slow_query_threshold
+        self.metrics = metrics if metrics is not None else RequestMetrics()
         self.start_time = datetime.now()
         
-        # Endpoint statistics
-        self.endpoint_stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
-            'total_requests': 0,
-            'total_duration': 0.0,
-            'min_duration': float('inf'),
-            'max_duration': 0.0,
-            'error_count': 0,
-            'status_codes': defaultdict(int),
-            'recent_requests': []  # Last 100 requests for RPM calculation
-        })
-        
-        # Global statistics
-        self.total_requests = 0
-        self.total_errors = 0
-        
         # Slow queries tracking
-        self.slow_queries: List[Dict[str, Any]] = []
         self.max_slow_queries = 50  # Keep last 50 slow queries
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=self.max_slow_queries)
+    
+    @property
+    def total_requests(self) -> int:
+        return self.metrics.snapshot().total_requests
+    
+    @property
+    def total_errors(self) -> int:
+        return self.metrics.snapshot().total_errors
+    
+    @property
+    def endpoint_stats(self) -> List[str]:
+        """Endpoints with recorded requests, as "METHOD endpoint" """
+        return [f"{method} {endpoint}" for method, endpoint in self.metrics.series_keys()]
         
     def record_request(
         self,
@@ -66,92 +68,49 @@ class PerformanceTracker:
         error: Optional[str] = None
     ):
         """Record a request with its metrics."""
-        now = datetime.now()
-        
-        # Update global stats
-        self.total_requests += 1
-        if status_code >= 400:
-            self.total_errors += 1
-        
-        # Update endpoint stats
-        stats = self.endpoint_stats[f"{method} {endpoint}"]
-        stats['total_requests'] += 1
-        stats['total_duration'] += duration
-        stats['min_duration'] = min(stats['min_duration'], duration)
-        stats['max_duration'] = max(stats['max_duration'], duration)
-        stats['status_codes'][status_code] += 1
-        
-        if status_code >= 400:
-            stats['error_count'] += 1
-        
-        # Track recent requests for RPM calculation
-        stats['recent_requests'].append(now)
-        # Keep only last 100 requests
-        if len(stats['recent_requests']) > 100:
-            stats['recent_requests'] = stats['recent_requests'][-100:]
+        self.metrics.record(method, endpoint, status_code, duration)
         
         # Track slow queries
         if duration >= self.slow_query_threshold:
             self.slow_queries.append({
                 'endpoint': f"{method} {endpoint}",
                 'duration': duration,
-                'timestamp': now.isoformat(),
+                'timestamp': datetime.now().isoformat(),
                 'status_code': status_code,
                 'error': error
             })
-            # Keep only recent slow queries
-            if len(self.slow_queries) > self.max_slow_queries:
-                self.slow_queries = self.slow_queries[-self.max_slow_queries:]
     
     def get_stats(self) -> Dict[str, Any]:
         """Get current performance statistics."""
+        snapshot = self.metrics.snapshot()
         endpoint_stats = {}
         
-        for endpoint, stats in self.endpoint_stats.items():
-            total_requests = stats['total_requests']
-            if total_requests == 0:
+        for endpoint, summary in snapshot.summary().items():
+            if summary['count'] == 0:
                 continue
             
-            # Calculate average duration
-            avg_duration = stats['total_duration'] / total_requests
-            
-            # Calculate error rate
-            error_rate = (stats['error_count'] / total_requests) * 100
-            
-            # Calculate requests per minute
-            rpm = self._calculate_rpm(stats['recent_requests'])
-            
             endpoint_stats[endpoint] = {
-                'total_requests': total_requests,
-                'avg_duration': avg_duration,
-                'min_duration': stats['min_duration'] if stats['min_duration'] != float('inf') else 0,
-                'max_duration': stats['max_duration'],
-                'error_rate': round(error_rate, 2),
-                'requests_per_minute': rpm
+                'total_requests': summary['count'],
+                'avg_duration': summary['avg'],
+                'min_duration': summary['min'],
+                'max_duration': summary['max'],
+                'p50_duration': summary['p50'],
+                'p95_duration': summary['p95'],
+                'p99_duration': summary['p99'],
+                'p999_duration': summary['p999'],
+                'error_rate': summary['error_rate'],
+                'requests_per_minute': round(summary['requests_per_second'] * 60, 2)
             }
         
         return {
-            'total_requests': self.total_requests,
-            'total_errors': self.total_errors,
+            'total_requests': snapshot.total_requests,
+            'total_errors': snapshot.total_errors,
             'slow_queries_count': len(self.slow_queries),
             'endpoint_stats': endpoint_stats,
-            'recent_slow_queries': self.slow_queries[-10:],  # Last 10 slow queries
+            'recent_slow_queries': list(self.slow_queries)[-10:],  # Last 10 slow queries
             'uptime_seconds': (datetime.now() - self.start_time).total_seconds()
         }
     
-    def _calculate_rpm(self, recent_requests: List[datetime]) -> float:
-        """Calculate requests per minute from recent requests."""
-        if not recent_requests:
-            return 0.0
-        
-        now = datetime.now()
-        one_minute_ago = now - timedelta(minutes=1)
-        
-        # Count requests in the last minute
-        recent_count = sum(1 for req_time in recent_requests if req_time >= one_minute_ago)
-        
-        return round(recent_count, 2)
-    
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status based on current metrics."""
         stats = self.get_stats()
@@ -188,35 +147,47 @@ class PerformanceTracker:
     
     def reset_stats(self):
         """Reset all statistics."""
-        self.endpoint_stats.clear()
-        self.total_requests = 0
-        self.total_errors = 0
+        self.metrics.reset()
         self.slow_queries.clear()
         self.start_time = datetime.now()
         logger.info("Performance statistics reset")
 
 
-class PerformanceMiddleware(BaseHTTPMiddleware):
+class PerformanceMiddleware:
     """
     Middleware to track request performance.
+    
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so tracking adds
+    no extra task or response wrapping per request. Requests are recorded by
+    route template (e.g. /api/projects/{project_id}), read from the route
+    FastAPI matched.
     """
     
+    # Skip tracking for health check endpoints to avoid noise
+    SKIP_PATHS = frozenset(['/health', '/'])
+    
     def __init__(self, app, tracker: PerformanceTracker):
-        super().__init__(app)
+        self.app = app
         self.tracker = tracker
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope, receive, send):
         """Process request and track performance."""
-        # Skip tracking for health check endpoints to avoid noise
-        if request.url.path in ['/health', '/']:
-            return await call_next(request)
+        if scope['type'] != 'http' or scope['path'] in self.SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        start_time = time.time()
+        start_time = time.perf_counter()
+        status_code = 500
         error_message = None
         
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+        
         try:
-            response = await call_next(request)
-            status_code = response.status_code
+            await self.app(scope, receive, send_with_status)
         except Exception as e:
             logger.error(f"Request failed: {str(e)}")
             error_message = str(e)
@@ -224,20 +195,15 @@ class PerformanceMiddleware(BaseHTTPMiddleware):
             # Re-raise to let FastAPI handle it
             raise
         finally:
-            # Calculate duration
-            duration = time.time() - start_time
-            
-            # Record metrics
+            route = scope.get('route')
             self.tracker.record_request(
-                endpoint=request.url.path,
-                method=request.method,
-                duration=duration,
+                endpoint=getattr(route, 'path', None) or UNMATCHED_ROUTE,
+                method=scope['method'],
+                duration=time.perf_counter() - start_time,
                 status_code=status_code,
                 error=error_message
             )
-        
-        return response
 
 
-# Global tracker instance
-performance_tracker = PerformanceTracker(slow_query_threshold=1.0)
+# Global tracker instance, recording into the process-wide request metrics
+performance_tracker = PerformanceTracker(slow_query_threshold=1.0, metrics=request_metrics)
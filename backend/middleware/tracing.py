@@ -0,0 +1,57 @@
+"""
+Request Tracing Middleware
+
+Starts a trace for each request, so database, cache and LLM calls made while
+handling it are recorded as spans (see services/tracing.py). When enabled
+(TRACE_RESPONSE_HEADERS), responses also carry the trace id and a
+Server-Timing header with the time per span kind; otherwise the breakdown is
+only available from the kept traces.
+"""
+
+from typing import Optional
+
+from services.request_metrics import UNMATCHED_ROUTE
+from services.tracing import Tracer
+
+
+class TracingMiddleware:
+    """
+    Middleware to trace requests.
+
+    A plain ASGI middleware: the trace is set in a context variable before
+    the application runs, so it has to wrap every BaseHTTPMiddleware (which
+    runs the application in a task of its own).
+    """
+
+    # Skip tracing for health check endpoints to avoid noise
+    SKIP_PATHS = frozenset(['/health', '/'])
+
+    def __init__(self, app, tracer: Tracer, response_headers: bool = False):
+        self.app = app
+        self.tracer = tracer
+        self.response_headers = response_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = self.tracer.start_trace(scope['method'], scope['path'])
+        status_code: Optional[int] = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if self.response_headers:
+                    headers = list(message.get('headers', []))
+                    headers.append((b'x-trace-id', trace.trace_id.encode()))
+                    headers.append((b'server-timing', trace.server_timing().encode()))
+                    message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = getattr(scope.get('route'), 'path', None) or UNMATCHED_ROUTE
+            self.tracer.finish_trace(trace, token, route, status_code)
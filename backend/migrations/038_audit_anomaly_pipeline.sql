@@ -0,0 +1,50 @@
+-- ============================================================================
+-- Migration 038: Incremental Audit Anomaly Detection Pipeline
+-- ============================================================================
+-- Supports services/audit_anomaly_pipeline.py:
+--   * audit_pipeline_watermarks keeps the (created_at, id) position of the last
+--     processed roche_audit_logs row per pipeline and tenant
+--   * bulk_update_audit_anomaly_status writes scores/flags for a whole window
+--     in one statement instead of one UPDATE per event
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS audit_pipeline_watermarks (
+    pipeline_name VARCHAR(100) NOT NULL,
+    tenant_key VARCHAR(100) NOT NULL DEFAULT 'global',
+    watermark_created_at TIMESTAMP WITH TIME ZONE,
+    watermark_event_id UUID,
+    last_run_metrics JSONB,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (pipeline_name, tenant_key)
+);
+
+COMMENT ON TABLE audit_pipeline_watermarks IS 'Last processed audit event per incremental pipeline and tenant';
+
+-- Keyset scans of new events in (created_at, id) order
+CREATE INDEX IF NOT EXISTS idx_roche_audit_logs_created_at_id
+    ON roche_audit_logs(created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_roche_audit_logs_tenant_created_at_id
+    ON roche_audit_logs(tenant_id, created_at, id);
+
+-- Bulk anomaly status update for one pipeline window
+CREATE OR REPLACE FUNCTION bulk_update_audit_anomaly_status(updates JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE roche_audit_logs AS logs
+    SET anomaly_score = u.anomaly_score,
+        is_anomaly = u.is_anomaly
+    FROM jsonb_to_recordset(updates) AS u(id UUID, anomaly_score DECIMAL(3,2), is_anomaly BOOLEAN)
+    WHERE logs.id = u.id;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$;
+
+COMMENT ON FUNCTION bulk_update_audit_anomaly_status(JSONB) IS 'Set anomaly_score/is_anomaly for many audit events in one statement';
@@ -0,0 +1,19 @@
+-- ============================================================================
+-- Migration 039: Rolling Audit Feature Statistics
+-- ============================================================================
+-- Supports services/audit_rolling_statistics.py: per time bucket counters of
+-- event types, users and entities used by AuditFeatureExtractor. Buckets older
+-- than the sliding window are deleted by the service; the catch-up position is
+-- kept in audit_pipeline_watermarks (pipeline_name = 'feature_statistics').
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS audit_feature_statistics_buckets (
+    bucket_start TIMESTAMP WITH TIME ZONE PRIMARY KEY,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    event_type_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    user_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    entity_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE audit_feature_statistics_buckets IS 'Time-bucketed audit event counters for anomaly feature extraction';
@@ -0,0 +1,71 @@
+-- ============================================================================
+-- Migration 040: Bulk Progress Rollup
+-- ============================================================================
+-- Supports services/progress_rollup_engine.py:
+--   * bulk_update_task_progress writes the progress of changed tasks and all
+--     rolled-up parent tasks in one statement instead of one UPDATE per task
+--   * bulk_update_wbs_progress does the same for WBS elements
+-- Columns missing from an update row are left unchanged.
+-- ============================================================================
+
+-- Rollup loads whole task/WBS trees per schedule
+CREATE INDEX IF NOT EXISTS idx_tasks_schedule_parent
+    ON tasks(schedule_id, parent_task_id);
+
+CREATE INDEX IF NOT EXISTS idx_wbs_elements_schedule_parent
+    ON wbs_elements(schedule_id, parent_element_id);
+
+-- Bulk task progress update
+CREATE OR REPLACE FUNCTION bulk_update_task_progress(updates JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE tasks AS t
+    SET progress_percentage = COALESCE(u.progress_percentage, t.progress_percentage),
+        status = COALESCE(u.status::task_status, t.status),
+        actual_start_date = COALESCE(u.actual_start_date, t.actual_start_date),
+        actual_end_date = COALESCE(u.actual_end_date, t.actual_end_date),
+        actual_effort_hours = COALESCE(u.actual_effort_hours, t.actual_effort_hours),
+        remaining_effort_hours = COALESCE(u.remaining_effort_hours, t.remaining_effort_hours),
+        updated_at = NOW()
+    FROM jsonb_to_recordset(updates) AS u(
+        id UUID,
+        progress_percentage INTEGER,
+        status TEXT,
+        actual_start_date DATE,
+        actual_end_date DATE,
+        actual_effort_hours DECIMAL(10,2),
+        remaining_effort_hours DECIMAL(10,2)
+    )
+    WHERE t.id = u.id;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$;
+
+COMMENT ON FUNCTION bulk_update_task_progress(JSONB) IS 'Set progress/status/actuals for many tasks in one statement';
+
+-- Bulk WBS element progress update
+CREATE OR REPLACE FUNCTION bulk_update_wbs_progress(updates JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE wbs_elements AS w
+    SET progress_percentage = u.progress_percentage,
+        updated_at = NOW()
+    FROM jsonb_to_recordset(updates) AS u(id UUID, progress_percentage INTEGER)
+    WHERE w.id = u.id;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$;
+
+COMMENT ON FUNCTION bulk_update_wbs_progress(JSONB) IS 'Set progress_percentage for many WBS elements in one statement';
@@ -183,6 +183,7 @@ class SimulationConfig(BaseModel):
     include_cost_analysis: bool = True
     include_schedule_analysis: bool = True
     risk_correlation_matrix: Optional[Dict[str, Dict[str, float]]] = None
+    random_seed: Optional[int] = None
     
     @field_validator('confidence_levels')
     @classmethod
@@ -0,0 +1,266 @@
+"""
+Batch Scenario Runner - Simulates a baseline and its variants as one vectorized job.
+
+This module provides functionality for:
+- Simulating a baseline scenario and K variants against shared random streams
+- Pairwise statistical comparison of all simulated scenarios
+- Expected value of the mitigations applied in each variant
+"""
+
+import time
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from .models import Risk, Scenario, CorrelationMatrix
+from .results_analyzer import SimulationResultsAnalyzer
+from .vectorized_sampling import RiskSampleMatrix, summarize_outcomes
+
+
+class BatchScenarioRunner:
+    """
+    Runs a baseline scenario and its variants with common random numbers.
+
+    The baseline risks are sampled once. Variants that only change impacts are
+    evaluated together with a single matrix product; variants that change a
+    risk's distribution re-transform the same uniforms for the changed columns.
+    Every variant therefore sees the same random draws as the baseline, which
+    makes differences between scenarios directly comparable iteration by
+    iteration.
+    """
+
+    def __init__(self, results_analyzer: Optional[SimulationResultsAnalyzer] = None):
+        """
+        Initialize the batch runner.
+
+        Args:
+            results_analyzer: Optional analyzer used for statistical comparisons
+        """
+        self.results_analyzer = results_analyzer or SimulationResultsAnalyzer()
+
+    def simulate(self,
+                 base_scenario: Scenario,
+                 variants: List[Scenario],
+                 iterations: int = 10000,
+                 random_seed: Optional[int] = None,
+                 correlations: Optional[CorrelationMatrix] = None,
+                 baseline_costs: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Simulate the baseline and every variant against one shared sample matrix.
+
+        Args:
+            base_scenario: Baseline scenario; its risks define the sample matrix
+            variants: Scenario variants of the baseline (same risk IDs and impact types)
+            iterations: Number of simulation iterations
+            random_seed: Optional random seed for reproducibility
+            correlations: Optional correlation matrix for dependent risks
+            baseline_costs: Optional baseline cost data added to cost outcomes
+
+        Returns:
+            Dict with 'cost' and 'schedule' arrays of shape ((K + 1) x iterations);
+            row 0 is the baseline
+
+        Raises:
+            ValueError: If a variant is not compatible with the baseline risks
+        """
+        base_risks = base_scenario.risks
+        matrix = RiskSampleMatrix.draw(base_risks, iterations, random_seed, correlations)
+        baseline_cost_total = sum(baseline_costs.values()) if baseline_costs else 0.0
+
+        n_scenarios = len(variants) + 1
+        cost = np.empty((n_scenarios, iterations))
+        schedule = np.empty((n_scenarios, iterations))
+
+        # Impact-only variants share the baseline samples and are stacked into one product
+        shared_rows = [0]
+        shared_weights = [matrix.impact_weights(base_risks)]
+
+        for k, variant in enumerate(variants, start=1):
+            weights, resampled = self._align_variant(matrix, base_risks, variant)
+            if not resampled:
+                shared_rows.append(k)
+                shared_weights.append(weights)
+                continue
+
+            samples = matrix.samples.copy()
+            for column, distribution in resampled:
+                samples[:, column] = matrix.resample_column(matrix.risk_ids[column], distribution)
+            outcomes = matrix.evaluate(weights, baseline_cost_total, samples=samples)
+            cost[k] = outcomes['cost'][0]
+            schedule[k] = outcomes['schedule'][0]
+
+        outcomes = matrix.evaluate(np.vstack(shared_weights), baseline_cost_total)
+        cost[shared_rows] = outcomes['cost']
+        schedule[shared_rows] = outcomes['schedule']
+
+        return {'cost': cost, 'schedule': schedule}
+
+    def run(self,
+            base_scenario: Scenario,
+            variants: List[Scenario],
+            iterations: int = 10000,
+            random_seed: Optional[int] = None,
+            correlations: Optional[CorrelationMatrix] = None,
+            baseline_costs: Optional[Dict[str, float]] = None,
+            include_pairwise: bool = True) -> Dict[str, Any]:
+        """
+        Simulate and compare a baseline and its variants in one job.
+
+        Args:
+            base_scenario: Baseline scenario
+            variants: Scenario variants of the baseline
+            iterations: Number of simulation iterations
+            random_seed: Optional random seed for reproducibility
+            correlations: Optional correlation matrix for dependent risks
+            baseline_costs: Optional baseline cost data added to cost outcomes
+            include_pairwise: Compare every pair of scenarios; when False only
+                baseline-versus-variant comparisons are made
+
+        Returns:
+            Dict containing per-scenario statistics, pairwise comparisons and
+            the expected value of mitigation for each variant
+        """
+        start_time = time.time()
+
+        outcomes = self.simulate(
+            base_scenario, variants, iterations, random_seed, correlations, baseline_costs
+        )
+        simulation_time = time.time() - start_time
+
+        scenarios = [base_scenario] + list(variants)
+        cost_summaries = summarize_outcomes(outcomes['cost'])
+        schedule_summaries = summarize_outcomes(outcomes['schedule'])
+
+        scenario_results = [
+            {
+                'scenario_id': scenario.id,
+                'name': scenario.name,
+                'is_baseline': k == 0,
+                'cost': cost_summaries[k],
+                'schedule': schedule_summaries[k]
+            }
+            for k, scenario in enumerate(scenarios)
+        ]
+
+        pairs = [(0, k) for k in range(1, len(scenarios))]
+        if include_pairwise:
+            pairs += [(i, j) for i in range(1, len(scenarios)) for j in range(i + 1, len(scenarios))]
+
+        comparisons = [
+            self._compare_pair(scenarios, outcomes, i, j) for i, j in pairs
+        ]
+
+        mitigation_values = [
+            self._mitigation_value(base_scenario, variant, outcomes, k)
+            for k, variant in enumerate(variants, start=1)
+        ]
+
+        return {
+            'iterations': iterations,
+            'random_seed': random_seed,
+            'scenarios_simulated': len(scenarios),
+            'scenarios': scenario_results,
+            'pairwise_comparisons': comparisons,
+            'mitigation_value': mitigation_values,
+            'simulation_time': simulation_time,
+            'execution_time': time.time() - start_time
+        }
+
+    def _align_variant(self,
+                       matrix: RiskSampleMatrix,
+                       base_risks: List[Risk],
+                       variant: Scenario) -> Tuple[np.ndarray, List[Tuple[int, Any]]]:
+        """
+        Map a variant's risks onto the baseline sample matrix columns.
+
+        Risks missing from the variant get zero weight. Correlation adjustment
+        factors are those of the baseline risk ordering.
+
+        Returns:
+            Tuple of the variant's impact weights and the (column, distribution)
+            pairs whose distribution differs from the baseline
+        """
+        weights = np.zeros(len(base_risks))
+        resampled = []
+        index_by_id = {risk_id: i for i, risk_id in enumerate(matrix.risk_ids)}
+
+        for risk in variant.risks:
+            column = index_by_id.get(risk.id)
+            if column is None:
+                raise ValueError(
+                    f"Variant {variant.name} contains risk {risk.id} that is not in the baseline"
+                )
+            base_risk = base_risks[column]
+            if risk.impact_type != base_risk.impact_type:
+                raise ValueError(
+                    f"Variant {variant.name} changes the impact type of risk {risk.id}"
+                )
+
+            weights[column] = risk.baseline_impact * matrix.adjustment_factors[column]
+            if risk.probability_distribution != base_risk.probability_distribution:
+                resampled.append((column, risk.probability_distribution))
+
+        return weights, resampled
+
+    def _compare_pair(self,
+                      scenarios: List[Scenario],
+                      outcomes: Dict[str, np.ndarray],
+                      i: int,
+                      j: int) -> Dict[str, Any]:
+        """Paired statistical comparison of scenarios i and j."""
+        cost_difference = self.results_analyzer.compare_paired_outcomes(
+            outcomes['cost'][i], outcomes['cost'][j], "cost"
+        )
+        schedule_difference = self.results_analyzer.compare_paired_outcomes(
+            outcomes['schedule'][i], outcomes['schedule'][j], "schedule"
+        )
+
+        return {
+            'scenario_a_id': scenarios[i].id,
+            'scenario_a_name': scenarios[i].name,
+            'scenario_b_id': scenarios[j].id,
+            'scenario_b_name': scenarios[j].name,
+            'cost_difference': cost_difference,
+            'schedule_difference': schedule_difference,
+            'statistical_significance': cost_difference['statistical_significance'],
+            'effect_size': cost_difference['effect_size']
+        }
+
+    def _mitigation_value(self,
+                          base_scenario: Scenario,
+                          variant: Scenario,
+                          outcomes: Dict[str, np.ndarray],
+                          k: int) -> Dict[str, Any]:
+        """Expected value of the mitigations applied in variant k."""
+        mitigation_cost = 0.0
+        mitigations_applied = {}
+        risks_by_id = {risk.id: risk for risk in base_scenario.risks}
+
+        for risk_id, modification in variant.modifications.items():
+            if not modification.mitigation_applied or risk_id not in risks_by_id:
+                continue
+            mitigation = next(
+                (m for m in risks_by_id[risk_id].mitigation_strategies
+                 if m.id == modification.mitigation_applied),
+                None
+            )
+            if mitigation:
+                mitigation_cost += mitigation.cost
+                mitigations_applied[risk_id] = mitigation.id
+
+        cost_reduction = outcomes['cost'][0] - outcomes['cost'][k]
+        expected_cost_reduction = float(np.mean(cost_reduction))
+        expected_value = expected_cost_reduction - mitigation_cost
+
+        return {
+            'scenario_id': variant.id,
+            'name': variant.name,
+            'mitigations_applied': mitigations_applied,
+            'mitigation_cost': mitigation_cost,
+            'expected_cost_reduction': expected_cost_reduction,
+            'expected_schedule_reduction': float(np.mean(outcomes['schedule'][0] - outcomes['schedule'][k])),
+            'expected_value': expected_value,
+            'probability_cost_reduction': float(np.mean(cost_reduction > 0)),
+            'return_on_investment': (expected_value / mitigation_cost
+                                     if mitigation_cost > 0 else None)
+        }
@@ -25,6 +25,7 @@ from .model_validator import ModelValidator
 from .change_detector import ModelChangeDetector, ChangeDetectionReport, ChangeSeverity
 from .cost_escalation import CostEscalationModeler, EscalationFactor, EscalationFactorType
 from .distribution_outputs import DistributionOutputGenerator, BudgetComplianceResult, ScheduleComplianceResult
+from services.tracing import traced
 
 
 class MonteCarloEngine:
@@ -339,6 +340,7 @@ class MonteCarloEngine:
             'previous_hash': previous_hash
         }
     
+    @traced("monte_carlo")
     def run_simulation(
         self, 
         risks: List[Risk], 
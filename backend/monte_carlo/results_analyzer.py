@@ -375,6 +375,64 @@ class SimulationResultsAnalyzer:
             }
         }
     
+    def compare_paired_outcomes(self, outcomes_a: np.ndarray,
+                                outcomes_b: np.ndarray,
+                                outcome_type: str = "cost") -> Dict[str, float]:
+        """
+        Compare outcome arrays simulated with common random numbers.
+        
+        Iteration i of both arrays was produced from the same random draws, so
+        in addition to the independent-sample tests of compare_scenarios the
+        paired t-test and Wilcoxon signed-rank test are reported, together with
+        a paired confidence interval for the mean difference.
+        
+        Args:
+            outcomes_a: First set of outcomes
+            outcomes_b: Second set of outcomes, aligned with outcomes_a
+            outcome_type: Type of outcome ('cost' or 'schedule')
+            
+        Returns:
+            Dictionary with statistical measures and test results
+            
+        Raises:
+            ValueError: If the outcome arrays have different lengths
+        """
+        if len(outcomes_a) != len(outcomes_b):
+            raise ValueError("Paired outcomes must have the same number of iterations")
+        
+        differences = self._calculate_outcome_differences(outcomes_a, outcomes_b, outcome_type)
+        
+        paired_diff = outcomes_b - outcomes_a
+        diff_std = np.std(paired_diff, ddof=1)
+        
+        # Identical scenarios have no paired variation to test
+        if diff_std == 0:
+            paired_t_statistic, paired_t_p_value = 0.0, 1.0
+            wilcoxon_statistic, wilcoxon_p_value = 0.0, 1.0
+        else:
+            paired_t_statistic, paired_t_p_value = stats.ttest_rel(outcomes_b, outcomes_a)
+            wilcoxon_statistic, wilcoxon_p_value = stats.wilcoxon(paired_diff, zero_method='zsplit')
+        
+        se_paired = diff_std / np.sqrt(len(paired_diff))
+        t_critical = stats.t.ppf(0.975, len(paired_diff) - 1)
+        mean_diff = np.mean(paired_diff)
+        
+        differences.update({
+            'paired_t_statistic': paired_t_statistic,
+            'paired_t_p_value': paired_t_p_value,
+            'wilcoxon_statistic': wilcoxon_statistic,
+            'wilcoxon_p_value': wilcoxon_p_value,
+            'paired_confidence_interval_95': (mean_diff - t_critical * se_paired,
+                                              mean_diff + t_critical * se_paired),
+            'probability_b_lower': float(np.mean(paired_diff < 0))
+        })
+        differences['statistical_significance'].update({
+            'paired_t_test': paired_t_p_value,
+            'wilcoxon': wilcoxon_p_value
+        })
+        
+        return differences
+    
     def perform_scenario_difference_analysis(self, scenario_a: SimulationResults,
                                            scenario_b: SimulationResults,
                                            significance_level: float = 0.05) -> Dict[str, any]:
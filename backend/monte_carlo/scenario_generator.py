@@ -16,8 +16,10 @@ from datetime import datetime
 from .models import (
     Risk, Scenario, RiskModification, MitigationStrategy, MitigationAnalysis,
     ProbabilityDistribution, DistributionType, ScenarioComparison,
-    SimulationResults, ValidationResult
+    SimulationResults, ValidationResult, CorrelationMatrix
 )
+from .sensitivity_engine import SensitivityEngine
+from .batch_scenario_runner import BatchScenarioRunner
 
 
 class ScenarioGenerator:
@@ -465,10 +467,110 @@ class ScenarioGenerator:
             'individual_analyses': individual_analyses
         }
     
+    def compare_scenarios_batch(self,
+                                base_scenario: Scenario,
+                                variants: List[Scenario],
+                                iterations: int = 10000,
+                                random_seed: Optional[int] = None,
+                                correlations: Optional[CorrelationMatrix] = None,
+                                baseline_costs: Optional[Dict[str, float]] = None,
+                                include_pairwise: bool = True) -> Dict[str, Any]:
+        """
+        Simulate a baseline and its variants as one job with shared random streams.
+        
+        Args:
+            base_scenario: Baseline scenario
+            variants: Scenario variants of the baseline
+            iterations: Number of simulation iterations
+            random_seed: Optional random seed for reproducibility
+            correlations: Optional correlation matrix for dependent risks
+            baseline_costs: Optional baseline cost data
+            include_pairwise: Compare every pair of scenarios, not only baseline vs variant
+            
+        Returns:
+            Dict containing per-scenario statistics, pairwise comparisons and
+            expected value of mitigation
+        """
+        return BatchScenarioRunner().run(
+            base_scenario, variants, iterations, random_seed,
+            correlations, baseline_costs, include_pairwise
+        )
+    
+    def simulate_mitigation_strategies(self,
+                                       base_scenario: Scenario,
+                                       target_risk_id: str,
+                                       iterations: int = 10000,
+                                       random_seed: Optional[int] = None,
+                                       correlations: Optional[CorrelationMatrix] = None,
+                                       baseline_costs: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Simulate every mitigation strategy of a risk in one batch against the baseline.
+        
+        Args:
+            base_scenario: Baseline scenario
+            target_risk_id: ID of the risk whose mitigation strategies are compared
+            iterations: Number of simulation iterations
+            random_seed: Optional random seed for reproducibility
+            correlations: Optional correlation matrix for dependent risks
+            baseline_costs: Optional baseline cost data
+            
+        Returns:
+            Dict containing the batch comparison, with mitigation values sorted
+            by expected value (descending)
+            
+        Raises:
+            ValueError: If the target risk is not found in the scenario
+        """
+        target_risk = next((r for r in base_scenario.risks if r.id == target_risk_id), None)
+        if not target_risk:
+            raise ValueError(f"Risk {target_risk_id} not found in scenario")
+        
+        variants = [
+            self.create_mitigated_scenario(
+                base_scenario,
+                {target_risk_id: mitigation.id},
+                name=f"{base_scenario.name} + {mitigation.name or mitigation.id}",
+                description=f"Mitigation {mitigation.id} applied to {target_risk_id}"
+            )
+            for mitigation in target_risk.mitigation_strategies
+        ]
+        
+        results = self.compare_scenarios_batch(
+            base_scenario, variants, iterations, random_seed,
+            correlations, baseline_costs, include_pairwise=False
+        )
+        results['mitigation_value'].sort(key=lambda x: x['expected_value'], reverse=True)
+        
+        return results
+    
+    def create_sensitivity_engine(self,
+                                 base_scenario: Scenario,
+                                 iterations: int = 10000,
+                                 random_seed: Optional[int] = None,
+                                 correlations: Optional[CorrelationMatrix] = None,
+                                 baseline_costs: Optional[Dict[str, float]] = None) -> SensitivityEngine:
+        """
+        Draw the shared sample matrix used to evaluate sensitivity scenarios.
+        
+        Args:
+            base_scenario: Base scenario to analyze
+            iterations: Number of simulation iterations
+            random_seed: Optional random seed for reproducibility
+            correlations: Optional correlation matrix for dependent risks
+            baseline_costs: Optional baseline cost data
+            
+        Returns:
+            SensitivityEngine: Engine evaluating perturbed scenarios with common random numbers
+        """
+        return SensitivityEngine.from_scenario(
+            base_scenario, iterations, random_seed, correlations, baseline_costs
+        )
+    
     def perform_sensitivity_analysis(self, 
                                     base_scenario: Scenario,
                                     target_variables: List[str],
-                                    variation_range: float = 0.2) -> Dict[str, Any]:
+                                    variation_range: float = 0.2,
+                                    sensitivity_engine: Optional[SensitivityEngine] = None) -> Dict[str, Any]:
         """
         Perform sensitivity analysis on key variables to assess their impact.
         
@@ -476,6 +578,8 @@ class ScenarioGenerator:
             base_scenario: Base scenario to analyze
             target_variables: List of variable names to analyze (risk IDs or parameter names)
             variation_range: Percentage variation to apply (e.g., 0.2 for ±20%)
+            sensitivity_engine: Optional engine from create_sensitivity_engine; when given,
+                simulated low/high outcomes are added to each result
             
         Returns:
             Dict containing sensitivity analysis results
@@ -484,6 +588,8 @@ class ScenarioGenerator:
             raise ValueError("Variation range must be between 0.0 and 1.0")
         
         sensitivity_results = {}
+        outcomes = (sensitivity_engine.tornado(target_variables, variation_range)
+                    if sensitivity_engine else {})
         
         for variable in target_variables:
             # Find the risk that matches this variable
@@ -526,6 +632,9 @@ class ScenarioGenerator:
                 'low_scenario': low_scenario,
                 'high_scenario': high_scenario
             }
+            
+            if variable in outcomes:
+                sensitivity_results[variable]['outcomes'] = outcomes[variable]
         
         return sensitivity_results
     
@@ -670,6 +779,9 @@ class ScenarioGenerator:
         """
         Generate data for tornado diagram visualization of sensitivity analysis.
         
+        When the results were computed with a sensitivity engine, variables are
+        ordered by simulated cost swing and the low/high outcome means are included.
+        
         Args:
             sensitivity_results: Results from perform_sensitivity_analysis
             
@@ -684,26 +796,71 @@ class ScenarioGenerator:
             'baseline_values': []
         }
         
-        # Sort variables by sensitivity (absolute value)
-        sorted_variables = sorted(
-            sensitivity_results.items(),
-            key=lambda x: abs(x[1].get('sensitivity_ratio', 0)),
-            reverse=True
+        has_outcomes = bool(sensitivity_results) and all(
+            'outcomes' in results for results in sensitivity_results.values()
         )
         
+        if has_outcomes:
+            tornado_data.update({
+                'low_cost_outcomes': [],
+                'high_cost_outcomes': [],
+                'cost_swings': [],
+                'low_schedule_outcomes': [],
+                'high_schedule_outcomes': [],
+                'schedule_swings': []
+            })
+            # Sort variables by simulated effect on the cost outcome
+            sort_key = lambda x: (x[1]['outcomes']['cost_swing'], x[1]['outcomes']['schedule_swing'])
+        else:
+            # Sort variables by sensitivity (absolute value)
+            sort_key = lambda x: abs(x[1].get('sensitivity_ratio', 0))
+        
+        sorted_variables = sorted(sensitivity_results.items(), key=sort_key, reverse=True)
+        
         for variable, results in sorted_variables:
             tornado_data['variables'].append(variable)
             tornado_data['low_impacts'].append(results.get('low_value', 0))
             tornado_data['high_impacts'].append(results.get('high_value', 0))
             tornado_data['ranges'].append(results.get('absolute_change', 0))
             tornado_data['baseline_values'].append(results.get('baseline_value', 0))
+            
+            if has_outcomes:
+                outcomes = results['outcomes']
+                tornado_data['low_cost_outcomes'].append(outcomes['low']['cost']['mean'])
+                tornado_data['high_cost_outcomes'].append(outcomes['high']['cost']['mean'])
+                tornado_data['cost_swings'].append(outcomes['cost_swing'])
+                tornado_data['low_schedule_outcomes'].append(outcomes['low']['schedule']['mean'])
+                tornado_data['high_schedule_outcomes'].append(outcomes['high']['schedule']['mean'])
+                tornado_data['schedule_swings'].append(outcomes['schedule_swing'])
         
         return tornado_data
     
+    def generate_spider_diagram_data(self,
+                                     sensitivity_engine: SensitivityEngine,
+                                     target_variables: List[str],
+                                     multipliers: Optional[List[float]] = None) -> Dict[str, Any]:
+        """
+        Generate data for spider diagram visualization of sensitivity analysis.
+        
+        Args:
+            sensitivity_engine: Engine from create_sensitivity_engine
+            target_variables: Risk IDs to vary
+            multipliers: Impact multipliers to evaluate (default 0.6 to 1.4)
+            
+        Returns:
+            Dict containing the multipliers, baseline means and per-variable mean outcomes
+        """
+        spider_data = sensitivity_engine.spider(target_variables, multipliers)
+        baseline = sensitivity_engine.baseline_summary()
+        spider_data['baseline_cost_mean'] = baseline['cost']['mean']
+        spider_data['baseline_schedule_mean'] = baseline['schedule']['mean']
+        return spider_data
+    
     def perform_multi_variable_sensitivity(self, 
                                          base_scenario: Scenario,
                                          variable_combinations: List[Dict[str, float]],
-                                         scenario_name_prefix: str = "MultiVar") -> Dict[str, Any]:
+                                         scenario_name_prefix: str = "MultiVar",
+                                         sensitivity_engine: Optional[SensitivityEngine] = None) -> Dict[str, Any]:
         """
         Perform sensitivity analysis on multiple variables simultaneously.
         
@@ -711,11 +868,15 @@ class ScenarioGenerator:
             base_scenario: Base scenario
             variable_combinations: List of dicts mapping risk_id -> impact_multiplier
             scenario_name_prefix: Prefix for generated scenario names
+            sensitivity_engine: Optional engine from create_sensitivity_engine; when given,
+                simulated outcomes are added to each result
             
         Returns:
             Dict containing multi-variable sensitivity results
         """
         multi_var_results = {}
+        outcomes = (sensitivity_engine.evaluate_multipliers(variable_combinations)
+                    if sensitivity_engine else [])
         
         for i, combination in enumerate(variable_combinations):
             scenario_name = f"{scenario_name_prefix}_{i}"
@@ -760,5 +921,8 @@ class ScenarioGenerator:
                 'relative_change': ((total_modified_impact - total_baseline_impact) / total_baseline_impact 
                                   if total_baseline_impact != 0 else 0)
             }
+            
+            if outcomes:
+                multi_var_results[scenario_name]['outcomes'] = outcomes[i]
         
         return multi_var_results
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Sensitivity Engine - Common-random-numbers evaluation of perturbed scenarios.
+
+This module provides functionality for:
+- Drawing the base risk sample matrix once per scenario
+- Evaluating impact-scaled scenarios by reweighting the shared samples
+- Tornado, spider and multi-variable sensitivity outcomes in a single pass
+"""
+
+import time
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from .models import Risk, Scenario, CorrelationMatrix
+from .vectorized_sampling import RiskSampleMatrix, summarize_outcomes
+
+
+class SensitivityEngine:
+    """
+    Evaluates sensitivity scenarios against one shared sample matrix.
+
+    Every perturbed scenario reuses the base scenario's random draws, so
+    differences between scenarios reflect the perturbation rather than
+    Monte Carlo noise, and scaling a risk's impact costs one matrix product
+    instead of a full simulation.
+    """
+
+    def __init__(self,
+                 risks: List[Risk],
+                 iterations: int = 10000,
+                 random_seed: Optional[int] = None,
+                 correlations: Optional[CorrelationMatrix] = None,
+                 baseline_costs: Optional[Dict[str, float]] = None):
+        """
+        Draw the shared sample matrix for the base risks.
+
+        Args:
+            risks: Base risks, in simulation order
+            iterations: Number of simulation iterations
+            random_seed: Optional random seed for reproducibility
+            correlations: Optional correlation matrix for dependent risks
+            baseline_costs: Optional baseline cost data added to cost outcomes
+        """
+        start_time = time.time()
+
+        self.risks = list(risks)
+        self.baseline_cost_total = sum(baseline_costs.values()) if baseline_costs else 0.0
+        self.sample_matrix = RiskSampleMatrix.draw(
+            self.risks, iterations, random_seed, correlations
+        )
+        self.base_weights = self.sample_matrix.impact_weights(self.risks)
+        self._baseline_outcomes = self.sample_matrix.evaluate(
+            self.base_weights, self.baseline_cost_total
+        )
+
+        self.sampling_time = time.time() - start_time
+
+    @classmethod
+    def from_scenario(cls,
+                      scenario: Scenario,
+                      iterations: int = 10000,
+                      random_seed: Optional[int] = None,
+                      correlations: Optional[CorrelationMatrix] = None,
+                      baseline_costs: Optional[Dict[str, float]] = None) -> 'SensitivityEngine':
+        """Create an engine for the risks of a scenario."""
+        return cls(scenario.risks, iterations, random_seed, correlations, baseline_costs)
+
+    @property
+    def iterations(self) -> int:
+        return self.sample_matrix.iterations
+
+    def baseline_summary(self) -> Dict[str, Dict[str, float]]:
+        """Outcome statistics of the unmodified base scenario."""
+        return {
+            'cost': summarize_outcomes(self._baseline_outcomes['cost'])[0],
+            'schedule': summarize_outcomes(self._baseline_outcomes['schedule'])[0]
+        }
+
+    def weights_for_multipliers(self, multipliers: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Build a (K x n_risks) weight matrix from per-scenario impact multipliers.
+
+        Args:
+            multipliers: One dict per scenario mapping risk_id -> impact multiplier;
+                risks not present in the matrix are ignored
+
+        Returns:
+            np.ndarray: Impact weights per scenario and risk
+        """
+        weights = np.tile(self.base_weights, (len(multipliers), 1))
+        index_by_id = {risk_id: i for i, risk_id in enumerate(self.sample_matrix.risk_ids)}
+
+        for k, combination in enumerate(multipliers):
+            for risk_id, multiplier in combination.items():
+                column = index_by_id.get(risk_id)
+                if column is not None:
+                    weights[k, column] *= multiplier
+
+        return weights
+
+    def evaluate_multipliers(self, multipliers: List[Dict[str, float]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate impact-scaled scenarios against the shared samples.
+
+        Args:
+            multipliers: One dict per scenario mapping risk_id -> impact multiplier
+
+        Returns:
+            List of dicts with 'cost' and 'schedule' outcome statistics, plus the
+            change in mean against the base scenario
+        """
+        if not multipliers:
+            return []
+
+        outcomes = self.sample_matrix.evaluate(
+            self.weights_for_multipliers(multipliers), self.baseline_cost_total
+        )
+        return self._summarize(outcomes)
+
+    def tornado(self, variables: List[str], variation_range: float = 0.2) -> Dict[str, Dict[str, Any]]:
+        """
+        Low/high outcome statistics for each variable scaled by ±variation_range.
+
+        All 2 x len(variables) scenarios are evaluated with one matrix product.
+
+        Args:
+            variables: Risk IDs to vary; IDs not in the scenario are skipped
+            variation_range: Relative variation to apply (e.g. 0.2 for ±20%)
+
+        Returns:
+            Dict mapping risk_id -> {'low': stats, 'high': stats, 'cost_swing', 'schedule_swing'}
+        """
+        variables = [v for v in variables if v in self.sample_matrix.risk_ids]
+        multipliers = []
+        for variable in variables:
+            multipliers.append({variable: 1.0 - variation_range})
+            multipliers.append({variable: 1.0 + variation_range})
+
+        summaries = self.evaluate_multipliers(multipliers)
+
+        results = {}
+        for i, variable in enumerate(variables):
+            low, high = summaries[2 * i], summaries[2 * i + 1]
+            results[variable] = {
+                'low': low,
+                'high': high,
+                'cost_swing': abs(high['cost']['mean'] - low['cost']['mean']),
+                'schedule_swing': abs(high['schedule']['mean'] - low['schedule']['mean'])
+            }
+        return results
+
+    def spider(self,
+               variables: List[str],
+               multipliers: Optional[List[float]] = None) -> Dict[str, Any]:
+        """
+        Mean outcome of each variable across a range of impact multipliers.
+
+        Args:
+            variables: Risk IDs to vary; IDs not in the scenario are skipped
+            multipliers: Impact multipliers to evaluate (default 0.6 to 1.4)
+
+        Returns:
+            Dict with the multipliers and per-variable cost and schedule means
+        """
+        if multipliers is None:
+            multipliers = [0.6, 0.8, 1.0, 1.2, 1.4]
+        variables = [v for v in variables if v in self.sample_matrix.risk_ids]
+
+        combinations = [
+            {variable: multiplier} for variable in variables for multiplier in multipliers
+        ]
+        summaries = self.evaluate_multipliers(combinations)
+
+        series = {}
+        for i, variable in enumerate(variables):
+            points = summaries[i * len(multipliers):(i + 1) * len(multipliers)]
+            series[variable] = {
+                'cost_means': [p['cost']['mean'] for p in points],
+                'schedule_means': [p['schedule']['mean'] for p in points]
+            }
+
+        return {'multipliers': list(multipliers), 'series': series}
+
+    def _summarize(self, outcomes: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Per-scenario statistics and mean deltas against the base scenario."""
+        cost_summaries = summarize_outcomes(outcomes['cost'])
+        schedule_summaries = summarize_outcomes(outcomes['schedule'])
+        baseline_cost_mean = float(self._baseline_outcomes['cost'].mean())
+        baseline_schedule_mean = float(self._baseline_outcomes['schedule'].mean())
+
+        return [
+            {
+                'cost': cost,
+                'schedule': schedule,
+                'cost_mean_change': cost['mean'] - baseline_cost_mean,
+                'schedule_mean_change': schedule['mean'] - baseline_schedule_mean
+            }
+            for cost, schedule in zip(cost_summaries, schedule_summaries)
+        ]
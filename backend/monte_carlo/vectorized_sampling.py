@@ -0,0 +1,395 @@
+"""
+Vectorized Sampling Core - Array-based risk sampling shared by simulation features.
+
+This module provides functionality for:
+- Drawing seeded uniform random matrices, optionally correlated via a Gaussian copula
+- Transforming uniforms to risk distributions with inverse CDFs
+- Reusing one sample matrix across scenarios (common random numbers)
+- Aggregating risk impacts into cost and schedule outcomes for many scenarios at once
+- Generic seeded samplers and order statistics used by the service-level simulators
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import stats
+
+from .models import (
+    Risk, ProbabilityDistribution, DistributionType, ImpactType, CorrelationMatrix
+)
+
+
+# Percentiles reported for every simulated outcome
+SUMMARY_PERCENTILES = (10, 50, 80, 90, 95)
+
+# Keeps inverse CDFs finite for uniforms at the edges of the unit interval
+_UNIFORM_EPSILON = 1e-12
+
+
+def create_generator(random_seed: Optional[int] = None) -> np.random.Generator:
+    """
+    Create the random generator used for all vectorized sampling.
+
+    Args:
+        random_seed: Optional seed for reproducible draws
+
+    Returns:
+        np.random.Generator: Seeded PCG64 generator
+    """
+    return np.random.default_rng(random_seed)
+
+
+def draw_uniform_matrix(iterations: int,
+                        n_variables: int,
+                        random_seed: Optional[int] = None,
+                        correlation_matrix: Optional[np.ndarray] = None,
+                        correlated_indices: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Draw an (iterations x n_variables) matrix of uniforms in (0, 1).
+
+    Columns listed in correlated_indices are coupled through a Gaussian copula
+    using correlation_matrix (ordered like correlated_indices). Falls back to
+    independent columns if the matrix is not positive definite.
+
+    Args:
+        iterations: Number of rows (simulation iterations)
+        n_variables: Number of columns (risks or other uncertain inputs)
+        random_seed: Optional seed for reproducibility
+        correlation_matrix: Optional correlation matrix for the correlated columns
+        correlated_indices: Column indices the correlation matrix applies to
+
+    Returns:
+        np.ndarray: Uniform samples
+    """
+    generator = create_generator(random_seed)
+    uniforms = generator.random((iterations, n_variables))
+
+    if correlation_matrix is not None and correlated_indices is not None and len(correlated_indices) > 1:
+        try:
+            cholesky = np.linalg.cholesky(correlation_matrix)
+        except np.linalg.LinAlgError:
+            cholesky = None
+
+        if cholesky is not None:
+            normals = generator.standard_normal((iterations, len(correlated_indices)))
+            uniforms[:, list(correlated_indices)] = stats.norm.cdf(normals @ cholesky.T)
+
+    return np.clip(uniforms, _UNIFORM_EPSILON, 1.0 - _UNIFORM_EPSILON)
+
+
+def triangular_ppf(uniforms: np.ndarray, minimum, mode, maximum) -> np.ndarray:
+    """
+    Closed-form inverse CDF of the triangular distribution.
+
+    Parameters may be scalars or arrays broadcastable against uniforms.
+    """
+    minimum = np.asarray(minimum, dtype=float)
+    mode = np.asarray(mode, dtype=float)
+    maximum = np.asarray(maximum, dtype=float)
+
+    width = maximum - minimum
+    safe_width = np.where(width > 0, width, 1.0)
+    split = np.where(width > 0, (mode - minimum) / safe_width, 0.5)
+
+    lower = minimum + np.sqrt(uniforms * width * (mode - minimum))
+    upper = maximum - np.sqrt((1.0 - uniforms) * width * (maximum - mode))
+
+    return np.where(uniforms < split, lower, upper)
+
+
+def transform_uniforms(distribution: ProbabilityDistribution, uniforms: np.ndarray) -> np.ndarray:
+    """
+    Transform uniform samples to a risk distribution via its inverse CDF.
+
+    Bounds are applied by clipping, matching ProbabilityDistribution.sample.
+
+    Args:
+        distribution: Target probability distribution
+        uniforms: Uniform samples in (0, 1)
+
+    Returns:
+        np.ndarray: Samples from the target distribution
+    """
+    params = distribution.parameters
+    dist_type = distribution.distribution_type
+
+    if dist_type == DistributionType.NORMAL:
+        samples = params['mean'] + params['std'] * stats.norm.ppf(uniforms)
+    elif dist_type == DistributionType.TRIANGULAR:
+        samples = triangular_ppf(uniforms, params['min'], params['mode'], params['max'])
+    elif dist_type == DistributionType.UNIFORM:
+        samples = params['min'] + (params['max'] - params['min']) * uniforms
+    elif dist_type == DistributionType.BETA:
+        samples = stats.beta.ppf(uniforms, params['alpha'], params['beta'])
+    elif dist_type == DistributionType.LOGNORMAL:
+        samples = np.exp(params['mu'] + params['sigma'] * stats.norm.ppf(uniforms))
+    else:
+        raise ValueError(f"Unsupported distribution type: {dist_type}")
+
+    if distribution.bounds is not None:
+        samples = np.clip(samples, distribution.bounds[0], distribution.bounds[1])
+
+    return samples
+
+
+def sample_triangular(generator: np.random.Generator,
+                      minimum, mode, maximum,
+                      size) -> np.ndarray:
+    """
+    Draw triangular samples; parameters broadcast against size.
+
+    Unlike Generator.triangular, degenerate (zero-width) distributions are
+    allowed and return their single value.
+    """
+    return triangular_ppf(generator.random(size), minimum, mode, maximum)
+
+
+def sample_occurrences(generator: np.random.Generator,
+                       probabilities: Sequence[float],
+                       iterations: int,
+                       correlation_matrix: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Draw an (iterations x n) boolean matrix of risk occurrences.
+
+    Args:
+        generator: Random generator
+        probabilities: Occurrence probability per risk
+        iterations: Number of iterations
+        correlation_matrix: Optional (n x n) correlation between occurrences,
+            applied through a Gaussian copula
+
+    Returns:
+        np.ndarray: True where the risk occurs in an iteration
+    """
+    probabilities = np.asarray(probabilities, dtype=float)
+    n_risks = len(probabilities)
+
+    uniforms = None
+    if correlation_matrix is not None and n_risks > 1:
+        try:
+            cholesky = np.linalg.cholesky(correlation_matrix)
+            normals = generator.standard_normal((iterations, n_risks))
+            uniforms = stats.norm.cdf(normals @ cholesky.T)
+        except np.linalg.LinAlgError:
+            uniforms = None
+
+    if uniforms is None:
+        uniforms = generator.random((iterations, n_risks))
+
+    return uniforms < probabilities
+
+
+def order_statistics(values: np.ndarray, fractions: Sequence[float]) -> np.ndarray:
+    """
+    Values at sorted position int(n * fraction) for each fraction.
+
+    Matches the index-into-sorted-list percentiles used by the service
+    simulators, with a partial sort instead of a full one.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    positions = np.minimum((np.asarray(fractions) * n).astype(int), n - 1)
+    return np.partition(values, positions)[positions]
+
+
+def correlation_adjustment_factors(risks: List[Risk],
+                                   correlations: Optional[CorrelationMatrix] = None) -> np.ndarray:
+    """
+    Per-risk impact factors that prevent double-counting of correlated risks.
+
+    Vectorized equivalent of RiskInteractionTracker.adjust_for_correlations:
+    each risk is reduced by 10% of every meaningful correlation (|rho| > 0.1)
+    with risks processed before it, capped at a 50% reduction.
+    """
+    factors = np.ones(len(risks))
+    if not correlations:
+        return factors
+
+    for j, risk in enumerate(risks):
+        if j == 0:
+            continue
+        total_effect = 0.0
+        for other in risks[:j]:
+            correlation = correlations.get_correlation(risk.id, other.id)
+            if abs(correlation) > 0.1:
+                total_effect += abs(correlation) * 0.1
+        factors[j] = max(0.5, 1.0 - min(total_effect, 0.5))
+
+    return factors
+
+
+def aggregate_outcomes(samples: np.ndarray,
+                       weights: np.ndarray,
+                       cost_mask: np.ndarray,
+                       schedule_mask: np.ndarray,
+                       baseline_cost_total: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Aggregate weighted risk samples into cost and schedule outcomes.
+
+    Each row of weights is one scenario, so K scenarios are evaluated with a
+    single matrix product over the shared samples.
+
+    Args:
+        samples: (iterations x n_risks) risk samples
+        weights: (K x n_risks) impact weight per scenario and risk
+        cost_mask: Boolean mask of risks with cost impact
+        schedule_mask: Boolean mask of risks with schedule impact
+        baseline_cost_total: Baseline cost added to every cost outcome
+
+    Returns:
+        Dict with 'cost' and 'schedule' arrays of shape (K x iterations)
+    """
+    weights = np.atleast_2d(weights)
+
+    cost_impact = (samples @ (weights * cost_mask).T).T
+    schedule_outcomes = (samples @ (weights * schedule_mask).T).T
+
+    cost_outcomes = baseline_cost_total + cost_impact
+
+    # Cost savings cannot take the project below 10% of its baseline cost
+    min_cost = baseline_cost_total * 0.1
+    cost_outcomes = np.where(
+        cost_impact < 0, np.maximum(cost_outcomes, min_cost), cost_outcomes
+    )
+
+    return {'cost': cost_outcomes, 'schedule': schedule_outcomes}
+
+
+def summarize_outcomes(outcomes: np.ndarray) -> List[Dict[str, float]]:
+    """
+    Summary statistics for each row of a (K x iterations) outcome array.
+
+    Returns:
+        List of dicts with mean, std, and the SUMMARY_PERCENTILES as p10, p50, ...
+    """
+    outcomes = np.atleast_2d(outcomes)
+    means = outcomes.mean(axis=1)
+    stds = outcomes.std(axis=1)
+    percentiles = np.percentile(outcomes, SUMMARY_PERCENTILES, axis=1)
+
+    summaries = []
+    for k in range(outcomes.shape[0]):
+        summary = {'mean': float(means[k]), 'std': float(stds[k])}
+        for p_index, p in enumerate(SUMMARY_PERCENTILES):
+            summary[f'p{p}'] = float(percentiles[p_index, k])
+        summaries.append(summary)
+    return summaries
+
+
+@dataclass
+class RiskSampleMatrix:
+    """
+    Risk samples drawn once and shared by every scenario evaluated against them.
+
+    Scenarios that only change a risk's baseline impact are evaluated by
+    reweighting columns. Scenarios that change a distribution are evaluated by
+    re-transforming the same uniforms, so every scenario sees the same random
+    numbers (common random numbers).
+    """
+    risk_ids: List[str]
+    uniforms: np.ndarray
+    samples: np.ndarray
+    adjustment_factors: np.ndarray
+    cost_mask: np.ndarray
+    schedule_mask: np.ndarray
+    random_seed: Optional[int] = None
+
+    @property
+    def iterations(self) -> int:
+        return self.samples.shape[0]
+
+    @classmethod
+    def draw(cls,
+             risks: List[Risk],
+             iterations: int = 10000,
+             random_seed: Optional[int] = None,
+             correlations: Optional[CorrelationMatrix] = None) -> 'RiskSampleMatrix':
+        """
+        Draw the shared sample matrix for a list of risks.
+
+        Args:
+            risks: Risks to sample, in simulation order
+            iterations: Number of iterations
+            random_seed: Optional seed for reproducibility
+            correlations: Optional correlation matrix between risks
+
+        Returns:
+            RiskSampleMatrix: Samples for every risk
+
+        Raises:
+            ValueError: If risks is empty or the correlation matrix references unknown risks
+        """
+        if not risks:
+            raise ValueError("At least one risk is required")
+
+        risk_ids = [risk.id for risk in risks]
+        index_by_id = {risk_id: i for i, risk_id in enumerate(risk_ids)}
+
+        correlation_array = None
+        correlated_indices = None
+        if correlations is not None:
+            for risk_id in correlations.risk_ids:
+                if risk_id not in index_by_id:
+                    raise ValueError(f"Correlation matrix references unknown risk: {risk_id}")
+            correlated_indices = [index_by_id[risk_id] for risk_id in correlations.risk_ids]
+            correlation_array = np.array([
+                [correlations.get_correlation(a, b) for b in correlations.risk_ids]
+                for a in correlations.risk_ids
+            ])
+
+        uniforms = draw_uniform_matrix(
+            iterations, len(risks), random_seed, correlation_array, correlated_indices
+        )
+        samples = np.column_stack([
+            transform_uniforms(risk.probability_distribution, uniforms[:, i])
+            for i, risk in enumerate(risks)
+        ])
+
+        return cls(
+            risk_ids=risk_ids,
+            uniforms=uniforms,
+            samples=samples,
+            adjustment_factors=correlation_adjustment_factors(risks, correlations),
+            cost_mask=np.array([r.impact_type in (ImpactType.COST, ImpactType.BOTH) for r in risks]),
+            schedule_mask=np.array([r.impact_type in (ImpactType.SCHEDULE, ImpactType.BOTH) for r in risks]),
+            random_seed=random_seed
+        )
+
+    def index_of(self, risk_id: str) -> int:
+        """Column index of a risk."""
+        try:
+            return self.risk_ids.index(risk_id)
+        except ValueError:
+            raise ValueError(f"Risk {risk_id} is not part of the sample matrix")
+
+    def resample_column(self, risk_id: str, distribution: ProbabilityDistribution) -> np.ndarray:
+        """Samples of a risk under a different distribution, from the same uniforms."""
+        return transform_uniforms(distribution, self.uniforms[:, self.index_of(risk_id)])
+
+    def impact_weights(self, risks: List[Risk]) -> np.ndarray:
+        """Impact weight per column: baseline impact times the correlation adjustment."""
+        return np.array([risk.baseline_impact for risk in risks]) * self.adjustment_factors
+
+    def evaluate(self,
+                 weights: np.ndarray,
+                 baseline_cost_total: float = 0.0,
+                 samples: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate one or more weight vectors against the shared samples.
+
+        Args:
+            weights: (n_risks,) or (K x n_risks) impact weights
+            baseline_cost_total: Baseline cost added to cost outcomes
+            samples: Optional replacement samples (e.g. with resampled columns)
+
+        Returns:
+            Dict with 'cost' and 'schedule' arrays of shape (K x iterations)
+        """
+        return aggregate_outcomes(
+            self.samples if samples is None else samples,
+            weights,
+            self.cost_mask,
+            self.schedule_mask,
+            baseline_cost_total
+        )
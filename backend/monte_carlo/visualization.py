@@ -12,12 +12,9 @@ from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.colors import LinearSegmentedColormap
-import seaborn as sns
 from scipy import stats
-import pandas as pd
+
+from utils.lazy_import import lazy_import
 
 from .models import (
     SimulationResults, PercentileAnalysis, RiskContribution, 
@@ -25,6 +22,9 @@ from .models import (
 )
 from .results_analyzer import SimulationResultsAnalyzer
 
+# matplotlib is imported on the first chart, not when the simulations router loads
+plt = lazy_import("matplotlib.pyplot")
+
 
 class ChartFormat(Enum):
     """Supported chart output formats."""
@@ -103,9 +103,14 @@ class ChartGenerator:
         """
         self.config = config or ChartConfig()
         self.results_analyzer = SimulationResultsAnalyzer()
-        
-        # Set up matplotlib style based on theme
-        self._setup_matplotlib_style()
+        self._style_applied = False
+    
+    def _subplots(self, *args, **kwargs):
+        """Create a figure, setting up the matplotlib style on first use."""
+        if not self._style_applied:
+            self._setup_matplotlib_style()
+            self._style_applied = True
+        return plt.subplots(*args, **kwargs)
     
     def _setup_matplotlib_style(self):
         """Set up matplotlib style based on configuration theme."""
@@ -177,7 +182,7 @@ class ChartGenerator:
             percentiles = [10, 25, 50, 75, 90, 95]
         
         # Create figure
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(self.config.width, self.config.height), 
+        fig, (ax1, ax2) = self._subplots(2, 1, figsize=(self.config.width, self.config.height), 
                                        height_ratios=[3, 1])
         
         # Main distribution plot (histogram + KDE)
@@ -293,7 +298,7 @@ class ChartGenerator:
         contributions = [rc.contribution_percentage for rc in risk_contributions]
         
         # Create figure
-        fig, ax = plt.subplots(figsize=(self.config.width, max(6, len(risk_names) * 0.5)))
+        fig, ax = self._subplots(figsize=(self.config.width, max(6, len(risk_names) * 0.5)))
         
         # Create horizontal bar chart (tornado style)
         y_positions = np.arange(len(risk_names))
@@ -394,7 +399,7 @@ class ChartGenerator:
         y_values = np.arange(1, n + 1) / n * 100  # Convert to percentages
         
         # Create figure
-        fig, ax = plt.subplots(figsize=(self.config.width, self.config.height))
+        fig, ax = self._subplots(figsize=(self.config.width, self.config.height))
         
         # Plot CDF
         ax.plot(sorted_data, y_values, color=self.config.color_palette[0], linewidth=2, label='Cumulative Probability')
@@ -524,7 +529,7 @@ class ChartGenerator:
             raise ValueError("No valid risk data found for heat map generation")
         
         # Create figure
-        fig, ax = plt.subplots(figsize=(self.config.width, self.config.height))
+        fig, ax = self._subplots(figsize=(self.config.width, self.config.height))
         
         # Extract data for plotting
         probabilities = [rd['estimated_probability'] for rd in risk_data]
@@ -635,7 +640,7 @@ class ChartGenerator:
             raise ValueError("chart_type must be 'distribution' or 'cdf'")
         
         # Create figure
-        fig, ax = plt.subplots(figsize=(self.config.width, self.config.height))
+        fig, ax = self._subplots(figsize=(self.config.width, self.config.height))
         
         # Prepare data
         scenario_data = {}
@@ -7,7 +7,7 @@ import time
 import json
 import hashlib
 import asyncio
-from typing import Any, Dict, List, Optional, Callable, Union
+from typing import Any, Dict, Optional, Callable, Union
 from datetime import datetime, timedelta
 from functools import wraps
 from contextlib import asynccontextmanager
@@ -20,12 +20,14 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from cachetools import TTLCache
-from prometheus_client import Counter, Histogram, Gauge, generate_latest
+from prometheus_client import Counter, Gauge, generate_latest
 import aiofiles
 
-# Metrics for monitoring
-REQUEST_COUNT = Counter('api_requests_total', 'Total API requests', ['method', 'endpoint', 'status'])
-REQUEST_DURATION = Histogram('api_request_duration_seconds', 'API request duration', ['method', 'endpoint'])
+from services.rate_limiter import API_KEY_PREFIX, storage_uri as rate_limit_storage_uri
+from services.request_metrics import RequestMetrics, request_metrics
+from utils.json_codec import dumps, encoded, loads
+
+# Metrics for monitoring; request counts and latencies are in services.request_metrics
 CACHE_HITS = Counter('cache_hits_total', 'Cache hits', ['cache_type'])
 CACHE_MISSES = Counter('cache_misses_total', 'Cache misses', ['cache_type'])
 ACTIVE_CONNECTIONS = Gauge('active_connections', 'Active connections')
@@ -54,7 +56,7 @@ class CacheManager:
                 value = await self.redis_client.get(key)
                 if value:
                     CACHE_HITS.labels(cache_type='redis').inc()
-                    return json.loads(value)
+                    return loads(value)
                 else:
                     CACHE_MISSES.labels(cache_type='redis').inc()
             
@@ -71,11 +73,34 @@ class CacheManager:
             CACHE_MISSES.labels(cache_type='error').inc()
             return None
     
+    async def get_encoded(self, key: str) -> Optional[bytes]:
+        """Get the JSON of a cached value without decoding it, for EncodedJSONResponse"""
+        try:
+            if self.redis_available and self.redis_client:
+                value = await self.redis_client.get(key)
+                if value:
+                    CACHE_HITS.labels(cache_type='redis').inc()
+                    return encoded(value)
+                else:
+                    CACHE_MISSES.labels(cache_type='redis').inc()
+            
+            if key in self.memory_cache:
+                CACHE_HITS.labels(cache_type='memory').inc()
+                return dumps(self.memory_cache[key], default=str)
+            
+            CACHE_MISSES.labels(cache_type='memory').inc()
+            return None
+            
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            CACHE_MISSES.labels(cache_type='error').inc()
+            return None
+    
     async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
         """Set value in cache with TTL"""
         try:
             if self.redis_available and self.redis_client:
-                serialized = json.dumps(value, default=str)
+                serialized = dumps(value, default=str)
                 await self.redis_client.setex(key, ttl, serialized)
                 return True
             
@@ -122,63 +147,33 @@ class CacheManager:
             return 0
 
 class PerformanceMonitor:
-    """Performance monitoring and metrics collection"""
+    """Performance summary of API requests, read from the shared request metrics"""
     
-    def __init__(self):
-        self.response_times: List[float] = []
-        self.error_counts: Dict[str, int] = {}
-        self.endpoint_stats: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, metrics: Optional[RequestMetrics] = None):
+        self.metrics = metrics if metrics is not None else request_metrics
     
     def record_request(self, method: str, endpoint: str, status_code: int, duration: float):
         """Record request metrics"""
-        REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status_code).inc()
-        REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
-        
-        # Store in memory for detailed analysis
-        self.response_times.append(duration)
-        if len(self.response_times) > 1000:  # Keep only last 1000 requests
-            self.response_times = self.response_times[-1000:]
-        
-        # Track endpoint statistics
-        endpoint_key = f"{method}:{endpoint}"
-        if endpoint_key not in self.endpoint_stats:
-            self.endpoint_stats[endpoint_key] = {
-                'total_requests': 0,
-                'total_duration': 0,
-                'error_count': 0,
-                'avg_duration': 0
-            }
-        
-        stats = self.endpoint_stats[endpoint_key]
-        stats['total_requests'] += 1
-        stats['total_duration'] += duration
-        stats['avg_duration'] = stats['total_duration'] / stats['total_requests']
-        
-        if status_code >= 400:
-            stats['error_count'] += 1
+        self.metrics.record(method, endpoint, status_code, duration)
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get performance summary"""
-        if not self.response_times:
+        snapshot = self.metrics.snapshot()
+        if not snapshot.total_requests:
             return {"message": "No performance data available"}
         
-        avg_response_time = sum(self.response_times) / len(self.response_times)
-        max_response_time = max(self.response_times)
-        min_response_time = min(self.response_times)
-        
-        # Calculate percentiles
-        sorted_times = sorted(self.response_times)
-        p95_index = int(len(sorted_times) * 0.95)
-        p99_index = int(len(sorted_times) * 0.99)
-        
+        overall = snapshot.summarize(snapshot.overall())
         return {
-            "total_requests": len(self.response_times),
-            "avg_response_time_ms": round(avg_response_time * 1000, 2),
-            "max_response_time_ms": round(max_response_time * 1000, 2),
-            "min_response_time_ms": round(min_response_time * 1000, 2),
-            "p95_response_time_ms": round(sorted_times[p95_index] * 1000, 2) if p95_index < len(sorted_times) else 0,
-            "p99_response_time_ms": round(sorted_times[p99_index] * 1000, 2) if p99_index < len(sorted_times) else 0,
-            "endpoint_stats": self.endpoint_stats
+            "total_requests": overall["count"],
+            "avg_response_time_ms": round(overall["avg"] * 1000, 2),
+            "max_response_time_ms": round(overall["max"] * 1000, 2),
+            "min_response_time_ms": round(overall["min"] * 1000, 2),
+            "p50_response_time_ms": round(overall["p50"] * 1000, 2),
+            "p95_response_time_ms": round(overall["p95"] * 1000, 2),
+            "p99_response_time_ms": round(overall["p99"] * 1000, 2),
+            "p999_response_time_ms": round(overall["p999"] * 1000, 2),
+            "requests_per_second": overall["requests_per_second"],
+            "endpoint_stats": snapshot.summary()
         }
 
 class BulkOperationManager:
@@ -255,7 +250,15 @@ class BulkOperationManager:
         return cached_status
 
 # Rate limiting setup
-limiter = Limiter(key_func=get_remote_address)
+# Rate limiting setup: the sliding window counter of services.rate_limiter,
+# over the same storage as the guest share link limiter
+limiter = Limiter(
+    key_func=get_remote_address,
+    strategy="sliding-window-counter",
+    storage_uri=rate_limit_storage_uri(),
+    key_prefix=API_KEY_PREFIX,
+    in_memory_fallback_enabled=True
+)
 
 def create_cache_key(prefix: str, *args, **kwargs) -> str:
     """Create a consistent cache key"""
@@ -291,8 +294,13 @@ def cached(ttl: int = 300, prefix: str = "api"):
     return decorator
 
 async def performance_middleware(request: Request, call_next):
-    """Middleware for performance monitoring"""
-    start_time = time.time()
+    """
+    Middleware adding response time headers.
+    
+    Request latencies are recorded once, by PerformanceMiddleware, in the
+    shared request metrics that PerformanceMonitor reads.
+    """
+    start_time = time.perf_counter()
     
     # Track active connections
     ACTIVE_CONNECTIONS.inc()
@@ -300,34 +308,11 @@ async def performance_middleware(request: Request, call_next):
     try:
         response = await call_next(request)
         
-        # Record metrics
-        duration = time.time() - start_time
-        method = request.method
-        endpoint = request.url.path
-        status_code = response.status_code
-        
-        # Get performance monitor from app state
-        performance_monitor = getattr(request.app.state, 'performance_monitor', None)
-        if performance_monitor:
-            performance_monitor.record_request(method, endpoint, status_code, duration)
-        
         # Add performance headers
-        response.headers["X-Response-Time"] = f"{duration:.3f}s"
+        response.headers["X-Response-Time"] = f"{time.perf_counter() - start_time:.3f}s"
         response.headers["X-Request-ID"] = str(id(request))
         
         return response
-        
-    except Exception as e:
-        # Record error
-        duration = time.time() - start_time
-        method = request.method
-        endpoint = request.url.path
-        
-        performance_monitor = getattr(request.app.state, 'performance_monitor', None)
-        if performance_monitor:
-            performance_monitor.record_request(method, endpoint, 500, duration)
-        
-        raise e
     
     finally:
         ACTIVE_CONNECTIONS.dec()
@@ -136,6 +136,7 @@ class SimulationConfig(BaseModel):
     include_cost_analysis: bool = True
     include_schedule_analysis: bool = True
     risk_correlation_matrix: Optional[Dict[str, Dict[str, float]]] = None
+    random_seed: Optional[int] = None
     
     @validator('confidence_levels')
     def validate_confidence_levels(cls, v):
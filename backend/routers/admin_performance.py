@@ -4,12 +4,19 @@ Admin Performance Monitoring Endpoints
 Provides real-time performance metrics for the admin dashboard.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, Any
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any, Optional
 from datetime import datetime
 
 from auth.rbac import require_permission, Permission
+from config.async_database import get_async_db
 from middleware.performance_tracker import performance_tracker
+from services.request_metrics import cluster_snapshot
+from services.tracing import to_otlp, tracer
+from utils.lazy_import import registered_modules
+from utils.startup_profiler import startup_profiler
 
 router = APIRouter(prefix="/api/admin/performance", tags=["admin", "performance"])
 
@@ -66,6 +73,103 @@ async def get_health_status(
         )
 
 
+@router.get("/routes")
+async def get_route_latencies(
+    current_user=Depends(require_permission(Permission.admin_read))
+) -> Dict[str, Any]:
+    """
+    Get per-route latency percentiles and rates across all workers.
+    
+    Returns:
+        - Workers included (all workers publishing to Redis, or this one)
+        - Total requests and errors
+        - Per route template: count, error rate, avg/min/max and
+          p50/p95/p99/p99.9 latency in seconds, requests and errors per
+          second over the last minute, responses by status class
+    
+    Requires: Admin read permission
+    """
+    try:
+        snapshot = await asyncio.to_thread(cluster_snapshot)
+        return {
+            'workers': snapshot.workers,
+            'total_requests': snapshot.total_requests,
+            'total_errors': snapshot.total_errors,
+            'routes': snapshot.summary(),
+            'timestamp': datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve route latencies: {str(e)}"
+        )
+
+
+@router.get("/traces")
+async def get_traces(
+    limit: int = 50,
+    reason: Optional[str] = Query(None, pattern="^(slow|errors|n_plus_one|sampled)$"),
+    current_user=Depends(require_permission(Permission.admin_read))
+) -> Dict[str, Any]:
+    """
+    Get recently kept request traces of this worker, newest first.
+    
+    Traces are kept when slower than the slow request threshold, failed
+    with a 5xx status, issued N+1 queries, or were randomly sampled.
+    
+    Args:
+        limit: Maximum number of traces to return (default: 50)
+        reason: Only traces kept for this reason
+    
+    Returns:
+        - Per trace: route, status, duration, why it was kept, time spent
+          in database, cache, LLM and Monte Carlo calls and in the
+          application itself, and repeated query shapes (N+1)
+        - Tracing thresholds and counters
+    
+    Requires: Admin read permission
+    """
+    try:
+        threshold = tracer.n_plus_one_threshold
+        return {
+            'traces': [trace.summary(threshold) for trace in tracer.recent(limit, reason)],
+            'slow_threshold_seconds': tracer.slow_threshold,
+            'n_plus_one_threshold': threshold,
+            'sample_rate': tracer.sample_rate,
+            'stats': dict(tracer.stats),
+            'exporter': dict(tracer.exporter.stats) if tracer.exporter is not None else None,
+            'timestamp': datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve traces: {str(e)}"
+        )
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(
+    trace_id: str,
+    format: str = Query("json", pattern="^(json|otlp)$"),
+    current_user=Depends(require_permission(Permission.admin_read))
+) -> Dict[str, Any]:
+    """
+    Get a kept trace with all its spans.
+    
+    Args:
+        trace_id: Trace id, as returned in the X-Trace-Id response header
+        format: json (default) or otlp for an OTLP/HTTP JSON export request
+    
+    Requires: Admin read permission
+    """
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found or no longer kept")
+    if format == "otlp":
+        return to_otlp([trace])
+    return trace.to_dict(tracer.n_plus_one_threshold)
+
+
 @router.post("/reset")
 async def reset_performance_stats(
     current_user=Depends(require_permission(Permission.system_admin))
@@ -80,6 +184,7 @@ async def reset_performance_stats(
     """
     try:
         performance_tracker.reset_stats()
+        tracer.clear()
         return {
             "message": "Performance statistics reset successfully",
             "timestamp": datetime.now().isoformat()
@@ -122,3 +227,70 @@ async def get_slow_queries(
             status_code=500,
             detail=f"Failed to retrieve slow queries: {str(e)}"
         )
+
+
+@router.get("/database-pool")
+async def get_database_pool_stats(
+    current_user=Depends(require_permission(Permission.admin_read))
+) -> Dict[str, Any]:
+    """
+    Get async database connection pool saturation.
+    
+    Returns:
+        - Pool backend and size
+        - Connections in use, available and peak usage
+        - Queries waiting for a connection and pool timeouts
+        - Average and maximum wait time for a connection
+    
+    Requires: Admin read permission
+    """
+    try:
+        db = get_async_db()
+        if db is None:
+            raise HTTPException(status_code=503, detail="Database service unavailable")
+        return {
+            **db.get_pool_metrics(),
+            'pool_config': db.pool_config,
+            'timestamp': datetime.now().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve database pool stats: {str(e)}"
+        )
+
+
+@router.get("/startup")
+async def get_startup_profile(
+    top: int = 25,
+    current_user=Depends(require_permission(Permission.admin_read))
+) -> Dict[str, Any]:
+    """
+    Get the startup profile of this worker process.
+    
+    Args:
+        top: Number of slowest modules and packages to return (default: 25)
+    
+    Returns:
+        - Seconds from process start to each startup phase
+        - Time to first request and its path
+        - Per-module import times (self and cumulative) and per-package totals
+        - Modules imported after startup, e.g. heavy dependencies on first use
+        - Background warm-up task outcomes and durations
+        - Lazily imported optional modules and whether each is loaded
+    
+    Requires: Admin read permission
+    """
+    try:
+        return {
+            **startup_profiler.report(top=top),
+            'lazy_modules': registered_modules(),
+            'timestamp': datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve startup profile: {str(e)}"
+        )
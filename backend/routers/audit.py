@@ -32,6 +32,8 @@ from services.audit_ml_service import AuditMLService
 from services.audit_export_service import AuditExportService
 from services.audit_integration_hub import AuditIntegrationHub
 from services.audit_encryption_service import get_encryption_service
+from services.audit_ingestion_stream import AuditIngestionBackpressureError, publish_audit_events
+from utils.json_codec import FastJSONResponse, register_response_models
 
 # Import rate limiting
 try:
@@ -111,6 +113,9 @@ class AuditEventsResponse(BaseModel):
     offset: int
 
 
+register_response_models(AuditEventsResponse)
+
+
 class TimelineEvent(BaseModel):
     """Timeline event with AI insights."""
     id: UUID
@@ -500,12 +505,12 @@ async def get_audit_events(
         response = query.execute()
         
         if not response.data:
-            return AuditEventsResponse(
+            return FastJSONResponse(AuditEventsResponse(
                 events=[],
                 total=0,
                 limit=limit,
                 offset=offset
-            )
+            ))
         
         # Decrypt sensitive fields (Requirement 6.6)
         decrypted_data = decrypt_audit_events(response.data)
@@ -545,12 +550,12 @@ async def get_audit_events(
             user_agent=request.headers.get("user-agent")
         )
         
-        return AuditEventsResponse(
+        return FastJSONResponse(AuditEventsResponse(
             events=events,
             total=total,
             limit=limit,
             offset=offset
-        )
+        ))
     
     except HTTPException:
         raise
@@ -1515,14 +1520,17 @@ async def batch_insert_events(
     """
     Batch insert audit events for high-throughput scenarios.
     
-    Supports up to 1000 events per batch with atomic transaction processing.
-    All events must succeed or the entire batch is rolled back.
+    Supports up to 1000 events per batch. When the ingestion stream is
+    running (Redis configured), the batch is queued and the ingestion
+    consumers classify, score, embed and store it in bulk; the response then
+    reports queued events. Otherwise the events are inserted directly, and
+    all events must succeed or the entire batch is rolled back.
     
     Args:
         events: List of audit event dictionaries (max 1000)
         
     Returns:
-        Success status and count of inserted events
+        Success status and count of queued or inserted events
         
     Requirements: 7.2
     """
@@ -1582,6 +1590,29 @@ async def batch_insert_events(
                     detail=f"Invalid event at index {idx}: {str(e)}"
                 )
         
+        # Queue the batch for the ingestion consumers when the stream is running
+        try:
+            message_ids = await publish_audit_events(prepared_events)
+        except AuditIngestionBackpressureError as e:
+            logger.warning(f"Audit ingestion backlog full, rejecting batch: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Audit ingestion is backlogged, retry later",
+                headers={"Retry-After": "5"}
+            )
+        
+        if message_ids:
+            logger.info(
+                f"Queued {len(message_ids)} audit events for ingestion for tenant {tenant_id}"
+            )
+            return {
+                "success": True,
+                "queued": True,
+                "message": f"Queued {len(message_ids)} events for ingestion",
+                "queued_count": len(message_ids),
+                "event_ids": [event["id"] for event in prepared_events]
+            }
+        
         # Insert events in a transaction (atomic operation)
         # Note: Supabase doesn't directly support transactions via REST API,
         # but batch inserts are atomic by default
@@ -1730,12 +1761,12 @@ async def get_audit_logs(
         response = query.execute()
         
         if not response.data:
-            return AuditEventsResponse(
+            return FastJSONResponse(AuditEventsResponse(
                 events=[],
                 total=0,
                 limit=limit,
                 offset=offset
-            )
+            ))
         
         # Convert to AuditEvent models
         events = []
@@ -1787,12 +1818,12 @@ async def get_audit_logs(
             }
         )
         
-        return AuditEventsResponse(
+        return FastJSONResponse(AuditEventsResponse(
             events=events,
             total=total,
             limit=limit,
             offset=offset
-        )
+        ))
     
     except HTTPException:
         raise
@@ -1338,6 +1338,7 @@ async def get_performance_stats(
     - Cache hit rates
     - WebSocket connection stats
     - Report generation times
+    - AI insight latency and token usage per category
     - Active alerts
     
     Requirements: Performance monitoring, admin access
@@ -1347,9 +1348,14 @@ async def get_performance_stats(
             "timestamp": datetime.utcnow().isoformat(),
             "pmr_optimizer": None,
             "websocket_optimizer": None,
-            "performance_monitor": None
+            "performance_monitor": None,
+            "ai_insights": None
         }
         
+        # Get AI insight generation latency and token metrics
+        if enhanced_pmr_service:
+            stats["ai_insights"] = enhanced_pmr_service.ai_insights_engine.get_metrics()
+        
         # Get PMR optimizer stats
         if pmr_performance_optimizer:
             stats["pmr_optimizer"] = await pmr_performance_optimizer.get_pmr_performance_stats()
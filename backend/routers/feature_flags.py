@@ -4,7 +4,7 @@ Feature flag management endpoints for admin interface
 
 from fastapi import APIRouter, HTTPException, Depends
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, List, Optional
 import asyncio
 
 from auth.rbac import require_permission, Permission
@@ -28,6 +28,13 @@ if supabase:
     feature_flag_service = FeatureFlagService(supabase)
 
 
+async def _evaluate_flags(func, *args):
+    """Evaluate in memory, or off the event loop while the flag snapshot is first loaded"""
+    if feature_flag_service.snapshot_loaded:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
 @router.post("", response_model=FeatureFlagResponse, status_code=201)
 async def create_feature_flag(
     flag_data: FeatureFlagCreate,
@@ -102,6 +109,40 @@ async def list_feature_flags(
         )
 
 
+@router.get("/evaluate", response_model=Dict[str, bool])
+async def evaluate_feature_flags(
+    current_user = Depends(get_current_user)
+):
+    """
+    Evaluate all feature flags for the current user.
+    
+    Returns a mapping of feature name to enabled status, so clients can
+    resolve every flag with one request.
+    
+    **Requirements**: 10.6
+    """
+    try:
+        if not feature_flag_service:
+            raise HTTPException(
+                status_code=503,
+                detail="Feature flag service unavailable"
+            )
+        
+        return await _evaluate_flags(
+            feature_flag_service.evaluate_all,
+            current_user.get("user_id"),
+            current_user.get("roles", [])
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to evaluate feature flags: {str(e)}"
+        )
+
+
 @router.get("/{flag_id}", response_model=FeatureFlagResponse)
 async def get_feature_flag(
     flag_id: UUID,
@@ -240,7 +281,7 @@ async def check_feature_enabled(
         # Get user roles from current_user
         user_roles = check_data.user_roles or current_user.get("roles", [])
         
-        result = await asyncio.to_thread(
+        result = await _evaluate_flags(
             feature_flag_service.check_feature_enabled,
             check_data.feature_name,
             user_id,
@@ -17,7 +17,9 @@ from models.financial import (
     FinancialTrackingCreate, FinancialTrackingResponse,
     FinancialSummary, ComprehensiveFinancialReport
 )
+from services.share_link_cache import get_share_resolution_cache
 from utils.converters import convert_uuids
+from utils.pagination import KeysetPage, PageParams
 from services.workflow_ppm_integration import WorkflowPPMIntegration
 
 router = APIRouter(prefix="/financial-tracking", tags=["financial"])
@@ -96,6 +98,7 @@ async def create_financial_entry(entry: FinancialTrackingCreate, current_user =
         supabase.table("projects").update({
             "actual_cost": str(total_spent)
         }).eq("id", str(entry.project_id)).execute()
+        await get_share_resolution_cache().invalidate_project(entry.project_id)
         
         # Check for budget variance and trigger workflow if needed
         if budget > 0:
@@ -140,14 +143,16 @@ async def list_financial_entries(
     transaction_type: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    params: PageParams = Depends(),
     current_user = Depends(get_current_user)
 ):
-    """Get financial tracking entries with optional filtering"""
+    """Get financial tracking entries with optional filtering, pagination and field selection"""
     try:
         if supabase is None:
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
-        query = supabase.table("financial_tracking").select("*")
+        page = KeysetPage(params, sort_column="date_incurred")
+        query = page.select(supabase.table("financial_tracking"))
         
         if project_id:
             query = query.eq("project_id", str(project_id))
@@ -164,8 +169,8 @@ async def list_financial_entries(
         if end_date:
             query = query.lte("date_incurred", end_date.isoformat())
         
-        response = query.order("date_incurred", desc=True).execute()
-        return convert_uuids(response.data)
+        response = page.apply(query).execute()
+        return page.response(response.data, response.count)
         
     except Exception as e:
         print(f"List financial entries error: {e}")
@@ -20,7 +20,9 @@ from models.roche_construction import (
     POBreakdownSummary,
     POBreakdownType
 )
+from models.po_breakdown import POHierarchyResponse
 from services.roche_construction_services import POBreakdownService
+from utils.json_codec import FastJSONResponse, register_response_models
 from services.po_breakdown_export_service import POBreakdownExportService
 from services.po_breakdown_scheduled_export_service import (
     POBreakdownScheduledExportService,
@@ -29,6 +31,8 @@ from services.po_breakdown_scheduled_export_service import (
 
 router = APIRouter(prefix="/pos/breakdown", tags=["po-breakdown"])
 
+register_response_models(POHierarchyResponse)
+
 # Initialize services
 po_breakdown_service = None
 export_service = None
@@ -498,13 +502,13 @@ async def get_hierarchy_tree(
             include_inactive=include_inactive
         )
         
-        return {
-            "project_id": str(project_id),
-            "root_id": str(root_id) if root_id else None,
+        return FastJSONResponse({
+            "project_id": project_id,
+            "root_id": root_id,
             "max_depth": max_depth,
             "hierarchy": hierarchy,
             "total_items": len(hierarchy) if isinstance(hierarchy, list) else 1
-        }
+        })
         
     except HTTPException:
         raise
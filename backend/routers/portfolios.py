@@ -10,6 +10,7 @@ from auth.dependencies import get_current_user
 from config.database import supabase
 from models.projects import PortfolioCreate, PortfolioResponse
 from utils.converters import convert_uuids
+from utils.pagination import KeysetPage, PageParams
 
 router = APIRouter(prefix="/portfolios", tags=["portfolios"])
 
@@ -32,14 +33,18 @@ async def create_portfolio(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/")
-async def list_portfolios(current_user = Depends(require_permission(Permission.portfolio_read))):
-    """Get all portfolios"""
+async def list_portfolios(
+    params: PageParams = Depends(),
+    current_user = Depends(require_permission(Permission.portfolio_read))
+):
+    """Get all portfolios with optional pagination and field selection"""
     try:
         if not supabase:
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
-        response = supabase.table("portfolios").select("*").execute()
-        return convert_uuids(response.data)
+        page = KeysetPage(params, sort_column="created_at")
+        response = page.apply(page.select(supabase.table("portfolios"))).execute()
+        return page.response(response.data, response.count)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
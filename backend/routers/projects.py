@@ -8,10 +8,11 @@ from typing import Optional
 
 from auth.rbac import require_permission, Permission
 from auth.dependencies import get_current_user
-from config.database import supabase
+from config.async_database import get_async_db
 from models.projects import ProjectCreate, ProjectResponse, ProjectStatus
 from models.base import HealthIndicator
 from utils.converters import convert_uuids
+from utils.pagination import KeysetPage, PageParams
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -22,13 +23,14 @@ async def create_project(
 ):
     """Create a new project"""
     try:
-        if not supabase:
+        db = get_async_db()
+        if not db:
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
         project_data = project.dict()
         project_data['health'] = HealthIndicator.green.value
         
-        response = supabase.table("projects").insert(project_data).execute()
+        response = await db.table("projects").insert(project_data).execute()
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to create project")
         
@@ -40,22 +42,25 @@ async def create_project(
 async def list_projects(
     portfolio_id: Optional[UUID] = Query(None),
     status: Optional[ProjectStatus] = Query(None),
+    params: PageParams = Depends(),
     current_user = Depends(require_permission(Permission.project_read))
 ):
-    """Get all projects with optional filtering"""
+    """Get all projects with optional filtering, pagination and field selection"""
     try:
-        if not supabase:
+        db = get_async_db()
+        if not db:
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
-        query = supabase.table("projects").select("*")
+        page = KeysetPage(params, sort_column="created_at")
+        query = page.select(db.table("projects"))
         
         if portfolio_id:
             query = query.eq("portfolio_id", str(portfolio_id))
         if status:
             query = query.eq("status", status.value)
         
-        response = query.execute()
-        return convert_uuids(response.data)
+        response = await page.apply(query).execute()
+        return page.response(response.data, response.count)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -66,10 +71,11 @@ async def get_project(
 ):
     """Get a specific project"""
     try:
-        if not supabase:
+        db = get_async_db()
+        if not db:
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
-        response = supabase.table("projects").select("*").eq("id", str(project_id)).execute()
+        response = await db.table("projects").select("*").eq("id", str(project_id)).execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="Project not found")
         return convert_uuids(response.data[0])
@@ -84,7 +90,8 @@ async def get_project_scenarios(
 ):
     """Get scenarios for a specific project - Frontend compatibility endpoint"""
     try:
-        if not supabase:
+        db = get_async_db()
+        if not db:
             # Return mock data for development when database is unavailable
             mock_scenarios = [
                 {
@@ -168,7 +175,7 @@ async def get_project_scenarios(
             }
         
         # Try to get scenarios from the database
-        response = supabase.table("scenario_analyses").select("*").eq(
+        response = await db.table("scenario_analyses").select("*").eq(
             "project_id", str(project_id)
         ).eq("is_active", True).order("created_at", desc=True).limit(limit).execute()
         
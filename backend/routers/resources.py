@@ -13,6 +13,7 @@ from models.resources import (
     ResourceSearchRequest, ResourceAllocationSuggestion
 )
 from utils.converters import convert_uuids
+from utils.pagination import KeysetPage, PageParams
 from utils.resource_calculations import (
     calculate_enhanced_resource_availability,
     calculate_advanced_skill_match_score
@@ -20,6 +21,13 @@ from utils.resource_calculations import (
 
 router = APIRouter(prefix="/resources", tags=["resources"])
 
+# Columns read and fields added by calculate_enhanced_resource_availability
+RESOURCE_AVAILABILITY_SOURCE_FIELDS = ("capacity", "availability", "current_projects")
+RESOURCE_AVAILABILITY_FIELDS = (
+    "utilization_percentage", "available_hours", "allocated_hours",
+    "capacity_hours", "availability_status", "can_take_more_work"
+)
+
 @router.post("/", response_model=ResourceResponse, status_code=status.HTTP_201_CREATED)
 async def create_resource(
     resource: ResourceCreate, 
@@ -49,18 +57,27 @@ async def create_resource(
         raise HTTPException(status_code=400, detail=f"Failed to create resource: {str(e)}")
 
 @router.get("/")
-async def list_resources(current_user = Depends(require_permission(Permission.resource_read))):
-    """Get all resources with utilization data"""
+async def list_resources(
+    params: PageParams = Depends(),
+    current_user = Depends(require_permission(Permission.resource_read))
+):
+    """Get all resources with utilization data, optional pagination and field selection"""
     try:
         if supabase is None:
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
         # Get resources from database
-        resources_response = supabase.table("resources").select("*").execute()
-        resources = convert_uuids(resources_response.data)
+        page = KeysetPage(
+            params,
+            sort_column="created_at",
+            source_fields=RESOURCE_AVAILABILITY_SOURCE_FIELDS,
+            computed_fields=RESOURCE_AVAILABILITY_FIELDS
+        )
+        resources_response = page.apply(page.select(supabase.table("resources"))).execute()
+        resources = resources_response.data or []
         
         # If no resources exist, return mock data for development
-        if not resources:
+        if not resources and not page.paginated:
             mock_resources = [
                 {
                     "id": "1",
@@ -152,7 +169,7 @@ async def list_resources(current_user = Depends(require_permission(Permission.re
             resource.update(availability_metrics)
             enhanced_resources.append(resource)
         
-        return enhanced_resources
+        return page.response(enhanced_resources, resources_response.count)
         
     except Exception as e:
         print(f"Resources error: {e}")
@@ -14,6 +14,7 @@ from models.risks import (
     RiskForecastRequest
 )
 from utils.converters import convert_uuids
+from utils.pagination import KeysetPage, PageParams
 
 router = APIRouter(prefix="/risks", tags=["risks"])
 issues_router = APIRouter(prefix="/issues", tags=["issues"])
@@ -62,14 +63,16 @@ async def list_risks(
     category: Optional[RiskCategory] = Query(None),
     status: Optional[RiskStatus] = Query(None),
     owner_id: Optional[UUID] = Query(None),
+    params: PageParams = Depends(),
     current_user = Depends(get_current_user)
 ):
-    """Get all risks with optional filtering"""
+    """Get all risks with optional filtering, pagination and field selection"""
     try:
         if supabase is None:
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
-        query = supabase.table("risks").select("*")
+        page = KeysetPage(params, sort_column="created_at")
+        query = page.select(supabase.table("risks"))
         
         if project_id:
             query = query.eq("project_id", str(project_id))
@@ -83,8 +86,8 @@ async def list_risks(
         if owner_id:
             query = query.eq("owner_id", str(owner_id))
         
-        response = query.order("created_at", desc=True).execute()
-        return convert_uuids(response.data)
+        response = page.apply(query).execute()
+        return page.response(response.data, response.count)
         
     except Exception as e:
         print(f"List risks error: {e}")
@@ -30,12 +30,22 @@ from models.shareable_urls import (
 )
 from services.share_link_generator import ShareLinkGenerator
 from services.guest_access_controller import GuestAccessController
+from services.share_link_cache import get_access_log_buffer, get_share_resolution_cache
 from services.access_analytics_service import AccessAnalyticsService
 from services.share_link_notification_service import ShareLinkNotificationService
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+
+async def _invalidate_share_validation(db, token: str) -> None:
+    """Drop the cached validation of a changed share link on every worker"""
+    await GuestAccessController(
+        db_session=db,
+        cache_manager=get_share_resolution_cache().cache_manager
+    ).invalidate_token_cache(token)
+
+
 # Create router
 router = APIRouter(prefix="/api", tags=["shareable-urls"])
 
@@ -267,7 +277,7 @@ async def revoke_share_link(
         user_id = UUID(current_user.get("user_id"))
         
         # Verify share link exists and get project_id
-        share_result = db.table("project_shares").select("id, project_id, created_by").eq(
+        share_result = db.table("project_shares").select("id, project_id, token, created_by").eq(
             "id", str(share_id)
         ).execute()
         
@@ -304,6 +314,8 @@ async def revoke_share_link(
                 detail="Failed to revoke share link"
             )
         
+        await _invalidate_share_validation(db, share["token"])
+        
         logger.info(
             f"Share link revoked: id={share_id}, by={user_id}, "
             f"reason={revocation_reason}"
@@ -363,7 +375,7 @@ async def extend_share_expiry(
         user_id = UUID(current_user.get("user_id"))
         
         # Verify share link exists and get project_id
-        share_result = db.table("project_shares").select("id, project_id, is_active").eq(
+        share_result = db.table("project_shares").select("id, project_id, token, is_active").eq(
             "id", str(share_id)
         ).execute()
         
@@ -406,6 +418,8 @@ async def extend_share_expiry(
                 detail="Failed to extend share link expiry"
             )
         
+        await _invalidate_share_validation(db, share["token"])
+        
         logger.info(
             f"Share link expiry extended: id={share_id}, by={user_id}, "
             f"added_days={extend_data.additional_days}"
@@ -470,8 +484,17 @@ async def access_shared_project(
                 detail="Service temporarily unavailable"
             )
         
-        # Initialize guest access controller
-        guest_controller = GuestAccessController(db_session=db)
+        # Initialize guest access controller; rate limits and token validations are
+        # shared across requests and workers, project payloads are cached and access
+        # logs are written in batches
+        resolution_cache = get_share_resolution_cache()
+        guest_controller = GuestAccessController(
+            db_session=db,
+            cache_manager=resolution_cache.cache_manager,
+            rate_limiter=GuestAccessController.shared_rate_limiter(),
+            resolution_cache=resolution_cache,
+            access_log_buffer=get_access_log_buffer()
+        )
         
         # Validate token
         validation = await guest_controller.validate_token(token)
@@ -1197,7 +1220,7 @@ async def manually_suspend_share_link(
             )
         
         # Verify share link exists
-        share_result = db.table("project_shares").select("id, is_active").eq(
+        share_result = db.table("project_shares").select("id, token, is_active").eq(
             "id", str(share_id)
         ).execute()
         
@@ -1229,6 +1252,8 @@ async def manually_suspend_share_link(
                 detail="Failed to suspend share link"
             )
         
+        await _invalidate_share_validation(db, share["token"])
+        
         logger.warning(
             f"Share link manually suspended: share_id={share_id}, "
             f"admin={current_user['id']}, reason={reason}"
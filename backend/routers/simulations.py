@@ -13,6 +13,7 @@ from fastapi.responses import JSONResponse, FileResponse
 from uuid import UUID, uuid4
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import asyncio
 import json
 import tempfile
 import os
@@ -42,6 +43,7 @@ from monte_carlo.api_validation import (
 )
 
 from utils.converters import convert_uuids
+from utils.json_codec import FastJSONResponse
 
 # Import caching service
 from services.simulation_cache_service import get_cache_service, SimulationCacheService
@@ -67,7 +69,7 @@ degradation_manager = GracefulDegradationManager()
 _cache_service: Optional[SimulationCacheService] = None
 
 # Pydantic models for API requests/responses
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Union
 
 class RiskCreateRequest(BaseModel):
@@ -103,6 +105,33 @@ class ScenarioComparisonRequest(BaseModel):
     scenario_ids: List[str]
     comparison_metrics: List[str] = ["cost", "schedule", "risk_contribution"]
 
+class ScenarioVariantRequest(BaseModel):
+    """Request model for a scenario variant in a batch comparison."""
+    name: str
+    description: str = ""
+    modifications: Dict[str, Dict[str, Any]] = {}
+
+# Pairwise comparisons grow quadratically with the number of scenarios
+MAX_PAIRWISE_VARIANTS = 10
+
+class BatchScenarioComparisonRequest(BaseModel):
+    """Request model for simulating and comparing a baseline and its variants in one job."""
+    base_risks: List[RiskCreateRequest]
+    variants: List[ScenarioVariantRequest] = Field(..., min_length=1, max_length=50)
+    iterations: int = Field(default=10000, ge=1000, le=200000)
+    random_seed: Optional[int] = None
+    correlations: Optional[Dict[str, Dict[str, float]]] = None
+    baseline_costs: Optional[Dict[str, float]] = None
+    include_pairwise: bool = False
+
+    @model_validator(mode='after')
+    def validate_pairwise(self):
+        if self.include_pairwise and len(self.variants) > MAX_PAIRWISE_VARIANTS:
+            raise ValueError(
+                f'include_pairwise supports at most {MAX_PAIRWISE_VARIANTS} variants'
+            )
+        return self
+
 class ChartGenerationRequest(BaseModel):
     """Request model for generating charts."""
     simulation_id: str
@@ -529,20 +558,22 @@ async def get_simulation_results(
                 logger.warning(f"Large dataset requested for raw data export: {results.iteration_count} iterations")
                 response_data["warning"] = "Large dataset - consider using export endpoint for better performance"
             
-            try:
-                response_data["raw_data"] = {
-                    "cost_outcomes": results.cost_outcomes.tolist(),
-                    "schedule_outcomes": results.schedule_outcomes.tolist(),
-                    "risk_contributions": {
-                        risk_id: contributions.tolist()
-                        for risk_id, contributions in results.risk_contributions.items()
-                    }
-                }
-            except Exception as e:
-                logger.error(f"Raw data serialization failed: {str(e)}")
-                response_data["raw_data_error"] = "Raw data too large or corrupted - use export endpoint"
+            # NumPy arrays are encoded directly by the response codec
+            response_data["raw_data"] = {
+                "cost_outcomes": results.cost_outcomes,
+                "schedule_outcomes": results.schedule_outcomes,
+                "risk_contributions": dict(results.risk_contributions)
+            }
         
-        return response_data
+        try:
+            return FastJSONResponse(response_data)
+        except Exception as e:
+            if "raw_data" not in response_data:
+                raise
+            logger.error(f"Raw data serialization failed: {str(e)}")
+            response_data.pop("raw_data")
+            response_data["raw_data_error"] = "Raw data too large or corrupted - use export endpoint"
+            return FastJSONResponse(response_data)
         
     except HTTPException:
         raise
@@ -761,6 +792,114 @@ async def compare_scenarios(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compare scenarios: {str(e)}")
 
+@router.post("/scenarios/compare/batch")
+async def compare_scenarios_batch(
+    request: BatchScenarioComparisonRequest,
+    current_user = Depends(require_permission(Permission.scenario_compare))
+):
+    """
+    Simulate a baseline and its variants as one vectorized job and compare them.
+    
+    All scenarios share the same random streams, so the response contains
+    paired comparisons, significance tests and the expected value of the
+    mitigations applied in each variant. Each variant is compared with the
+    baseline; comparing every pair of scenarios (include_pairwise) is limited
+    to MAX_PAIRWISE_VARIANTS variants.
+    
+    The simulation runs in a worker thread, so the event loop keeps serving
+    other requests meanwhile.
+    """
+    try:
+        from monte_carlo.models import RiskCategory, ImpactType, DistributionType, ProbabilityDistribution
+        
+        risks = []
+        for risk_data in request.base_risks:
+            mitigation_strategies = [
+                MitigationStrategy(
+                    id=ms_data.get("id", str(uuid4())),
+                    name=ms_data.get("name", ""),
+                    description=ms_data.get("description", ""),
+                    cost=ms_data.get("cost", 0.0),
+                    effectiveness=ms_data.get("effectiveness", 0.0),
+                    implementation_time=ms_data.get("implementation_time", 0)
+                )
+                for ms_data in risk_data.mitigation_strategies
+            ]
+            
+            risks.append(Risk(
+                id=risk_data.id,
+                name=risk_data.name,
+                category=RiskCategory(risk_data.category),
+                impact_type=ImpactType(risk_data.impact_type),
+                probability_distribution=ProbabilityDistribution(
+                    distribution_type=DistributionType(risk_data.distribution_type),
+                    parameters=risk_data.distribution_parameters
+                ),
+                baseline_impact=risk_data.baseline_impact,
+                correlation_dependencies=risk_data.correlation_dependencies,
+                mitigation_strategies=mitigation_strategies
+            ))
+        
+        correlations = None
+        if request.correlations:
+            risk_ids = [risk.id for risk in risks]
+            correlations = CorrelationMatrix(
+                correlations={
+                    (risk1_id, risk2_id): value
+                    for risk1_id, row in request.correlations.items()
+                    for risk2_id, value in row.items()
+                    if risk1_id in risk_ids and risk2_id in risk_ids
+                },
+                risk_ids=risk_ids
+            )
+        
+        base_scenario = Scenario(
+            id=str(uuid4()),
+            name="Baseline",
+            description="Baseline for batch comparison",
+            risks=risks
+        )
+        
+        variants = []
+        for variant_data in request.variants:
+            modifications = {
+                risk_id: RiskModification(
+                    parameter_changes=mod_data.get("parameter_changes", {}),
+                    distribution_type_change=(DistributionType(mod_data["distribution_type_change"])
+                                              if mod_data.get("distribution_type_change") else None),
+                    mitigation_applied=mod_data.get("mitigation_applied")
+                )
+                for risk_id, mod_data in variant_data.modifications.items()
+            }
+            variants.append(scenario_generator.create_scenario(
+                base_risks=risks,
+                modifications=modifications,
+                name=variant_data.name,
+                description=variant_data.description
+            ))
+        
+        results = await asyncio.to_thread(
+            scenario_generator.compare_scenarios_batch,
+            base_scenario,
+            variants,
+            iterations=request.iterations,
+            random_seed=request.random_seed,
+            correlations=correlations,
+            baseline_costs=request.baseline_costs,
+            include_pairwise=request.include_pairwise
+        )
+        
+        return {
+            "comparison_timestamp": datetime.now().isoformat(),
+            **results
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scenario parameters: {str(e)}")
+    except Exception as e:
+        logger.error(f"Batch scenario comparison failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to compare scenarios: {str(e)}")
+
 # Results Export Endpoints
 
 @router.post("/export")
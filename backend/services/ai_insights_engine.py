@@ -5,6 +5,10 @@ Leverages existing RAG patterns and OpenAI integration
 """
 
 import os
+import json
+import time
+import asyncio
+import hashlib
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
@@ -45,6 +49,17 @@ class AIInsightsEngine:
         self.max_tokens = 2000
         self.confidence_threshold = 0.7
         
+        # Concurrent category completions per generate_insights call
+        self.max_concurrent_requests = int(os.getenv("AI_INSIGHTS_MAX_CONCURRENCY", "4"))
+        
+        # Completions memoized on a hash of the prompt inputs: key -> (response, usage, expiry)
+        self.memo_ttl_seconds = int(os.getenv("AI_INSIGHTS_MEMO_TTL_SECONDS", "3600"))
+        self.memo_max_entries = 256
+        self._completion_memo: Dict[str, Tuple[str, Dict[str, int], float]] = {}
+        
+        # Per-category latency and token usage
+        self.category_metrics: Dict[str, Dict[str, float]] = {}
+        
     async def generate_insights(
         self,
         report_id: UUID,
@@ -74,23 +89,29 @@ class AIInsightsEngine:
                     AIInsightCategory.risk
                 ]
             
-            # Get project data for context
-            project_data = await self._get_project_data(project_id)
+            # Prefetch project and category data in one round of concurrent queries
+            project_data, category_data = await self._prefetch_insight_data(project_id, categories)
             
             # Merge with additional context
             full_context = {**project_data, **(context_data or {})}
             
-            # Generate insights for each category
-            all_insights = []
-            
-            for category in categories:
-                insights = await self._generate_category_insights(
-                    report_id=report_id,
-                    project_id=project_id,
-                    category=category,
-                    context=full_context
-                )
-                all_insights.extend(insights)
+            # Generate insights for all categories concurrently, bounded by the concurrency limit
+            semaphore = asyncio.Semaphore(max(1, self.max_concurrent_requests))
+            
+            async def generate_category(category: AIInsightCategory) -> List[EnhancedAIInsight]:
+                async with semaphore:
+                    return await self._generate_category_insights(
+                        report_id=report_id,
+                        project_id=project_id,
+                        category=category,
+                        context=full_context,
+                        category_data=category_data.get(category)
+                    )
+            
+            category_results = await asyncio.gather(
+                *(generate_category(category) for category in categories)
+            )
+            all_insights = [insight for insights in category_results for insight in insights]
             
             # Filter by confidence threshold
             filtered_insights = [
@@ -114,29 +135,22 @@ class AIInsightsEngine:
         report_id: UUID,
         project_id: UUID,
         category: AIInsightCategory,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        category_data: Optional[Dict[str, Any]] = None
     ) -> List[EnhancedAIInsight]:
         """Generate insights for a specific category"""
+        start_time = time.time()
         try:
-            # Get category-specific data
-            category_data = await self._get_category_data(project_id, category)
+            # Get category-specific data unless it was prefetched
+            if category_data is None:
+                category_data = await self._get_category_data(project_id, category)
             
             # Build prompt for AI insight generation
             system_prompt = self._build_system_prompt(category)
             user_prompt = self._build_user_prompt(category, category_data, context)
             
-            # Call OpenAI for insight generation
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            
-            ai_response = response.choices[0].message.content
+            # Call OpenAI for insight generation, reusing memoized completions
+            ai_response, usage, from_cache = await self._complete(system_prompt, user_prompt)
             
             # Parse AI response into structured insights
             insights = self._parse_insights_from_response(
@@ -146,12 +160,116 @@ class AIInsightsEngine:
                 category_data=category_data
             )
             
+            self._record_category_metrics(
+                category, (time.time() - start_time) * 1000, usage, from_cache
+            )
             return insights
             
         except Exception as e:
             logger.error(f"Failed to generate {category} insights: {e}")
             return []
     
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str
+    ) -> Tuple[str, Dict[str, int], bool]:
+        """
+        Run a chat completion, memoized on a hash of the prompt inputs
+        
+        Returns:
+            Tuple of response text, token usage and whether it came from the memo
+        """
+        memo_key = hashlib.sha256(json.dumps(
+            [self.model, self.temperature, self.max_tokens, system_prompt, user_prompt]
+        ).encode()).hexdigest()
+        
+        memoized = self._completion_memo.get(memo_key)
+        if memoized and memoized[2] > time.time():
+            return memoized[0], memoized[1], True
+        
+        # The OpenAI client is synchronous; keep the event loop free for other categories
+        response = await asyncio.to_thread(
+            self.openai_client.chat.completions.create,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        
+        ai_response = response.choices[0].message.content
+        response_usage = getattr(response, "usage", None)
+        usage = {
+            "prompt_tokens": getattr(response_usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(response_usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(response_usage, "total_tokens", 0) or 0
+        }
+        
+        self._memoize_completion(memo_key, ai_response, usage)
+        return ai_response, usage, False
+    
+    def _memoize_completion(self, memo_key: str, ai_response: str, usage: Dict[str, int]) -> None:
+        """Store a completion, evicting expired and then oldest entries when full"""
+        now = time.time()
+        if len(self._completion_memo) >= self.memo_max_entries:
+            for key in [k for k, v in self._completion_memo.items() if v[2] <= now]:
+                del self._completion_memo[key]
+        while len(self._completion_memo) >= self.memo_max_entries:
+            del self._completion_memo[next(iter(self._completion_memo))]
+        
+        self._completion_memo[memo_key] = (ai_response, usage, now + self.memo_ttl_seconds)
+    
+    def _record_category_metrics(
+        self,
+        category: AIInsightCategory,
+        latency_ms: float,
+        usage: Dict[str, int],
+        from_cache: bool
+    ) -> None:
+        """Accumulate latency and token usage for a category"""
+        metrics = self.category_metrics.setdefault(category.value, {
+            "requests": 0,
+            "memo_hits": 0,
+            "total_latency_ms": 0.0,
+            "last_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0
+        })
+        metrics["requests"] += 1
+        metrics["total_latency_ms"] += latency_ms
+        metrics["last_latency_ms"] = latency_ms
+        metrics["max_latency_ms"] = max(metrics["max_latency_ms"], latency_ms)
+        
+        # Memoized completions cost no tokens
+        if from_cache:
+            metrics["memo_hits"] += 1
+        else:
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                metrics[key] += usage.get(key, 0)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-category latency and token metrics of insight generation"""
+        categories = {}
+        for category, metrics in self.category_metrics.items():
+            requests = metrics["requests"]
+            categories[category] = {
+                **metrics,
+                "average_latency_ms": metrics["total_latency_ms"] / requests if requests else 0.0,
+                "memo_hit_rate": metrics["memo_hits"] / requests if requests else 0.0
+            }
+        
+        return {
+            "categories": categories,
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "memoized_completions": len(self._completion_memo),
+            "memo_ttl_seconds": self.memo_ttl_seconds
+        }
+    
     async def generate_budget_insights(
         self,
         report_id: UUID,
@@ -274,26 +392,42 @@ class AIInsightsEngine:
             
         return supporting_data
     
+    async def _execute_query(self, query: Any) -> Any:
+        """Execute a blocking Supabase query in a worker thread"""
+        return await asyncio.to_thread(query.execute)
+    
+    async def _prefetch_insight_data(
+        self,
+        project_id: UUID,
+        categories: List[AIInsightCategory]
+    ) -> Tuple[Dict[str, Any], Dict[AIInsightCategory, Dict[str, Any]]]:
+        """Fetch project context and the data of every category concurrently"""
+        results = await asyncio.gather(
+            self._get_project_data(project_id),
+            *(self._get_category_data(project_id, category) for category in categories)
+        )
+        return results[0], dict(zip(categories, results[1:]))
+    
     async def _get_project_data(self, project_id: UUID) -> Dict[str, Any]:
         """Get project data for context"""
         try:
-            # Get project details
-            project_response = self.supabase.table("projects").select(
-                "id, name, status, start_date, end_date, budget, priority"
-            ).eq("id", str(project_id)).execute()
+            # Get project details and recent metrics
+            project_response, metrics_response = await asyncio.gather(
+                self._execute_query(self.supabase.table("projects").select(
+                    "id, name, status, start_date, end_date, budget, priority"
+                ).eq("id", str(project_id))),
+                self._execute_query(self.supabase.table("project_metrics").select(
+                    "*"
+                ).eq("project_id", str(project_id)).order(
+                    "created_at", desc=True
+                ).limit(10))
+            )
             
             if not project_response.data:
                 return {}
             
             project = project_response.data[0]
             
-            # Get project metrics
-            metrics_response = self.supabase.table("project_metrics").select(
-                "*"
-            ).eq("project_id", str(project_id)).order(
-                "created_at", desc=True
-            ).limit(10).execute()
-            
             return {
                 "project": project,
                 "recent_metrics": metrics_response.data or []
@@ -331,11 +465,11 @@ class AIInsightsEngine:
         """Get budget-related data"""
         try:
             # Get financial data
-            financial_response = self.supabase.table("financial_data").select(
+            financial_response = await self._execute_query(self.supabase.table("financial_data").select(
                 "*"
             ).eq("project_id", str(project_id)).order(
                 "period_start", desc=True
-            ).limit(12).execute()
+            ).limit(12))
             
             financial_data = financial_response.data or []
             
@@ -375,11 +509,11 @@ class AIInsightsEngine:
         """Get schedule-related data"""
         try:
             # Get schedule data
-            schedule_response = self.supabase.table("schedule_data").select(
+            schedule_response = await self._execute_query(self.supabase.table("schedule_data").select(
                 "*"
             ).eq("project_id", str(project_id)).order(
                 "created_at", desc=True
-            ).limit(12).execute()
+            ).limit(12))
             
             schedule_data = schedule_response.data or []
             
@@ -412,9 +546,9 @@ class AIInsightsEngine:
         """Get resource-related data"""
         try:
             # Get resource allocation data
-            resource_response = self.supabase.table("resource_allocations").select(
+            resource_response = await self._execute_query(self.supabase.table("resource_allocations").select(
                 "*"
-            ).eq("project_id", str(project_id)).execute()
+            ).eq("project_id", str(project_id)))
             
             resource_data = resource_response.data or []
             
@@ -445,9 +579,9 @@ class AIInsightsEngine:
         """Get risk-related data"""
         try:
             # Get risk data
-            risk_response = self.supabase.table("risks").select(
+            risk_response = await self._execute_query(self.supabase.table("risks").select(
                 "*"
-            ).eq("project_id", str(project_id)).execute()
+            ).eq("project_id", str(project_id)))
             
             risk_data = risk_response.data or []
             
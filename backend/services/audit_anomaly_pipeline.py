@@ -0,0 +1,388 @@
+"""
+Incremental Audit Anomaly Detection Pipeline
+
+This module processes audit events in watermark-bounded windows instead of
+rescanning a full time range on every run. Each window is scored with a single
+vectorized feature extraction and a single Isolation Forest call, and the
+results are persisted with bulk writes:
+
+- one insert for all audit_anomalies rows of the window
+- one RPC call (bulk_update_audit_anomaly_status) for all roche_audit_logs flags
+- one upsert to advance the watermark
+
+Per-stage timings (fetch, feature extraction, scoring, persistence) are
+collected for every run.
+
+The watermark only advances after a window's anomalies are stored. A failed
+read or write stops the run with AnomalyPipelineError, and the window is
+processed again by the next run.
+
+Requirements: 1.1, 1.2, 1.3, 1.4, 1.5
+"""
+
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+import logging
+import time
+
+import numpy as np
+
+from config.database import supabase
+from services.audit_anomaly_service import AuditAnomalyService, AnomalyDetection
+
+
+WATERMARK_TABLE = "audit_pipeline_watermarks"
+GLOBAL_TENANT_KEY = "global"
+
+PIPELINE_STAGES = ("fetch", "feature_extraction", "scoring", "persistence")
+
+
+class AnomalyPipelineError(Exception):
+    """
+    A pipeline run stopped because audit events could not be read or results
+    could not be stored.
+
+    Attributes:
+        anomalies: Anomalies of the windows stored before the failure
+    """
+
+    def __init__(self, message: str, anomalies: Optional[List[AnomalyDetection]] = None):
+        super().__init__(message)
+        self.anomalies = anomalies or []
+
+
+@dataclass
+class AnomalyPipelineWatermark:
+    """Position of the last processed audit event (keyset on created_at, id)."""
+    created_at: str
+    event_id: str
+
+
+@dataclass
+class AnomalyPipelineRunMetrics:
+    """Timing and volume metrics for a single pipeline run."""
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    batches_processed: int = 0
+    events_processed: int = 0
+    anomalies_detected: int = 0
+    stage_durations: Dict[str, float] = field(
+        default_factory=lambda: {stage: 0.0 for stage in PIPELINE_STAGES}
+    )
+    watermark: Optional[AnomalyPipelineWatermark] = None
+    error: Optional[str] = None
+
+    @property
+    def total_duration(self) -> float:
+        """Wall-clock duration of the run in seconds."""
+        if self.finished_at is None:
+            return 0.0
+        return (self.finished_at - self.started_at).total_seconds()
+
+    @property
+    def events_per_second(self) -> float:
+        """Processing throughput of the run."""
+        duration = self.total_duration
+        return self.events_processed / duration if duration > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize metrics for logging and persistence."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "batches_processed": self.batches_processed,
+            "events_processed": self.events_processed,
+            "anomalies_detected": self.anomalies_detected,
+            "stage_durations": {k: round(v, 6) for k, v in self.stage_durations.items()},
+            "total_duration": round(self.total_duration, 6),
+            "events_per_second": round(self.events_per_second, 2),
+            "watermark": asdict(self.watermark) if self.watermark else None,
+            "error": self.error
+        }
+
+
+class AuditAnomalyPipeline:
+    """
+    Streams audit events since the last watermark through anomaly detection.
+
+    Events are read in (created_at, id) keyset order so that late inserts with
+    an older business timestamp are still picked up, and a window boundary never
+    skips or repeats events that share the same created_at value.
+    """
+
+    def __init__(
+        self,
+        anomaly_service: Optional[AuditAnomalyService] = None,
+        supabase_client=None,
+        batch_size: int = 5000,
+        max_batches_per_run: Optional[int] = None,
+        initial_lookback: timedelta = timedelta(hours=24),
+        pipeline_name: str = "anomaly_detection"
+    ):
+        self.supabase = supabase_client or supabase
+        self.anomaly_service = anomaly_service or AuditAnomalyService(
+            supabase_client=self.supabase
+        )
+        self.batch_size = batch_size
+        self.max_batches_per_run = max_batches_per_run
+        self.initial_lookback = initial_lookback
+        self.pipeline_name = pipeline_name
+        self.logger = logging.getLogger(__name__)
+
+        self.last_run_metrics: Optional[AnomalyPipelineRunMetrics] = None
+
+    async def run(self, tenant_id: Optional[UUID] = None) -> List[AnomalyDetection]:
+        """
+        Process all audit events added since the last watermark.
+
+        Args:
+            tenant_id: Optional tenant ID for multi-tenant filtering
+
+        Returns:
+            List of anomalies detected during this run
+
+        Raises:
+            AnomalyPipelineError: If events could not be read or results could
+                not be stored. The watermark stays after the last stored window.
+        """
+        metrics = AnomalyPipelineRunMetrics(started_at=datetime.now())
+        anomalies: List[AnomalyDetection] = []
+
+        try:
+            watermark = self._load_watermark(tenant_id)
+
+            while self.max_batches_per_run is None or metrics.batches_processed < self.max_batches_per_run:
+                stage_start = time.time()
+                events = self._fetch_batch(watermark, tenant_id)
+                metrics.stage_durations["fetch"] += time.time() - stage_start
+
+                if not events:
+                    break
+
+                batch_anomalies = await self._process_batch(events, metrics)
+                if batch_anomalies is None:
+                    # Leave the watermark in place so the window is retried next run
+                    break
+                anomalies.extend(batch_anomalies)
+
+                last_event = events[-1]
+                watermark = AnomalyPipelineWatermark(
+                    created_at=str(last_event.get("created_at")),
+                    event_id=str(last_event.get("id"))
+                )
+                metrics.batches_processed += 1
+                metrics.events_processed += len(events)
+                metrics.watermark = watermark
+
+                stage_start = time.time()
+                self._save_watermark(watermark, tenant_id, metrics)
+                metrics.stage_durations["persistence"] += time.time() - stage_start
+
+                if len(events) < self.batch_size:
+                    break
+        except AnomalyPipelineError as e:
+            metrics.error = str(e)
+            e.anomalies = anomalies
+            self.logger.error(f"Anomaly pipeline stopped after {metrics.batches_processed} batches: {str(e)}")
+            raise
+        finally:
+            metrics.anomalies_detected = len(anomalies)
+            metrics.finished_at = datetime.now()
+            self.last_run_metrics = metrics
+
+        self.logger.info(
+            f"Anomaly pipeline processed {metrics.events_processed} events in "
+            f"{metrics.batches_processed} batches, detected {metrics.anomalies_detected} "
+            f"anomalies (stages: {metrics.to_dict()['stage_durations']})"
+        )
+
+        return anomalies
+
+    def get_metrics(self) -> Optional[Dict[str, Any]]:
+        """Return metrics of the most recent run."""
+        return self.last_run_metrics.to_dict() if self.last_run_metrics else None
+
+    async def _process_batch(
+        self,
+        events: List[Dict[str, Any]],
+        metrics: AnomalyPipelineRunMetrics
+    ) -> Optional[List[AnomalyDetection]]:
+        """
+        Score one window of events and persist the results in bulk.
+
+        Args:
+            events: Audit events of the window, in watermark order
+            metrics: Run metrics to accumulate stage timings into
+
+        Returns:
+            Anomalies detected in this window, or None if the window could not
+            be scored
+
+        Raises:
+            AnomalyPipelineError: If the anomalies could not be stored
+        """
+        service = self.anomaly_service
+
+        stage_start = time.time()
+        feature_matrix = await service.feature_extractor.extract_batch_features(events)
+        metrics.stage_durations["feature_extraction"] += time.time() - stage_start
+
+        if not service.is_trained:
+            await service.load_model()
+        if not service.is_trained:
+            self.logger.warning("Model not trained, training on current window")
+            await service.train_model(events)
+        if not service.is_trained:
+            self.logger.error("Anomaly model unavailable, skipping window scoring")
+            return None
+
+        stage_start = time.time()
+        scores, flags = service._compute_calibrated_scores_batch(feature_matrix)
+        metrics.stage_durations["scoring"] += time.time() - stage_start
+
+        stage_start = time.time()
+        anomaly_records = []
+        anomalies = []
+        for index in np.flatnonzero(flags):
+            record, anomaly = service._build_anomaly_detection(
+                event=events[index],
+                anomaly_score=float(scores[index]),
+                features=feature_matrix[index]
+            )
+            anomaly_records.append(record)
+            anomalies.append(anomaly)
+
+        self._persist_anomalies(anomaly_records)
+        self._persist_event_flags(events, scores, flags)
+        metrics.stage_durations["persistence"] += time.time() - stage_start
+
+        return anomalies
+
+    def _fetch_batch(
+        self,
+        watermark: Optional[AnomalyPipelineWatermark],
+        tenant_id: Optional[UUID]
+    ) -> List[Dict[str, Any]]:
+        """Fetch the next window of events strictly after the watermark."""
+        try:
+            query = self.supabase.table("roche_audit_logs").select("*")
+
+            if watermark:
+                query = query.or_(
+                    f'created_at.gt."{watermark.created_at}",'
+                    f'and(created_at.eq."{watermark.created_at}",id.gt.{watermark.event_id})'
+                )
+            else:
+                start_time = datetime.now() - self.initial_lookback
+                query = query.gte("created_at", start_time.isoformat())
+
+            if tenant_id:
+                query = query.eq("tenant_id", str(tenant_id))
+
+            response = query.order("created_at").order("id").limit(self.batch_size).execute()
+            return response.data if response.data else []
+
+        except Exception as e:
+            raise AnomalyPipelineError(f"Failed to fetch audit events: {str(e)}") from e
+
+    def _persist_anomalies(self, anomaly_records: List[Dict[str, Any]]):
+        """Insert all anomaly rows of a window with a single request."""
+        if not anomaly_records:
+            return
+        try:
+            self.supabase.table("audit_anomalies").insert(anomaly_records).execute()
+        except Exception as e:
+            raise AnomalyPipelineError(
+                f"Failed to store {len(anomaly_records)} anomaly records: {str(e)}"
+            ) from e
+
+    def _persist_event_flags(
+        self,
+        events: List[Dict[str, Any]],
+        scores: np.ndarray,
+        flags: np.ndarray
+    ):
+        """
+        Write anomaly scores and flags for every event of a window.
+
+        Uses the bulk_update_audit_anomaly_status RPC so the whole window is a
+        single UPDATE ... FROM jsonb_to_recordset statement. Falls back to
+        per-event updates if the function is not installed. The flags are
+        best effort: the anomalies themselves are already stored, so a failed
+        flag update is logged rather than failing the window.
+        """
+        updates = [
+            {
+                "id": event["id"],
+                "anomaly_score": round(float(score), 2),
+                "is_anomaly": bool(flag)
+            }
+            for event, score, flag in zip(events, scores, flags)
+        ]
+        if not updates:
+            return
+
+        try:
+            self.supabase.rpc(
+                "bulk_update_audit_anomaly_status",
+                {"updates": updates}
+            ).execute()
+        except Exception as e:
+            self.logger.warning(
+                f"Bulk anomaly status update failed, falling back to per-event updates: {str(e)}"
+            )
+            for update in updates:
+                try:
+                    self.supabase.table("roche_audit_logs").update({
+                        "anomaly_score": update["anomaly_score"],
+                        "is_anomaly": update["is_anomaly"]
+                    }).eq("id", update["id"]).execute()
+                except Exception as inner:
+                    self.logger.error(
+                        f"Failed to update event anomaly status: {str(inner)}"
+                    )
+
+    def _tenant_key(self, tenant_id: Optional[UUID]) -> str:
+        return str(tenant_id) if tenant_id else GLOBAL_TENANT_KEY
+
+    def _load_watermark(self, tenant_id: Optional[UUID]) -> Optional[AnomalyPipelineWatermark]:
+        """Load the persisted watermark for this pipeline and tenant."""
+        try:
+            response = self.supabase.table(WATERMARK_TABLE).select(
+                "watermark_created_at, watermark_event_id"
+            ).eq("pipeline_name", self.pipeline_name).eq(
+                "tenant_key", self._tenant_key(tenant_id)
+            ).limit(1).execute()
+
+            rows = response.data if response.data else []
+            if rows and rows[0].get("watermark_created_at") and rows[0].get("watermark_event_id"):
+                return AnomalyPipelineWatermark(
+                    created_at=str(rows[0]["watermark_created_at"]),
+                    event_id=str(rows[0]["watermark_event_id"])
+                )
+        except Exception as e:
+            # Starting over from the initial lookback would store anomalies twice
+            raise AnomalyPipelineError(f"Failed to load watermark: {str(e)}") from e
+
+        return None
+
+    def _save_watermark(
+        self,
+        watermark: AnomalyPipelineWatermark,
+        tenant_id: Optional[UUID],
+        metrics: AnomalyPipelineRunMetrics
+    ):
+        """Advance the persisted watermark after a window has been stored."""
+        try:
+            self.supabase.table(WATERMARK_TABLE).upsert({
+                "pipeline_name": self.pipeline_name,
+                "tenant_key": self._tenant_key(tenant_id),
+                "watermark_created_at": watermark.created_at,
+                "watermark_event_id": watermark.event_id,
+                "last_run_metrics": metrics.to_dict(),
+                "updated_at": datetime.now().isoformat()
+            }, on_conflict="pipeline_name,tenant_key").execute()
+        except Exception as e:
+            raise AnomalyPipelineError(f"Failed to save watermark: {str(e)}") from e
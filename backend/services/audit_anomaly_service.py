@@ -16,13 +16,17 @@ import logging
 import pickle
 import os
 from dataclasses import dataclass
+from functools import cached_property
 
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
 
 from config.database import supabase
 from services.audit_feature_extractor import AuditFeatureExtractor
+from utils.lazy_import import lazy_import
+
+# scikit-learn is loaded on first use, not when the audit router is imported
+sk_ensemble = lazy_import("sklearn.ensemble")
+sk_preprocessing = lazy_import("sklearn.preprocessing")
 
 
 @dataclass
@@ -67,24 +71,9 @@ class AuditAnomalyService:
         self.redis = redis_client
         self.logger = logging.getLogger(__name__)
         
-        # Initialize Isolation Forest model
-        self.model = IsolationForest(
-            contamination=0.1,  # Expect 10% of data to be anomalies
-            random_state=42,
-            n_estimators=100,
-            max_samples='auto',
-            max_features=1.0,
-            bootstrap=False,
-            n_jobs=-1,  # Use all CPU cores
-            verbose=0
-        )
-        
         # Feature extractor
         self.feature_extractor = AuditFeatureExtractor(supabase_client=self.supabase)
         
-        # Scaler for feature normalization
-        self.scaler = StandardScaler()
-        
         # Model metadata
         self.model_version = "1.0.0"
         self.is_trained = False
@@ -94,6 +83,28 @@ class AuditAnomalyService:
         self.model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
         os.makedirs(self.model_dir, exist_ok=True)
     
+    # The model and scaler are built on first use, so scikit-learn is not
+    # imported with the module-level service instance
+    
+    @cached_property
+    def model(self):
+        """Isolation Forest model"""
+        return sk_ensemble.IsolationForest(
+            contamination=0.1,  # Expect 10% of data to be anomalies
+            random_state=42,
+            n_estimators=100,
+            max_samples='auto',
+            max_features=1.0,
+            bootstrap=False,
+            n_jobs=-1,  # Use all CPU cores
+            verbose=0
+        )
+    
+    @cached_property
+    def scaler(self):
+        """Scaler for feature normalization"""
+        return sk_preprocessing.StandardScaler()
+    
     async def detect_anomalies(
         self,
         start_time: datetime,
@@ -227,6 +238,36 @@ class AuditAnomalyService:
         
         return normalized_scores
     
+    def _compute_calibrated_scores_batch(
+        self,
+        feature_matrix: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute batch-size independent anomaly scores and flags.
+        
+        Unlike _compute_anomaly_scores_batch, scores are not min-max normalized
+        within the batch, so a window of a few events is scored the same way as
+        a full day. The score is the Isolation Forest path-length score (0-1,
+        higher = more anomalous), flagged at anomaly_threshold like the
+        per-event scores, so the severity bands apply unchanged.
+        
+        Args:
+            feature_matrix: 2D array of feature vectors
+            
+        Returns:
+            Tuple of (anomaly scores in 0-1 range, boolean anomaly flags)
+        """
+        if hasattr(self.scaler, 'mean_'):
+            features_scaled = self.scaler.transform(feature_matrix)
+        else:
+            features_scaled = feature_matrix
+        
+        raw_scores = self.model.score_samples(features_scaled)
+        anomaly_scores = np.clip(-raw_scores, 0.0, 1.0)
+        is_anomaly = anomaly_scores >= self.anomaly_threshold
+        
+        return anomaly_scores, is_anomaly
+    
     async def train_model(
         self,
         training_data: Optional[List[Dict[str, Any]]] = None,
@@ -311,6 +352,33 @@ class AuditAnomalyService:
         Returns:
             AnomalyDetection object
         """
+        anomaly_record, anomaly = self._build_anomaly_detection(event, anomaly_score, features)
+        
+        # Store in database
+        try:
+            self.supabase.table("audit_anomalies").insert(anomaly_record).execute()
+        except Exception as e:
+            self.logger.error(f"Failed to store anomaly record: {str(e)}")
+        
+        return anomaly
+    
+    def _build_anomaly_detection(
+        self,
+        event: Dict[str, Any],
+        anomaly_score: float,
+        features: np.ndarray
+    ) -> Tuple[Dict[str, Any], AnomalyDetection]:
+        """
+        Build the database record and AnomalyDetection object for an anomaly.
+        
+        Args:
+            event: Audit event that triggered anomaly
+            anomaly_score: Computed anomaly score
+            features: Feature vector used for detection
+            
+        Returns:
+            Tuple of (audit_anomalies row, AnomalyDetection object)
+        """
         # Determine severity level based on score and event severity
         severity_level = self._determine_severity_level(anomaly_score, event)
         
@@ -340,12 +408,6 @@ class AuditAnomalyService:
             "tenant_id": event.get('tenant_id')
         }
         
-        # Store in database
-        try:
-            self.supabase.table("audit_anomalies").insert(anomaly_record).execute()
-        except Exception as e:
-            self.logger.error(f"Failed to store anomaly record: {str(e)}")
-        
         # Create AnomalyDetection object
         anomaly = AnomalyDetection(
             id=anomaly_id,
@@ -363,7 +425,7 @@ class AuditAnomalyService:
             suggested_actions=suggested_actions
         )
         
-        return anomaly
+        return anomaly_record, anomaly
     
     async def generate_alert(
         self,
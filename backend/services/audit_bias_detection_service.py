@@ -17,9 +17,12 @@ from dataclasses import dataclass
 from collections import defaultdict
 
 import numpy as np
-from sklearn.utils import resample
 
 from config.database import supabase
+from utils.lazy_import import lazy_import
+
+# scikit-learn is loaded on first use, not when the service is imported
+sk_utils = lazy_import("sklearn.utils")
 
 
 @dataclass
@@ -547,7 +550,7 @@ class AuditBiasDetectionService:
             for category, group_events in category_groups.items():
                 if len(group_events) < target_size:
                     # Upsample minority class
-                    resampled = resample(
+                    resampled = sk_utils.resample(
                         group_events,
                         n_samples=target_size,
                         replace=True,
@@ -117,24 +117,18 @@ class AuditEmbeddingService:
             
             logger.info(f"Processing {len(logs)} logs without embeddings")
             
-            # Generate embeddings for all logs
-            embeddings_data = []
-            for log in logs:
-                try:
-                    # Build content text
-                    content_text = self._build_content_text(log)
-                    
-                    # Generate embedding
-                    embedding = await self._generate_embedding(content_text)
-                    
-                    embeddings_data.append({
-                        "log_id": log["id"],
-                        "embedding": embedding
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Failed to generate embedding for log {log['id']}: {e}")
-                    continue
+            # Generate embeddings for all logs with a single API request
+            content_texts = [self._build_content_text(log) for log in logs]
+            try:
+                embeddings = await self.generate_embeddings_batch(content_texts)
+            except Exception as e:
+                logger.error(f"Failed to generate embeddings for batch: {e}")
+                return
+            
+            embeddings_data = [
+                {"log_id": log["id"], "embedding": embedding}
+                for log, embedding in zip(logs, embeddings)
+            ]
             
             # Batch update embeddings
             if embeddings_data:
@@ -256,6 +250,42 @@ class AuditEmbeddingService:
             logger.error(f"Embedding generation failed: {e}")
             raise
     
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts with one OpenAI request
+        
+        Args:
+            texts: Texts to generate embeddings for
+            
+        Returns:
+            Embedding vectors in the same order as texts
+            
+        Raises:
+            Exception: If embedding generation fails
+        """
+        if not texts:
+            return []
+        
+        try:
+            response = self.openai_client.embeddings.create(
+                model=self.embedding_model,
+                input=texts
+            )
+            
+            embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            
+            for embedding in embeddings:
+                if len(embedding) != self.embedding_dimension:
+                    raise ValueError(
+                        f"Expected embedding dimension {self.embedding_dimension}, got {len(embedding)}"
+                    )
+            
+            return embeddings
+            
+        except Exception as e:
+            logger.error(f"Batch embedding generation failed: {e}")
+            raise
+    
     async def _batch_update_embeddings(self, embeddings_data: List[Dict[str, Any]]):
         """
         Batch update embeddings in the database
@@ -14,7 +14,9 @@ from uuid import UUID
 import json
 import logging
 import numpy as np
-from collections import defaultdict, Counter
+from collections import defaultdict
+
+from services.audit_rolling_statistics import AuditRollingStatistics
 
 
 class AuditFeatureExtractor:
@@ -34,12 +36,10 @@ class AuditFeatureExtractor:
         self.supabase = supabase_client
         self.logger = logging.getLogger(__name__)
         
-        # Cache for historical statistics
-        self._event_type_frequencies = {}
-        self._user_activity_stats = {}
-        self._entity_access_patterns = {}
+        # Rolling, incrementally maintained historical statistics
+        self.rolling_statistics = AuditRollingStatistics(supabase_client=supabase_client)
         self._last_cache_update = None
-        self._cache_ttl = timedelta(hours=1)
+        self._cache_ttl = timedelta(minutes=5)
     
     async def extract_features(
         self,
@@ -60,11 +60,7 @@ class AuditFeatureExtractor:
             # Update cache if needed
             if historical_context is None:
                 await self._update_cache_if_needed()
-                historical_context = {
-                    'event_type_frequencies': self._event_type_frequencies,
-                    'user_activity_stats': self._user_activity_stats,
-                    'entity_access_patterns': self._entity_access_patterns
-                }
+                historical_context = self.rolling_statistics.historical_context()
             
             features = []
             
@@ -130,7 +126,7 @@ class AuditFeatureExtractor:
         frequencies = historical_context.get('event_type_frequencies', {})
         
         # Get frequency of this event type (0-1 normalized)
-        total_events = sum(frequencies.values()) if frequencies else 1
+        total_events = self._context_total(historical_context, 'event_type_total', frequencies)
         event_frequency = frequencies.get(event_type, 0) / total_events if total_events > 0 else 0
         
         # Rarity score (inverse of frequency)
@@ -236,14 +232,11 @@ class AuditFeatureExtractor:
         # Entity access frequency
         entity_key = f"{entity_type}:{entity_id}" if entity_id else entity_type
         entity_access_count = access_patterns.get(entity_key, 0)
-        total_accesses = sum(access_patterns.values()) if access_patterns else 1
+        total_accesses = self._context_total(historical_context, 'entity_access_total', access_patterns)
         entity_access_frequency = entity_access_count / total_accesses if total_accesses > 0 else 0
         
         # Entity type frequency
-        entity_type_counts = defaultdict(int)
-        for key in access_patterns.keys():
-            etype = key.split(':')[0]
-            entity_type_counts[etype] += access_patterns[key]
+        entity_type_counts = self._context_entity_type_counts(historical_context, access_patterns)
         
         entity_type_count = entity_type_counts.get(entity_type, 0)
         entity_type_frequency = entity_type_count / total_accesses if total_accesses > 0 else 0
@@ -333,7 +326,7 @@ class AuditFeatureExtractor:
             'critical': 1.0
         }
         
-        severity_score = severity_map.get(severity.lower(), 0.0)
+        severity_score = severity_map.get(str(severity or 'info').lower(), 0.0)
         
         return [severity_score]
     
@@ -378,8 +371,35 @@ class AuditFeatureExtractor:
         # 2 (event type) + 4 (time) + 3 (user) + 3 (entity) + 3 (complexity) + 2 (performance) + 1 (severity)
         return 18
     
+    def _context_total(
+        self,
+        historical_context: Dict[str, Any],
+        total_key: str,
+        counts: Dict[str, int]
+    ) -> int:
+        """Total of a counter, using the precomputed value when available."""
+        total = historical_context.get(total_key)
+        if total is not None:
+            return total if counts else 1
+        return sum(counts.values()) if counts else 1
+    
+    def _context_entity_type_counts(
+        self,
+        historical_context: Dict[str, Any],
+        access_patterns: Dict[str, int]
+    ) -> Dict[str, int]:
+        """Per entity type access counts, using the precomputed value when available."""
+        entity_type_counts = historical_context.get('entity_type_counts')
+        if entity_type_counts is not None:
+            return entity_type_counts
+        
+        entity_type_counts = defaultdict(int)
+        for key, count in access_patterns.items():
+            entity_type_counts[key.split(':')[0]] += count
+        return entity_type_counts
+    
     async def _update_cache_if_needed(self):
-        """Update cached historical statistics if TTL expired."""
+        """Fold in new audit events if the refresh interval has passed."""
         if (
             self._last_cache_update is None or
             datetime.now() - self._last_cache_update > self._cache_ttl
@@ -388,64 +408,13 @@ class AuditFeatureExtractor:
             self._last_cache_update = datetime.now()
     
     async def _compute_historical_statistics(self):
-        """Compute historical statistics for feature extraction."""
-        try:
-            if not self.supabase:
-                return
-            
-            # Get last 30 days of audit events for statistics
-            start_date = datetime.now() - timedelta(days=30)
-            
-            response = self.supabase.table("roche_audit_logs").select(
-                "event_type, user_id, entity_type, entity_id, timestamp"
-            ).gte("timestamp", start_date.isoformat()).execute()
-            
-            events = response.data if response.data else []
-            
-            # Compute event type frequencies
-            event_type_counter = Counter(e['event_type'] for e in events)
-            self._event_type_frequencies = dict(event_type_counter)
-            
-            # Compute user activity statistics
-            user_events = defaultdict(list)
-            for event in events:
-                user_id = event.get('user_id')
-                if user_id:
-                    user_events[user_id].append(event)
-            
-            for user_id, user_event_list in user_events.items():
-                # Calculate events per hour and per day
-                if user_event_list:
-                    time_span_hours = 30 * 24  # 30 days in hours
-                    events_per_hour = len(user_event_list) / time_span_hours
-                    events_per_day = len(user_event_list) / 30
-                    
-                    self._user_activity_stats[user_id] = {
-                        'events_per_hour': events_per_hour,
-                        'events_per_day': events_per_day,
-                        'avg_events_per_day': events_per_day,
-                        'std_events_per_day': events_per_day * 0.2  # Rough estimate
-                    }
-            
-            # Compute entity access patterns
-            entity_access_counter = Counter()
-            for event in events:
-                entity_type = event.get('entity_type', 'unknown')
-                entity_id = event.get('entity_id')
-                entity_key = f"{entity_type}:{entity_id}" if entity_id else entity_type
-                entity_access_counter[entity_key] += 1
-            
-            self._entity_access_patterns = dict(entity_access_counter)
-            
-            self.logger.info(
-                f"Updated historical statistics: "
-                f"{len(self._event_type_frequencies)} event types, "
-                f"{len(self._user_activity_stats)} users, "
-                f"{len(self._entity_access_patterns)} entities"
-            )
-            
-        except Exception as e:
-            self.logger.error(f"Failed to compute historical statistics: {str(e)}")
+        """
+        Update historical statistics for feature extraction.
+        
+        Statistics are maintained incrementally by AuditRollingStatistics, so
+        this only reads events added since the last refresh.
+        """
+        await self.rolling_statistics.refresh()
     
     async def extract_batch_features(
         self,
@@ -454,6 +423,10 @@ class AuditFeatureExtractor:
         """
         Extract features for a batch of events efficiently.
         
+        Historical statistics are resolved once for the whole batch and the
+        feature matrix is assembled column by column, so per-event cost is a
+        handful of dictionary lookups instead of a full extraction pass.
+        
         Args:
             events: List of audit event dictionaries
             
@@ -463,16 +436,137 @@ class AuditFeatureExtractor:
         # Update cache once for the batch
         await self._update_cache_if_needed()
         
-        historical_context = {
-            'event_type_frequencies': self._event_type_frequencies,
-            'user_activity_stats': self._user_activity_stats,
-            'entity_access_patterns': self._entity_access_patterns
-        }
+        historical_context = self.rolling_statistics.historical_context()
+        
+        try:
+            return self.build_feature_matrix(events, historical_context)
+        except Exception as e:
+            self.logger.warning(
+                f"Vectorized feature extraction failed, falling back to per-event: {str(e)}"
+            )
+            feature_vectors = []
+            for event in events:
+                features = await self.extract_features(event, historical_context)
+                feature_vectors.append(features)
+            return np.array(feature_vectors)
+    
+    def build_feature_matrix(
+        self,
+        events: List[Dict[str, Any]],
+        historical_context: Dict[str, Any]
+    ) -> np.ndarray:
+        """
+        Build the feature matrix for a batch of events in one pass.
+        
+        Produces the same columns as extract_features, in the same order, but
+        aggregates over the historical statistics only once per batch.
         
-        # Extract features for each event
-        feature_vectors = []
-        for event in events:
-            features = await self.extract_features(event, historical_context)
-            feature_vectors.append(features)
+        Args:
+            events: List of audit event dictionaries
+            historical_context: Pre-computed historical statistics
+            
+        Returns:
+            2D numpy array of shape (len(events), feature_dimension)
+        """
+        n = len(events)
+        matrix = np.zeros((n, self._get_feature_dimension()), dtype=np.float64)
+        if n == 0:
+            return matrix
         
-        return np.array(feature_vectors)
+        # 1. Event type frequency features (columns 0-1)
+        frequencies = historical_context.get('event_type_frequencies', {})
+        total_events = self._context_total(historical_context, 'event_type_total', frequencies)
+        type_counts = np.fromiter(
+            (frequencies.get(e.get('event_type', 'unknown'), 0) for e in events),
+            dtype=np.float64,
+            count=n
+        )
+        event_frequency = type_counts / total_events if total_events > 0 else np.zeros(n)
+        matrix[:, 0] = event_frequency
+        matrix[:, 1] = np.where(event_frequency > 0, 1.0 - event_frequency, 1.0)
+        
+        # 2. Time-based features (columns 2-5)
+        hours = np.zeros(n)
+        weekdays = np.zeros(n)
+        has_time = np.zeros(n, dtype=bool)
+        for i, event in enumerate(events):
+            timestamp = self._parse_event_timestamp(event.get('timestamp'))
+            if timestamp is not None:
+                hours[i] = timestamp.hour
+                weekdays[i] = timestamp.weekday()
+                has_time[i] = True
+        matrix[:, 2] = np.where(has_time, hours / 23.0, 0.0)
+        matrix[:, 3] = np.where(has_time, weekdays / 6.0, 0.0)
+        matrix[:, 4] = np.where(has_time & (weekdays >= 5), 1.0, 0.0)
+        matrix[:, 5] = np.where(
+            has_time & (weekdays < 5) & (hours >= 9) & (hours < 17), 1.0, 0.0
+        )
+        
+        # 3. User activity features (columns 6-8)
+        user_activity_stats = historical_context.get('user_activity_stats', {})
+        per_hour = np.zeros(n)
+        per_day = np.zeros(n)
+        avg_per_day = np.zeros(n)
+        std_per_day = np.ones(n)
+        has_user = np.zeros(n, dtype=bool)
+        for i, event in enumerate(events):
+            user_id = event.get('user_id')
+            if not user_id:
+                continue
+            has_user[i] = True
+            user_stats = user_activity_stats.get(str(user_id))
+            if user_stats:
+                per_hour[i] = user_stats.get('events_per_hour', 0.0)
+                per_day[i] = user_stats.get('events_per_day', 0.0)
+                avg_per_day[i] = user_stats.get('avg_events_per_day', 0.0)
+                std_per_day[i] = user_stats.get('std_events_per_day', 1.0)
+        safe_std = np.where(std_per_day > 0, std_per_day, 1.0)
+        deviation = np.where(
+            std_per_day > 0,
+            np.minimum(np.abs(per_day - avg_per_day) / safe_std / 3.0, 1.0),
+            0.0
+        )
+        matrix[:, 6] = np.where(has_user, np.minimum(per_hour / 100.0, 1.0), 0.0)
+        matrix[:, 7] = np.where(has_user, np.minimum(per_day / 1000.0, 1.0), 0.0)
+        matrix[:, 8] = np.where(has_user, deviation, 0.0)
+        
+        # 4. Entity access features (columns 9-11)
+        access_patterns = historical_context.get('entity_access_patterns', {})
+        total_accesses = self._context_total(historical_context, 'entity_access_total', access_patterns)
+        entity_type_counts = self._context_entity_type_counts(historical_context, access_patterns)
+        entity_counts = np.zeros(n)
+        entity_type_totals = np.zeros(n)
+        for i, event in enumerate(events):
+            entity_type = event.get('entity_type', 'unknown')
+            entity_id = event.get('entity_id')
+            entity_key = f"{entity_type}:{entity_id}" if entity_id else entity_type
+            entity_counts[i] = access_patterns.get(entity_key, 0)
+            entity_type_totals[i] = entity_type_counts.get(entity_type, 0)
+        if total_accesses > 0:
+            matrix[:, 9] = entity_counts / total_accesses
+            matrix[:, 10] = entity_type_totals / total_accesses
+        matrix[:, 11] = min(len(entity_type_counts) / 10.0, 1.0)
+        
+        # 5-7. Complexity, performance and severity features (columns 12-17)
+        # These depend only on the event payload itself.
+        for i, event in enumerate(events):
+            matrix[i, 12:15] = self._extract_action_complexity_features(event)
+            matrix[i, 15:17] = self._extract_performance_features(event)
+        matrix[:, 17] = np.fromiter(
+            (self._extract_severity_features(e)[0] for e in events),
+            dtype=np.float64,
+            count=n
+        )
+        
+        return np.nan_to_num(matrix, nan=0.0, posinf=1.0, neginf=0.0)
+    
+    def _parse_event_timestamp(self, timestamp_value: Any) -> Optional[datetime]:
+        """Parse an event timestamp, returning None when missing or invalid."""
+        if not timestamp_value:
+            return None
+        try:
+            if isinstance(timestamp_value, str):
+                return datetime.fromisoformat(timestamp_value.replace('Z', '+00:00'))
+            return timestamp_value if isinstance(timestamp_value, datetime) else None
+        except Exception:
+            return None
@@ -0,0 +1,893 @@
+"""
+Audit Event Ingestion Stream
+
+Batched, high-throughput audit event ingestion built on Redis Streams consumer
+groups. Producers append events to a stream; consumers in the ingestion group
+pull up to N events at a time and run every processing stage on the whole
+batch before a single bulk write:
+
+1. ML classification (category, risk level, tags)
+2. Anomaly feature extraction (and scoring when a trained model is available)
+3. Embedding generation (one embeddings request per batch)
+4. Storage (one bulk insert into roche_audit_logs)
+
+Messages are acknowledged and removed from the stream only after they are
+stored, so the stream length is the ingestion backlog. Producers apply
+backpressure when the backlog exceeds a limit, messages that keep failing are
+moved to a dead-letter stream, and per-stage throughput and consumer lag are
+tracked for monitoring.
+
+InMemoryStreamBackend implements the subset of the redis.asyncio stream API
+used here and stands in for Redis in tests and local development.
+
+Requirements: 7.8
+"""
+
+import os
+import json
+import time
+import logging
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from uuid import uuid4
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+
+INGESTION_STAGES = ("classification", "feature_extraction", "embedding", "storage")
+
+
+class AuditIngestionBackpressureError(Exception):
+    """Raised when the ingestion backlog stays above its limit for too long."""
+    pass
+
+
+def _stream_id_key(message_id: str) -> Tuple[int, int]:
+    """Sort key of a stream ID ("<milliseconds>-<sequence>")."""
+    ms, _, seq = message_id.partition('-')
+    return int(ms), int(seq or 0)
+
+
+class InMemoryPipeline:
+    """Queues commands like a redis.asyncio pipeline and runs them on execute()"""
+
+    def __init__(self, backend: "InMemoryStreamBackend"):
+        self._backend = backend
+        self._commands: List[Tuple[str, tuple, Dict[str, Any]]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._backend, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._commands = []
+
+
+class InMemoryStreamBackend:
+    """
+    Process-local stand-in for the Redis Streams commands used by ingestion.
+
+    Supports a single stream namespace with consumer groups, pending entry
+    tracking with delivery counts, XAUTOCLAIM-style redelivery and XDEL.
+    """
+
+    def __init__(self):
+        self._streams: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self._groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._last_ms = 0
+        self._seq = 0
+
+    def _next_id(self) -> str:
+        now_ms = int(time.time() * 1000)
+        if now_ms <= self._last_ms:
+            self._seq += 1
+        else:
+            self._last_ms = now_ms
+            self._seq = 0
+        return f"{self._last_ms}-{self._seq}"
+
+    async def ping(self) -> bool:
+        return True
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    async def xadd(self, name: str, fields: Dict[str, Any], id: str = '*', **kwargs) -> str:
+        message_id = self._next_id() if id == '*' else id
+        self._streams.setdefault(name, {})[message_id] = {k: str(v) for k, v in fields.items()}
+        return message_id
+
+    async def xlen(self, name: str) -> int:
+        return len(self._streams.get(name, {}))
+
+    async def xgroup_create(self, name: str, groupname: str, id: str = '$', mkstream: bool = False):
+        if name not in self._streams:
+            if not mkstream:
+                raise Exception("ERR The XGROUP subcommand requires the key to exist")
+            self._streams[name] = {}
+        if (name, groupname) in self._groups:
+            raise Exception("BUSYGROUP Consumer Group name already exists")
+        entries = self._streams[name]
+        last_id = max(entries, key=_stream_id_key) if (id == '$' and entries) else '0-0'
+        self._groups[(name, groupname)] = {"last_delivered": last_id, "pending": {}}
+        return True
+
+    async def xreadgroup(
+        self,
+        groupname: str,
+        consumername: str,
+        streams: Dict[str, str],
+        count: Optional[int] = None,
+        block: Optional[int] = None,
+        **kwargs
+    ) -> List[Any]:
+        result = []
+        for name in streams:
+            group = self._groups[(name, groupname)]
+            last_key = _stream_id_key(group["last_delivered"])
+            entries = self._streams.get(name, {})
+            new_ids = sorted(
+                (mid for mid in entries if _stream_id_key(mid) > last_key),
+                key=_stream_id_key
+            )[:count]
+            if not new_ids:
+                continue
+            now = time.time()
+            for mid in new_ids:
+                group["pending"][mid] = {
+                    "consumer": consumername,
+                    "delivered_at": now,
+                    "times_delivered": 1
+                }
+            group["last_delivered"] = new_ids[-1]
+            result.append([name, [(mid, dict(entries[mid])) for mid in new_ids]])
+        return result
+
+    async def xack(self, name: str, groupname: str, *ids: str) -> int:
+        pending = self._groups[(name, groupname)]["pending"]
+        return sum(1 for mid in ids if pending.pop(mid, None) is not None)
+
+    async def xdel(self, name: str, *ids: str) -> int:
+        entries = self._streams.get(name, {})
+        return sum(1 for mid in ids if entries.pop(mid, None) is not None)
+
+    async def xautoclaim(
+        self,
+        name: str,
+        groupname: str,
+        consumername: str,
+        min_idle_time: int,
+        start_id: str = '0-0',
+        count: Optional[int] = None,
+        **kwargs
+    ) -> List[Any]:
+        group = self._groups[(name, groupname)]
+        entries = self._streams.get(name, {})
+        now = time.time()
+        claimed = []
+        deleted = []
+        for mid in sorted(group["pending"], key=_stream_id_key):
+            if _stream_id_key(mid) < _stream_id_key(start_id):
+                continue
+            info = group["pending"][mid]
+            if (now - info["delivered_at"]) * 1000 < min_idle_time:
+                continue
+            if mid not in entries:
+                deleted.append(mid)
+                group["pending"].pop(mid)
+                continue
+            info.update(
+                consumer=consumername,
+                delivered_at=now,
+                times_delivered=info["times_delivered"] + 1
+            )
+            claimed.append((mid, dict(entries[mid])))
+            if count and len(claimed) >= count:
+                break
+        return ['0-0', claimed, deleted]
+
+    async def xpending_range(
+        self,
+        name: str,
+        groupname: str,
+        min: str,
+        max: str,
+        count: int,
+        consumername: Optional[str] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        pending = self._groups[(name, groupname)]["pending"]
+        low, high = _stream_id_key(min), _stream_id_key(max)
+        now = time.time()
+        rows = []
+        for mid in sorted(pending, key=_stream_id_key):
+            if not (low <= _stream_id_key(mid) <= high):
+                continue
+            info = pending[mid]
+            if consumername and info["consumer"] != consumername:
+                continue
+            rows.append({
+                "message_id": mid,
+                "consumer": info["consumer"],
+                "time_since_delivered": int((now - info["delivered_at"]) * 1000),
+                "times_delivered": info["times_delivered"]
+            })
+            if len(rows) >= count:
+                break
+        return rows
+
+    async def close(self):
+        return None
+
+
+@dataclass
+class IngestionStageMetrics:
+    """Cumulative volume and time spent in one ingestion stage."""
+    events: int = 0
+    seconds: float = 0.0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class IngestionMetrics:
+    """Throughput, lag and outcome counters of an ingestion consumer."""
+    batches: int = 0
+    events_stored: int = 0
+    events_dead_lettered: int = 0
+    events_retried: int = 0
+    last_batch_size: int = 0
+    last_batch_lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+    stages: Dict[str, IngestionStageMetrics] = field(
+        default_factory=lambda: {stage: IngestionStageMetrics() for stage in INGESTION_STAGES}
+    )
+
+    def record_stage(self, stage: str, events: int, seconds: float):
+        metrics = self.stages[stage]
+        metrics.events += events
+        metrics.seconds += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "events_stored": self.events_stored,
+            "events_dead_lettered": self.events_dead_lettered,
+            "events_retried": self.events_retried,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_lag_seconds": round(self.last_batch_lag_seconds, 3),
+            "max_lag_seconds": round(self.max_lag_seconds, 3),
+            "stages": {
+                name: {
+                    "events": stage.events,
+                    "seconds": round(stage.seconds, 6),
+                    "events_per_second": round(stage.events_per_second, 2)
+                }
+                for name, stage in self.stages.items()
+            }
+        }
+
+
+class AuditIngestionStream:
+    """
+    Producer side of the audit ingestion stream.
+
+    Provides:
+    - Event publishing with backpressure on the unprocessed backlog
+    - Consumer group setup
+    - Backlog and dead-letter statistics
+    """
+
+    EVENT_STREAM = "audit:stream:events"
+    DEAD_LETTER_STREAM = "audit:stream:dead_letter"
+    CONSUMER_GROUP = "audit-ingestion"
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        backend=None,
+        max_backlog: int = 100000,
+        backpressure_timeout: float = 5.0,
+        backpressure_poll_interval: float = 0.05
+    ):
+        """
+        Initialize the ingestion stream.
+
+        Args:
+            redis_url: Redis connection URL (defaults to REDIS_URL env var)
+            backend: Pre-built stream backend (Redis client or InMemoryStreamBackend)
+            max_backlog: Unprocessed events above which publishers wait
+            backpressure_timeout: Seconds a publisher waits before giving up
+            backpressure_poll_interval: Seconds between backlog checks while waiting
+        """
+        self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        self.backend = backend
+        self.max_backlog = max_backlog
+        self.backpressure_timeout = backpressure_timeout
+        self.backpressure_poll_interval = backpressure_poll_interval
+        self.enabled = backend is not None
+
+    async def connect(self):
+        """Connect to Redis unless a backend was injected, and create the group."""
+        if self.backend is None:
+            try:
+                self.backend = await aioredis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=5,
+                    socket_timeout=5
+                )
+                await self.backend.ping()
+                logger.info("Audit ingestion stream connected to Redis")
+            except Exception as e:
+                logger.error(f"Failed to connect audit ingestion stream to Redis: {e}")
+                self.backend = None
+                self.enabled = False
+                return
+
+        self.enabled = True
+        await self.ensure_consumer_group()
+
+    async def disconnect(self):
+        """Close the backend connection."""
+        if self.backend:
+            await self.backend.close()
+            logger.info("Audit ingestion stream disconnected")
+
+    async def ensure_consumer_group(self):
+        """Create the ingestion consumer group if it does not exist yet."""
+        try:
+            await self.backend.xgroup_create(
+                self.EVENT_STREAM,
+                self.CONSUMER_GROUP,
+                id='0',
+                mkstream=True
+            )
+            logger.info(f"Created consumer group {self.CONSUMER_GROUP}")
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _wait_for_capacity(self, incoming: int):
+        """Block while the backlog is above max_backlog, up to the timeout."""
+        deadline = time.time() + self.backpressure_timeout
+        while True:
+            backlog = await self.backend.xlen(self.EVENT_STREAM)
+            if backlog + incoming <= self.max_backlog or backlog == 0:
+                return
+            if time.time() >= deadline:
+                raise AuditIngestionBackpressureError(
+                    f"Audit ingestion backlog {backlog} exceeds limit {self.max_backlog}"
+                )
+            await asyncio.sleep(self.backpressure_poll_interval)
+
+    async def publish(self, event: Dict[str, Any]) -> Optional[str]:
+        """
+        Append a single audit event to the ingestion stream.
+
+        Args:
+            event: Audit event dictionary
+
+        Returns:
+            Stream message ID, or None if the stream is unavailable
+
+        Raises:
+            AuditIngestionBackpressureError: If the backlog does not drain in time
+        """
+        message_ids = await self.publish_batch([event])
+        return message_ids[0] if message_ids else None
+
+    async def publish_batch(self, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Append audit events to the ingestion stream.
+
+        Events without an ID get one here, so a redelivered message is
+        inserted idempotently. The backlog is checked once and all events are
+        appended in one transaction (a single round trip).
+
+        Args:
+            events: List of audit event dictionaries
+
+        Returns:
+            List of stream message IDs
+
+        Raises:
+            AuditIngestionBackpressureError: If the backlog does not drain in time
+        """
+        if not self.enabled or not self.backend:
+            logger.warning("Ingestion stream not available")
+            return []
+
+        await self._wait_for_capacity(len(events))
+
+        enqueued_at = datetime.now().isoformat()
+        async with self.backend.pipeline(transaction=True) as pipe:
+            for event in events:
+                event.setdefault("id", str(uuid4()))
+                pipe.xadd(
+                    self.EVENT_STREAM,
+                    {"event": json.dumps(event, default=str), "enqueued_at": enqueued_at}
+                )
+            message_ids = await pipe.execute()
+
+        logger.debug(f"Published {len(message_ids)} audit events to ingestion stream")
+        return message_ids
+
+    async def get_stream_stats(self) -> Dict[str, Any]:
+        """
+        Get backlog and dead-letter sizes.
+
+        Returns:
+            Dictionary with stream statistics
+        """
+        if not self.enabled or not self.backend:
+            return {"enabled": False, "backlog": 0, "dead_lettered": 0}
+
+        try:
+            backlog = await self.backend.xlen(self.EVENT_STREAM)
+            dead_lettered = await self.backend.xlen(self.DEAD_LETTER_STREAM)
+            return {
+                "enabled": True,
+                "backlog": backlog,
+                "dead_lettered": dead_lettered,
+                "max_backlog": self.max_backlog
+            }
+        except Exception as e:
+            logger.error(f"Failed to get ingestion stream stats: {e}")
+            return {"enabled": True, "error": str(e)}
+
+
+class AuditIngestionConsumer:
+    """
+    Batching consumer of the audit ingestion stream.
+
+    Each call to process_next_batch pulls up to batch_size messages (stale
+    pending messages from crashed consumers first), runs all stages on the
+    batch, stores it with one bulk insert and acknowledges what was stored.
+    """
+
+    def __init__(
+        self,
+        stream: AuditIngestionStream,
+        ml_service=None,
+        feature_extractor=None,
+        anomaly_service=None,
+        embedding_service=None,
+        supabase_client=None,
+        consumer_name: Optional[str] = None,
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        claim_idle_ms: int = 60000,
+        max_deliveries: int = 3
+    ):
+        """
+        Initialize an ingestion consumer.
+
+        Args:
+            stream: Ingestion stream to consume from
+            ml_service: AuditMLService for classification
+            feature_extractor: AuditFeatureExtractor for anomaly features
+            anomaly_service: Optional trained AuditAnomalyService for scoring
+            embedding_service: Optional AuditEmbeddingService; without it
+                embeddings are left to the background embedding job
+            supabase_client: Supabase client for storage
+            consumer_name: Unique consumer name within the group
+            batch_size: Maximum messages per batch
+            block_ms: How long to block waiting for new messages
+            claim_idle_ms: Idle time after which another consumer's pending
+                message is reclaimed
+            max_deliveries: Deliveries after which a message is dead-lettered
+        """
+        if supabase_client is None:
+            from config.database import supabase as supabase_client
+
+        self.stream = stream
+        self.ml_service = ml_service
+        self.feature_extractor = feature_extractor
+        self.anomaly_service = anomaly_service
+        self.embedding_service = embedding_service
+        self.supabase = supabase_client
+        self.consumer_name = consumer_name or f"consumer-{uuid4().hex[:8]}"
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+
+        self.metrics = IngestionMetrics()
+        self.running = False
+
+    @property
+    def backend(self):
+        return self.stream.backend
+
+    async def run(self, idle_sleep: float = 0.1):
+        """Consume batches until stop() is called."""
+        self.running = True
+        logger.info(f"Starting audit ingestion consumer {self.consumer_name}")
+
+        while self.running:
+            try:
+                processed = await self.process_next_batch()
+                if not processed:
+                    await asyncio.sleep(idle_sleep)
+            except Exception as e:
+                logger.error(f"Ingestion consumer {self.consumer_name} error: {e}")
+                await asyncio.sleep(5)
+
+    def stop(self):
+        """Stop the consume loop after the current batch."""
+        self.running = False
+
+    async def process_next_batch(self) -> int:
+        """
+        Pull and process one batch.
+
+        Returns:
+            Number of messages handled (stored or dead-lettered)
+        """
+        messages = await self._read_messages()
+        if not messages:
+            return 0
+
+        delivery_counts = await self._get_delivery_counts(messages)
+
+        events = []
+        message_ids = []
+        for message_id, fields in messages:
+            if delivery_counts.get(message_id, 1) > self.max_deliveries:
+                await self._dead_letter(message_id, fields, "max deliveries exceeded",
+                                        delivery_counts[message_id])
+                continue
+            try:
+                event = json.loads(fields["event"])
+            except Exception as e:
+                await self._dead_letter(message_id, fields, f"undecodable event: {e}",
+                                        delivery_counts.get(message_id, 1))
+                continue
+            events.append(event)
+            message_ids.append(message_id)
+
+        handled = len(messages) - len(events)
+        if not events:
+            return handled
+
+        now_ms = time.time() * 1000
+        oldest_ms = min(_stream_id_key(mid)[0] for mid in message_ids)
+        lag_seconds = max(0.0, (now_ms - oldest_ms) / 1000)
+        self.metrics.last_batch_lag_seconds = lag_seconds
+        self.metrics.max_lag_seconds = max(self.metrics.max_lag_seconds, lag_seconds)
+
+        rows = await self._build_rows(events)
+        stored_ids = self._store_rows(rows, message_ids)
+
+        if stored_ids:
+            await self.backend.xack(self.stream.EVENT_STREAM, self.stream.CONSUMER_GROUP, *stored_ids)
+            await self.backend.xdel(self.stream.EVENT_STREAM, *stored_ids)
+
+        self.metrics.batches += 1
+        self.metrics.last_batch_size = len(events)
+        self.metrics.events_stored += len(stored_ids)
+        self.metrics.events_retried += len(message_ids) - len(stored_ids)
+
+        logger.info(
+            f"Ingested {len(stored_ids)}/{len(events)} audit events "
+            f"(lag {lag_seconds:.2f}s, consumer {self.consumer_name})"
+        )
+        return handled + len(stored_ids)
+
+    async def _read_messages(self) -> List[Tuple[str, Dict[str, str]]]:
+        """Reclaim stale pending messages first, then read new ones."""
+        messages = []
+        try:
+            claim = await self.backend.xautoclaim(
+                self.stream.EVENT_STREAM,
+                self.stream.CONSUMER_GROUP,
+                self.consumer_name,
+                min_idle_time=self.claim_idle_ms,
+                start_id='0-0',
+                count=self.batch_size
+            )
+            messages.extend(claim[1] if claim else [])
+        except Exception as e:
+            logger.warning(f"Failed to reclaim pending audit events: {e}")
+
+        remaining = self.batch_size - len(messages)
+        if remaining > 0:
+            response = await self.backend.xreadgroup(
+                self.stream.CONSUMER_GROUP,
+                self.consumer_name,
+                {self.stream.EVENT_STREAM: '>'},
+                count=remaining,
+                block=None if messages else self.block_ms
+            )
+            for _, stream_messages in response or []:
+                messages.extend(stream_messages)
+
+        return [(mid, fields) for mid, fields in messages if fields]
+
+    async def _get_delivery_counts(self, messages: List[Tuple[str, Dict[str, str]]]) -> Dict[str, int]:
+        """Look up delivery counts of the batch from the pending entries list."""
+        message_ids = [mid for mid, _ in messages]
+        try:
+            pending = await self.backend.xpending_range(
+                self.stream.EVENT_STREAM,
+                self.stream.CONSUMER_GROUP,
+                min=min(message_ids, key=_stream_id_key),
+                max=max(message_ids, key=_stream_id_key),
+                count=len(message_ids) * 2,
+                consumername=self.consumer_name
+            )
+            return {row["message_id"]: row["times_delivered"] for row in pending}
+        except Exception as e:
+            logger.warning(f"Failed to read delivery counts: {e}")
+            return {}
+
+    async def _dead_letter(self, message_id: str, fields: Dict[str, str], reason: str, deliveries: int):
+        """Move a message to the dead-letter stream and drop it from the backlog."""
+        try:
+            await self.backend.xadd(
+                self.stream.DEAD_LETTER_STREAM,
+                {
+                    **fields,
+                    "original_id": message_id,
+                    "reason": reason,
+                    "times_delivered": deliveries,
+                    "dead_lettered_at": datetime.now().isoformat()
+                }
+            )
+            await self.backend.xack(self.stream.EVENT_STREAM, self.stream.CONSUMER_GROUP, message_id)
+            await self.backend.xdel(self.stream.EVENT_STREAM, message_id)
+            self.metrics.events_dead_lettered += 1
+            logger.error(f"Dead-lettered audit event message {message_id}: {reason}")
+        except Exception as e:
+            logger.error(f"Failed to dead-letter message {message_id}: {e}")
+
+    async def _build_rows(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run classification, feature extraction and embedding on the batch."""
+        rows = [dict(event) for event in events]
+        count = len(rows)
+
+        if self.ml_service is not None:
+            stage_start = time.time()
+            classifications = await self.ml_service.classify_events_batch(events)
+            for row, classification in zip(rows, classifications):
+                self._apply_classification(row, classification)
+            self.metrics.record_stage("classification", count, time.time() - stage_start)
+
+        if self.feature_extractor is not None:
+            stage_start = time.time()
+            try:
+                feature_matrix = await self.feature_extractor.extract_batch_features(rows)
+                if self.anomaly_service is not None and self.anomaly_service.is_trained:
+                    scores, flags = self.anomaly_service._compute_calibrated_scores_batch(feature_matrix)
+                    for row, score, flag in zip(rows, scores, flags):
+                        row["anomaly_score"] = round(float(score), 2)
+                        row["is_anomaly"] = bool(flag)
+            except Exception as e:
+                logger.warning(f"Batch anomaly feature extraction failed: {e}")
+            self.metrics.record_stage("feature_extraction", count, time.time() - stage_start)
+
+        if self.embedding_service is not None:
+            stage_start = time.time()
+            try:
+                texts = [self.embedding_service._build_content_text(row) for row in rows]
+                embeddings = await self.embedding_service.generate_embeddings_batch(texts)
+                for row, embedding in zip(rows, embeddings):
+                    row["embedding"] = embedding
+            except Exception as e:
+                # Rows without embeddings are picked up by the embedding job
+                logger.warning(f"Batch embedding generation failed: {e}")
+            self.metrics.record_stage("embedding", count, time.time() - stage_start)
+
+        return rows
+
+    def _apply_classification(self, row: Dict[str, Any], classification) -> None:
+        row["category"] = classification.category
+        row["risk_level"] = classification.risk_level
+
+        tags = row.get("tags")
+        if not isinstance(tags, dict):
+            tags = {}
+        for tag in classification.tags:
+            tags.setdefault(tag.lower().replace(" ", "_").replace(":", ""), {
+                "label": tag,
+                "source": "ml_classification"
+            })
+        row["tags"] = tags
+
+    def _store_rows(self, rows: List[Dict[str, Any]], message_ids: List[str]) -> List[str]:
+        """
+        Store the batch with one bulk write.
+
+        Falls back to row-by-row writes if the bulk write fails, so a single
+        bad event does not hold back the rest of the batch.
+
+        Returns:
+            Message IDs whose events were stored
+        """
+        stage_start = time.time()
+        table = self.supabase.table("roche_audit_logs")
+        try:
+            table.upsert(rows, on_conflict="id", ignore_duplicates=True).execute()
+            stored = list(message_ids)
+        except Exception as e:
+            logger.warning(f"Bulk audit insert failed, retrying row by row: {e}")
+            stored = []
+            for row, message_id in zip(rows, message_ids):
+                try:
+                    self.supabase.table("roche_audit_logs").upsert(
+                        row, on_conflict="id", ignore_duplicates=True
+                    ).execute()
+                    stored.append(message_id)
+                except Exception as row_error:
+                    logger.error(f"Failed to store audit event {row.get('id')}: {row_error}")
+
+        self.metrics.record_stage("storage", len(rows), time.time() - stage_start)
+        return stored
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return consumer throughput, lag and outcome metrics."""
+        return {"consumer": self.consumer_name, **self.metrics.to_dict()}
+
+
+# Global ingestion stream instance
+_ingestion_stream_instance: Optional[AuditIngestionStream] = None
+
+
+async def get_ingestion_stream() -> AuditIngestionStream:
+    """Get or create global ingestion stream instance."""
+    global _ingestion_stream_instance
+
+    if _ingestion_stream_instance is None:
+        _ingestion_stream_instance = AuditIngestionStream()
+        await _ingestion_stream_instance.connect()
+
+    return _ingestion_stream_instance
+
+
+async def publish_audit_events(events: List[Dict[str, Any]]) -> Optional[List[str]]:
+    """
+    Hand audit events to the ingestion stream for batched processing.
+
+    Events are only queued while this process runs a consumer (see
+    start_ingestion_consumer), so they never wait in a stream nobody reads.
+
+    Returns:
+        Stream message IDs, or None if the stream is not in use and the
+        caller should store the events itself
+
+    Raises:
+        AuditIngestionBackpressureError: If the backlog does not drain in time
+    """
+    if _consumer_task is None or _consumer_task.done():
+        return None
+    message_ids = await _consumer.stream.publish_batch(events)
+    return message_ids or None
+
+
+async def create_ingestion_consumer(
+    consumer_name: Optional[str] = None,
+    batch_size: int = 500
+) -> Optional[AuditIngestionConsumer]:
+    """
+    Build a batching consumer with the default audit services.
+
+    Anomaly features are extracted with the anomaly service's own feature
+    extractor, and events are scored when its model is trained.
+
+    Args:
+        consumer_name: Unique consumer name within the group
+        batch_size: Maximum messages per batch
+
+    Returns:
+        The consumer, or None if the stream is unavailable
+    """
+    from services.audit_ml_service import AuditMLService
+    from services.audit_anomaly_service import anomaly_service
+    from config.database import supabase
+
+    stream = await get_ingestion_stream()
+    if not stream.enabled:
+        return None
+
+    ml_service = AuditMLService(supabase_client=supabase)
+    await ml_service.load_models()
+    await ml_service.initialize_redis()
+
+    if not anomaly_service.is_trained:
+        try:
+            await anomaly_service.load_model()
+        except Exception as e:
+            logger.warning(f"Anomaly model unavailable, ingested events are not scored: {e}")
+
+    embedding_service = None
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if openai_api_key:
+        from services.audit_embedding_service import AuditEmbeddingService
+        embedding_service = AuditEmbeddingService(
+            supabase_client=supabase,
+            openai_api_key=openai_api_key
+        )
+
+    return AuditIngestionConsumer(
+        stream=stream,
+        ml_service=ml_service,
+        feature_extractor=anomaly_service.feature_extractor,
+        anomaly_service=anomaly_service,
+        embedding_service=embedding_service,
+        supabase_client=supabase,
+        consumer_name=consumer_name,
+        batch_size=batch_size
+    )
+
+
+# Consumer running in this process, started with the application
+_consumer: Optional[AuditIngestionConsumer] = None
+_consumer_task: Optional[asyncio.Task] = None
+
+
+async def start_ingestion_consumer(consumer_name: Optional[str] = None, batch_size: int = 500) -> bool:
+    """
+    Run a batching consumer in the background of this process.
+
+    Args:
+        consumer_name: Unique consumer name within the group
+        batch_size: Maximum messages per batch
+
+    Returns:
+        True if a consumer is running, False if the stream is unavailable
+    """
+    global _consumer, _consumer_task
+
+    if _consumer_task is not None and not _consumer_task.done():
+        return True
+
+    consumer = await create_ingestion_consumer(consumer_name, batch_size)
+    if consumer is None:
+        logger.warning("Audit ingestion stream unavailable, consumer not started")
+        return False
+
+    _consumer = consumer
+    _consumer_task = asyncio.create_task(consumer.run())
+    return True
+
+
+async def stop_ingestion_consumer(timeout: float = 10.0):
+    """Stop the consumer after its current batch and disconnect the stream."""
+    global _consumer, _consumer_task, _ingestion_stream_instance
+
+    if _consumer is not None:
+        _consumer.stop()
+    if _consumer_task is not None:
+        try:
+            await asyncio.wait_for(_consumer_task, timeout)
+        except asyncio.TimeoutError:
+            _consumer_task.cancel()
+        except Exception as e:
+            logger.error(f"Audit ingestion consumer stopped with error: {e}")
+    _consumer = None
+    _consumer_task = None
+
+    if _ingestion_stream_instance is not None:
+        await _ingestion_stream_instance.disconnect()
+        _ingestion_stream_instance = None
+
+
+def get_consumer_metrics() -> Optional[Dict[str, Any]]:
+    """Metrics of the consumer running in this process, if any."""
+    return _consumer.get_metrics() if _consumer is not None else None
@@ -16,17 +16,33 @@ import logging
 import pickle
 import os
 import hashlib
+import threading
+import time
 from dataclasses import dataclass, asdict
+from functools import cached_property
 
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import redis.asyncio as aioredis
 
 from config.database import supabase
+from utils.lazy_import import lazy_import
+
+# scikit-learn and joblib take seconds to import; load them on first use
+joblib = lazy_import("joblib")
+sk_ensemble = lazy_import("sklearn.ensemble")
+sk_metrics = lazy_import("sklearn.metrics")
+sk_model_selection = lazy_import("sklearn.model_selection")
+sk_preprocessing = lazy_import("sklearn.preprocessing")
+sk_text = lazy_import("sklearn.feature_extraction.text")
+
+
+# Loaded model bundles shared by every AuditMLService instance in the process,
+# keyed by (model_dir, model_version). Fitted estimators are only read during
+# prediction, so a single copy serves all instances.
+_SHARED_MODELS: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_SHARED_MODELS_LOCK = threading.Lock()
+
+MODEL_ARTIFACTS = ('category_classifier', 'risk_classifier', 'feature_vectorizer')
 
 
 @dataclass
@@ -94,8 +110,35 @@ class AuditMLService:
         self.redis_enabled = False
         self.cache_ttl = 3600  # 1 hour TTL for classification results
         
-        # Initialize Random Forest for category classification
-        self.category_classifier = RandomForestClassifier(
+        # Model metadata
+        self.model_version = "1.0.0"
+        self.is_trained = False
+        
+        # Model persistence path
+        self.model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+        os.makedirs(self.model_dir, exist_ok=True)
+    
+    # Estimators and encoders are built on first use, so scikit-learn is not
+    # imported with the module-level service instance
+    
+    @cached_property
+    def category_classifier(self):
+        """Random Forest for category classification"""
+        return self._new_category_classifier()
+    
+    @cached_property
+    def risk_classifier(self):
+        """Gradient Boosting for risk level classification"""
+        return self._new_risk_classifier()
+    
+    @cached_property
+    def feature_vectorizer(self):
+        """TF-IDF vectorizer for text features"""
+        return self._new_feature_vectorizer()
+    
+    @staticmethod
+    def _new_category_classifier():
+        return sk_ensemble.RandomForestClassifier(
             n_estimators=100,
             max_depth=20,
             min_samples_split=5,
@@ -104,9 +147,10 @@ class AuditMLService:
             n_jobs=-1,
             class_weight='balanced'
         )
-        
-        # Initialize Gradient Boosting for risk level classification
-        self.risk_classifier = GradientBoostingClassifier(
+    
+    @staticmethod
+    def _new_risk_classifier():
+        return sk_ensemble.GradientBoostingClassifier(
             n_estimators=100,
             learning_rate=0.1,
             max_depth=5,
@@ -114,29 +158,25 @@ class AuditMLService:
             min_samples_leaf=2,
             random_state=42
         )
-        
-        # Initialize TF-IDF vectorizer for text features
-        self.feature_vectorizer = TfidfVectorizer(
+    
+    @staticmethod
+    def _new_feature_vectorizer():
+        return sk_text.TfidfVectorizer(
             max_features=500,
             ngram_range=(1, 2),
             stop_words='english',
             lowercase=True
         )
-        
-        # Label encoders for categories and risk levels
-        self.category_encoder = LabelEncoder()
-        self.category_encoder.fit(self.CATEGORIES)
-        
-        self.risk_encoder = LabelEncoder()
-        self.risk_encoder.fit(self.RISK_LEVELS)
-        
-        # Model metadata
-        self.model_version = "1.0.0"
-        self.is_trained = False
-        
-        # Model persistence path
-        self.model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
-        os.makedirs(self.model_dir, exist_ok=True)
+    
+    @cached_property
+    def category_encoder(self):
+        """Label encoder for categories"""
+        return sk_preprocessing.LabelEncoder().fit(self.CATEGORIES)
+    
+    @cached_property
+    def risk_encoder(self):
+        """Label encoder for risk levels"""
+        return sk_preprocessing.LabelEncoder().fit(self.RISK_LEVELS)
     
     async def initialize_redis(self):
         """
@@ -250,7 +290,67 @@ class AuditMLService:
             
         except Exception as e:
             self.logger.warning(f"Cache storage failed: {e}")
-    
+
+    async def _get_cached_classifications(
+        self,
+        cache_keys: List[str]
+    ) -> List[Optional[EventClassification]]:
+        """
+        Retrieve cached classification results for many events with one MGET.
+
+        Args:
+            cache_keys: Cache keys generated with _generate_cache_key
+
+        Returns:
+            List aligned with cache_keys holding cached results or None for misses
+
+        Requirements: 7.10
+        """
+        results: List[Optional[EventClassification]] = [None] * len(cache_keys)
+        if not cache_keys or not self.redis_enabled or not self.redis_client:
+            return results
+
+        try:
+            cached_values = await self.redis_client.mget(cache_keys)
+            for index, cached_data in enumerate(cached_values):
+                if cached_data:
+                    results[index] = EventClassification.from_dict(json.loads(cached_data))
+
+            self.logger.debug(
+                f"Batch cache lookup: {sum(r is not None for r in results)}/{len(cache_keys)} hits"
+            )
+
+        except Exception as e:
+            self.logger.warning(f"Batch cache retrieval failed: {e}")
+
+        return results
+
+    async def _cache_classifications(
+        self,
+        entries: List[Tuple[str, EventClassification]]
+    ):
+        """
+        Cache many classification results in a single pipelined round trip.
+
+        Args:
+            entries: (cache_key, classification) pairs to store
+
+        Requirements: 7.10
+        """
+        if not entries or not self.redis_enabled or not self.redis_client:
+            return
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for cache_key, classification in entries:
+                pipe.setex(cache_key, self.cache_ttl, json.dumps(classification.to_dict()))
+            await pipe.execute()
+
+            self.logger.debug(f"Cached {len(entries)} classification results (TTL: {self.cache_ttl}s)")
+
+        except Exception as e:
+            self.logger.warning(f"Batch cache storage failed: {e}")
+
     async def invalidate_cache(self, event: Optional[Dict[str, Any]] = None):
         """
         Invalidate cached classification results.
@@ -373,7 +473,104 @@ class AuditMLService:
             self.logger.error(f"Event classification failed: {str(e)}")
             # Fallback to rule-based classification
             return await self._rule_based_classification(event)
-    
+
+    async def classify_events_batch(
+        self,
+        events: List[Dict[str, Any]]
+    ) -> List[EventClassification]:
+        """
+        Classify many audit events at once.
+
+        Produces the same results as calling classify_event for each event, but
+        resolves cache hits with a single MGET, vectorizes all action texts with
+        one TF-IDF transform and runs each classifier's predict_proba once for
+        the whole batch.
+
+        Args:
+            events: Audit event dictionaries
+
+        Returns:
+            EventClassification for each event, in input order
+
+        Requirements: 4.1, 4.2, 4.3, 4.5, 4.6, 4.7, 7.10
+        """
+        if not events:
+            return []
+
+        start_time = time.time()
+        cache_keys = [self._generate_cache_key(event) for event in events]
+        results = await self._get_cached_classifications(cache_keys)
+
+        miss_indices = [index for index, result in enumerate(results) if result is None]
+        if miss_indices:
+            miss_events = [events[index] for index in miss_indices]
+            try:
+                classifications = await self._classify_uncached_batch(miss_events)
+                await self._cache_classifications([
+                    (cache_keys[index], classification)
+                    for index, classification in zip(miss_indices, classifications)
+                ])
+            except Exception as e:
+                self.logger.error(f"Batch event classification failed: {str(e)}")
+                classifications = [
+                    await self._rule_based_classification(event) for event in miss_events
+                ]
+
+            for index, classification in zip(miss_indices, classifications):
+                results[index] = classification
+
+        elapsed = time.time() - start_time
+        self.logger.debug(
+            f"Classified {len(events)} events in {elapsed:.3f}s "
+            f"({len(events) - len(miss_indices)} cache hits)"
+        )
+
+        return results
+
+    async def _classify_uncached_batch(
+        self,
+        events: List[Dict[str, Any]]
+    ) -> List[EventClassification]:
+        """
+        Run the classifiers on a batch of events that missed the cache.
+
+        Args:
+            events: Audit event dictionaries
+
+        Returns:
+            EventClassification for each event, in input order
+        """
+        if not self.is_trained:
+            self.logger.warning("Model not trained, using rule-based classification")
+            return [await self._rule_based_classification(event) for event in events]
+
+        feature_matrix = await self.extract_features_batch(events)
+
+        category_probs = self.category_classifier.predict_proba(feature_matrix)
+        category_indices = np.argmax(category_probs, axis=1)
+        categories = self.category_encoder.inverse_transform(category_indices)
+        category_confidences = category_probs[np.arange(len(events)), category_indices]
+
+        risk_probs = self.risk_classifier.predict_proba(feature_matrix)
+        risk_indices = np.argmax(risk_probs, axis=1)
+        risk_levels = self.risk_encoder.inverse_transform(risk_indices)
+        risk_confidences = risk_probs[np.arange(len(events)), risk_indices]
+
+        classifications = []
+        for i, event in enumerate(events):
+            category, risk_level, tags = await self._apply_business_rules(
+                event, categories[i], risk_levels[i]
+            )
+            classifications.append(EventClassification(
+                category=category,
+                category_confidence=float(category_confidences[i]),
+                risk_level=risk_level,
+                risk_confidence=float(risk_confidences[i]),
+                tags=tags
+            ))
+
+        return classifications
+
     async def extract_features(
         self,
         event: Dict[str, Any]
@@ -398,55 +595,104 @@ class AuditMLService:
         Requirements: 4.1
         """
         try:
-            features = []
-            
-            # 1. Event type features (one-hot encoded)
-            event_type = event.get('event_type', 'unknown')
-            event_type_features = self._encode_event_type(event_type)
-            features.extend(event_type_features)
-            
-            # 2. Action details text features (TF-IDF)
+            # Action details text features (TF-IDF)
             action_text = self._extract_action_text(event)
             if hasattr(self.feature_vectorizer, 'vocabulary_'):
                 text_features = self.feature_vectorizer.transform([action_text]).toarray()[0]
             else:
                 # If vectorizer not fitted, use zero vector
                 text_features = np.zeros(500)
-            features.extend(text_features)
-            
-            # 3. Entity type features
-            entity_type = event.get('entity_type', 'unknown')
-            entity_features = self._encode_entity_type(entity_type)
-            features.extend(entity_features)
-            
-            # 4. User role features (if available)
-            user_role_features = self._extract_user_role_features(event)
-            features.extend(user_role_features)
-            
-            # 5. Time features
-            time_features = self._extract_time_features(event)
-            features.extend(time_features)
-            
-            # 6. Performance metrics features
-            performance_features = self._extract_performance_features(event)
-            features.extend(performance_features)
-            
-            # 7. Severity features
-            severity_features = self._extract_severity_features(event)
-            features.extend(severity_features)
-            
-            # Convert to numpy array
-            feature_vector = np.array(features, dtype=np.float64)
-            
-            # Handle any NaN or inf values
-            feature_vector = np.nan_to_num(feature_vector, nan=0.0, posinf=1.0, neginf=0.0)
-            
-            return feature_vector
+
+            return self._build_feature_vector(event, text_features)
             
         except Exception as e:
             self.logger.error(f"Feature extraction failed: {str(e)}")
             # Return zero vector on error
             return np.zeros(self._get_feature_dimension())
+
+    async def extract_features_batch(
+        self,
+        events: List[Dict[str, Any]],
+        vectorizer=None
+    ) -> np.ndarray:
+        """
+        Extract the feature matrix for many audit events.
+
+        Rows are identical to extract_features for each event, but the TF-IDF
+        vectorizer is applied once to all action texts instead of per event.
+
+        Args:
+            events: Audit event dictionaries
+            vectorizer: Fitted TF-IDF vectorizer to use instead of the
+                service's own (used while training a new model bundle)
+
+        Returns:
+            Numpy array of shape (len(events), feature_dimension)
+
+        Requirements: 4.1
+        """
+        vectorizer = vectorizer if vectorizer is not None else self.feature_vectorizer
+        action_texts = [self._extract_action_text(event) for event in events]
+        if hasattr(vectorizer, 'vocabulary_'):
+            text_matrix = vectorizer.transform(action_texts).toarray()
+        else:
+            text_matrix = np.zeros((len(events), 500))
+
+        rows = []
+        for event, text_features in zip(events, text_matrix):
+            try:
+                rows.append(self._build_feature_vector(event, text_features))
+            except Exception as e:
+                self.logger.error(f"Feature extraction failed: {str(e)}")
+                rows.append(np.zeros(len(text_features) + self._get_feature_dimension() - 500))
+
+        return np.vstack(rows) if rows else np.zeros((0, self._get_feature_dimension()))
+
+    def _build_feature_vector(
+        self,
+        event: Dict[str, Any],
+        text_features: np.ndarray
+    ) -> np.ndarray:
+        """
+        Assemble the feature vector of an event around its TF-IDF features.
+
+        Args:
+            event: Audit event dictionary
+            text_features: TF-IDF vector of the event's action text
+
+        Returns:
+            Numpy array of features
+        """
+        features = []
+
+        # 1. Event type features (one-hot encoded)
+        event_type = event.get('event_type', 'unknown')
+        features.extend(self._encode_event_type(event_type))
+
+        # 2. Action details text features (TF-IDF)
+        features.extend(text_features)
+
+        # 3. Entity type features
+        entity_type = event.get('entity_type', 'unknown')
+        features.extend(self._encode_entity_type(entity_type))
+
+        # 4. User role features (if available)
+        features.extend(self._extract_user_role_features(event))
+
+        # 5. Time features
+        features.extend(self._extract_time_features(event))
+
+        # 6. Performance metrics features
+        features.extend(self._extract_performance_features(event))
+
+        # 7. Severity features
+        features.extend(self._extract_severity_features(event))
+
+        # Convert to numpy array
+        feature_vector = np.array(features, dtype=np.float64)
+
+        # Handle any NaN or inf values
+        return np.nan_to_num(feature_vector, nan=0.0, posinf=1.0, neginf=0.0)
     
     def _encode_event_type(self, event_type: str) -> List[float]:
         """
@@ -762,6 +1008,10 @@ class AuditMLService:
     ) -> TrainingMetrics:
         """
         Train category and risk classifiers on labeled data.
+
+        Fresh estimators are fitted and then swapped in as a whole, so
+        instances sharing the current models keep predicting with a
+        consistent bundle while training runs.
         
         Args:
             labeled_data: Optional list of labeled audit events
@@ -784,7 +1034,6 @@ class AuditMLService:
             self.logger.info(f"Training classifiers on {len(labeled_data)} labeled events")
             
             # Extract features and labels
-            X_features = []
             y_categories = []
             y_risks = []
             action_texts = []
@@ -802,15 +1051,17 @@ class AuditMLService:
                     y_categories.append(category)
                     y_risks.append(risk_level)
             
+            bundle = {
+                'category_classifier': self._new_category_classifier(),
+                'risk_classifier': self._new_risk_classifier(),
+                'feature_vectorizer': self._new_feature_vectorizer()
+            }
+            
             # Fit TF-IDF vectorizer on action texts
-            self.feature_vectorizer.fit(action_texts)
+            bundle['feature_vectorizer'].fit(action_texts)
             
             # Extract full feature vectors
-            for event in labeled_data:
-                features = await self.extract_features(event)
-                X_features.append(features)
-            
-            X = np.array(X_features)
+            X = await self.extract_features_batch(labeled_data, vectorizer=bundle['feature_vectorizer'])
             y_cat = np.array(y_categories)
             y_risk = np.array(y_risks)
             
@@ -819,7 +1070,7 @@ class AuditMLService:
             y_risk_encoded = self.risk_encoder.transform(y_risk)
             
             # Split data for validation
-            X_train, X_test, y_cat_train, y_cat_test, y_risk_train, y_risk_test = train_test_split(
+            X_train, X_test, y_cat_train, y_cat_test, y_risk_train, y_risk_test = sk_model_selection.train_test_split(
                 X, y_cat_encoded, y_risk_encoded,
                 test_size=0.2,
                 random_state=42,
@@ -828,33 +1079,34 @@ class AuditMLService:
             
             # Train category classifier
             self.logger.info("Training category classifier...")
-            self.category_classifier.fit(X_train, y_cat_train)
+            bundle['category_classifier'].fit(X_train, y_cat_train)
             
             # Train risk classifier
             self.logger.info("Training risk classifier...")
-            self.risk_classifier.fit(X_train, y_risk_train)
-            
-            self.is_trained = True
+            bundle['risk_classifier'].fit(X_train, y_risk_train)
             
             # Calculate metrics
-            cat_pred = self.category_classifier.predict(X_test)
-            risk_pred = self.risk_classifier.predict(X_test)
+            cat_pred = bundle['category_classifier'].predict(X_test)
+            risk_pred = bundle['risk_classifier'].predict(X_test)
             
             metrics = TrainingMetrics(
                 model_version=self.model_version,
                 training_date=datetime.now(),
                 training_data_size=len(labeled_data),
-                category_accuracy=accuracy_score(y_cat_test, cat_pred),
-                category_precision=precision_score(y_cat_test, cat_pred, average='weighted', zero_division=0),
-                category_recall=recall_score(y_cat_test, cat_pred, average='weighted', zero_division=0),
-                category_f1=f1_score(y_cat_test, cat_pred, average='weighted', zero_division=0),
-                risk_accuracy=accuracy_score(y_risk_test, risk_pred),
-                risk_precision=precision_score(y_risk_test, risk_pred, average='weighted', zero_division=0),
-                risk_recall=recall_score(y_risk_test, risk_pred, average='weighted', zero_division=0),
-                risk_f1=f1_score(y_risk_test, risk_pred, average='weighted', zero_division=0)
+                category_accuracy=sk_metrics.accuracy_score(y_cat_test, cat_pred),
+                category_precision=sk_metrics.precision_score(y_cat_test, cat_pred, average='weighted', zero_division=0),
+                category_recall=sk_metrics.recall_score(y_cat_test, cat_pred, average='weighted', zero_division=0),
+                category_f1=sk_metrics.f1_score(y_cat_test, cat_pred, average='weighted', zero_division=0),
+                risk_accuracy=sk_metrics.accuracy_score(y_risk_test, risk_pred),
+                risk_precision=sk_metrics.precision_score(y_risk_test, risk_pred, average='weighted', zero_division=0),
+                risk_recall=sk_metrics.recall_score(y_risk_test, risk_pred, average='weighted', zero_division=0),
+                risk_f1=sk_metrics.f1_score(y_risk_test, risk_pred, average='weighted', zero_division=0)
             )
             
-            # Save models
+            # Replace the shared models and save them
+            with _SHARED_MODELS_LOCK:
+                _SHARED_MODELS[self._shared_model_key(self.model_version)] = bundle
+                self._use_model_bundle(bundle)
             await self._save_models()
             
             # Store model metadata in database
@@ -903,73 +1155,99 @@ class AuditMLService:
             self.logger.error(f"Failed to fetch labeled training data: {str(e)}")
             return []
     
+    def _model_path(self, artifact: str, version: str, extension: str = "pkl") -> str:
+        """Path of a persisted model artifact."""
+        return os.path.join(self.model_dir, f"{artifact}_{version}.{extension}")
+
+    def _shared_model_key(self, version: str) -> Tuple[str, str]:
+        return (os.path.realpath(self.model_dir), version)
+
     async def _save_models(self):
-        """Save trained models and vectorizer to disk."""
+        """
+        Save trained models and vectorizer to disk.
+
+        Each artifact is written as a pickle and as an uncompressed joblib file.
+        The joblib copy lets load_models memory-map the estimators' arrays so
+        that worker processes share the same pages.
+        """
         try:
-            category_model_path = os.path.join(
-                self.model_dir, f"category_classifier_{self.model_version}.pkl"
-            )
-            risk_model_path = os.path.join(
-                self.model_dir, f"risk_classifier_{self.model_version}.pkl"
-            )
-            vectorizer_path = os.path.join(
-                self.model_dir, f"feature_vectorizer_{self.model_version}.pkl"
-            )
-            
-            with open(category_model_path, 'wb') as f:
-                pickle.dump(self.category_classifier, f)
-            
-            with open(risk_model_path, 'wb') as f:
-                pickle.dump(self.risk_classifier, f)
-            
-            with open(vectorizer_path, 'wb') as f:
-                pickle.dump(self.feature_vectorizer, f)
-            
+            bundle = {
+                'category_classifier': self.category_classifier,
+                'risk_classifier': self.risk_classifier,
+                'feature_vectorizer': self.feature_vectorizer
+            }
+
+            for artifact, model in bundle.items():
+                with open(self._model_path(artifact, self.model_version), 'wb') as f:
+                    pickle.dump(model, f)
+                joblib.dump(model, self._model_path(artifact, self.model_version, "joblib"))
+
             self.logger.info(f"Models saved to {self.model_dir}")
             
         except Exception as e:
             self.logger.error(f"Failed to save models: {str(e)}")
+
+    def _load_model_bundle(self, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Load all model artifacts of a version from disk.
+
+        Prefers memory-mapped joblib files and falls back to the pickles.
+
+        Returns:
+            Dict of artifact name to model, or None if any artifact is missing
+        """
+        bundle = {}
+        for artifact in MODEL_ARTIFACTS:
+            joblib_path = self._model_path(artifact, version, "joblib")
+            pickle_path = self._model_path(artifact, version)
+
+            if os.path.exists(joblib_path):
+                bundle[artifact] = joblib.load(joblib_path, mmap_mode='r')
+            elif os.path.exists(pickle_path):
+                with open(pickle_path, 'rb') as f:
+                    bundle[artifact] = pickle.load(f)
+            else:
+                return None
+
+        return bundle
     
     async def load_models(self, model_version: Optional[str] = None):
         """
         Load trained models from disk.
+
+        Models are loaded once per process and shared by all service
+        instances; subsequent calls reuse the loaded bundle.
         
         Args:
             model_version: Version of models to load (defaults to current version)
         """
         try:
             version = model_version or self.model_version
-            
-            category_model_path = os.path.join(
-                self.model_dir, f"category_classifier_{version}.pkl"
-            )
-            risk_model_path = os.path.join(
-                self.model_dir, f"risk_classifier_{version}.pkl"
-            )
-            vectorizer_path = os.path.join(
-                self.model_dir, f"feature_vectorizer_{version}.pkl"
-            )
-            
-            if (os.path.exists(category_model_path) and 
-                os.path.exists(risk_model_path) and 
-                os.path.exists(vectorizer_path)):
-                
-                with open(category_model_path, 'rb') as f:
-                    self.category_classifier = pickle.load(f)
-                
-                with open(risk_model_path, 'rb') as f:
-                    self.risk_classifier = pickle.load(f)
-                
-                with open(vectorizer_path, 'rb') as f:
-                    self.feature_vectorizer = pickle.load(f)
-                
-                self.is_trained = True
-                self.logger.info(f"Models loaded from {self.model_dir}")
-            else:
+            key = self._shared_model_key(version)
+
+            with _SHARED_MODELS_LOCK:
+                bundle = _SHARED_MODELS.get(key)
+                if bundle is None:
+                    bundle = self._load_model_bundle(version)
+                    if bundle is not None:
+                        _SHARED_MODELS[key] = bundle
+                        self.logger.info(f"Models loaded from {self.model_dir}")
+
+            if bundle is None:
                 self.logger.warning(f"Model files not found for version {version}")
+                return
+
+            self._use_model_bundle(bundle)
                 
         except Exception as e:
             self.logger.error(f"Failed to load models: {str(e)}")
+
+    def _use_model_bundle(self, bundle: Dict[str, Any]):
+        """Predict with the models of a bundle from now on."""
+        self.category_classifier = bundle['category_classifier']
+        self.risk_classifier = bundle['risk_classifier']
+        self.feature_vectorizer = bundle['feature_vectorizer']
+        self.is_trained = True
     
     async def _store_model_metadata(self, metrics: TrainingMetrics):
         """
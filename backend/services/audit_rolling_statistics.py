@@ -0,0 +1,411 @@
+"""
+Rolling Historical Statistics for Audit Feature Extraction
+
+Maintains the event-type, per-user and entity-access counters used by
+AuditFeatureExtractor as time-bucketed aggregates over a sliding window
+(30 days by default). New audit events are folded in incrementally from the
+last processed (created_at, id) position, buckets that fall out of the window
+are subtracted from the running totals, and every bucket is persisted so a
+restart resumes from the stored state instead of rescanning the window.
+
+Running totals are kept alongside the buckets, so looking up any statistic
+for an event is a constant-time dictionary access.
+
+Requirements: 1.2
+"""
+
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+import logging
+
+
+BUCKETS_TABLE = "audit_feature_statistics_buckets"
+WATERMARK_TABLE = "audit_pipeline_watermarks"
+STATISTICS_PIPELINE_NAME = "feature_statistics"
+GLOBAL_TENANT_KEY = "global"
+
+STATISTICS_EVENT_COLUMNS = "id, created_at, event_type, user_id, entity_type, entity_id, timestamp"
+
+
+def _to_utc_naive(value: Any) -> Optional[datetime]:
+    """Parse a timestamp into a naive UTC datetime, or None if invalid."""
+    if not value:
+        return None
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if not isinstance(value, datetime):
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    except Exception:
+        return None
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _entity_key(event: Dict[str, Any]) -> str:
+    entity_type = event.get('entity_type', 'unknown')
+    entity_id = event.get('entity_id')
+    return f"{entity_type}:{entity_id}" if entity_id else f"{entity_type}"
+
+
+@dataclass
+class StatisticsBucket:
+    """Counters for all audit events whose timestamp falls in one bucket."""
+    start: datetime
+    event_count: int = 0
+    event_types: Counter = field(default_factory=Counter)
+    users: Counter = field(default_factory=Counter)
+    entities: Counter = field(default_factory=Counter)
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "bucket_start": self.start.isoformat(),
+            "event_count": self.event_count,
+            "event_type_counts": dict(self.event_types),
+            "user_counts": dict(self.users),
+            "entity_counts": dict(self.entities),
+            "updated_at": _utc_now().isoformat()
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> Optional["StatisticsBucket"]:
+        start = _to_utc_naive(row.get("bucket_start"))
+        if start is None:
+            return None
+        return cls(
+            start=start,
+            event_count=int(row.get("event_count") or 0),
+            event_types=Counter(row.get("event_type_counts") or {}),
+            users=Counter(row.get("user_counts") or {}),
+            entities=Counter(row.get("entity_counts") or {})
+        )
+
+
+class UserActivityView(Mapping):
+    """
+    Read-only mapping of user_id -> activity statistics.
+
+    Statistics are derived on access from the running per-user counter, so the
+    view never has to be rebuilt when counters change.
+    """
+
+    def __init__(self, user_counts: Dict[str, int], window_days: float):
+        self._user_counts = user_counts
+        self._window_days = window_days
+
+    def __getitem__(self, user_id: str) -> Dict[str, float]:
+        count = self._user_counts[user_id]
+        events_per_day = count / self._window_days
+        return {
+            'events_per_hour': count / (self._window_days * 24),
+            'events_per_day': events_per_day,
+            'avg_events_per_day': events_per_day,
+            'std_events_per_day': events_per_day * 0.2  # Rough estimate
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._user_counts)
+
+    def __len__(self) -> int:
+        return len(self._user_counts)
+
+
+class AuditRollingStatistics:
+    """
+    Sliding-window audit statistics with incremental updates and persistence.
+    """
+
+    def __init__(
+        self,
+        supabase_client=None,
+        window: timedelta = timedelta(days=30),
+        bucket_size: timedelta = timedelta(hours=1),
+        page_size: int = 5000
+    ):
+        self.supabase = supabase_client
+        self.window = window
+        self.bucket_size = bucket_size
+        self.page_size = page_size
+        self.logger = logging.getLogger(__name__)
+
+        self._buckets: Dict[datetime, StatisticsBucket] = {}
+        self._dirty_buckets: set = set()
+
+        # Running totals over all live buckets
+        self.event_type_counts: Dict[str, int] = {}
+        self.user_counts: Dict[str, int] = {}
+        self.entity_counts: Dict[str, int] = {}
+        self.entity_type_counts: Dict[str, int] = {}
+        self.total_events = 0
+        self.total_entity_accesses = 0
+
+        self.watermark: Optional[Tuple[str, str]] = None
+        self.is_loaded = False
+
+        self._user_activity_view = UserActivityView(
+            self.user_counts, self.window.total_seconds() / 86400
+        )
+
+    # ------------------------------------------------------------------
+    # In-memory maintenance
+    # ------------------------------------------------------------------
+
+    def _bucket_start(self, timestamp: datetime) -> datetime:
+        bucket_seconds = int(self.bucket_size.total_seconds())
+        epoch_seconds = int((timestamp - datetime(1970, 1, 1)).total_seconds())
+        return datetime(1970, 1, 1) + timedelta(
+            seconds=epoch_seconds - epoch_seconds % bucket_seconds
+        )
+
+    def _window_start(self, now: Optional[datetime] = None) -> datetime:
+        return (now or _utc_now()) - self.window
+
+    @staticmethod
+    def _increment(totals: Dict[str, int], key: str, amount: int):
+        value = totals.get(key, 0) + amount
+        if value > 0:
+            totals[key] = value
+        else:
+            totals.pop(key, None)
+
+    def _apply_bucket_counts(self, bucket: StatisticsBucket, sign: int):
+        """Add (sign=1) or subtract (sign=-1) a bucket from the running totals."""
+        self.total_events += sign * bucket.event_count
+        for event_type, count in bucket.event_types.items():
+            self._increment(self.event_type_counts, event_type, sign * count)
+        for user_id, count in bucket.users.items():
+            self._increment(self.user_counts, user_id, sign * count)
+        for entity_key, count in bucket.entities.items():
+            self._increment(self.entity_counts, entity_key, sign * count)
+            self._increment(self.entity_type_counts, entity_key.split(':')[0], sign * count)
+            self.total_entity_accesses += sign * count
+
+    def add_event(self, event: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+        """
+        Fold a single audit event into its time bucket and the running totals.
+
+        Args:
+            event: Audit event with at least event_type and timestamp
+            now: Reference time for the window (defaults to current UTC time)
+
+        Returns:
+            True if the event fell inside the window and was counted
+        """
+        timestamp = _to_utc_naive(event.get('timestamp'))
+        if timestamp is None or timestamp < self._window_start(now):
+            return False
+
+        start = self._bucket_start(timestamp)
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = StatisticsBucket(start=start)
+
+        event_type = event.get('event_type')
+        entity_key = _entity_key(event)
+        user_id = event.get('user_id')
+
+        bucket.event_count += 1
+        self.total_events += 1
+        if event_type is not None:
+            bucket.event_types[event_type] += 1
+            self._increment(self.event_type_counts, event_type, 1)
+        if user_id:
+            bucket.users[str(user_id)] += 1
+            self._increment(self.user_counts, str(user_id), 1)
+        bucket.entities[entity_key] += 1
+        self._increment(self.entity_counts, entity_key, 1)
+        self._increment(self.entity_type_counts, entity_key.split(':')[0], 1)
+        self.total_entity_accesses += 1
+
+        self._dirty_buckets.add(start)
+        return True
+
+    def add_events(self, events: List[Dict[str, Any]], now: Optional[datetime] = None) -> int:
+        """Fold a batch of events in; returns how many were inside the window."""
+        now = now or _utc_now()
+        return sum(1 for event in events if self.add_event(event, now))
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """
+        Drop buckets that have slid out of the window.
+
+        Returns:
+            Number of buckets removed
+        """
+        cutoff = self._bucket_start(self._window_start(now))
+        expired = [start for start in self._buckets if start < cutoff]
+        for start in expired:
+            self._apply_bucket_counts(self._buckets.pop(start), -1)
+            self._dirty_buckets.discard(start)
+        return len(expired)
+
+    def historical_context(self) -> Dict[str, Any]:
+        """
+        Statistics in the shape expected by AuditFeatureExtractor.
+
+        The returned structures are live views over the running totals, and
+        the *_total / entity_type_counts entries spare the extractor from
+        re-aggregating them per event.
+        """
+        return {
+            'event_type_frequencies': self.event_type_counts,
+            'event_type_total': self.total_events,
+            'user_activity_stats': self._user_activity_view,
+            'entity_access_patterns': self.entity_counts,
+            'entity_access_total': self.total_entity_accesses,
+            'entity_type_counts': self.entity_type_counts
+        }
+
+    def load_buckets(self, rows: List[Dict[str, Any]], now: Optional[datetime] = None):
+        """Replace the in-memory state with persisted bucket rows."""
+        self._buckets.clear()
+        self._dirty_buckets.clear()
+        for totals in (self.event_type_counts, self.user_counts,
+                       self.entity_counts, self.entity_type_counts):
+            totals.clear()
+        self.total_events = 0
+        self.total_entity_accesses = 0
+
+        for row in rows:
+            bucket = StatisticsBucket.from_row(row)
+            if bucket is None:
+                continue
+            self._buckets[bucket.start] = bucket
+            self._apply_bucket_counts(bucket, 1)
+        self.expire(now)
+
+    # ------------------------------------------------------------------
+    # Persistence and catch-up
+    # ------------------------------------------------------------------
+
+    async def refresh(self, now: Optional[datetime] = None):
+        """
+        Bring the statistics up to date.
+
+        On first use the persisted buckets and watermark are loaded; after that
+        only events added since the watermark are read. A full window scan only
+        happens when no persisted state exists at all.
+        """
+        if not self.supabase:
+            return
+
+        now = now or _utc_now()
+        try:
+            if not self.is_loaded:
+                self._load_persisted_state(now)
+                self.is_loaded = True
+
+            events_added = self._catch_up(now)
+            expired = self.expire(now)
+            self._persist(now)
+
+            self.logger.info(
+                f"Updated rolling audit statistics: {events_added} new events, "
+                f"{expired} expired buckets, {len(self.event_type_counts)} event types, "
+                f"{len(self.user_counts)} users, {len(self.entity_counts)} entities"
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to refresh rolling audit statistics: {str(e)}")
+
+    def _load_persisted_state(self, now: datetime):
+        """
+        Load the persisted buckets with the watermark they were counted up to.
+
+        Buckets without a watermark are not used, since the full window scan
+        that follows would count their events again. A read error resets the
+        state and propagates, so the next refresh loads again.
+        """
+        cutoff = self._bucket_start(self._window_start(now))
+        try:
+            response = self.supabase.table(WATERMARK_TABLE).select(
+                "watermark_created_at, watermark_event_id"
+            ).eq("pipeline_name", STATISTICS_PIPELINE_NAME).eq(
+                "tenant_key", GLOBAL_TENANT_KEY
+            ).limit(1).execute()
+            rows = response.data or []
+            if not (rows and rows[0].get("watermark_created_at") and rows[0].get("watermark_event_id")):
+                self.logger.info("No audit statistics watermark; rebuilding from a full window scan")
+                return
+            watermark = (str(rows[0]["watermark_created_at"]), str(rows[0]["watermark_event_id"]))
+
+            response = self.supabase.table(BUCKETS_TABLE).select("*").gte(
+                "bucket_start", cutoff.isoformat()
+            ).execute()
+            self.load_buckets(response.data or [], now)
+            self.watermark = watermark
+        except Exception:
+            self.load_buckets([], now)
+            self.watermark = None
+            raise
+
+    def _catch_up(self, now: datetime) -> int:
+        """Read events after the watermark page by page and fold them in."""
+        events_added = 0
+        while True:
+            query = self.supabase.table("roche_audit_logs").select(STATISTICS_EVENT_COLUMNS)
+            if self.watermark:
+                created_at, event_id = self.watermark
+                query = query.or_(
+                    f'created_at.gt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.gt.{event_id})'
+                )
+            else:
+                query = query.gte("created_at", self._window_start(now).isoformat())
+
+            response = query.order("created_at").order("id").limit(self.page_size).execute()
+            events = response.data or []
+            if not events:
+                break
+
+            events_added += self.add_events(events, now)
+            self.watermark = (str(events[-1].get("created_at")), str(events[-1].get("id")))
+
+            if len(events) < self.page_size:
+                break
+        return events_added
+
+    def _persist(self, now: datetime):
+        """Write changed buckets, drop expired rows and advance the watermark."""
+        if self._dirty_buckets:
+            rows = [
+                self._buckets[start].to_row()
+                for start in sorted(self._dirty_buckets)
+                if start in self._buckets
+            ]
+            try:
+                if rows:
+                    self.supabase.table(BUCKETS_TABLE).upsert(
+                        rows, on_conflict="bucket_start"
+                    ).execute()
+                self._dirty_buckets.clear()
+            except Exception as e:
+                self.logger.error(f"Failed to persist audit statistics buckets: {str(e)}")
+                return
+
+        try:
+            cutoff = self._bucket_start(self._window_start(now))
+            self.supabase.table(BUCKETS_TABLE).delete().lt(
+                "bucket_start", cutoff.isoformat()
+            ).execute()
+        except Exception as e:
+            self.logger.warning(f"Failed to delete expired audit statistics buckets: {str(e)}")
+
+        if self.watermark:
+            try:
+                self.supabase.table(WATERMARK_TABLE).upsert({
+                    "pipeline_name": STATISTICS_PIPELINE_NAME,
+                    "tenant_key": GLOBAL_TENANT_KEY,
+                    "watermark_created_at": self.watermark[0],
+                    "watermark_event_id": self.watermark[1],
+                    "updated_at": now.isoformat()
+                }, on_conflict="pipeline_name,tenant_key").execute()
+            except Exception as e:
+                self.logger.error(f"Failed to save audit statistics watermark: {str(e)}")
@@ -15,6 +15,7 @@ import asyncio
 
 from config.database import supabase
 from services.audit_anomaly_service import AuditAnomalyService
+from services.audit_anomaly_pipeline import AnomalyPipelineError, AuditAnomalyPipeline
 from services.audit_integration_hub import AuditIntegrationHub
 from services.audit_rag_agent import AuditRAGAgent
 from services.audit_ml_service import AuditMLService
@@ -53,6 +54,10 @@ class AuditScheduledJobs:
             supabase_client=self.supabase,
             redis_client=self.redis
         )
+        self.anomaly_pipeline = AuditAnomalyPipeline(
+            anomaly_service=self.anomaly_service,
+            supabase_client=self.supabase
+        )
         self.integration_hub = AuditIntegrationHub(supabase_client=self.supabase)
         self.rag_agent = AuditRAGAgent(
             supabase_client=self.supabase,
@@ -71,39 +76,30 @@ class AuditScheduledJobs:
         """
         Scheduled job for anomaly detection.
         
-        Scans last 24 hours of audit events, detects anomalies,
-        generates alerts, and sends notifications via Integration Hub.
+        Scans audit events added since the last pipeline watermark (the first
+        run covers the last 24 hours), detects anomalies, generates alerts,
+        and sends notifications via Integration Hub.
         
         Requirements: 1.1, 1.4, 1.5
         """
         try:
             logger.info("Starting scheduled anomaly detection job")
             
-            # Define time range (last 24 hours)
-            end_time = datetime.now()
-            start_time = end_time - timedelta(hours=24)
-            
-            # Detect anomalies
-            anomalies = await self.anomaly_service.detect_anomalies(
-                start_time=start_time,
-                end_time=end_time
+            # Detect anomalies in events added since the last watermark
+            try:
+                anomalies = await self.anomaly_pipeline.run()
+            except AnomalyPipelineError as e:
+                # Windows stored before the failure are past the watermark;
+                # alert their anomalies now, as they will not be detected again
+                await self._alert_anomalies(e.anomalies)
+                raise
+            
+            logger.info(
+                f"Detected {len(anomalies)} anomalies in new events "
+                f"(metrics: {self.anomaly_pipeline.get_metrics()})"
             )
             
-            logger.info(f"Detected {len(anomalies)} anomalies in last 24 hours")
-            
-            # Generate alerts and send notifications for each anomaly
-            for anomaly in anomalies:
-                try:
-                    # Generate alert
-                    alert = await self.anomaly_service.generate_alert(anomaly)
-                    logger.info(f"Generated alert for anomaly {anomaly.id}")
-                    
-                    # Send notifications via configured integrations
-                    await self._send_anomaly_notifications(anomaly)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process anomaly {anomaly.id}: {str(e)}")
-                    continue
+            await self._alert_anomalies(anomalies)
             
             logger.info("Completed scheduled anomaly detection job")
             
@@ -111,6 +107,21 @@ class AuditScheduledJobs:
             logger.error(f"Anomaly detection job failed: {str(e)}")
             raise
     
+    async def _alert_anomalies(self, anomalies):
+        """Generate alerts and send notifications for each anomaly"""
+        for anomaly in anomalies:
+            try:
+                # Generate alert
+                alert = await self.anomaly_service.generate_alert(anomaly)
+                logger.info(f"Generated alert for anomaly {anomaly.id}")
+                
+                # Send notifications via configured integrations
+                await self._send_anomaly_notifications(anomaly)
+                
+            except Exception as e:
+                logger.error(f"Failed to process anomaly {anomaly.id}: {str(e)}")
+                continue
+    
     async def _send_anomaly_notifications(self, anomaly):
         """
         Send notifications for detected anomaly via all configured integrations.
@@ -18,6 +18,7 @@ import json
 from decimal import Decimal
 
 from config.database import supabase
+from services.earned_value_engine import EarnedValueEngine, INDEX_PLACES, to_decimal
 from models.schedule import (
     ScheduleBaselineCreate, ScheduleBaselineResponse,
     ScheduleResponse, TaskResponse, ScheduleWithTasksResponse
@@ -204,19 +205,9 @@ class BaselineManager:
         """
         try:
             # Get baseline
-            if baseline_id:
-                baseline_result = self.db.table("schedule_baselines").select("*").eq("id", str(baseline_id)).execute()
-            else:
-                # Get latest approved baseline
-                baseline_result = self.db.table("schedule_baselines").select("*").eq(
-                    "schedule_id", str(schedule_id)
-                ).eq("is_approved", True).order("created_at", desc=True).limit(1).execute()
-            
-            if not baseline_result.data:
-                raise ValueError("No baseline found for variance calculation")
-            
-            baseline = baseline_result.data[0]
-            baseline_data = json.loads(baseline["baseline_data"])
+            baseline, baseline_data = self._get_baseline_for_calculation(
+                schedule_id, baseline_id, "variance calculation"
+            )
             baseline_tasks = baseline_data["snapshot"]["tasks"]
             
             # Get current schedule and tasks
@@ -226,8 +217,7 @@ class BaselineManager:
             
             current_schedule = current_schedule_result.data[0]
             
-            current_tasks_result = self.db.table("tasks").select("*").eq("schedule_id", str(schedule_id)).execute()
-            current_tasks = current_tasks_result.data or []
+            current_tasks = self._get_schedule_tasks(schedule_id)
             
             # Calculate variances
             task_variances = []
@@ -403,15 +393,22 @@ class BaselineManager:
         self,
         schedule_id: UUID,
         baseline_id: Optional[UUID] = None,
-        status_date: Optional[date] = None
+        status_date: Optional[date] = None,
+        period_end_dates: Optional[List[date]] = None
     ) -> Dict[str, Any]:
         """
         Calculate earned value metrics for schedule performance.
         
+        Baseline effort is phased linearly over each task's baseline dates and
+        all task and summary metrics are computed in one pass.
+        
         Args:
             schedule_id: ID of the schedule
             baseline_id: ID of specific baseline (uses latest approved if None)
             status_date: Date for calculations (uses today if None)
+            period_end_dates: Optional period end dates for a time-phased trend;
+                without progress history, earned value and the metrics
+                derived from it are only reported for the latest one
             
         Returns:
             Dict with earned value metrics
@@ -420,108 +417,59 @@ class BaselineManager:
             if not status_date:
                 status_date = date.today()
             
-            # Get baseline
-            if baseline_id:
-                baseline_result = self.db.table("schedule_baselines").select("*").eq("id", str(baseline_id)).execute()
-            else:
-                baseline_result = self.db.table("schedule_baselines").select("*").eq(
-                    "schedule_id", str(schedule_id)
-                ).eq("is_approved", True).order("created_at", desc=True).limit(1).execute()
-            
-            if not baseline_result.data:
-                raise ValueError("No baseline found for earned value calculation")
-            
-            baseline = baseline_result.data[0]
-            baseline_data = json.loads(baseline["baseline_data"])
-            baseline_tasks = baseline_data["snapshot"]["tasks"]
-            
-            # Get current tasks
-            current_tasks_result = self.db.table("tasks").select("*").eq("schedule_id", str(schedule_id)).execute()
-            current_tasks = current_tasks_result.data or []
-            current_tasks_map = {task["id"]: task for task in current_tasks}
-            
-            # Calculate earned value metrics
-            total_planned_value = 0.0  # BCWS - Budgeted Cost of Work Scheduled
-            total_earned_value = 0.0   # BCWP - Budgeted Cost of Work Performed
-            total_actual_cost = 0.0    # ACWP - Actual Cost of Work Performed
+            # Get baseline and current tasks
+            baseline, baseline_data = self._get_baseline_for_calculation(
+                schedule_id, baseline_id, "earned value calculation"
+            )
+            current_tasks = self._get_schedule_tasks(schedule_id)
             
-            task_metrics = []
+            # Planned value from baseline effort, earned value from current progress,
+            # actual cost from actual effort hours
+            engine = EarnedValueEngine.for_tasks(
+                baseline_data["snapshot"]["tasks"], current_tasks, str(schedule_id)
+            )
             
-            for baseline_task in baseline_tasks:
-                task_id = baseline_task["id"]
-                current_task = current_tasks_map.get(task_id)
-                
-                if current_task:
-                    # Calculate planned value (should be done by status date)
-                    baseline_start = date.fromisoformat(baseline_task["planned_start_date"])
-                    baseline_end = date.fromisoformat(baseline_task["planned_end_date"])
-                    baseline_effort = baseline_task.get("planned_effort_hours", 0) or 0
-                    
-                    if status_date >= baseline_end:
-                        # Task should be 100% complete
-                        planned_value = baseline_effort
-                    elif status_date >= baseline_start:
-                        # Task should be partially complete
-                        total_duration = (baseline_end - baseline_start).days + 1
-                        elapsed_duration = (status_date - baseline_start).days + 1
-                        planned_progress = min(100, (elapsed_duration / total_duration) * 100)
-                        planned_value = baseline_effort * (planned_progress / 100)
-                    else:
-                        # Task should not have started
-                        planned_value = 0
-                    
-                    # Calculate earned value (actual progress * baseline effort)
-                    current_progress = current_task.get("progress_percentage", 0)
-                    earned_value = baseline_effort * (current_progress / 100)
-                    
-                    # Calculate actual cost (actual effort hours)
-                    actual_cost = current_task.get("actual_effort_hours", 0) or 0
-                    
-                    task_metric = {
-                        "task_id": task_id,
-                        "task_name": current_task["name"],
-                        "wbs_code": current_task["wbs_code"],
-                        "planned_value": planned_value,
-                        "earned_value": earned_value,
-                        "actual_cost": actual_cost,
-                        "schedule_variance": earned_value - planned_value,
-                        "cost_variance": earned_value - actual_cost,
-                        "schedule_performance_index": earned_value / planned_value if planned_value > 0 else 0,
-                        "cost_performance_index": earned_value / actual_cost if actual_cost > 0 else 0
-                    }
-                    
-                    task_metrics.append(task_metric)
-                    total_planned_value += planned_value
-                    total_earned_value += earned_value
-                    total_actual_cost += actual_cost
+            elements = engine.element_metrics(status_date)
+            task_metrics = [
+                {
+                    "task_id": task["id"],
+                    "task_name": task["name"],
+                    "wbs_code": task["wbs_code"],
+                    "planned_value": float(to_decimal(elements["planned_value"][i])),
+                    "earned_value": float(to_decimal(elements["earned_value"][i])),
+                    "actual_cost": float(to_decimal(elements["actual_cost"][i])),
+                    "schedule_variance": float(to_decimal(elements["schedule_variance"][i])),
+                    "cost_variance": float(to_decimal(elements["cost_variance"][i])),
+                    "schedule_performance_index": float(to_decimal(elements["schedule_performance_index"][i], INDEX_PLACES)),
+                    "cost_performance_index": float(to_decimal(elements["cost_performance_index"][i], INDEX_PLACES))
+                }
+                for i, task in enumerate(engine.elements)
+            ]
             
             # Calculate overall metrics
-            schedule_variance = total_earned_value - total_planned_value
-            cost_variance = total_earned_value - total_actual_cost
-            schedule_performance_index = total_earned_value / total_planned_value if total_planned_value > 0 else 0
-            cost_performance_index = total_earned_value / total_actual_cost if total_actual_cost > 0 else 0
+            metrics = engine.compute([status_date])
+            summary = metrics.snapshot()
+            schedule_performance_index = float(summary["schedule_performance_index"])
+            cost_performance_index = float(summary["cost_performance_index"])
             
-            # Calculate estimates
-            estimate_at_completion = total_actual_cost / cost_performance_index if cost_performance_index > 0 else 0
-            estimate_to_complete = estimate_at_completion - total_actual_cost
-            variance_at_completion = total_planned_value - estimate_at_completion
-            
-            return {
+            result = {
                 "schedule_id": str(schedule_id),
                 "baseline_id": baseline["id"],
                 "status_date": status_date.isoformat(),
                 "calculation_timestamp": datetime.utcnow().isoformat(),
                 "summary_metrics": {
-                    "planned_value": round(total_planned_value, 2),
-                    "earned_value": round(total_earned_value, 2),
-                    "actual_cost": round(total_actual_cost, 2),
-                    "schedule_variance": round(schedule_variance, 2),
-                    "cost_variance": round(cost_variance, 2),
+                    "planned_value": float(summary["planned_value"]),
+                    "earned_value": float(summary["earned_value"]),
+                    "actual_cost": float(summary["actual_cost"]),
+                    "schedule_variance": float(summary["schedule_variance"]),
+                    "cost_variance": float(summary["cost_variance"]),
                     "schedule_performance_index": round(schedule_performance_index, 3),
                     "cost_performance_index": round(cost_performance_index, 3),
-                    "estimate_at_completion": round(estimate_at_completion, 2),
-                    "estimate_to_complete": round(estimate_to_complete, 2),
-                    "variance_at_completion": round(variance_at_completion, 2)
+                    "to_complete_performance_index": round(float(summary["to_complete_performance_index"]), 3),
+                    "budget_at_completion": float(summary["budget_at_completion"]),
+                    "estimate_at_completion": float(summary["estimate_at_completion"]["current_performance"]),
+                    "estimate_to_complete": float(summary["estimate_to_complete"]["performance_based"]),
+                    "variance_at_completion": float(summary["variance_at_completion"]["current_performance"])
                 },
                 "task_metrics": task_metrics,
                 "performance_indicators": {
@@ -531,12 +479,43 @@ class BaselineManager:
                 }
             }
             
+            if period_end_dates:
+                result["period_metrics"] = engine.compute(sorted(period_end_dates)).period_series()
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Error calculating earned value metrics: {e}")
             raise RuntimeError(f"Failed to calculate earned value metrics: {str(e)}")
     
     # Private helper methods
     
+    def _get_baseline_for_calculation(
+        self,
+        schedule_id: UUID,
+        baseline_id: Optional[UUID],
+        purpose: str
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Get the given baseline, or the latest approved one, with its parsed snapshot."""
+        if baseline_id:
+            baseline_result = self.db.table("schedule_baselines").select("*").eq("id", str(baseline_id)).execute()
+        else:
+            # Get latest approved baseline
+            baseline_result = self.db.table("schedule_baselines").select("*").eq(
+                "schedule_id", str(schedule_id)
+            ).eq("is_approved", True).order("created_at", desc=True).limit(1).execute()
+        
+        if not baseline_result.data:
+            raise ValueError(f"No baseline found for {purpose}")
+        
+        baseline = baseline_result.data[0]
+        return baseline, json.loads(baseline["baseline_data"])
+    
+    def _get_schedule_tasks(self, schedule_id: UUID) -> List[Dict[str, Any]]:
+        """Get the current tasks of a schedule."""
+        current_tasks_result = self.db.table("tasks").select("*").eq("schedule_id", str(schedule_id)).execute()
+        return current_tasks_result.data or []
+    
     def _convert_baseline_to_response(self, baseline_data: Dict[str, Any]) -> ScheduleBaselineResponse:
         """Convert database baseline record to ScheduleBaselineResponse model."""
         return ScheduleBaselineResponse(
@@ -624,29 +603,11 @@ class BaselineManager:
             float: Schedule Performance Index
         """
         try:
-            current_tasks_map = {task["id"]: task for task in current_tasks}
-            
-            total_earned_value = 0.0
-            total_planned_value = 0.0
-            
-            for baseline_task in baseline_tasks:
-                task_id = baseline_task["id"]
-                current_task = current_tasks_map.get(task_id)
-                
-                if current_task:
-                    baseline_effort = baseline_task.get("planned_effort_hours", 1) or 1
-                    current_progress = current_task.get("progress_percentage", 0)
-                    
-                    # Earned value = baseline effort * actual progress
-                    earned_value = baseline_effort * (current_progress / 100)
-                    
-                    # Planned value = baseline effort * planned progress (simplified to 100% for completed baseline)
-                    planned_value = baseline_effort
-                    
-                    total_earned_value += earned_value
-                    total_planned_value += planned_value
+            # Planned value simplified to the full baseline effort (default 1 per task)
+            engine = EarnedValueEngine.for_tasks(baseline_tasks, current_tasks, default_effort=1)
+            total_planned_value = engine.budgets.sum()
             
-            return total_earned_value / total_planned_value if total_planned_value > 0 else 0.0
+            return float(engine.earned_values.sum() / total_planned_value) if total_planned_value > 0 else 0.0
             
         except Exception as e:
             logger.error(f"Error calculating schedule performance index: {e}")
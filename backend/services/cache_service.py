@@ -3,7 +3,6 @@ Redis caching service for change management system performance optimization.
 Provides caching for frequently accessed change data, approval workflows, and templates.
 """
 
-import json
 import logging
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, timedelta
@@ -13,6 +12,7 @@ import redis
 from redis.exceptions import ConnectionError, RedisError
 
 from config.settings import settings
+from utils.json_codec import dumps, loads
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +56,10 @@ class CacheService:
         except (ConnectionError, RedisError):
             return False
     
-    def _serialize_value(self, value: Any) -> str:
+    def _serialize_value(self, value: Any) -> Union[str, bytes]:
         """Serialize value for Redis storage"""
         if isinstance(value, (dict, list)):
-            return json.dumps(value, default=str)
+            return dumps(value, default=str)
         elif isinstance(value, (UUID, datetime)):
             return str(value)
         else:
@@ -72,15 +72,15 @@ class CacheService:
         
         if value_type == "json":
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
+                return loads(value)
+            except ValueError:
                 return value
         elif value_type == "auto":
             # Try to detect JSON
             if value.startswith(("{", "[")):
                 try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
+                    return loads(value)
+                except ValueError:
                     pass
         
         return value
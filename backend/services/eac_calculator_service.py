@@ -10,6 +10,7 @@ from typing import Dict, List, Any, Optional
 from uuid import UUID, uuid4
 
 from .project_controls_base import ProjectControlsBaseService
+from .earned_value_engine import EarnedValueEngine, to_decimal
 from models.project_controls import (
     EACCalculationMethod, EACCalculationCreate, EACCalculationResponse,
     ValidationResult, CalculationResult, PerformanceIndices
@@ -36,12 +37,14 @@ class EACCalculatorService(ProjectControlsBaseService):
             EACCalculationMethod.bottom_up: 0.2
         }
 
-    async def calculate_current_performance_eac(self, project_id: UUID) -> CalculationResult:
+    async def calculate_current_performance_eac(self, project_id: UUID,
+                                              engine: Optional[EarnedValueEngine] = None) -> CalculationResult:
         """
         Calculate EAC using current performance: EAC = AC + (BAC - EV) / CPI
         
         Args:
             project_id: Project identifier
+            engine: Preloaded earned value data (loaded if None)
             
         Returns:
             CalculationResult with current performance EAC calculation
@@ -49,32 +52,24 @@ class EACCalculatorService(ProjectControlsBaseService):
         try:
             logger.info(f"Calculating current performance EAC for project {project_id}")
             
-            # Get financial data
-            financial_data = await self.get_financial_data(project_id)
+            # Get earned value data
+            evm = await self._get_earned_value_snapshot(project_id, engine)
             
-            budget_at_completion = financial_data['budget_at_completion']
-            earned_value = financial_data['earned_value']
-            actual_cost = financial_data['actual_cost']
-            planned_value = financial_data['planned_value']
+            budget_at_completion = evm['budget_at_completion']
+            earned_value = evm['earned_value']
+            actual_cost = evm['actual_cost']
             
-            # Calculate performance indices
-            performance_indices = self.calculate_performance_indices(
-                planned_value, earned_value, actual_cost, budget_at_completion
-            )
+            cpi = evm['cost_performance_index']
             
-            cpi = performance_indices['cost_performance_index']
-            
-            # Calculate EAC using current performance method
+            # EAC using current performance method
             # EAC = AC + (BAC - EV) / CPI
             remaining_budget = budget_at_completion - earned_value
+            eac = evm['estimate_at_completion']['current_performance']
             
             if cpi <= self.minimum_cpi_threshold:
-                # CPI too low, use remaining budget as ETC (conservative approach)
-                eac = actual_cost + remaining_budget
+                # CPI too low, remaining budget used as ETC (conservative approach)
                 confidence_level = 0.2  # Low confidence due to poor performance data
             else:
-                etc = remaining_budget / cpi
-                eac = actual_cost + etc
                 confidence_level = self._calculate_current_performance_confidence(
                     cpi, earned_value, budget_at_completion
                 )
@@ -130,12 +125,14 @@ class EACCalculatorService(ProjectControlsBaseService):
                 calculated_at=datetime.now()
             )
 
-    async def calculate_budget_performance_eac(self, project_id: UUID) -> CalculationResult:
+    async def calculate_budget_performance_eac(self, project_id: UUID,
+                                             engine: Optional[EarnedValueEngine] = None) -> CalculationResult:
         """
         Calculate EAC using budget performance: EAC = AC + (BAC - EV) / (CPI × SPI)
         
         Args:
             project_id: Project identifier
+            engine: Preloaded earned value data (loaded if None)
             
         Returns:
             CalculationResult with budget performance EAC calculation
@@ -143,34 +140,26 @@ class EACCalculatorService(ProjectControlsBaseService):
         try:
             logger.info(f"Calculating budget performance EAC for project {project_id}")
             
-            # Get financial data
-            financial_data = await self.get_financial_data(project_id)
-            
-            budget_at_completion = financial_data['budget_at_completion']
-            earned_value = financial_data['earned_value']
-            actual_cost = financial_data['actual_cost']
-            planned_value = financial_data['planned_value']
+            # Get earned value data
+            evm = await self._get_earned_value_snapshot(project_id, engine)
             
-            # Calculate performance indices
-            performance_indices = self.calculate_performance_indices(
-                planned_value, earned_value, actual_cost, budget_at_completion
-            )
+            budget_at_completion = evm['budget_at_completion']
+            earned_value = evm['earned_value']
+            actual_cost = evm['actual_cost']
             
-            cpi = performance_indices['cost_performance_index']
-            spi = performance_indices['schedule_performance_index']
+            cpi = evm['cost_performance_index']
+            spi = evm['schedule_performance_index']
             
-            # Calculate EAC using budget performance method
+            # EAC using budget performance method
             # EAC = AC + (BAC - EV) / (CPI × SPI)
             remaining_budget = budget_at_completion - earned_value
             combined_performance_index = cpi * spi
+            eac = evm['estimate_at_completion']['budget_performance']
             
             if combined_performance_index <= self.minimum_cpi_threshold:
-                # Combined performance too low, use conservative approach
-                eac = actual_cost + remaining_budget
+                # Combined performance too low, conservative approach
                 confidence_level = 0.2
             else:
-                etc = remaining_budget / combined_performance_index
-                eac = actual_cost + etc
                 confidence_level = self._calculate_budget_performance_confidence(
                     cpi, spi, earned_value, budget_at_completion
                 )
@@ -233,7 +222,8 @@ class EACCalculatorService(ProjectControlsBaseService):
     async def calculate_management_forecast_eac(self, project_id: UUID, 
                                               management_etc: Decimal,
                                               justification: Optional[str] = None,
-                                              user_id: Optional[UUID] = None) -> CalculationResult:
+                                              user_id: Optional[UUID] = None,
+                                              engine: Optional[EarnedValueEngine] = None) -> CalculationResult:
         """
         Calculate EAC using management forecast: EAC = AC + Management ETC
         
@@ -242,6 +232,7 @@ class EACCalculatorService(ProjectControlsBaseService):
             management_etc: Management's estimate to complete
             justification: Justification for management estimate
             user_id: User providing the estimate
+            engine: Preloaded earned value data (loaded if None)
             
         Returns:
             CalculationResult with management forecast EAC calculation
@@ -250,7 +241,7 @@ class EACCalculatorService(ProjectControlsBaseService):
             logger.info(f"Calculating management forecast EAC for project {project_id}")
             
             # Get financial data
-            financial_data = await self.get_financial_data(project_id)
+            financial_data = await self.get_financial_data(project_id, engine)
             
             budget_at_completion = financial_data['budget_at_completion']
             actual_cost = financial_data['actual_cost']
@@ -321,13 +312,15 @@ class EACCalculatorService(ProjectControlsBaseService):
             )
 
     async def calculate_bottom_up_eac(self, project_id: UUID, 
-                                    work_package_ids: Optional[List[UUID]] = None) -> CalculationResult:
+                                    work_package_ids: Optional[List[UUID]] = None,
+                                    engine: Optional[EarnedValueEngine] = None) -> CalculationResult:
         """
         Calculate EAC using bottom-up estimates: EAC = AC + Sum of remaining work estimates
         
         Args:
             project_id: Project identifier
             work_package_ids: Specific work packages to include (optional)
+            engine: Preloaded earned value data (loaded if None)
             
         Returns:
             CalculationResult with bottom-up EAC calculation
@@ -335,17 +328,16 @@ class EACCalculatorService(ProjectControlsBaseService):
         try:
             logger.info(f"Calculating bottom-up EAC for project {project_id}")
             
-            # Get financial data
-            financial_data = await self.get_financial_data(project_id)
+            # Get financial data and work packages
+            engine = engine or await self.load_earned_value_engine([project_id])
+            financial_data = await self.get_financial_data(project_id, engine)
             actual_cost = financial_data['actual_cost']
             budget_at_completion = financial_data['budget_at_completion']
             
-            # Get work packages
-            work_packages = await self.get_work_packages(project_id)
-            
-            if work_package_ids:
-                work_packages = [wp for wp in work_packages 
-                               if wp['id'] in [str(wp_id) for wp_id in work_package_ids]]
+            positions = engine.element_positions(
+                str(project_id), [str(wp_id) for wp_id in work_package_ids] if work_package_ids else None
+            )
+            work_packages = [engine.elements[i] for i in positions]
             
             if not work_packages:
                 return CalculationResult(
@@ -361,35 +353,9 @@ class EACCalculatorService(ProjectControlsBaseService):
                     calculated_at=datetime.now()
                 )
             
-            # Calculate bottom-up ETC
-            total_etc = Decimal('0')
-            completed_packages = 0
-            
-            for wp in work_packages:
-                budget = Decimal(str(wp.get('budget', 0)))
-                percent_complete = Decimal(str(wp.get('percent_complete', 0))) / 100
-                wp_actual_cost = Decimal(str(wp.get('actual_cost', 0)))
-                
-                if percent_complete >= 1.0:
-                    # Package is complete, no remaining cost
-                    completed_packages += 1
-                    continue
-                
-                # Calculate remaining work for this package
-                remaining_budget = budget * (1 - percent_complete)
-                
-                # Performance-based adjustment if we have actual cost data
-                if wp_actual_cost > 0 and percent_complete > 0:
-                    # Calculate work package CPI
-                    earned_value = budget * percent_complete
-                    wp_cpi = earned_value / wp_actual_cost if wp_actual_cost > 0 else Decimal('1.0')
-                    
-                    # Adjust remaining work based on performance
-                    remaining_work_adjusted = remaining_budget / wp_cpi if wp_cpi > 0 else remaining_budget
-                    total_etc += remaining_work_adjusted
-                else:
-                    # Use remaining budget if no performance data
-                    total_etc += remaining_budget
+            # Bottom-up ETC: remaining budget per package, adjusted by its own CPI
+            total_etc = to_decimal(engine.element_estimate_to_complete(positions).sum())
+            completed_packages = int((engine.percent_complete[positions] >= 1.0).sum())
             
             # Calculate EAC = AC + ETC
             eac = actual_cost + total_etc
@@ -466,27 +432,32 @@ class EACCalculatorService(ProjectControlsBaseService):
         try:
             logger.info(f"Comparing EAC methods for project {project_id}")
             
+            # Load earned value data once for all methods
+            engine = await self.load_earned_value_engine([project_id])
+            
             # Calculate EAC using all methods
             calculations = {}
             
             # Current performance method
-            current_perf_result = await self.calculate_current_performance_eac(project_id)
+            current_perf_result = await self.calculate_current_performance_eac(project_id, engine)
             if current_perf_result.validation_result.is_valid:
                 calculations['current_performance'] = current_perf_result
             
             # Budget performance method
-            budget_perf_result = await self.calculate_budget_performance_eac(project_id)
+            budget_perf_result = await self.calculate_budget_performance_eac(project_id, engine)
             if budget_perf_result.validation_result.is_valid:
                 calculations['budget_performance'] = budget_perf_result
             
             # Management forecast method (if ETC provided)
             if management_etc is not None:
-                mgmt_result = await self.calculate_management_forecast_eac(project_id, management_etc)
+                mgmt_result = await self.calculate_management_forecast_eac(
+                    project_id, management_etc, engine=engine
+                )
                 if mgmt_result.validation_result.is_valid:
                     calculations['management_forecast'] = mgmt_result
             
             # Bottom-up method
-            bottom_up_result = await self.calculate_bottom_up_eac(project_id)
+            bottom_up_result = await self.calculate_bottom_up_eac(project_id, engine=engine)
             if bottom_up_result.validation_result.is_valid:
                 calculations['bottom_up'] = bottom_up_result
             
@@ -581,6 +552,12 @@ class EACCalculatorService(ProjectControlsBaseService):
         else:
             raise ValueError(f"Unknown EAC calculation method: {method}")
 
+    async def _get_earned_value_snapshot(self, project_id: UUID,
+                                         engine: Optional[EarnedValueEngine] = None) -> Dict[str, Any]:
+        """Current earned value metrics and all EAC/ETC methods of a project as decimals"""
+        engine = engine or await self.load_earned_value_engine([project_id])
+        return engine.compute().snapshot(engine.group_position(str(project_id)))
+
     # Helper methods for confidence calculations
     
     def _calculate_current_performance_confidence(self, cpi: Decimal, earned_value: Decimal, 
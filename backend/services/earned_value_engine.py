@@ -0,0 +1,432 @@
+"""
+Earned Value Engine
+
+Shared earned value computation for schedules, project controls and portfolio
+dashboards:
+- Loads time-phased baseline elements (tasks or work packages), progress and
+  actuals once into arrays
+- Computes PV/EV/AC, CPI/SPI/TCPI and every EAC/ETC method for all projects
+  and all status dates in one vectorized pass
+- Progress is only known as of now, so earned value (and everything derived
+  from it) is only reported at the latest status date; earlier periods of a
+  trend carry planned value and dated actual cost only
+- Converts to exact decimals (ROUND_HALF_UP) only at output
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MONEY_PLACES = 2
+INDEX_PLACES = 4
+
+# Extra decimal places kept before rounding, so float summation error on
+# decimal inputs (e.g. 0.395 summed to 0.39499999) does not flip ROUND_HALF_UP
+GUARD_PLACES = 4
+
+
+def to_decimal(value: Union[float, np.floating], places: int = MONEY_PLACES) -> Decimal:
+    """Round a computed value to an exact decimal with ROUND_HALF_UP"""
+    guarded = Decimal(repr(round(float(value), places + GUARD_PLACES)))
+    return guarded.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+def _to_day(value: Union[str, date, None]) -> np.datetime64:
+    if value is None:
+        return np.datetime64("NaT", "D")
+    if isinstance(value, str):
+        value = value[:10]
+    return np.datetime64(value, "D")
+
+
+@dataclass
+class EarnedValueMetrics:
+    """
+    Earned value metrics per group (project/schedule) and status date, shape
+    (groups, periods). Metrics not known at a status date are NaN.
+    """
+    group_ids: List[str]
+    status_dates: List[date]
+    budget_at_completion: np.ndarray
+    planned_value: np.ndarray
+    earned_value: np.ndarray
+    actual_cost: np.ndarray
+    schedule_variance: np.ndarray
+    cost_variance: np.ndarray
+    schedule_performance_index: np.ndarray
+    cost_performance_index: np.ndarray
+    to_complete_performance_index: np.ndarray
+    estimate_at_completion: Dict[str, np.ndarray]
+    estimate_to_complete: Dict[str, np.ndarray]
+
+    def snapshot(self, group: int = 0, period: int = -1) -> Dict[str, Any]:
+        """Decimal metrics of one group at one status date"""
+        def money(values: np.ndarray) -> Optional[Decimal]:
+            value = values[group, period]
+            return None if np.isnan(value) else to_decimal(value)
+
+        def index(values: np.ndarray) -> Optional[Decimal]:
+            value = values[group, period]
+            return None if np.isnan(value) else to_decimal(value, INDEX_PLACES)
+
+        bac = to_decimal(self.budget_at_completion[group])
+        eac = {method: money(values) for method, values in self.estimate_at_completion.items()}
+        return {
+            "status_date": self.status_dates[period],
+            "budget_at_completion": bac,
+            "planned_value": money(self.planned_value),
+            "earned_value": money(self.earned_value),
+            "actual_cost": money(self.actual_cost),
+            "schedule_variance": money(self.schedule_variance),
+            "cost_variance": money(self.cost_variance),
+            "schedule_performance_index": index(self.schedule_performance_index),
+            "cost_performance_index": index(self.cost_performance_index),
+            "to_complete_performance_index": index(self.to_complete_performance_index),
+            "estimate_at_completion": eac,
+            "estimate_to_complete": {
+                method: money(values) for method, values in self.estimate_to_complete.items()
+            },
+            "variance_at_completion": {
+                method: None if value is None else bac - value for method, value in eac.items()
+            }
+        }
+
+    def period_series(self, group: int = 0) -> List[Dict[str, Any]]:
+        """Per status date metrics of one group as floats (None if not known), for trend charts"""
+        def number(value: Optional[Decimal]) -> Optional[float]:
+            return None if value is None else float(value)
+
+        series = []
+        for period, status_date in enumerate(self.status_dates):
+            snapshot = self.snapshot(group, period)
+            series.append({
+                "status_date": status_date.isoformat(),
+                **{
+                    key: number(value) for key, value in snapshot.items()
+                    if key != "status_date" and not isinstance(value, dict)
+                },
+                "estimate_at_completion": {
+                    method: number(value) for method, value in snapshot["estimate_at_completion"].items()
+                },
+                "estimate_to_complete": {
+                    method: number(value) for method, value in snapshot["estimate_to_complete"].items()
+                }
+            })
+        return series
+
+
+class EarnedValueEngine:
+    """
+    Time-phased earned value data of one or more projects/schedules.
+
+    Each baseline element (task or work package) has a budget spread linearly
+    over its planned start and end dates, a percent complete and an actual
+    cost. Use for_tasks() for schedule baselines and for_work_packages() for
+    project controls.
+    """
+
+    def __init__(
+        self,
+        element_ids: Sequence[str],
+        element_groups: Sequence[str],
+        budgets: Sequence[float],
+        start_dates: Sequence[Union[str, date, None]],
+        end_dates: Sequence[Union[str, date, None]],
+        percent_complete: Sequence[float],
+        actual_costs: Sequence[float],
+        earned_values: Optional[Sequence[float]] = None,
+        group_ids: Optional[Sequence[str]] = None,
+        group_budgets: Optional[Sequence[float]] = None,
+        cost_records: Optional[Iterable[Dict[str, Any]]] = None,
+        empty_index: float = 1.0,
+        minimum_index: float = 0.1,
+        elements: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            element_ids: Baseline element IDs
+            element_groups: Project/schedule ID of each element
+            budgets: Budget at completion of each element
+            start_dates: Baseline start of each element
+            end_dates: Baseline end of each element
+            percent_complete: Completion of each element (0-1)
+            actual_costs: Actual cost of each element
+            earned_values: Recorded earned value of each element (budget x
+                percent complete if None)
+            group_ids: All groups, including those without elements
+            group_budgets: Budget at completion per group; element PV is scaled
+                to it (sum of element budgets if None)
+            cost_records: Dated actual costs ({"group_id", "date", "amount"});
+                group actual cost is their cumulative sum at each status date
+                (sum of element actual costs if None)
+            empty_index: CPI/SPI reported when AC/PV is zero
+            minimum_index: CPI (or CPI x SPI) at or below which EAC falls back
+                to the remaining budget
+            elements: Source rows, kept for callers that need other columns
+        """
+        self.element_ids = [str(element_id) for element_id in element_ids]
+        self.group_ids = [str(g) for g in group_ids] if group_ids is not None else \
+            list(dict.fromkeys(str(g) for g in element_groups))
+        self._group_position = {group_id: i for i, group_id in enumerate(self.group_ids)}
+        self.group_index = np.array(
+            [self._group_position[str(g)] for g in element_groups], dtype=np.int64
+        )
+        self.n_groups = len(self.group_ids)
+
+        self.budgets = np.asarray(budgets, dtype=float).reshape(-1)
+        self.start_dates = np.array([_to_day(d) for d in start_dates], dtype="datetime64[D]")
+        self.end_dates = np.array([_to_day(d) for d in end_dates], dtype="datetime64[D]")
+        self.percent_complete = np.clip(np.asarray(percent_complete, dtype=float).reshape(-1), 0.0, 1.0)
+        self.actual_costs = np.asarray(actual_costs, dtype=float).reshape(-1)
+        self.earned_values = self.budgets * self.percent_complete if earned_values is None else \
+            np.asarray(earned_values, dtype=float).reshape(-1)
+
+        self.element_budget_totals = self._group_sum(self.budgets)
+        self.group_budgets = self.element_budget_totals if group_budgets is None else \
+            np.asarray(group_budgets, dtype=float).reshape(-1)
+
+        self.cost_records = None
+        if cost_records is not None:
+            records = [r for r in cost_records if str(r["group_id"]) in self._group_position]
+            self.cost_records = (
+                np.array([self._group_position[str(r["group_id"])] for r in records], dtype=np.int64),
+                np.array([_to_day(r.get("date")) for r in records], dtype="datetime64[D]"),
+                np.array([float(r.get("amount") or 0) for r in records], dtype=float)
+            )
+
+        self.empty_index = empty_index
+        self.minimum_index = minimum_index
+        self.elements = elements or []
+
+    @classmethod
+    def for_tasks(
+        cls,
+        baseline_tasks: List[Dict[str, Any]],
+        current_tasks: List[Dict[str, Any]],
+        schedule_id: str = "schedule",
+        default_effort: float = 0.0
+    ) -> "EarnedValueEngine":
+        """
+        Schedule baseline: baseline effort phased over baseline dates, current
+        progress and actual effort hours. Only tasks still in the schedule count.
+        """
+        current = {task["id"]: task for task in current_tasks}
+        matched = [(b, current[b["id"]]) for b in baseline_tasks if b["id"] in current]
+        return cls(
+            element_ids=[b["id"] for b, _ in matched],
+            element_groups=[schedule_id] * len(matched),
+            budgets=[b.get("planned_effort_hours", default_effort) or default_effort for b, _ in matched],
+            start_dates=[b["planned_start_date"] for b, _ in matched],
+            end_dates=[b["planned_end_date"] for b, _ in matched],
+            percent_complete=[(c.get("progress_percentage", 0) or 0) / 100 for _, c in matched],
+            actual_costs=[c.get("actual_effort_hours", 0) or 0 for _, c in matched],
+            group_ids=[schedule_id],
+            empty_index=0.0,
+            elements=[c for _, c in matched]
+        )
+
+    @classmethod
+    def for_work_packages(
+        cls,
+        projects: List[Dict[str, Any]],
+        work_packages: List[Dict[str, Any]],
+        cost_records: Optional[List[Dict[str, Any]]] = None,
+        minimum_index: float = 0.1
+    ) -> "EarnedValueEngine":
+        """
+        Project controls: work package budgets phased over their dates, the
+        project budget as BAC and financial tracking records as actual cost.
+        """
+        project_ids = [str(p["id"]) for p in projects]
+        known = set(project_ids)
+        packages = [wp for wp in work_packages if str(wp["project_id"]) in known]
+        return cls(
+            element_ids=[wp["id"] for wp in packages],
+            element_groups=[wp["project_id"] for wp in packages],
+            budgets=[float(wp.get("budget", 0) or 0) for wp in packages],
+            start_dates=[wp.get("start_date") for wp in packages],
+            end_dates=[wp.get("end_date") for wp in packages],
+            percent_complete=[float(wp.get("percent_complete", 0) or 0) / 100 for wp in packages],
+            actual_costs=[float(wp.get("actual_cost", 0) or 0) for wp in packages],
+            earned_values=[float(wp.get("earned_value", 0) or 0) for wp in packages],
+            group_ids=project_ids,
+            group_budgets=[float(p.get("budget", 0) or 0) for p in projects],
+            cost_records=[
+                {"group_id": r["project_id"], "date": r.get("date_incurred"), "amount": r.get("actual_amount")}
+                for r in cost_records
+            ] if cost_records is not None else None,
+            minimum_index=minimum_index,
+            elements=packages
+        )
+
+    def group_position(self, group_id: str) -> int:
+        return self._group_position[str(group_id)]
+
+    def element_positions(self, group_id: str, element_ids: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Element indices of a group, optionally restricted to the given IDs"""
+        mask = self.group_index == self.group_position(group_id)
+        if element_ids is not None:
+            wanted = {str(e) for e in element_ids}
+            mask &= np.array([e in wanted for e in self.element_ids], dtype=bool)
+        return np.flatnonzero(mask)
+
+    def planned_fraction(self, status_dates: Sequence[date]) -> np.ndarray:
+        """Share of each element's budget planned by each status date, shape (elements, periods)"""
+        days = np.array([_to_day(d) for d in status_dates], dtype="datetime64[D]")
+        start = self.start_dates[:, None]
+        duration = np.maximum((self.end_dates - self.start_dates).astype(np.int64) + 1, 1)[:, None]
+        elapsed = (days[None, :] - start).astype(np.int64) + 1
+        fraction = np.clip(elapsed / duration, 0.0, 1.0)
+        # Elements without dates are planned from the start
+        return np.where(np.isnat(start) | np.isnat(self.end_dates[:, None]), 1.0, fraction)
+
+    def element_estimate_to_complete(self, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Bottom-up ETC per element: remaining budget, adjusted by the element's
+        own CPI when it has progress and actual cost; zero once complete.
+        """
+        if positions is None:
+            positions = slice(None)
+        budget = self.budgets[positions]
+        percent = self.percent_complete[positions]
+        actual = self.actual_costs[positions]
+        remaining = budget * (1 - percent)
+        earned = budget * percent
+        adjusted = (actual > 0) & (percent > 0) & (earned > 0)
+        etc = np.where(adjusted, remaining * actual / np.where(adjusted, earned, 1.0), remaining)
+        return np.where(percent >= 1.0, 0.0, etc)
+
+    def element_metrics(self, status_date: Optional[date] = None) -> Dict[str, np.ndarray]:
+        """PV/EV/AC, variances and indices per element at one status date"""
+        status_date = status_date or date.today()
+        planned = self.budgets * self.planned_fraction([status_date])[:, 0]
+        earned = self.earned_values
+        actual = self.actual_costs
+        return {
+            "planned_value": planned,
+            "earned_value": earned,
+            "actual_cost": actual,
+            "schedule_variance": earned - planned,
+            "cost_variance": earned - actual,
+            "schedule_performance_index": self._ratio(earned, planned),
+            "cost_performance_index": self._ratio(earned, actual)
+        }
+
+    def compute(self, status_dates: Optional[Sequence[date]] = None) -> EarnedValueMetrics:
+        """
+        Compute all metrics for every group and status date.
+
+        Element progress (and element actual cost, without dated cost
+        records) is the current state, not a history, so it is taken as of
+        the latest status date. At earlier status dates EV, AC from elements
+        and every metric derived from them are NaN.
+
+        Args:
+            status_dates: Status dates, e.g. period ends (today if None)
+
+        Returns:
+            EarnedValueMetrics with arrays of shape (groups, periods)
+        """
+        current = status_dates is None
+        status_dates = [date.today()] if current else list(status_dates)
+        days = np.array([_to_day(d) for d in status_dates], dtype="datetime64[D]")
+        latest = (days == days.max())[None, :]
+
+        bac = self.group_budgets[:, None]
+
+        planned = self._group_sum(self.budgets[:, None] * self.planned_fraction(status_dates))
+        totals = self.element_budget_totals[:, None]
+        has_elements = totals > 0
+        planned = np.where(
+            has_elements, planned * bac / np.where(has_elements, totals, 1.0), bac
+        )
+
+        earned = np.where(latest, self._group_sum(self.earned_values)[:, None], np.nan)
+        actual = self._actual_cost(status_dates, current)
+        if self.cost_records is None:
+            actual = np.where(latest, actual, np.nan)
+
+        cpi = self._ratio(earned, actual)
+        spi = self._ratio(earned, planned)
+        remaining = bac - earned
+        remaining_cost = bac - actual
+        tcpi = np.where(
+            remaining_cost > 0, remaining / np.where(remaining_cost > 0, remaining_cost, 1.0), 1.0
+        )
+
+        # NaN earned value or actual cost is compared as not positive, so mask explicitly
+        cpi, spi, tcpi = (np.where(latest, values, np.nan) for values in (cpi, spi, tcpi))
+
+        etc_performance = self._performance_etc(remaining, cpi)
+        etc_bottom_up = np.where(
+            latest, self._group_sum(self.element_estimate_to_complete())[:, None], np.nan
+        )
+
+        return EarnedValueMetrics(
+            group_ids=self.group_ids,
+            status_dates=status_dates,
+            budget_at_completion=self.group_budgets,
+            planned_value=planned,
+            earned_value=earned,
+            actual_cost=actual,
+            schedule_variance=earned - planned,
+            cost_variance=earned - actual,
+            schedule_performance_index=spi,
+            cost_performance_index=cpi,
+            to_complete_performance_index=tcpi,
+            estimate_at_completion={
+                "current_performance": actual + etc_performance,
+                "budget_performance": actual + self._performance_etc(remaining, cpi * spi),
+                "bottom_up": actual + etc_bottom_up
+            },
+            estimate_to_complete={
+                "performance_based": etc_performance,
+                "bottom_up": etc_bottom_up
+            }
+        )
+
+    def _performance_etc(self, remaining: np.ndarray, index: np.ndarray) -> np.ndarray:
+        usable = index > self.minimum_index
+        etc = np.where(usable, remaining / np.where(usable, index, 1.0), remaining)
+        return np.where(np.isnan(index), np.nan, etc)
+
+    def _ratio(self, numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        positive = denominator > 0
+        return np.where(positive, numerator / np.where(positive, denominator, 1.0), self.empty_index)
+
+    def _group_sum(self, values: np.ndarray) -> np.ndarray:
+        totals = np.zeros((self.n_groups,) + values.shape[1:])
+        np.add.at(totals, self.group_index, values)
+        return totals
+
+    def _actual_cost(self, status_dates: List[date], current: bool) -> np.ndarray:
+        n_periods = len(status_dates)
+        if self.cost_records is None:
+            return np.repeat(self._group_sum(self.actual_costs)[:, None], n_periods, axis=1)
+
+        groups, dates, amounts = self.cost_records
+        if current:
+            totals = np.zeros(self.n_groups)
+            np.add.at(totals, groups, amounts)
+            return totals[:, None]
+
+        # Bucket each record into the first status date on or after it, then accumulate
+        days = np.array([_to_day(d) for d in status_dates], dtype="datetime64[D]")
+        order = np.argsort(days)
+        bucket = np.searchsorted(days[order], dates, side="left")
+        undated = np.isnat(dates)
+        bucket[undated] = 0
+        in_range = bucket < n_periods
+
+        incurred = np.zeros((self.n_groups, n_periods))
+        np.add.at(incurred, (groups[in_range], order[bucket[in_range]]), amounts[in_range])
+        cumulative = np.cumsum(incurred[:, order], axis=1)
+        actual = np.empty_like(cumulative)
+        actual[:, order] = cumulative
+        return actual
@@ -4,13 +4,17 @@ Coordinates AI insight generation, Monte Carlo analysis, and RAG-powered executi
 """
 
 import os
+import asyncio
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 from uuid import UUID, uuid4
 from supabase import Client
 
+import numpy as np
+
 # Import models
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -23,16 +27,61 @@ from models.pmr import (
 # Import services
 from services.ai_insights_engine import AIInsightsEngine
 from services.help_rag_agent import HelpRAGAgent, PageContext
+from services.pmr_stage_dag import PMRStageDAG
+from monte_carlo.vectorized_sampling import create_generator, order_statistics
 
 logger = logging.getLogger(__name__)
 
 
+# Worker processes for CPU-bound simulation; 0 runs simulations inline
+SIMULATION_WORKERS = int(os.getenv("PMR_SIMULATION_WORKERS", "2"))
+_simulation_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_simulation_pool() -> Optional[ProcessPoolExecutor]:
+    """Get or create the shared simulation process pool"""
+    global _simulation_pool
+    if _simulation_pool is None and SIMULATION_WORKERS > 0:
+        _simulation_pool = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS)
+    return _simulation_pool
+
+
+def _budget_completion_percentiles(
+    project_data: Dict[str, Any],
+    iterations: int,
+    random_seed: Optional[int] = None
+) -> List[float]:
+    """P50/P80/P95 budget completion ratios (15% standard deviation)"""
+    current_budget = project_data.get("current_budget", 1000000)
+    actual_cost = project_data.get("actual_cost", 800000)
+    
+    generator = create_generator(random_seed)
+    variance_factors = generator.normal(0, 0.15, iterations)
+    if current_budget > 0:
+        results = (actual_cost / current_budget) * (1 + variance_factors)
+    else:
+        results = np.ones(iterations)
+    
+    return order_statistics(results, [0.50, 0.80, 0.95]).tolist()
+
+
+def _schedule_variance_percentiles(iterations: int, random_seed: Optional[int] = None) -> List[float]:
+    """P50/P80/P95 schedule variance in days (15 days standard deviation)"""
+    generator = create_generator(random_seed)
+    days_variance = generator.normal(0, 15, iterations)
+    return order_statistics(days_variance, [0.50, 0.80, 0.95]).tolist()
+
+
 class EnhancedPMRService:
     """
     Main orchestration service for Enhanced PMR generation
     Integrates AI insights, Monte Carlo analysis, and RAG-powered content generation
     """
     
+    EXECUTIVE_SUMMARY_FALLBACK = (
+        "Executive summary generation failed. Please review the detailed sections below."
+    )
+    
     def __init__(self, supabase_client: Client, openai_api_key: str):
         """Initialize Enhanced PMR Service with dependencies"""
         self.supabase = supabase_client
@@ -62,15 +111,19 @@ class EnhancedPMRService:
             EnhancedPMRReport with AI insights, Monte Carlo analysis, and executive summary
         """
         start_time = datetime.utcnow()
+        # Sections run as a dependency graph: insights, Monte Carlo and metrics
+        # only need the base report, the executive summary needs all of them
+        report: Optional[EnhancedPMRReport] = None
         
         try:
             logger.info(f"Starting Enhanced PMR generation for project {request.project_id}")
             
-            # Step 1: Create base PMR report structure
-            report = await self._create_base_report(request, user_id)
+            async def create_base(results: Dict[str, Any]) -> EnhancedPMRReport:
+                nonlocal report
+                report = await self._create_base_report(request, user_id)
+                return report
             
-            # Step 2: Generate AI insights if enabled
-            if request.include_ai_insights:
+            async def generate_insights(results: Dict[str, Any]) -> List:
                 logger.info("Generating AI insights...")
                 ai_insights = await self._generate_ai_insights(
                     report_id=report.id,
@@ -80,9 +133,9 @@ class EnhancedPMRService:
                 for insight in ai_insights:
                     report.add_ai_insight(insight)
                 logger.info(f"Generated {len(ai_insights)} AI insights")
+                return ai_insights
             
-            # Step 3: Run Monte Carlo analysis if enabled
-            if request.include_monte_carlo:
+            async def run_monte_carlo(results: Dict[str, Any]) -> MonteCarloResults:
                 logger.info("Running Monte Carlo analysis...")
                 monte_carlo_results = await self._run_monte_carlo_analysis(
                     project_id=request.project_id,
@@ -92,35 +145,73 @@ class EnhancedPMRService:
                 report.monte_carlo_analysis = monte_carlo_results
                 report.monte_carlo_enabled = True
                 logger.info("Monte Carlo analysis completed")
+                return monte_carlo_results
             
-            # Step 4: Generate executive summary using RAG agent
-            logger.info("Generating executive summary...")
-            executive_summary = await self._generate_executive_summary(
-                report=report,
-                project_id=request.project_id
-            )
-            report.ai_generated_summary = executive_summary
-            report.executive_summary = executive_summary
-            
-            # Step 5: Collect real-time metrics if enabled
-            if request.enable_real_time_metrics:
+            async def collect_metrics(results: Dict[str, Any]) -> RealTimeMetrics:
                 logger.info("Collecting real-time metrics...")
                 real_time_metrics = await self._collect_real_time_metrics(
                     project_id=request.project_id
                 )
                 report.update_real_time_metrics(real_time_metrics)
                 report.metrics_refresh_interval_seconds = request.metrics_refresh_interval_seconds
+                return real_time_metrics
+            
+            async def generate_summary(results: Dict[str, Any]) -> str:
+                logger.info("Generating executive summary...")
+                executive_summary = await self._generate_executive_summary(
+                    report=report,
+                    project_id=request.project_id
+                )
+                report.ai_generated_summary = executive_summary
+                report.executive_summary = executive_summary
+                return executive_summary
+            
+            async def on_section_complete(section: str, result: Any, duration: float) -> None:
+                await self._persist_section(report, section)
+                await self._publish_section_event(report.id, {
+                    "type": "section_ready",
+                    "report_id": str(report.id),
+                    "section": section,
+                    "duration_ms": round(duration * 1000, 1),
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+            
+            dag = PMRStageDAG(on_stage_complete=on_section_complete)
+            dag.add_stage("base_report", create_base)
+            
+            summary_dependencies = ["base_report"]
+            if request.include_ai_insights:
+                dag.add_stage("ai_insights", generate_insights, depends_on=["base_report"])
+                summary_dependencies.append("ai_insights")
+            if request.include_monte_carlo:
+                dag.add_stage("monte_carlo", run_monte_carlo, depends_on=["base_report"])
+                summary_dependencies.append("monte_carlo")
+            if request.enable_real_time_metrics:
+                dag.add_stage("real_time_metrics", collect_metrics, depends_on=["base_report"])
+                summary_dependencies.append("real_time_metrics")
+            dag.add_stage("executive_summary", generate_summary, depends_on=summary_dependencies)
+            
+            dag_result = await dag.run()
             
-            # Step 6: Calculate performance metrics
+            # Calculate performance metrics
             generation_time = (datetime.utcnow() - start_time).total_seconds()
             report.generation_time_seconds = Decimal(str(round(generation_time, 2)))
             
-            # Step 7: Set report status
+            # Set report status and persist the final fields
             report.status = PMRStatus.draft
             report.last_modified = datetime.utcnow()
-            
-            # Step 8: Store report in database
-            await self._store_report(report)
+            await self._persist_section(report, "finalize")
+            
+            await self._publish_section_event(report.id, {
+                "type": "report_ready",
+                "report_id": str(report.id),
+                "generation_time_seconds": round(generation_time, 2),
+                "section_durations_ms": {
+                    name: round(timing.duration * 1000, 1)
+                    for name, timing in dag_result.timings.items()
+                },
+                "timestamp": datetime.utcnow().isoformat()
+            })
             
             logger.info(
                 f"Enhanced PMR generation completed in {generation_time:.2f}s "
@@ -131,6 +222,8 @@ class EnhancedPMRService:
             
         except Exception as e:
             logger.error(f"Failed to generate Enhanced PMR: {e}")
+            if report is not None:
+                await self._discard_report(report)
             raise
     
     async def _create_base_report(
@@ -221,7 +314,8 @@ class EnhancedPMRService:
         self,
         project_id: UUID,
         iterations: int = 1000,
-        confidence_levels: List[Decimal] = None
+        confidence_levels: List[Decimal] = None,
+        random_seed: Optional[int] = None
     ) -> MonteCarloResults:
         """
         Run Monte Carlo analysis for predictive analytics
@@ -243,24 +337,26 @@ class EnhancedPMRService:
                 config = SimulationConfig(
                     num_iterations=iterations,
                     confidence_levels=[float(cl) for cl in confidence_levels],
-                    random_seed=None  # Use random seed for variability
+                    random_seed=random_seed
                 )
                 
                 # Initialize engine
                 engine = MonteCarloEngine(config)
                 
-                # Run budget variance simulation
-                budget_results = await self._run_budget_simulation(
-                    engine=engine,
-                    project_data=project_data,
-                    iterations=iterations
-                )
-                
-                # Run schedule variance simulation
-                schedule_results = await self._run_schedule_simulation(
-                    engine=engine,
-                    project_data=project_data,
-                    iterations=iterations
+                # Run budget and schedule variance simulations concurrently
+                budget_results, schedule_results = await asyncio.gather(
+                    self._run_budget_simulation(
+                        engine=engine,
+                        project_data=project_data,
+                        iterations=iterations,
+                        random_seed=random_seed
+                    ),
+                    self._run_schedule_simulation(
+                        engine=engine,
+                        project_data=project_data,
+                        iterations=iterations,
+                        random_seed=random_seed
+                    )
                 )
                 
                 # Compile results
@@ -300,7 +396,8 @@ class EnhancedPMRService:
                 return await self._run_simplified_monte_carlo(
                     project_id=project_id,
                     iterations=iterations,
-                    confidence_levels=confidence_levels
+                    confidence_levels=confidence_levels,
+                    random_seed=random_seed
                 )
             
         except Exception as e:
@@ -342,7 +439,8 @@ class EnhancedPMRService:
             # Use the configured model from the RAG agent
             import os
             model = os.getenv("OPENAI_MODEL", "gpt-4")
-            response = self.rag_agent.openai_client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.rag_agent.openai_client.chat.completions.create,
                 model=model,
                 messages=[
                     {
@@ -375,7 +473,7 @@ class EnhancedPMRService:
             
         except Exception as e:
             logger.error(f"Failed to generate executive summary: {e}")
-            return "Executive summary generation failed. Please review the detailed sections below."
+            return self.EXECUTIVE_SUMMARY_FALLBACK
     
     async def _collect_real_time_metrics(
         self,
@@ -383,38 +481,38 @@ class EnhancedPMRService:
     ) -> RealTimeMetrics:
         """Collect real-time metrics for the project"""
         try:
-            # Get latest project metrics
-            metrics_response = self.supabase.table("project_metrics").select(
-                "*"
-            ).eq("project_id", str(project_id)).order(
-                "created_at", desc=True
-            ).limit(1).execute()
-            
-            # Get financial data
-            financial_response = self.supabase.table("financial_data").select(
-                "*"
-            ).eq("project_id", str(project_id)).order(
-                "period_start", desc=True
-            ).limit(1).execute()
-            
-            # Get schedule data
-            schedule_response = self.supabase.table("schedule_data").select(
-                "*"
-            ).eq("project_id", str(project_id)).order(
-                "created_at", desc=True
-            ).limit(1).execute()
-            
-            # Get risk data
-            risk_response = self.supabase.table("risks").select(
-                "*"
-            ).eq("project_id", str(project_id)).eq(
-                "status", "open"
-            ).execute()
-            
-            # Get milestone data
-            milestone_response = self.supabase.table("milestones").select(
-                "*"
-            ).eq("project_id", str(project_id)).execute()
+            # Latest metrics, financial, schedule, open risk and milestone data, fetched concurrently
+            (
+                metrics_response,
+                financial_response,
+                schedule_response,
+                risk_response,
+                milestone_response
+            ) = await asyncio.gather(
+                self._execute_query(self.supabase.table("project_metrics").select(
+                    "*"
+                ).eq("project_id", str(project_id)).order(
+                    "created_at", desc=True
+                ).limit(1)),
+                self._execute_query(self.supabase.table("financial_data").select(
+                    "*"
+                ).eq("project_id", str(project_id)).order(
+                    "period_start", desc=True
+                ).limit(1)),
+                self._execute_query(self.supabase.table("schedule_data").select(
+                    "*"
+                ).eq("project_id", str(project_id)).order(
+                    "created_at", desc=True
+                ).limit(1)),
+                self._execute_query(self.supabase.table("risks").select(
+                    "*"
+                ).eq("project_id", str(project_id)).eq(
+                    "status", "open"
+                )),
+                self._execute_query(self.supabase.table("milestones").select(
+                    "*"
+                ).eq("project_id", str(project_id)))
+            )
             
             # Calculate metrics
             budget_utilization = None
@@ -471,90 +569,10 @@ class EnhancedPMRService:
     async def _store_report(self, report: EnhancedPMRReport) -> None:
         """Store the generated report in the database"""
         try:
-            # Convert report to dict for storage
-            report_data = {
-                "id": str(report.id),
-                "project_id": str(report.project_id),
-                "report_month": report.report_month.isoformat(),
-                "report_year": report.report_year,
-                "template_id": str(report.template_id) if report.template_id else None,
-                "title": report.title,
-                "executive_summary": report.executive_summary,
-                "ai_generated_summary": report.ai_generated_summary,
-                "sections": report.sections,
-                "metrics": report.metrics,
-                "visualizations": report.visualizations,
-                "status": report.status.value,
-                "version": report.version,
-                "generated_by": str(report.generated_by),
-                "approved_by": str(report.approved_by) if report.approved_by else None,
-                "generated_at": report.generated_at.isoformat(),
-                "last_modified": report.last_modified.isoformat(),
-                "is_active": report.is_active,
-                "collaboration_enabled": report.collaboration_enabled,
-                "monte_carlo_enabled": report.monte_carlo_enabled,
-                "generation_time_seconds": float(report.generation_time_seconds) if report.generation_time_seconds else None,
-                "total_edits": report.total_edits,
-                "total_collaborators": report.total_collaborators,
-                "created_at": report.created_at.isoformat(),
-                "updated_at": report.updated_at.isoformat()
-            }
-            
-            # Store in database
-            self.supabase.table("enhanced_pmr_reports").insert(report_data).execute()
-            
-            # Store AI insights separately
-            if report.ai_insights:
-                for insight in report.ai_insights:
-                    insight_data = {
-                        "id": str(insight.id),
-                        "report_id": str(report.id),
-                        "insight_type": insight.insight_type.value,
-                        "category": insight.category.value,
-                        "title": insight.title,
-                        "content": insight.content,
-                        "confidence_score": float(insight.confidence_score),
-                        "supporting_data": insight.supporting_data,
-                        "predicted_impact": insight.predicted_impact,
-                        "recommended_actions": insight.recommended_actions,
-                        "priority": insight.priority.value,
-                        "validated": insight.validated,
-                        "validation_status": insight.validation_status.value,
-                        "generated_at": insight.generated_at.isoformat(),
-                        "created_at": insight.created_at.isoformat(),
-                        "updated_at": insight.updated_at.isoformat()
-                    }
-                    self.supabase.table("ai_insights").insert(insight_data).execute()
-            
-            # Store Monte Carlo results if present
-            if report.monte_carlo_analysis:
-                mc_data = {
-                    "report_id": str(report.id),
-                    "analysis_type": report.monte_carlo_analysis.analysis_type,
-                    "iterations": report.monte_carlo_analysis.iterations,
-                    "budget_completion": report.monte_carlo_analysis.budget_completion,
-                    "schedule_completion": report.monte_carlo_analysis.schedule_completion,
-                    "confidence_intervals": report.monte_carlo_analysis.confidence_intervals,
-                    "parameters_used": report.monte_carlo_analysis.parameters_used,
-                    "recommendations": report.monte_carlo_analysis.recommendations,
-                    "generated_at": report.monte_carlo_analysis.generated_at.isoformat()
-                }
-                self.supabase.table("monte_carlo_results").insert(mc_data).execute()
-            
-            # Store real-time metrics if present
-            if report.real_time_metrics:
-                metrics_data = {
-                    "report_id": str(report.id),
-                    "last_updated": report.real_time_metrics.last_updated.isoformat(),
-                    "budget_utilization": float(report.real_time_metrics.budget_utilization) if report.real_time_metrics.budget_utilization else None,
-                    "schedule_performance_index": float(report.real_time_metrics.schedule_performance_index) if report.real_time_metrics.schedule_performance_index else None,
-                    "cost_performance_index": float(report.real_time_metrics.cost_performance_index) if report.real_time_metrics.cost_performance_index else None,
-                    "risk_score": float(report.real_time_metrics.risk_score) if report.real_time_metrics.risk_score else None,
-                    "active_issues_count": report.real_time_metrics.active_issues_count,
-                    "completed_milestones": report.real_time_metrics.completed_milestones,
-                    "upcoming_milestones": report.real_time_metrics.upcoming_milestones
-                }
-                self.supabase.table("pmr_real_time_metrics").insert(metrics_data).execute()
+            await self._store_report_row(report)
+            await self._store_ai_insights(report)
+            await self._store_monte_carlo_results(report)
+            await self._store_real_time_metrics(report)
             
             logger.info(f"Report {report.id} stored successfully")
             
@@ -562,6 +580,173 @@ class EnhancedPMRService:
             logger.error(f"Failed to store report: {e}")
             raise
     
+    async def _persist_section(self, report: EnhancedPMRReport, section: str) -> None:
+        """Store a report section as soon as it has been generated"""
+        try:
+            if section == "base_report":
+                await self._store_report_row(report)
+            elif section == "ai_insights":
+                await self._store_ai_insights(report)
+            elif section == "monte_carlo":
+                await self._store_monte_carlo_results(report)
+            elif section == "real_time_metrics":
+                await self._store_real_time_metrics(report)
+            elif section == "executive_summary":
+                await self._update_report_row(report, {
+                    "executive_summary": report.executive_summary,
+                    "ai_generated_summary": report.ai_generated_summary
+                })
+            elif section == "finalize":
+                await self._update_report_row(report, {
+                    "status": report.status.value,
+                    "monte_carlo_enabled": report.monte_carlo_enabled,
+                    "generation_time_seconds": float(report.generation_time_seconds) if report.generation_time_seconds else None,
+                    "last_modified": report.last_modified.isoformat()
+                })
+            
+        except Exception as e:
+            logger.error(f"Failed to store report section {section}: {e}")
+            raise
+    
+    async def _discard_report(self, report: EnhancedPMRReport) -> None:
+        """
+        Delete the sections stored so far of a report whose generation failed,
+        so no partial report is left behind
+        """
+        try:
+            for table in ("ai_insights", "monte_carlo_results", "pmr_real_time_metrics"):
+                await self._execute_query(
+                    self.supabase.table(table).delete().eq("report_id", str(report.id))
+                )
+            await self._execute_query(
+                self.supabase.table("enhanced_pmr_reports").delete().eq("id", str(report.id))
+            )
+            logger.info(f"Discarded partially generated report {report.id}")
+        except Exception as e:
+            logger.error(f"Failed to discard partially generated report {report.id}: {e}")
+        
+        await self._publish_section_event(report.id, {
+            "type": "report_failed",
+            "report_id": str(report.id),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    
+    async def _publish_section_event(self, report_id: UUID, message: Dict[str, Any]) -> None:
+        """Announce report progress on the report's collaboration channel"""
+        try:
+            from services.websocket_manager import get_websocket_manager
+            await get_websocket_manager().broadcast_to_report(str(report_id), message)
+        except Exception as e:
+            logger.warning(f"Failed to publish {message.get('type')} event for report {report_id}: {e}")
+    
+    async def _execute_query(self, query: Any) -> Any:
+        """Execute a blocking Supabase query in a worker thread"""
+        return await asyncio.to_thread(query.execute)
+    
+    async def _store_report_row(self, report: EnhancedPMRReport) -> None:
+        """Insert the report row"""
+        report_data = {
+            "id": str(report.id),
+            "project_id": str(report.project_id),
+            "report_month": report.report_month.isoformat(),
+            "report_year": report.report_year,
+            "template_id": str(report.template_id) if report.template_id else None,
+            "title": report.title,
+            "executive_summary": report.executive_summary,
+            "ai_generated_summary": report.ai_generated_summary,
+            "sections": report.sections,
+            "metrics": report.metrics,
+            "visualizations": report.visualizations,
+            "status": report.status.value,
+            "version": report.version,
+            "generated_by": str(report.generated_by),
+            "approved_by": str(report.approved_by) if report.approved_by else None,
+            "generated_at": report.generated_at.isoformat(),
+            "last_modified": report.last_modified.isoformat(),
+            "is_active": report.is_active,
+            "collaboration_enabled": report.collaboration_enabled,
+            "monte_carlo_enabled": report.monte_carlo_enabled,
+            "generation_time_seconds": float(report.generation_time_seconds) if report.generation_time_seconds else None,
+            "total_edits": report.total_edits,
+            "total_collaborators": report.total_collaborators,
+            "created_at": report.created_at.isoformat(),
+            "updated_at": report.updated_at.isoformat()
+        }
+        await self._execute_query(
+            self.supabase.table("enhanced_pmr_reports").insert(report_data)
+        )
+    
+    async def _update_report_row(self, report: EnhancedPMRReport, fields: Dict[str, Any]) -> None:
+        """Update columns of an already stored report row"""
+        fields = {**fields, "updated_at": datetime.utcnow().isoformat()}
+        await self._execute_query(
+            self.supabase.table("enhanced_pmr_reports").update(fields).eq("id", str(report.id))
+        )
+    
+    async def _store_ai_insights(self, report: EnhancedPMRReport) -> None:
+        """Insert all AI insights of the report in one request"""
+        if not report.ai_insights:
+            return
+        
+        insight_rows = [
+            {
+                "id": str(insight.id),
+                "report_id": str(report.id),
+                "insight_type": insight.insight_type.value,
+                "category": insight.category.value,
+                "title": insight.title,
+                "content": insight.content,
+                "confidence_score": float(insight.confidence_score),
+                "supporting_data": insight.supporting_data,
+                "predicted_impact": insight.predicted_impact,
+                "recommended_actions": insight.recommended_actions,
+                "priority": insight.priority.value,
+                "validated": insight.validated,
+                "validation_status": insight.validation_status.value,
+                "generated_at": insight.generated_at.isoformat(),
+                "created_at": insight.created_at.isoformat(),
+                "updated_at": insight.updated_at.isoformat()
+            }
+            for insight in report.ai_insights
+        ]
+        await self._execute_query(self.supabase.table("ai_insights").insert(insight_rows))
+    
+    async def _store_monte_carlo_results(self, report: EnhancedPMRReport) -> None:
+        """Insert the Monte Carlo results of the report"""
+        if not report.monte_carlo_analysis:
+            return
+        
+        mc_data = {
+            "report_id": str(report.id),
+            "analysis_type": report.monte_carlo_analysis.analysis_type,
+            "iterations": report.monte_carlo_analysis.iterations,
+            "budget_completion": report.monte_carlo_analysis.budget_completion,
+            "schedule_completion": report.monte_carlo_analysis.schedule_completion,
+            "confidence_intervals": report.monte_carlo_analysis.confidence_intervals,
+            "parameters_used": report.monte_carlo_analysis.parameters_used,
+            "recommendations": report.monte_carlo_analysis.recommendations,
+            "generated_at": report.monte_carlo_analysis.generated_at.isoformat()
+        }
+        await self._execute_query(self.supabase.table("monte_carlo_results").insert(mc_data))
+    
+    async def _store_real_time_metrics(self, report: EnhancedPMRReport) -> None:
+        """Insert the real-time metrics snapshot of the report"""
+        if not report.real_time_metrics:
+            return
+        
+        metrics_data = {
+            "report_id": str(report.id),
+            "last_updated": report.real_time_metrics.last_updated.isoformat(),
+            "budget_utilization": float(report.real_time_metrics.budget_utilization) if report.real_time_metrics.budget_utilization else None,
+            "schedule_performance_index": float(report.real_time_metrics.schedule_performance_index) if report.real_time_metrics.schedule_performance_index else None,
+            "cost_performance_index": float(report.real_time_metrics.cost_performance_index) if report.real_time_metrics.cost_performance_index else None,
+            "risk_score": float(report.real_time_metrics.risk_score) if report.real_time_metrics.risk_score else None,
+            "active_issues_count": report.real_time_metrics.active_issues_count,
+            "completed_milestones": report.real_time_metrics.completed_milestones,
+            "upcoming_milestones": report.real_time_metrics.upcoming_milestones
+        }
+        await self._execute_query(self.supabase.table("pmr_real_time_metrics").insert(metrics_data))
+    
     # Helper methods
     
     async def _get_project_context(self, project_id: UUID) -> Dict[str, Any]:
@@ -569,35 +754,36 @@ class EnhancedPMRService:
         try:
             context = {}
             
-            # Get project details
-            project_response = self.supabase.table("projects").select("*").eq(
-                "id", str(project_id)
-            ).execute()
+            # Project details, recent metrics, financial, schedule and risk data, fetched concurrently
+            (
+                project_response,
+                metrics_response,
+                financial_response,
+                schedule_response,
+                risk_response
+            ) = await asyncio.gather(
+                self._execute_query(self.supabase.table("projects").select("*").eq(
+                    "id", str(project_id)
+                )),
+                self._execute_query(self.supabase.table("project_metrics").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("created_at", desc=True).limit(10)),
+                self._execute_query(self.supabase.table("financial_data").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("period_start", desc=True).limit(6)),
+                self._execute_query(self.supabase.table("schedule_data").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("created_at", desc=True).limit(6)),
+                self._execute_query(self.supabase.table("risks").select("*").eq(
+                    "project_id", str(project_id)
+                ))
+            )
+            
             if project_response.data:
                 context["project"] = project_response.data[0]
-            
-            # Get recent metrics
-            metrics_response = self.supabase.table("project_metrics").select("*").eq(
-                "project_id", str(project_id)
-            ).order("created_at", desc=True).limit(10).execute()
             context["recent_metrics"] = metrics_response.data or []
-            
-            # Get financial data
-            financial_response = self.supabase.table("financial_data").select("*").eq(
-                "project_id", str(project_id)
-            ).order("period_start", desc=True).limit(6).execute()
             context["financial_data"] = financial_response.data or []
-            
-            # Get schedule data
-            schedule_response = self.supabase.table("schedule_data").select("*").eq(
-                "project_id", str(project_id)
-            ).order("created_at", desc=True).limit(6).execute()
             context["schedule_data"] = schedule_response.data or []
-            
-            # Get risks
-            risk_response = self.supabase.table("risks").select("*").eq(
-                "project_id", str(project_id)
-            ).execute()
             context["risks"] = risk_response.data or []
             
             return context
@@ -608,13 +794,19 @@ class EnhancedPMRService:
     
     async def _get_project_data_for_monte_carlo(self, project_id: UUID) -> Dict[str, Any]:
         """Get project data needed for Monte Carlo simulation"""
+        # The project id identifies whose data it is, e.g. for cached simulation results
+        data: Dict[str, Any] = {"project_id": project_id}
         try:
-            data = {}
             
-            # Get budget data
-            financial_response = self.supabase.table("financial_data").select("*").eq(
-                "project_id", str(project_id)
-            ).order("period_start", desc=True).limit(12).execute()
+            # Budget and schedule history, fetched concurrently
+            financial_response, schedule_response = await asyncio.gather(
+                self._execute_query(self.supabase.table("financial_data").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("period_start", desc=True).limit(12)),
+                self._execute_query(self.supabase.table("schedule_data").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("created_at", desc=True).limit(12))
+            )
             
             if financial_response.data:
                 data["financial_history"] = financial_response.data
@@ -623,11 +815,6 @@ class EnhancedPMRService:
                 data["actual_cost"] = latest.get("actual_cost", 0)
                 data["budget_variance"] = latest.get("actual_cost", 0) - latest.get("planned_cost", 0)
             
-            # Get schedule data
-            schedule_response = self.supabase.table("schedule_data").select("*").eq(
-                "project_id", str(project_id)
-            ).order("created_at", desc=True).limit(12).execute()
-            
             if schedule_response.data:
                 data["schedule_history"] = schedule_response.data
                 latest = schedule_response.data[0]
@@ -637,44 +824,19 @@ class EnhancedPMRService:
             
         except Exception as e:
             logger.error(f"Failed to get Monte Carlo data: {e}")
-            return {}
+            return {"project_id": project_id}
     
     async def _run_budget_simulation(
         self,
         engine: Any,
         project_data: Dict[str, Any],
-        iterations: int
+        iterations: int,
+        random_seed: Optional[int] = None
     ) -> Dict[str, Decimal]:
         """Run budget variance simulation"""
         try:
-            # Extract budget parameters
-            current_budget = project_data.get("current_budget", 1000000)
-            actual_cost = project_data.get("actual_cost", 800000)
-            budget_variance = project_data.get("budget_variance", 0)
-            
-            # Calculate budget completion percentiles
-            # Simplified simulation - in production, use full Monte Carlo engine
-            import random
-            random.seed()
-            
-            results = []
-            for _ in range(iterations):
-                # Simulate budget completion with normal distribution
-                variance_factor = random.gauss(0, 0.15)  # 15% standard deviation
-                completion_ratio = (actual_cost / current_budget) * (1 + variance_factor) if current_budget > 0 else 1.0
-                results.append(completion_ratio)
-            
-            # Calculate percentiles
-            results.sort()
-            p50_idx = int(iterations * 0.50)
-            p80_idx = int(iterations * 0.80)
-            p95_idx = int(iterations * 0.95)
-            
-            return {
-                "p50": Decimal(str(round(results[p50_idx], 2))),
-                "p80": Decimal(str(round(results[p80_idx], 2))),
-                "p95": Decimal(str(round(results[p95_idx], 2)))
-            }
+            percentiles = await self._simulate_budget_completion(project_data, iterations, random_seed)
+            return self._format_budget_percentiles(percentiles)
             
         except Exception as e:
             logger.error(f"Failed to run budget simulation: {e}")
@@ -688,57 +850,100 @@ class EnhancedPMRService:
         self,
         engine: Any,
         project_data: Dict[str, Any],
-        iterations: int
+        iterations: int,
+        random_seed: Optional[int] = None
     ) -> Dict[str, Any]:
         """Run schedule variance simulation"""
+        base_date = datetime.utcnow()
         try:
-            # Simplified schedule simulation
-            import random
-            from datetime import timedelta
-            
-            random.seed()
-            base_date = datetime.utcnow()
-            
-            results = []
-            for _ in range(iterations):
-                # Simulate schedule completion with normal distribution
-                days_variance = random.gauss(0, 15)  # 15 days standard deviation
-                completion_date = base_date + timedelta(days=days_variance)
-                results.append(completion_date)
-            
-            # Calculate percentiles
-            results.sort()
-            p50_idx = int(iterations * 0.50)
-            p80_idx = int(iterations * 0.80)
-            p95_idx = int(iterations * 0.95)
-            
-            return {
-                "p50": results[p50_idx].isoformat(),
-                "p80": results[p80_idx].isoformat(),
-                "p95": results[p95_idx].isoformat()
-            }
+            days = await self._simulate_schedule_variance(project_data, iterations, random_seed)
+            return self._format_schedule_percentiles(days, base_date)
             
         except Exception as e:
             logger.error(f"Failed to run schedule simulation: {e}")
-            base_date = datetime.utcnow()
             return {
                 "p50": base_date.isoformat(),
                 "p80": (base_date + timedelta(days=7)).isoformat(),
                 "p95": (base_date + timedelta(days=14)).isoformat()
             }
     
+    def _format_budget_percentiles(self, values: List[float]) -> Dict[str, Decimal]:
+        """Round budget completion percentiles to Decimals"""
+        p50, p80, p95 = values
+        return {
+            "p50": Decimal(str(round(p50, 2))),
+            "p80": Decimal(str(round(p80, 2))),
+            "p95": Decimal(str(round(p95, 2)))
+        }
+    
+    def _format_schedule_percentiles(self, days: List[float], base_date: datetime) -> Dict[str, Any]:
+        """Convert schedule variance percentiles in days to completion dates"""
+        p50, p80, p95 = days
+        return {
+            "p50": (base_date + timedelta(days=p50)).isoformat(),
+            "p80": (base_date + timedelta(days=p80)).isoformat(),
+            "p95": (base_date + timedelta(days=p95)).isoformat()
+        }
+    
+    async def _run_simulation_kernel(self, kernel: Any, *args: Any) -> Any:
+        """
+        Run a module-level simulation kernel off the event loop
+        Uses the shared process pool, falling back to inline execution
+        """
+        pool = _get_simulation_pool()
+        if pool is not None:
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pool, kernel, *args)
+            except Exception as e:
+                logger.warning(f"Simulation worker unavailable, running inline: {e}")
+        
+        return kernel(*args)
+    
+    async def _simulate_budget_completion(
+        self,
+        project_data: Dict[str, Any],
+        iterations: int,
+        random_seed: Optional[int] = None
+    ) -> List[float]:
+        """Budget completion percentiles of the project data"""
+        simulation_input = {
+            key: project_data[key]
+            for key in ("current_budget", "actual_cost")
+            if key in project_data
+        }
+        return await self._run_simulation_kernel(
+            _budget_completion_percentiles, simulation_input, iterations, random_seed
+        )
+    
+    async def _simulate_schedule_variance(
+        self,
+        project_data: Dict[str, Any],
+        iterations: int,
+        random_seed: Optional[int] = None
+    ) -> List[float]:
+        """Schedule variance percentiles in days (independent of the project data)"""
+        return await self._run_simulation_kernel(
+            _schedule_variance_percentiles, iterations, random_seed
+        )
+    
     async def _run_simplified_monte_carlo(
         self,
         project_id: UUID,
         iterations: int,
-        confidence_levels: List[Decimal]
+        confidence_levels: List[Decimal],
+        random_seed: Optional[int] = None
     ) -> MonteCarloResults:
         """Simplified Monte Carlo simulation fallback"""
         try:
             project_data = await self._get_project_data_for_monte_carlo(project_id)
             
-            budget_results = await self._run_budget_simulation(None, project_data, iterations)
-            schedule_results = await self._run_schedule_simulation(None, project_data, iterations)
+            budget_percentiles, schedule_days = await asyncio.gather(
+                self._simulate_budget_completion(project_data, iterations, random_seed),
+                self._simulate_schedule_variance(project_data, iterations, random_seed)
+            )
+            budget_results = self._format_budget_percentiles(budget_percentiles)
+            schedule_results = self._format_schedule_percentiles(schedule_days, datetime.utcnow())
             
             return MonteCarloResults(
                 analysis_type="simplified",
@@ -803,9 +1008,9 @@ class EnhancedPMRService:
             context = {}
             
             # Add project details
-            project_response = self.supabase.table("projects").select("*").eq(
+            project_response = await self._execute_query(self.supabase.table("projects").select("*").eq(
                 "id", str(project_id)
-            ).execute()
+            ))
             if project_response.data:
                 context["project"] = project_response.data[0]
             
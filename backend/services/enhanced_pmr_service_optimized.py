@@ -3,15 +3,24 @@ Enhanced PMR Service with Performance Optimizations
 Integrates caching, performance monitoring, and optimized data loading
 """
 
+import os
+import asyncio
 import logging
-from typing import Optional, Dict, Any
-from uuid import UUID
+from typing import Optional, Dict, Any, List
+from uuid import UUID, NAMESPACE_URL, uuid4, uuid5
 from datetime import datetime
 
 from services.enhanced_pmr_service import EnhancedPMRService
 from services.pmr_cache_service import PMRCacheService
 from services.pmr_performance_monitor import performance_monitor
-from models.pmr import EnhancedPMRReport, EnhancedPMRGenerationRequest
+from models.pmr import EnhancedPMRReport, EnhancedPMRGenerationRequest, EnhancedAIInsight
+
+try:
+    from performance_optimization import CacheManager, PerformanceMonitor
+    from services.pmr_performance_optimizer import PMRPerformanceOptimizer, fingerprint_data
+    SECTION_CACHE_AVAILABLE = True
+except ImportError:
+    SECTION_CACHE_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +41,17 @@ class EnhancedPMRServiceOptimized(EnhancedPMRService):
         # Initialize performance monitor
         self.performance_monitor = performance_monitor
         
+        # Section cache: each section is keyed by the fingerprints of its inputs
+        self.section_cache: Optional[PMRPerformanceOptimizer] = None
+        if SECTION_CACHE_AVAILABLE:
+            self.section_cache = PMRPerformanceOptimizer(
+                CacheManager(redis_url or os.getenv("REDIS_URL")),
+                PerformanceMonitor()
+            )
+        
+        # Input fingerprints of the projects currently being generated
+        self._generation_fingerprints: Dict[str, Dict[str, str]] = {}
+        
         logger.info("Enhanced PMR Service Optimized initialized")
     
     @performance_monitor.track_time("report_generation_time")
@@ -46,7 +66,7 @@ class EnhancedPMRServiceOptimized(EnhancedPMRService):
         try:
             # Check cache first
             cache_key = f"{request.project_id}_{request.report_month}_{request.report_year}"
-            cached_report = await self.cache_service.get_cached_report(UUID(cache_key))
+            cached_report = await self.cache_service.get_cached_report(uuid5(NAMESPACE_URL, cache_key))
             
             if cached_report:
                 logger.info(f"Cache hit for report {cache_key}")
@@ -56,8 +76,18 @@ class EnhancedPMRServiceOptimized(EnhancedPMRService):
             
             self.performance_monitor.record_metric("cache_hit_rate", 0, "%")
             
+            # Fingerprint the project inputs once; sections whose inputs are
+            # unchanged are served from the section cache
+            project_key = str(request.project_id)
+            self._generation_fingerprints[project_key] = await self._load_input_fingerprints(
+                request.project_id
+            )
+            
             # Generate report using parent method
-            report = await super().generate_enhanced_pmr(request, user_id)
+            try:
+                report = await super().generate_enhanced_pmr(request, user_id)
+            finally:
+                self._generation_fingerprints.pop(project_key, None)
             
             # Cache the generated report
             if self.cache_service.is_enabled():
@@ -82,26 +112,29 @@ class EnhancedPMRServiceOptimized(EnhancedPMRService):
         categories: Optional[list] = None
     ) -> list:
         """
-        Generate AI insights with caching
+        Generate AI insights, reusing them while their inputs are unchanged
         """
         try:
-            # Check cache for insights
-            cached_insights = await self.cache_service.get_cached_insights(report_id)
+            parameters = {
+                "categories": sorted(c.value for c in categories) if categories else None
+            }
+            cached_insights = await self._get_cached_section_result(
+                project_id, "ai_insights", parameters
+            )
             
-            if cached_insights:
-                logger.info(f"Cache hit for insights {report_id}")
-                return cached_insights
+            if cached_insights is not None:
+                logger.info(f"Section cache hit for insights of project {project_id}")
+                return [self._restore_insight(data, report_id) for data in cached_insights]
             
             # Generate insights using parent method
             insights = await super()._generate_ai_insights(report_id, project_id, categories)
             
-            # Cache insights
-            if self.cache_service.is_enabled() and insights:
-                insights_data = [self._serialize_insight(i) for i in insights]
-                await self.cache_service.cache_insights(
-                    report_id,
-                    insights_data,
-                    ttl=1800  # 30 minutes
+            if insights:
+                await self._cache_section_result(
+                    project_id,
+                    "ai_insights",
+                    [insight.model_dump(mode="json") for insight in insights],
+                    parameters
                 )
             
             return insights
@@ -110,6 +143,66 @@ class EnhancedPMRServiceOptimized(EnhancedPMRService):
             logger.error(f"Failed to generate optimized AI insights: {e}")
             return []
     
+    async def _simulate_budget_completion(
+        self,
+        project_data: Dict[str, Any],
+        iterations: int,
+        random_seed: Optional[int] = None
+    ) -> List[float]:
+        """Budget simulation, rerun only when budget data or parameters change"""
+        project_id = project_data.get("project_id")
+        if project_id is None:
+            return await super()._simulate_budget_completion(project_data, iterations, random_seed)
+        
+        parameters = {"iterations": iterations, "random_seed": random_seed}
+        cached = await self._get_cached_section_result(project_id, "budget_simulation", parameters)
+        if cached is not None:
+            return cached
+        
+        percentiles = await super()._simulate_budget_completion(project_data, iterations, random_seed)
+        await self._cache_section_result(project_id, "budget_simulation", percentiles, parameters)
+        return percentiles
+    
+    async def _simulate_schedule_variance(
+        self,
+        project_data: Dict[str, Any],
+        iterations: int,
+        random_seed: Optional[int] = None
+    ) -> List[float]:
+        """Schedule simulation, rerun only when schedule data or parameters change"""
+        project_id = project_data.get("project_id")
+        if project_id is None:
+            return await super()._simulate_schedule_variance(project_data, iterations, random_seed)
+        
+        parameters = {"iterations": iterations, "random_seed": random_seed}
+        cached = await self._get_cached_section_result(project_id, "schedule_simulation", parameters)
+        if cached is not None:
+            return cached
+        
+        days = await super()._simulate_schedule_variance(project_data, iterations, random_seed)
+        await self._cache_section_result(project_id, "schedule_simulation", days, parameters)
+        return days
+    
+    async def _generate_executive_summary(
+        self,
+        report: EnhancedPMRReport,
+        project_id: UUID
+    ) -> str:
+        """Executive summary, regenerated only when one of the summarized sections changes"""
+        parameters = {
+            "insights": [insight.title for insight in report.ai_insights],
+            "monte_carlo": report.monte_carlo_analysis.parameters_used
+            if report.monte_carlo_analysis else None
+        }
+        cached = await self._get_cached_section_result(project_id, "executive_summary", parameters)
+        if cached is not None:
+            return cached
+        
+        summary = await super()._generate_executive_summary(report, project_id)
+        if summary and summary != self.EXECUTIVE_SUMMARY_FALLBACK:
+            await self._cache_section_result(project_id, "executive_summary", summary, parameters)
+        return summary
+    
     @performance_monitor.track_time("monte_carlo_analysis_time")
     async def _run_monte_carlo_analysis(
         self,
@@ -218,16 +311,125 @@ class EnhancedPMRServiceOptimized(EnhancedPMRService):
             logger.error(f"Failed to invalidate cache: {e}")
             return False
     
-    async def invalidate_project_caches(self, project_id: UUID) -> int:
-        """Invalidate all caches for a project"""
+    async def invalidate_project_caches(
+        self,
+        project_id: UUID,
+        changed_inputs: Optional[List[str]] = None
+    ) -> int:
+        """
+        Invalidate caches for a project
+        
+        Args:
+            project_id: Project whose data changed
+            changed_inputs: Changed data inputs ('budget', 'risks', 'schedule',
+                'milestones', 'metrics'); only the sections computed from them
+                are invalidated. None invalidates every section.
+        """
         try:
             count = await self.cache_service.invalidate_project_caches(project_id)
+            
+            if self.section_cache:
+                sections = await self.section_cache.invalidate_sections(project_id, changed_inputs)
+                count += len(sections)
+            
             logger.info(f"Invalidated {count} cache entries for project {project_id}")
             return count
         except Exception as e:
             logger.error(f"Failed to invalidate project caches: {e}")
             return 0
     
+    # Section cache helpers
+    
+    async def _load_input_fingerprints(self, project_id: UUID) -> Dict[str, str]:
+        """Fingerprint the project data the PMR sections are computed from"""
+        try:
+            (
+                financial_response,
+                risk_response,
+                schedule_response,
+                milestone_response,
+                metrics_response
+            ) = await asyncio.gather(
+                self._execute_query(self.supabase.table("financial_data").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("period_start", desc=True).limit(12)),
+                self._execute_query(self.supabase.table("risks").select("*").eq(
+                    "project_id", str(project_id)
+                )),
+                self._execute_query(self.supabase.table("schedule_data").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("created_at", desc=True).limit(12)),
+                self._execute_query(self.supabase.table("milestones").select("*").eq(
+                    "project_id", str(project_id)
+                )),
+                self._execute_query(self.supabase.table("project_metrics").select("*").eq(
+                    "project_id", str(project_id)
+                ).order("created_at", desc=True).limit(10))
+            )
+            
+            # A schedule carries an explicit version when available
+            schedule_rows = schedule_response.data or []
+            schedule_version = schedule_rows[0].get("version") if schedule_rows else None
+            
+            return {
+                "budget": fingerprint_data(financial_response.data or []),
+                "risks": fingerprint_data(risk_response.data or []),
+                "schedule": f"v{schedule_version}" if schedule_version is not None
+                            else fingerprint_data(schedule_rows),
+                "milestones": fingerprint_data(milestone_response.data or []),
+                "metrics": fingerprint_data(metrics_response.data or [])
+            }
+        except Exception as e:
+            logger.error(f"Failed to fingerprint inputs for project {project_id}: {e}")
+            return {}
+    
+    async def _get_input_fingerprints(self, project_id: UUID) -> Dict[str, str]:
+        """Input fingerprints of the current generation, loading them if needed"""
+        fingerprints = self._generation_fingerprints.get(str(project_id))
+        if fingerprints is None:
+            fingerprints = await self._load_input_fingerprints(project_id)
+        return fingerprints
+    
+    async def _get_cached_section_result(
+        self,
+        project_id: UUID,
+        section_id: str,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Any]:
+        """Cached section result if it was computed from the current inputs"""
+        if not self.section_cache:
+            return None
+        
+        fingerprints = await self._get_input_fingerprints(project_id)
+        if not fingerprints:
+            return None
+        
+        return await self.section_cache.get_cached_section(
+            project_id, section_id, input_fingerprints=fingerprints, parameters=parameters
+        )
+    
+    async def _cache_section_result(
+        self,
+        project_id: UUID,
+        section_id: str,
+        result: Any,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Store a section result with the fingerprints of its inputs"""
+        if not self.section_cache:
+            return
+        
+        fingerprints = await self._get_input_fingerprints(project_id)
+        if fingerprints:
+            await self.section_cache.cache_section(
+                project_id, section_id, result,
+                input_fingerprints=fingerprints, parameters=parameters
+            )
+    
+    def _restore_insight(self, data: Dict[str, Any], report_id: UUID) -> EnhancedAIInsight:
+        """Rebuild a cached insight for a new report"""
+        return EnhancedAIInsight(**{**data, "id": uuid4(), "report_id": report_id})
+    
     # Serialization helpers
     
     def _serialize_report(self, report: EnhancedPMRReport) -> Dict[str, Any]:
@@ -9,7 +9,10 @@ from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, List, Any, Optional
 from uuid import UUID, uuid4
 
+import numpy as np
+
 from .project_controls_base import ProjectControlsBaseService
+from .earned_value_engine import EarnedValueEngine, to_decimal
 from models.project_controls import (
     ETCCalculationMethod, ETCCalculationCreate, ETCCalculationResponse,
     ValidationResult, CalculationResult
@@ -36,13 +39,15 @@ class ETCCalculatorService(ProjectControlsBaseService):
             ETCCalculationMethod.manual: 0.1
         }
 
-    async def calculate_bottom_up_etc(self, project_id: UUID, work_package_ids: Optional[List[UUID]] = None) -> CalculationResult:
+    async def calculate_bottom_up_etc(self, project_id: UUID, work_package_ids: Optional[List[UUID]] = None,
+                                      engine: Optional[EarnedValueEngine] = None) -> CalculationResult:
         """
         Calculate ETC by summing detailed estimates for all remaining work packages
         
         Args:
             project_id: Project identifier
             work_package_ids: Specific work packages to include (optional)
+            engine: Preloaded earned value data (loaded if None)
             
         Returns:
             CalculationResult with bottom-up ETC calculation
@@ -51,11 +56,11 @@ class ETCCalculatorService(ProjectControlsBaseService):
             logger.info(f"Calculating bottom-up ETC for project {project_id}")
             
             # Get work packages
-            work_packages = await self.get_work_packages(project_id)
-            
-            if work_package_ids:
-                work_packages = [wp for wp in work_packages 
-                               if wp['id'] in [str(wp_id) for wp_id in work_package_ids]]
+            engine = engine or await self.load_earned_value_engine([project_id])
+            positions = engine.element_positions(
+                str(project_id), [str(wp_id) for wp_id in work_package_ids] if work_package_ids else None
+            )
+            work_packages = [engine.elements[i] for i in positions]
             
             if not work_packages:
                 return CalculationResult(
@@ -71,35 +76,9 @@ class ETCCalculatorService(ProjectControlsBaseService):
                     calculated_at=datetime.now()
                 )
             
-            total_etc = Decimal('0')
-            completed_packages = 0
-            
-            for wp in work_packages:
-                budget = Decimal(str(wp.get('budget', 0)))
-                percent_complete = Decimal(str(wp.get('percent_complete', 0))) / 100
-                actual_cost = Decimal(str(wp.get('actual_cost', 0)))
-                
-                # Calculate remaining work for this package
-                if percent_complete >= 1.0:
-                    # Package is complete
-                    completed_packages += 1
-                    continue
-                
-                # Remaining budget approach
-                remaining_budget = budget * (1 - percent_complete)
-                
-                # Performance-based adjustment if we have actual cost data
-                if actual_cost > 0 and percent_complete > 0:
-                    # Calculate work package CPI
-                    earned_value = budget * percent_complete
-                    wp_cpi = earned_value / actual_cost if actual_cost > 0 else Decimal('1.0')
-                    
-                    # Adjust remaining work based on performance
-                    remaining_work_adjusted = remaining_budget / wp_cpi if wp_cpi > 0 else remaining_budget
-                    total_etc += remaining_work_adjusted
-                else:
-                    # Use remaining budget if no performance data
-                    total_etc += remaining_budget
+            # Remaining budget per package, adjusted by its own CPI when it has cost data
+            total_etc = to_decimal(engine.element_estimate_to_complete(positions).sum())
+            completed_packages = int((engine.percent_complete[positions] >= 1.0).sum())
             
             # Validate calculation
             validation = self.validate_calculation_inputs(
@@ -150,12 +129,14 @@ class ETCCalculatorService(ProjectControlsBaseService):
                 calculated_at=datetime.now()
             )
 
-    async def calculate_performance_based_etc(self, project_id: UUID) -> CalculationResult:
+    async def calculate_performance_based_etc(self, project_id: UUID,
+                                              engine: Optional[EarnedValueEngine] = None) -> CalculationResult:
         """
         Calculate ETC using Cost Performance Index: ETC = (BAC - EV) / CPI
         
         Args:
             project_id: Project identifier
+            engine: Preloaded earned value data (loaded if None)
             
         Returns:
             CalculationResult with performance-based ETC calculation
@@ -163,32 +144,24 @@ class ETCCalculatorService(ProjectControlsBaseService):
         try:
             logger.info(f"Calculating performance-based ETC for project {project_id}")
             
-            # Get financial data
-            financial_data = await self.get_financial_data(project_id)
-            
-            budget_at_completion = financial_data['budget_at_completion']
-            earned_value = financial_data['earned_value']
-            actual_cost = financial_data['actual_cost']
+            # Get earned value data
+            engine = engine or await self.load_earned_value_engine([project_id])
+            evm = engine.compute().snapshot(engine.group_position(str(project_id)))
             
-            # Calculate performance indices
-            performance_indices = self.calculate_performance_indices(
-                financial_data['planned_value'],
-                earned_value,
-                actual_cost,
-                budget_at_completion
-            )
+            budget_at_completion = evm['budget_at_completion']
+            earned_value = evm['earned_value']
+            actual_cost = evm['actual_cost']
             
-            cpi = performance_indices['cost_performance_index']
+            cpi = evm['cost_performance_index']
             
-            # Calculate ETC using performance-based method
+            # ETC using performance-based method
             remaining_budget = budget_at_completion - earned_value
+            etc = evm['estimate_to_complete']['performance_based']
             
             if cpi <= self.minimum_cpi_threshold:
-                # CPI too low, use remaining budget as ETC
-                etc = remaining_budget
+                # CPI too low, remaining budget used as ETC
                 confidence_level = 0.3  # Low confidence due to poor performance data
             else:
-                etc = remaining_budget / cpi
                 confidence_level = self._calculate_performance_based_confidence(cpi, earned_value, budget_at_completion)
             
             # Validate calculation
@@ -449,25 +422,17 @@ class ETCCalculatorService(ProjectControlsBaseService):
             # Use custom weights or defaults
             weights = custom_weights or self.method_weights
             
-            weighted_sum = Decimal('0')
-            total_weight = Decimal('0')
-            confidence_sum = Decimal('0')
-            methods_used = []
+            # Skip invalid calculations
+            valid = [calc for calc in etc_calculations if calc.validation_result.is_valid]
+            methods_used = [calc.calculation_method for calc in valid]
             
-            for calc in etc_calculations:
-                if not calc.validation_result.is_valid:
-                    continue  # Skip invalid calculations
-                
-                method = calc.calculation_method
-                weight = Decimal(str(weights.get(method, 0.1)))  # Default small weight
-                
-                # Adjust weight by confidence level
-                confidence_adjusted_weight = weight * Decimal(str(calc.confidence_level))
-                
-                weighted_sum += calc.result_value * confidence_adjusted_weight
-                total_weight += confidence_adjusted_weight
-                confidence_sum += Decimal(str(calc.confidence_level)) * weight
-                methods_used.append(method)
+            values = np.array([float(calc.result_value) for calc in valid])
+            method_weights = np.array([weights.get(method, 0.1) for method in methods_used])  # Default small weight
+            confidences = np.array([calc.confidence_level for calc in valid])
+            
+            # Adjust weights by confidence level
+            confidence_adjusted_weights = method_weights * confidences
+            total_weight = confidence_adjusted_weights.sum()
             
             if total_weight == 0:
                 return CalculationResult(
@@ -484,8 +449,8 @@ class ETCCalculatorService(ProjectControlsBaseService):
                 )
             
             # Calculate weighted average
-            weighted_etc = weighted_sum / total_weight
-            weighted_confidence = confidence_sum / sum(Decimal(str(weights.get(m, 0.1))) for m in methods_used)
+            weighted_etc = to_decimal(values @ confidence_adjusted_weights / total_weight)
+            weighted_confidence = Decimal(repr(float(confidences @ method_weights / method_weights.sum())))
             
             # Calculate confidence interval
             confidence_interval = self.calculate_confidence_interval(
@@ -0,0 +1,169 @@
+"""
+Compiled in-memory feature flag evaluation
+
+A FlagSnapshot compiles every flag once into an evaluator specialised by its
+status and rollout strategy:
+- USER_LIST: set membership of the user ID
+- ROLE_BASED: bitmask of the allowed roles, tested against the user's role mask
+- PERCENTAGE: the user's hash bucket, computed once per user and flag
+All check responses are built at compile time, so evaluation does no I/O and
+no allocation beyond the per-request FlagUser.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from models.feature_flags import (
+    FeatureFlagCheckResponse,
+    FeatureFlagResponse,
+    FeatureFlagStatus,
+    RolloutStrategy
+)
+
+# Cached percentage buckets per flag before the cache is reset
+MAX_CACHED_BUCKETS = 50000
+
+
+def percentage_bucket(user_id: str, feature_name: str) -> int:
+    """Stable rollout bucket (0-99) of a user for a feature"""
+    hash_bytes = hashlib.sha256(f"{user_id}:{feature_name}".encode()).digest()
+    return int.from_bytes(hash_bytes[:4], byteorder='big') % 100
+
+
+def flag_version(rows: Iterable[Dict[str, Any]]) -> FrozenSet[Tuple[str, str]]:
+    """Version stamp of a set of flag rows: their ids and update times"""
+    return frozenset((str(row["id"]), str(row.get("updated_at"))) for row in rows)
+
+
+class FlagUser:
+    """User context prepared once per request and evaluated against many flags"""
+
+    __slots__ = ("user_id", "roles", "role_mask")
+
+    def __init__(self, user_id: Optional[str], roles: Optional[List[str]], role_mask: int):
+        self.user_id = user_id
+        self.roles = roles
+        self.role_mask = role_mask
+
+
+Evaluator = Callable[[FlagUser], FeatureFlagCheckResponse]
+
+
+class FlagSnapshot:
+    """Immutable set of compiled flags"""
+
+    def __init__(self, flags: Iterable[FeatureFlagResponse], version: FrozenSet[Tuple[str, str]] = frozenset()):
+        self.flags: Dict[str, FeatureFlagResponse] = {flag.name: flag for flag in flags}
+        self.version = version
+
+        self.role_bits: Dict[str, int] = {}
+        for flag in self.flags.values():
+            if flag.rollout_strategy == RolloutStrategy.ROLE_BASED:
+                for role in flag.allowed_roles or []:
+                    self.role_bits.setdefault(role, 1 << len(self.role_bits))
+
+        self.evaluators: Dict[str, Evaluator] = {
+            name: self._compile(flag) for name, flag in self.flags.items()
+        }
+
+    def user(self, user_id: Optional[Any] = None, roles: Optional[List[str]] = None) -> FlagUser:
+        """Prepare a user for evaluation"""
+        role_mask = 0
+        for role in roles or ():
+            role_mask |= self.role_bits.get(role, 0)
+        return FlagUser(str(user_id) if user_id else None, roles, role_mask)
+
+    def check(self, feature_name: str, user: FlagUser) -> FeatureFlagCheckResponse:
+        """Evaluate one flag for a prepared user"""
+        evaluator = self.evaluators.get(feature_name)
+        if evaluator is None:
+            return FeatureFlagCheckResponse(
+                feature_name=feature_name,
+                is_enabled=False,
+                reason="Feature flag not found"
+            )
+        return evaluator(user)
+
+    def evaluate_all(self, user: FlagUser) -> Dict[str, bool]:
+        """Evaluate every flag for a prepared user"""
+        return {name: evaluator(user).is_enabled for name, evaluator in self.evaluators.items()}
+
+    def _compile(self, flag: FeatureFlagResponse) -> Evaluator:
+        name = flag.name
+
+        def outcome(is_enabled: bool, reason: str, with_metadata: bool = True) -> FeatureFlagCheckResponse:
+            return FeatureFlagCheckResponse(
+                feature_name=name,
+                is_enabled=is_enabled,
+                reason=reason,
+                metadata=flag.metadata if with_metadata else None
+            )
+
+        def constant(response: FeatureFlagCheckResponse) -> Evaluator:
+            return lambda user: response
+
+        if flag.status == FeatureFlagStatus.DISABLED:
+            return constant(outcome(False, "Feature is disabled"))
+        if flag.status == FeatureFlagStatus.DEPRECATED:
+            return constant(outcome(False, "Feature is deprecated"))
+
+        strategy = flag.rollout_strategy
+
+        if strategy == RolloutStrategy.ALL_USERS:
+            return constant(outcome(True, "Feature enabled for all users"))
+
+        if strategy == RolloutStrategy.USER_LIST:
+            allowed_users = frozenset(str(user_id) for user_id in flag.allowed_user_ids or ())
+            no_user = outcome(False, "User ID required for user list strategy", False)
+            allowed = outcome(True, "User in allowed list")
+            denied = outcome(False, "User not in allowed list", False)
+
+            def evaluate_user_list(user: FlagUser) -> FeatureFlagCheckResponse:
+                if not user.user_id:
+                    return no_user
+                return allowed if user.user_id in allowed_users else denied
+
+            return evaluate_user_list
+
+        if strategy == RolloutStrategy.ROLE_BASED:
+            role_mask = 0
+            for role in flag.allowed_roles or ():
+                role_mask |= self.role_bits[role]
+            no_roles = outcome(False, "User roles required for role-based strategy", False)
+            unconfigured = outcome(False, "No allowed roles configured", False)
+            allowed = outcome(True, "User has allowed role")
+            denied = outcome(False, "User does not have allowed role", False)
+
+            def evaluate_roles(user: FlagUser) -> FeatureFlagCheckResponse:
+                if not user.roles:
+                    return no_roles
+                if not role_mask:
+                    return unconfigured
+                return allowed if user.role_mask & role_mask else denied
+
+            return evaluate_roles
+
+        if strategy == RolloutStrategy.PERCENTAGE:
+            no_user = outcome(False, "User ID required for percentage rollout", False)
+            if flag.rollout_percentage is None:
+                unconfigured = outcome(False, "Rollout percentage not configured", False)
+                return lambda user: no_user if not user.user_id else unconfigured
+
+            threshold = flag.rollout_percentage
+            included = outcome(True, f"User in {threshold}% rollout")
+            excluded = outcome(False, f"User not in {threshold}% rollout")
+            buckets: Dict[str, int] = {}
+
+            def evaluate_percentage(user: FlagUser) -> FeatureFlagCheckResponse:
+                if not user.user_id:
+                    return no_user
+                bucket = buckets.get(user.user_id)
+                if bucket is None:
+                    if len(buckets) >= MAX_CACHED_BUCKETS:
+                        buckets.clear()
+                    bucket = buckets[user.user_id] = percentage_bucket(user.user_id, name)
+                return included if bucket < threshold else excluded
+
+            return evaluate_percentage
+
+        return constant(outcome(False, "Unknown rollout strategy", False))
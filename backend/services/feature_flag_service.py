@@ -4,8 +4,10 @@ Feature flag service for gradual rollout and user-based access control
 
 from typing import Optional, List, Dict, Any
 from uuid import UUID
-import hashlib
 from datetime import datetime
+import logging
+import threading
+import time
 
 from models.feature_flags import (
     FeatureFlagCreate,
@@ -15,13 +17,32 @@ from models.feature_flags import (
     FeatureFlagStatus,
     RolloutStrategy
 )
+from services.feature_flag_evaluator import FlagSnapshot, flag_version, percentage_bucket
+
+logger = logging.getLogger(__name__)
+
+# Seconds between version checks of the in-memory flag snapshot
+DEFAULT_REFRESH_INTERVAL = 15.0
 
 
 class FeatureFlagService:
-    """Service for managing feature flags and access control"""
+    """
+    Service for managing feature flags and access control.
+    
+    Flag checks are evaluated against an in-memory snapshot of compiled flags.
+    The snapshot is loaded on first use, updated immediately by writes made
+    through this service, and re-validated in the background every
+    refresh_interval seconds by comparing version stamps (id, updated_at).
+    """
     
-    def __init__(self, supabase_client):
+    def __init__(self, supabase_client, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
         self.supabase = supabase_client
+        self.refresh_interval = refresh_interval
+        self._rows: Optional[Dict[str, Dict[str, Any]]] = None
+        self._snapshot: Optional[FlagSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
     
     def create_feature_flag(
         self,
@@ -65,6 +86,7 @@ class FeatureFlagService:
         if not result.data:
             raise Exception("Failed to create feature flag")
         
+        self._apply_write(result.data[0])
         return self._map_to_response(result.data[0])
     
     def update_feature_flag(
@@ -113,6 +135,7 @@ class FeatureFlagService:
         if not result.data:
             raise ValueError(f"Feature flag {flag_id} not found")
         
+        self._apply_write(result.data[0])
         return self._map_to_response(result.data[0])
     
     def get_feature_flag(self, flag_id: UUID) -> Optional[FeatureFlagResponse]:
@@ -157,6 +180,8 @@ class FeatureFlagService:
             "id", str(flag_id)
         ).execute()
         
+        if result.data:
+            self._apply_write(deleted_id=str(flag_id))
         return bool(result.data)
     
     def check_feature_enabled(
@@ -173,6 +198,8 @@ class FeatureFlagService:
         2. Check if feature is globally disabled
         3. Apply rollout strategy (all users, percentage, user list, role-based)
         
+        Evaluated in memory against the flag snapshot.
+        
         Args:
             feature_name: Name of the feature to check
             user_id: Optional user ID for user-specific checks
@@ -181,129 +208,121 @@ class FeatureFlagService:
         Returns:
             Feature flag check response with enabled status and reason
         """
-        # Get feature flag
-        flag = self.get_feature_flag_by_name(feature_name)
-        
-        # If flag doesn't exist, default to disabled
-        if not flag:
-            return FeatureFlagCheckResponse(
-                feature_name=feature_name,
-                is_enabled=False,
-                reason="Feature flag not found"
-            )
-        
-        # If flag is disabled, return false
-        if flag.status == FeatureFlagStatus.DISABLED:
-            return FeatureFlagCheckResponse(
-                feature_name=feature_name,
-                is_enabled=False,
-                reason="Feature is disabled",
-                metadata=flag.metadata
-            )
-        
-        # If flag is deprecated, return false
-        if flag.status == FeatureFlagStatus.DEPRECATED:
-            return FeatureFlagCheckResponse(
-                feature_name=feature_name,
-                is_enabled=False,
-                reason="Feature is deprecated",
-                metadata=flag.metadata
-            )
-        
-        # Apply rollout strategy
-        if flag.rollout_strategy == RolloutStrategy.ALL_USERS:
-            return FeatureFlagCheckResponse(
-                feature_name=feature_name,
-                is_enabled=True,
-                reason="Feature enabled for all users",
-                metadata=flag.metadata
-            )
-        
-        if flag.rollout_strategy == RolloutStrategy.USER_LIST:
-            if not user_id:
-                return FeatureFlagCheckResponse(
-                    feature_name=feature_name,
-                    is_enabled=False,
-                    reason="User ID required for user list strategy"
-                )
-            
-            if flag.allowed_user_ids and user_id in flag.allowed_user_ids:
-                return FeatureFlagCheckResponse(
-                    feature_name=feature_name,
-                    is_enabled=True,
-                    reason="User in allowed list",
-                    metadata=flag.metadata
-                )
-            else:
-                return FeatureFlagCheckResponse(
-                    feature_name=feature_name,
-                    is_enabled=False,
-                    reason="User not in allowed list"
-                )
-        
-        if flag.rollout_strategy == RolloutStrategy.ROLE_BASED:
-            if not user_roles:
-                return FeatureFlagCheckResponse(
-                    feature_name=feature_name,
-                    is_enabled=False,
-                    reason="User roles required for role-based strategy"
-                )
-            
-            if flag.allowed_roles:
-                # Check if user has any of the allowed roles
-                has_allowed_role = any(role in flag.allowed_roles for role in user_roles)
-                if has_allowed_role:
-                    return FeatureFlagCheckResponse(
-                        feature_name=feature_name,
-                        is_enabled=True,
-                        reason="User has allowed role",
-                        metadata=flag.metadata
-                    )
-                else:
-                    return FeatureFlagCheckResponse(
-                        feature_name=feature_name,
-                        is_enabled=False,
-                        reason="User does not have allowed role"
-                    )
-            else:
-                return FeatureFlagCheckResponse(
-                    feature_name=feature_name,
-                    is_enabled=False,
-                    reason="No allowed roles configured"
-                )
-        
-        if flag.rollout_strategy == RolloutStrategy.PERCENTAGE:
-            if not user_id:
-                return FeatureFlagCheckResponse(
-                    feature_name=feature_name,
-                    is_enabled=False,
-                    reason="User ID required for percentage rollout"
-                )
+        snapshot = self.get_snapshot()
+        return snapshot.check(feature_name, snapshot.user(user_id, user_roles))
+    
+    def is_feature_enabled(
+        self,
+        feature_name: str,
+        user_id: Optional[UUID] = None,
+        user_roles: Optional[List[str]] = None
+    ) -> bool:
+        """Check if a feature is enabled for a user, without the reason"""
+        snapshot = self.get_snapshot()
+        return snapshot.check(feature_name, snapshot.user(user_id, user_roles)).is_enabled
+    
+    def evaluate_all(
+        self,
+        user_id: Optional[UUID] = None,
+        user_roles: Optional[List[str]] = None
+    ) -> Dict[str, bool]:
+        """
+        Evaluate every feature flag for a user.
+        
+        Args:
+            user_id: Optional user ID for user-specific checks
+            user_roles: Optional user roles for role-based checks
             
-            if flag.rollout_percentage is None:
-                return FeatureFlagCheckResponse(
-                    feature_name=feature_name,
-                    is_enabled=False,
-                    reason="Rollout percentage not configured"
-                )
+        Returns:
+            Mapping of feature name to enabled status
+        """
+        snapshot = self.get_snapshot()
+        return snapshot.evaluate_all(snapshot.user(user_id, user_roles))
+    
+    # Flag snapshot
+    
+    @property
+    def snapshot_loaded(self) -> bool:
+        return self._snapshot is not None
+    
+    def get_snapshot(self) -> FlagSnapshot:
+        """
+        Get the compiled flag snapshot.
+        
+        Loads it on first use. Afterwards a stale snapshot is returned while it
+        is re-validated in the background, so checks never wait on the database.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh(force=True)
+            return self._snapshot
+        if time.monotonic() - self._checked_at > self.refresh_interval:
+            self._refresh_in_background()
+        return snapshot
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the flag snapshot if the flags changed.
+        
+        Args:
+            force: Reload without comparing version stamps
             
-            # Use consistent hashing to determine if user is in rollout percentage
-            user_hash = self._hash_user_for_percentage(str(user_id), feature_name)
-            is_enabled = user_hash < flag.rollout_percentage
+        Returns:
+            True if the snapshot was reloaded
+        """
+        with self._lock:
+            if not force and self._snapshot is not None:
+                stamps = self.supabase.table("feature_flags").select("id,updated_at").execute()
+                if flag_version(stamps.data or []) == self._snapshot.version:
+                    self._checked_at = time.monotonic()
+                    return False
             
-            return FeatureFlagCheckResponse(
-                feature_name=feature_name,
-                is_enabled=is_enabled,
-                reason=f"User {'in' if is_enabled else 'not in'} {flag.rollout_percentage}% rollout",
-                metadata=flag.metadata
-            )
-        
-        # Default to disabled
-        return FeatureFlagCheckResponse(
-            feature_name=feature_name,
-            is_enabled=False,
-            reason="Unknown rollout strategy"
-        )
+            result = self.supabase.table("feature_flags").select("*").execute()
+            self._install({str(row["id"]): row for row in result.data or []})
+            return True
+    
+    def invalidate(self) -> None:
+        """Re-validate the snapshot on the next check (e.g. on a change notification)"""
+        self._checked_at = 0.0
+    
+    def _refresh_in_background(self) -> None:
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Feature flag refresh failed, keeping current snapshot: {e}")
+                self._checked_at = time.monotonic()
+            finally:
+                self._refresh_lock.release()
+        
+        threading.Thread(target=run, name="feature-flag-refresh", daemon=True).start()
+    
+    def _apply_write(self, row: Optional[Dict[str, Any]] = None, deleted_id: Optional[str] = None) -> None:
+        """Apply a flag written through this service to the snapshot"""
+        with self._lock:
+            if self._rows is None:
+                self.refresh(force=True)
+            rows = dict(self._rows)
+            if row is not None:
+                rows[str(row["id"])] = row
+            if deleted_id is not None:
+                rows.pop(deleted_id, None)
+            self._install(rows)
+    
+    def _install(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        flags = []
+        for row in rows.values():
+            try:
+                flags.append(self._map_to_response(row))
+            except Exception as e:
+                logger.warning(f"Skipping invalid feature flag {row.get('name')}: {e}")
+        
+        self._rows = rows
+        self._snapshot = FlagSnapshot(flags, flag_version(rows.values()))
+        self._checked_at = time.monotonic()
     
     def _hash_user_for_percentage(self, user_id: str, feature_name: str) -> int:
         """
@@ -315,12 +334,7 @@ class FeatureFlagService:
         Returns:
             Integer between 0 and 99
         """
-        # Combine user ID and feature name for consistent hashing
-        hash_input = f"{user_id}:{feature_name}"
-        hash_bytes = hashlib.sha256(hash_input.encode()).digest()
-        # Convert first 4 bytes to integer and mod by 100
-        hash_int = int.from_bytes(hash_bytes[:4], byteorder='big')
-        return hash_int % 100
+        return percentage_bucket(user_id, feature_name)
     
     def _map_to_response(self, data: Dict[str, Any]) -> FeatureFlagResponse:
         """Map database record to response model"""
@@ -12,14 +12,15 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 import logging
+import math
 import hmac
 import hashlib
-from collections import defaultdict
-from threading import Lock
 
 from config.database import get_db
 from models.shareable_urls import ShareLinkValidation, FilteredProjectData, SharePermissionLevel
 from performance_optimization import CacheManager
+from services.rate_limiter import GUEST_KEY_PREFIX, RateLimiter, get_rate_limit_backend
+from services.share_link_cache import AccessLogBuffer, ShareResolutionCache
 
 
 class GuestAccessController:
@@ -43,21 +44,45 @@ class GuestAccessController:
     TOKEN_VALIDATION_CACHE_TTL = 60  # 1 minute for token validation
     PROJECT_DATA_CACHE_TTL = 300  # 5 minutes for filtered project data
     
-    def __init__(self, db_session=None, cache_manager: Optional[CacheManager] = None):
+    def __init__(
+        self,
+        db_session=None,
+        cache_manager: Optional[CacheManager] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        resolution_cache: Optional[ShareResolutionCache] = None,
+        access_log_buffer: Optional[AccessLogBuffer] = None
+    ):
         """
         Initialize the guest access controller.
         
         Args:
             db_session: Database client (defaults to global Supabase client)
             cache_manager: Cache manager for Redis caching (optional)
+            rate_limiter: Share link rate limiter (defaults to one private to this
+                instance; use shared_rate_limiter() to limit across requests and workers)
+            resolution_cache: In-process cache of filtered project payloads,
+                versioned by a project data version shared by all workers (optional)
+            access_log_buffer: Buffer for batched access log writes (optional;
+                access attempts are written synchronously without it)
         """
         self.db = db_session or get_db()
         self.logger = logging.getLogger(__name__)
         self.cache_manager = cache_manager
-        
-        # Rate limiting storage: {(ip_address, share_id): [(timestamp1, timestamp2, ...)]}
-        self._rate_limit_storage: Dict[tuple, list] = defaultdict(list)
-        self._rate_limit_lock = Lock()
+        self.rate_limiter = rate_limiter or RateLimiter(
+            self.RATE_LIMIT_REQUESTS, self.RATE_LIMIT_WINDOW, key_prefix=GUEST_KEY_PREFIX
+        )
+        self.resolution_cache = resolution_cache
+        self.access_log_buffer = access_log_buffer
+    
+    @classmethod
+    def shared_rate_limiter(cls) -> RateLimiter:
+        """Rate limiter over the process-wide backend (Redis when configured)"""
+        return RateLimiter(
+            cls.RATE_LIMIT_REQUESTS,
+            cls.RATE_LIMIT_WINDOW,
+            backend=get_rate_limit_backend(),
+            key_prefix=GUEST_KEY_PREFIX
+        )
     
     def _constant_time_compare(self, a: str, b: str) -> bool:
         """
@@ -260,9 +285,15 @@ class GuestAccessController:
                 error_message=None
             )
             
-            # Cache valid result with 1-minute TTL
+            # Cache valid result with 1-minute TTL, never beyond the link's expiry
             if self.cache_manager:
-                await self.cache_manager.set(cache_key, validation_result.dict(), ttl=self.TOKEN_VALIDATION_CACHE_TTL)
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                ttl = min(
+                    self.TOKEN_VALIDATION_CACHE_TTL,
+                    math.ceil((expires_at - datetime.now(timezone.utc)).total_seconds())
+                )
+                await self.cache_manager.set(cache_key, validation_result.dict(), ttl=max(ttl, 1))
             
             return validation_result
             
@@ -283,8 +314,8 @@ class GuestAccessController:
         """
         Check if an IP address has exceeded the rate limit for a share link.
         
-        Implements a sliding window rate limiter that tracks access attempts
-        per IP per share link. Limits to 10 requests per minute per IP.
+        Uses a sliding window counter per IP per share link (O(1) memory per
+        key). Limits to 10 requests per minute per IP.
         
         Args:
             ip_address: IP address of the requester
@@ -296,40 +327,22 @@ class GuestAccessController:
         Requirements: 7.4
         """
         try:
-            with self._rate_limit_lock:
-                # Create key for this IP + share combination
-                key = (ip_address, share_id)
-                
-                # Get current timestamp
-                now = datetime.now(timezone.utc).timestamp()
-                
-                # Get existing access timestamps for this key
-                access_times = self._rate_limit_storage[key]
-                
-                # Remove timestamps outside the current window
-                cutoff_time = now - self.RATE_LIMIT_WINDOW
-                access_times = [t for t in access_times if t > cutoff_time]
-                
-                # Check if rate limit exceeded
-                if len(access_times) >= self.RATE_LIMIT_REQUESTS:
-                    self.logger.warning(
-                        f"Rate limit exceeded: ip={ip_address}, share_id={share_id}, "
-                        f"requests={len(access_times)}"
-                    )
-                    return False
-                
-                # Add current access time
-                access_times.append(now)
-                
-                # Update storage
-                self._rate_limit_storage[key] = access_times
-                
-                self.logger.debug(
-                    f"Rate limit check passed: ip={ip_address}, share_id={share_id}, "
-                    f"requests={len(access_times)}/{self.RATE_LIMIT_REQUESTS}"
+            # Backend errors fail open inside the limiter (availability first)
+            result = self.rate_limiter.hit(ip_address, share_id)
+            
+            if not result.allowed:
+                self.logger.warning(
+                    f"Rate limit exceeded: ip={ip_address}, share_id={share_id}, "
+                    f"requests={result.count:.1f}, retry_after={result.retry_after:.0f}s"
                 )
-                
-                return True
+                return False
+            
+            self.logger.debug(
+                f"Rate limit check passed: ip={ip_address}, share_id={share_id}, "
+                f"requests={result.count + 1:.1f}/{self.RATE_LIMIT_REQUESTS}"
+            )
+            
+            return True
                 
         except Exception as e:
             self.logger.error(
@@ -351,6 +364,7 @@ class GuestAccessController:
         
         Records access attempts in the share_access_logs table for security
         monitoring and analytics. Includes IP address, user agent, and success status.
+        With an access log buffer, the attempt is queued and written in a batch.
         
         Args:
             share_id: UUID of the share link
@@ -364,6 +378,10 @@ class GuestAccessController:
         Requirements: 7.4
         """
         try:
+            if self.access_log_buffer:
+                self.access_log_buffer.add(share_id, ip_address, user_agent, success)
+                return True
+            
             if not self.db:
                 self.logger.error("Database client not available, cannot log access attempt")
                 return False
@@ -425,11 +443,10 @@ class GuestAccessController:
         Clear the rate limit cache.
         
         This method is primarily for testing purposes to reset rate limit state.
-        In production, old entries are automatically cleaned up during rate limit checks.
+        In production, idle entries expire after two windows.
         """
-        with self._rate_limit_lock:
-            self._rate_limit_storage.clear()
-            self.logger.info("Rate limit cache cleared")
+        self.rate_limiter.reset()
+        self.logger.info("Rate limit cache cleared")
     
     async def invalidate_project_cache(self, project_id: UUID) -> int:
         """
@@ -445,6 +462,9 @@ class GuestAccessController:
         Returns:
             int: Number of cache entries cleared
         """
+        if self.resolution_cache:
+            await self.resolution_cache.invalidate_project(project_id)
+        
         if not self.cache_manager:
             return 0
         
@@ -503,25 +523,21 @@ class GuestAccessController:
             share_id: Share link ID to check
             
         Returns:
-            Dict with 'requests_count', 'limit', 'window_seconds', 'is_limited'
+            Dict with 'requests_count', 'limit', 'window_seconds', 'is_limited',
+            'retry_after' and 'oldest_request_age' (age of the oldest counted window)
         """
         try:
-            with self._rate_limit_lock:
-                key = (ip_address, share_id)
-                now = datetime.now(timezone.utc).timestamp()
-                cutoff_time = now - self.RATE_LIMIT_WINDOW
-                
-                # Get and clean access times
-                access_times = self._rate_limit_storage.get(key, [])
-                access_times = [t for t in access_times if t > cutoff_time]
-                
-                return {
-                    "requests_count": len(access_times),
-                    "limit": self.RATE_LIMIT_REQUESTS,
-                    "window_seconds": self.RATE_LIMIT_WINDOW,
-                    "is_limited": len(access_times) >= self.RATE_LIMIT_REQUESTS,
-                    "oldest_request_age": int(now - access_times[0]) if access_times else None
-                }
+            result = self.rate_limiter.peek(ip_address, share_id)
+            count = math.ceil(result.count)
+            
+            return {
+                "requests_count": count,
+                "limit": self.RATE_LIMIT_REQUESTS,
+                "window_seconds": self.RATE_LIMIT_WINDOW,
+                "is_limited": not result.allowed,
+                "retry_after": int(math.ceil(result.retry_after)),
+                "oldest_request_age": int(result.window_age) if count else None
+            }
         except Exception as e:
             self.logger.error(f"Error getting rate limit info: {str(e)}")
             return {
@@ -529,6 +545,7 @@ class GuestAccessController:
                 "limit": self.RATE_LIMIT_REQUESTS,
                 "window_seconds": self.RATE_LIMIT_WINDOW,
                 "is_limited": False,
+                "retry_after": 0,
                 "oldest_request_age": None
             }
     
@@ -680,13 +697,31 @@ class GuestAccessController:
         Requirements: 2.2, 2.3, 2.4, 2.5, 5.2
         """
         try:
+            data_version = None
+            if self.resolution_cache:
+                # Project writes replace the version, so a cached payload is only
+                # served while the project is unchanged, whichever worker changed it
+                data_version = await self.resolution_cache.project_version(project_id)
+                cached_payload = self.resolution_cache.get_payload(
+                    project_id, permission_level.value, data_version
+                )
+                if cached_payload:
+                    return cached_payload
+            
             # Check cache first (5-minute TTL)
             cache_key = f"filtered_project:{project_id}:{permission_level.value}"
+            if data_version:
+                cache_key = f"{cache_key}:{data_version}"
             if self.cache_manager:
                 cached_data = await self.cache_manager.get(cache_key)
                 if cached_data:
                     self.logger.debug(f"Filtered project data cache hit: {project_id}, {permission_level}")
-                    return FilteredProjectData(**cached_data)
+                    filtered_project = FilteredProjectData(**cached_data)
+                    if self.resolution_cache and data_version:
+                        self.resolution_cache.put_payload(
+                            project_id, permission_level.value, data_version, filtered_project
+                        )
+                    return filtered_project
             
             if not self.db:
                 self.logger.error("Database client not available, cannot get project data")
@@ -818,6 +853,10 @@ class GuestAccessController:
             )
             
             # Cache the filtered result with 5-minute TTL
+            if self.resolution_cache and data_version:
+                self.resolution_cache.put_payload(
+                    project_id, permission_level.value, data_version, filtered_project
+                )
             if self.cache_manager:
                 await self.cache_manager.set(cache_key, filtered_project.dict(), ttl=self.PROJECT_DATA_CACHE_TTL)
             
@@ -3,19 +3,24 @@ Ingestion Orchestrator Service for RAG Knowledge Base
 Coordinates the document ingestion pipeline: parse → chunk → embed → store
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 
-from services.document_parser import DocumentParser, DocumentFormat, ParsingError
-from services.text_chunker import TextChunker, ChunkingError
+from services.document_parser import DocumentParser, DocumentFormat, ParsedDocument, ParsingError
+from services.text_chunker import Chunk, TextChunker, ChunkingError
 from services.embedding_service import EmbeddingService, EmbeddingServiceError
 from services.vector_store import VectorStore, VectorChunk, VectorStoreError
 
 logger = logging.getLogger(__name__)
 
+# Characters per page, for documents ingested without a page count
+CHARS_PER_PAGE = 3000
+
 
 class IngestionStatus(str, Enum):
     """Status of ingestion operation"""
@@ -83,6 +88,50 @@ class IngestionResult:
         }
 
 
+@dataclass
+class BatchIngestionStats:
+    """Throughput of a batch ingestion"""
+    documents: int
+    succeeded: int
+    chunks: int
+    pages: int
+    elapsed_seconds: float
+    documents_per_minute: float
+    pages_per_second: float
+    
+    @classmethod
+    def measure(
+        cls,
+        documents: int,
+        succeeded: int,
+        chunks: int,
+        pages: int,
+        elapsed_seconds: float
+    ) -> "BatchIngestionStats":
+        elapsed = max(elapsed_seconds, 1e-9)
+        return cls(
+            documents=documents,
+            succeeded=succeeded,
+            chunks=chunks,
+            pages=pages,
+            elapsed_seconds=elapsed_seconds,
+            documents_per_minute=succeeded * 60.0 / elapsed,
+            pages_per_second=pages / elapsed
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        return {
+            "documents": self.documents,
+            "succeeded": self.succeeded,
+            "chunks": self.chunks,
+            "pages": self.pages,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "documents_per_minute": round(self.documents_per_minute, 2),
+            "pages_per_second": round(self.pages_per_second, 2)
+        }
+
+
 class IngestionOrchestrator:
     """
     Orchestrates the document ingestion pipeline.
@@ -126,6 +175,7 @@ class IngestionOrchestrator:
         
         # Progress tracking
         self._progress_trackers: Dict[str, IngestionProgress] = {}
+        self._last_batch_stats: Optional[BatchIngestionStats] = None
         
         logger.info("IngestionOrchestrator initialized")
     
@@ -161,6 +211,24 @@ class IngestionOrchestrator:
         Raises:
             IngestionError: If ingestion fails at any stage
         """
+        return await self._run_pipeline(document_id, content, format, metadata, preserve_boundaries)
+    
+    async def _run_pipeline(
+        self,
+        document_id: str,
+        content: str,
+        format: DocumentFormat,
+        metadata: Optional[Dict[str, Any]],
+        preserve_boundaries: bool,
+        limits: Optional["_StageLimits"] = None
+    ) -> IngestionResult:
+        """
+        Run one document through parse → chunk → embed → store.
+        
+        With stage limits (batch ingestion), parsing and chunking run in a worker
+        thread and every stage is entered under its own semaphore, so documents
+        are pipelined: one is embedded while the next is being chunked.
+        """
         start_time = datetime.now()
         
         # Initialize progress tracking
@@ -178,104 +246,31 @@ class IngestionOrchestrator:
         try:
             logger.info(f"Starting ingestion for document: {document_id}")
             
-            # Stage 1: Parse document
-            progress.status = IngestionStatus.PARSING
-            progress.current_stage = "Parsing document"
-            progress.progress_percentage = 10.0
-            
-            logger.debug(f"[{document_id}] Stage 1: Parsing document")
-            
-            try:
-                parsed_doc = self.parser.parse(content, format)
-            except ParsingError as e:
-                raise IngestionError(f"Document parsing failed: {str(e)}") from e
-            
-            logger.info(
-                f"[{document_id}] Document parsed successfully: "
-                f"length={len(parsed_doc.content)}, format={format}"
-            )
-            
-            # Stage 2: Chunk text
-            progress.status = IngestionStatus.CHUNKING
-            progress.current_stage = "Chunking text"
-            progress.progress_percentage = 30.0
-            
-            logger.debug(f"[{document_id}] Stage 2: Chunking text")
-            
-            try:
-                # Prepare chunk metadata
-                chunk_metadata = metadata.copy() if metadata else {}
-                chunk_metadata.update({
-                    "document_title": parsed_doc.title,
-                    "format": format.value
-                })
-                
-                chunks = self.chunker.chunk_text(
-                    parsed_doc.content,
-                    preserve_boundaries=preserve_boundaries,
-                    metadata=chunk_metadata
+            # Stages 1 and 2: Parse document and chunk text (CPU-bound)
+            if limits:
+                async with limits.prepare:
+                    parsed_doc, chunks = await asyncio.to_thread(
+                        self._parse_and_chunk,
+                        document_id, content, format, metadata, preserve_boundaries, progress
+                    )
+            else:
+                parsed_doc, chunks = self._parse_and_chunk(
+                    document_id, content, format, metadata, preserve_boundaries, progress
                 )
-            except ChunkingError as e:
-                raise IngestionError(f"Text chunking failed: {str(e)}") from e
-            
-            progress.total_chunks = len(chunks)
-            
-            logger.info(
-                f"[{document_id}] Text chunked successfully: "
-                f"{len(chunks)} chunks created"
-            )
             
             # Stage 3: Generate embeddings
-            progress.status = IngestionStatus.EMBEDDING
-            progress.current_stage = "Generating embeddings"
-            progress.progress_percentage = 50.0
-            
-            logger.debug(f"[{document_id}] Stage 3: Generating embeddings")
-            
-            try:
-                # Extract chunk texts for batch embedding
-                chunk_texts = [chunk.content for chunk in chunks]
-                
-                # Generate embeddings in batch for efficiency
-                embeddings = await self.embedding_service.embed_batch_async(chunk_texts)
-                
-            except EmbeddingServiceError as e:
-                raise IngestionError(f"Embedding generation failed: {str(e)}") from e
-            
-            logger.info(
-                f"[{document_id}] Embeddings generated successfully: "
-                f"{len(embeddings)} embeddings"
-            )
+            if limits:
+                async with limits.embed:
+                    embeddings = await self._embed_chunks(document_id, chunks, progress)
+            else:
+                embeddings = await self._embed_chunks(document_id, chunks, progress)
             
             # Stage 4: Store in vector database
-            progress.status = IngestionStatus.STORING
-            progress.current_stage = "Storing in vector database"
-            progress.progress_percentage = 80.0
-            
-            logger.debug(f"[{document_id}] Stage 4: Storing in vector database")
-            
-            try:
-                # Create VectorChunk objects
-                vector_chunks = []
-                for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                    vector_chunk = VectorChunk(
-                        document_id=document_id,
-                        chunk_index=i,
-                        content=chunk.content,
-                        embedding=embedding,
-                        metadata=chunk.metadata
-                    )
-                    vector_chunks.append(vector_chunk)
-                    
-                    # Update progress
-                    progress.chunks_processed = i + 1
-                    progress.progress_percentage = 80.0 + (15.0 * (i + 1) / len(chunks))
-                
-                # Store chunks in vector database
-                await self.vector_store.upsert_chunks(vector_chunks)
-                
-            except VectorStoreError as e:
-                raise IngestionError(f"Vector store operation failed: {str(e)}") from e
+            if limits:
+                async with limits.store:
+                    await self._store_chunks(document_id, chunks, embeddings, progress)
+            else:
+                await self._store_chunks(document_id, chunks, embeddings, progress)
             
             # Complete
             progress.status = IngestionStatus.COMPLETED
@@ -326,6 +321,128 @@ class IngestionOrchestrator:
                 error_message=str(e)
             )
     
+    def _parse_and_chunk(
+        self,
+        document_id: str,
+        content: str,
+        format: DocumentFormat,
+        metadata: Optional[Dict[str, Any]],
+        preserve_boundaries: bool,
+        progress: IngestionProgress
+    ) -> Tuple[ParsedDocument, List[Chunk]]:
+        """Stages 1 and 2: parse the document and split its text into chunks"""
+        progress.status = IngestionStatus.PARSING
+        progress.current_stage = "Parsing document"
+        progress.progress_percentage = 10.0
+        
+        logger.debug(f"[{document_id}] Stage 1: Parsing document")
+        
+        try:
+            parsed_doc = self.parser.parse(content, format)
+        except ParsingError as e:
+            raise IngestionError(f"Document parsing failed: {str(e)}") from e
+        
+        logger.info(
+            f"[{document_id}] Document parsed successfully: "
+            f"length={len(parsed_doc.content)}, format={format}"
+        )
+        
+        progress.status = IngestionStatus.CHUNKING
+        progress.current_stage = "Chunking text"
+        progress.progress_percentage = 30.0
+        
+        logger.debug(f"[{document_id}] Stage 2: Chunking text")
+        
+        try:
+            # Prepare chunk metadata
+            chunk_metadata = metadata.copy() if metadata else {}
+            chunk_metadata.update({
+                "document_title": parsed_doc.title,
+                "format": format.value
+            })
+            
+            chunks = self.chunker.chunk_text(
+                parsed_doc.content,
+                preserve_boundaries=preserve_boundaries,
+                metadata=chunk_metadata
+            )
+        except ChunkingError as e:
+            raise IngestionError(f"Text chunking failed: {str(e)}") from e
+        
+        progress.total_chunks = len(chunks)
+        
+        logger.info(
+            f"[{document_id}] Text chunked successfully: "
+            f"{len(chunks)} chunks created"
+        )
+        
+        return parsed_doc, chunks
+    
+    async def _embed_chunks(
+        self,
+        document_id: str,
+        chunks: List[Chunk],
+        progress: IngestionProgress
+    ) -> List[List[float]]:
+        """Stage 3: generate embeddings for the chunks in one batch"""
+        progress.status = IngestionStatus.EMBEDDING
+        progress.current_stage = "Generating embeddings"
+        progress.progress_percentage = 50.0
+        
+        logger.debug(f"[{document_id}] Stage 3: Generating embeddings")
+        
+        try:
+            # Generate embeddings in batch for efficiency
+            embeddings = await self.embedding_service.embed_batch_async(
+                [chunk.content for chunk in chunks]
+            )
+        except EmbeddingServiceError as e:
+            raise IngestionError(f"Embedding generation failed: {str(e)}") from e
+        
+        logger.info(
+            f"[{document_id}] Embeddings generated successfully: "
+            f"{len(embeddings)} embeddings"
+        )
+        
+        return embeddings
+    
+    async def _store_chunks(
+        self,
+        document_id: str,
+        chunks: List[Chunk],
+        embeddings: List[List[float]],
+        progress: IngestionProgress
+    ) -> None:
+        """Stage 4: store the chunks and their embeddings in the vector database"""
+        progress.status = IngestionStatus.STORING
+        progress.current_stage = "Storing in vector database"
+        progress.progress_percentage = 80.0
+        
+        logger.debug(f"[{document_id}] Stage 4: Storing in vector database")
+        
+        try:
+            # Create VectorChunk objects
+            vector_chunks = []
+            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+                vector_chunk = VectorChunk(
+                    document_id=document_id,
+                    chunk_index=i,
+                    content=chunk.content,
+                    embedding=embedding,
+                    metadata=chunk.metadata
+                )
+                vector_chunks.append(vector_chunk)
+                
+                # Update progress
+                progress.chunks_processed = i + 1
+                progress.progress_percentage = 80.0 + (15.0 * (i + 1) / len(chunks))
+            
+            # Store chunks in vector database
+            await self.vector_store.upsert_chunks(vector_chunks)
+            
+        except VectorStoreError as e:
+            raise IngestionError(f"Vector store operation failed: {str(e)}") from e
+    
     async def update_document(
         self,
         document_id: str,
@@ -429,60 +546,112 @@ class IngestionOrchestrator:
     async def batch_ingest_documents(
         self,
         documents: List[Dict[str, Any]],
-        continue_on_error: bool = True
+        continue_on_error: bool = True,
+        max_concurrency: int = 4
     ) -> List[IngestionResult]:
         """
         Ingest multiple documents in batch.
         
+        Documents are pipelined through parse → chunk → embed → store with at
+        most max_concurrency documents in each stage, so parsing and chunking
+        overlap with embedding and storage of other documents. Throughput of
+        the batch is available from get_batch_stats() afterwards.
+        
         Args:
-            documents: List of document dicts with keys: id, content, format, metadata
-            continue_on_error: Whether to continue if one document fails
+            documents: List of document dicts with keys: id, content, format, metadata,
+                and optionally pages (page count used for throughput reporting)
+            continue_on_error: Whether to continue if one document fails; if not,
+                documents that have not started when a failure occurs are skipped
+            max_concurrency: Maximum number of documents in each pipeline stage
             
         Returns:
-            List of IngestionResult objects
+            List of IngestionResult objects, in the order of the documents
         """
-        logger.info(f"Starting batch ingestion: {len(documents)} documents")
+        logger.info(
+            f"Starting batch ingestion: {len(documents)} documents, "
+            f"max_concurrency={max_concurrency}"
+        )
         
-        results = []
+        limits = _StageLimits(max_concurrency)
+        stopped = asyncio.Event()
+        started = time.perf_counter()
         
-        for i, doc in enumerate(documents):
+        async def ingest(i: int, doc: Dict[str, Any]) -> Optional[IngestionResult]:
             document_id = doc.get('id')
-            content = doc.get('content')
-            format = doc.get('format', DocumentFormat.PLAIN_TEXT)
-            metadata = doc.get('metadata')
             
-            logger.info(f"Batch ingestion [{i+1}/{len(documents)}]: {document_id}")
-            
-            try:
-                result = await self.ingest_document(
-                    document_id=document_id,
-                    content=content,
-                    format=format,
-                    metadata=metadata
-                )
-                results.append(result)
+            # Documents wait here for a slot so skipped ones never start
+            async with limits.admit:
+                if stopped.is_set():
+                    return None
                 
-                if not result.success and not continue_on_error:
-                    logger.error(f"Batch ingestion stopped due to error: {result.error_message}")
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Batch ingestion error for {document_id}: {e}")
+                logger.info(f"Batch ingestion [{i+1}/{len(documents)}]: {document_id}")
                 
-                results.append(IngestionResult(
-                    document_id=document_id,
-                    success=False,
-                    chunks_created=0,
-                    processing_time_ms=0,
-                    error_message=str(e)
-                ))
-                
-                if not continue_on_error:
-                    break
+                try:
+                    result = await self._run_pipeline(
+                        document_id=document_id,
+                        content=doc.get('content'),
+                        format=doc.get('format', DocumentFormat.PLAIN_TEXT),
+                        metadata=doc.get('metadata'),
+                        preserve_boundaries=True,
+                        limits=limits
+                    )
+                except Exception as e:
+                    logger.error(f"Batch ingestion error for {document_id}: {e}")
+                    result = IngestionResult(
+                        document_id=document_id,
+                        success=False,
+                        chunks_created=0,
+                        processing_time_ms=0,
+                        error_message=str(e)
+                    )
+            
+            if not result.success and not continue_on_error:
+                logger.error(f"Batch ingestion stopped due to error: {result.error_message}")
+                stopped.set()
+            return result
+        
+        outcomes = await asyncio.gather(*(ingest(i, doc) for i, doc in enumerate(documents)))
+        results = [result for result in outcomes if result is not None]
+        
+        ingested = {result.document_id for result in results if result.success}
+        self._last_batch_stats = BatchIngestionStats.measure(
+            documents=len(results),
+            succeeded=len(ingested),
+            chunks=sum(result.chunks_created for result in results),
+            pages=sum(
+                _page_count(doc) for doc in documents if doc.get('id') in ingested
+            ),
+            elapsed_seconds=time.perf_counter() - started
+        )
         
-        successful = sum(1 for r in results if r.success)
         logger.info(
-            f"Batch ingestion completed: {successful}/{len(documents)} successful"
+            f"Batch ingestion completed: {len(ingested)}/{len(documents)} successful, "
+            f"{self._last_batch_stats.documents_per_minute:.1f} documents/min, "
+            f"{self._last_batch_stats.pages_per_second:.2f} pages/s"
         )
         
         return results
+    
+    def get_batch_stats(self) -> Optional[BatchIngestionStats]:
+        """Throughput of the last batch ingestion, or None if no batch has run"""
+        return self._last_batch_stats
+
+
+class _StageLimits:
+    """Concurrency limits of the batch ingestion pipeline"""
+    
+    def __init__(self, max_concurrency: int):
+        max_concurrency = max(1, max_concurrency)
+        # Documents in flight: every stage full plus one waiting to enter each
+        self.admit = asyncio.Semaphore(max_concurrency * 3)
+        self.prepare = asyncio.Semaphore(max_concurrency)
+        self.embed = asyncio.Semaphore(max_concurrency)
+        self.store = asyncio.Semaphore(max_concurrency)
+
+
+def _page_count(doc: Dict[str, Any]) -> int:
+    """Pages of a batch document: as given, or estimated from its length"""
+    pages = doc.get('pages') or (doc.get('metadata') or {}).get('page_count')
+    if pages:
+        return int(pages)
+    return max(1, -(-len(doc.get('content') or '') // CHARS_PER_PAGE))
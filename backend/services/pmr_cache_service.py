@@ -5,11 +5,10 @@ Implements caching strategies for frequently accessed reports and AI insights
 
 import os
 import logging
-import json
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
 from uuid import UUID
-from decimal import Decimal
+
+from utils.json_codec import dumps, loads
 
 try:
     import redis
@@ -22,18 +21,6 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
-class DecimalEncoder(json.JSONEncoder):
-    """Custom JSON encoder for Decimal types"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if isinstance(obj, UUID):
-            return str(obj)
-        return super().default(obj)
-
-
 class PMRCacheService:
     """
     Redis-based caching service for Enhanced PMR
@@ -107,7 +94,7 @@ class PMRCacheService:
             ttl = ttl or self.REPORT_TTL
             
             # Serialize report data
-            serialized = json.dumps(report_data, cls=DecimalEncoder)
+            serialized = dumps(report_data)
             
             # Store in Redis with TTL
             self.redis_client.setex(key, ttl, serialized)
@@ -130,7 +117,7 @@ class PMRCacheService:
             
             if cached:
                 logger.debug(f"Cache hit for report {report_id}")
-                return json.loads(cached)
+                return loads(cached)
             
             logger.debug(f"Cache miss for report {report_id}")
             return None
@@ -171,7 +158,7 @@ class PMRCacheService:
             key = f"{self.INSIGHTS_PREFIX}{report_id}"
             ttl = ttl or self.INSIGHTS_TTL
             
-            serialized = json.dumps(insights, cls=DecimalEncoder)
+            serialized = dumps(insights)
             self.redis_client.setex(key, ttl, serialized)
             
             logger.debug(f"Cached {len(insights)} insights for report {report_id}")
@@ -192,7 +179,7 @@ class PMRCacheService:
             
             if cached:
                 logger.debug(f"Cache hit for insights {report_id}")
-                return json.loads(cached)
+                return loads(cached)
             
             return None
             
@@ -216,7 +203,7 @@ class PMRCacheService:
             key = f"{self.MONTE_CARLO_PREFIX}{report_id}"
             ttl = ttl or self.MONTE_CARLO_TTL
             
-            serialized = json.dumps(results, cls=DecimalEncoder)
+            serialized = dumps(results)
             self.redis_client.setex(key, ttl, serialized)
             
             logger.debug(f"Cached Monte Carlo results for report {report_id}")
@@ -237,7 +224,7 @@ class PMRCacheService:
             
             if cached:
                 logger.debug(f"Cache hit for Monte Carlo {report_id}")
-                return json.loads(cached)
+                return loads(cached)
             
             return None
             
@@ -261,7 +248,7 @@ class PMRCacheService:
             key = f"{self.METRICS_PREFIX}{project_id}"
             ttl = ttl or self.METRICS_TTL
             
-            serialized = json.dumps(metrics, cls=DecimalEncoder)
+            serialized = dumps(metrics)
             self.redis_client.setex(key, ttl, serialized)
             
             logger.debug(f"Cached metrics for project {project_id}")
@@ -282,7 +269,7 @@ class PMRCacheService:
             
             if cached:
                 logger.debug(f"Cache hit for metrics {project_id}")
-                return json.loads(cached)
+                return loads(cached)
             
             return None
             
@@ -306,7 +293,7 @@ class PMRCacheService:
             key = f"{self.TEMPLATE_PREFIX}{template_id}"
             ttl = ttl or self.TEMPLATE_TTL
             
-            serialized = json.dumps(template_data, cls=DecimalEncoder)
+            serialized = dumps(template_data)
             self.redis_client.setex(key, ttl, serialized)
             
             logger.debug(f"Cached template {template_id}")
@@ -327,7 +314,7 @@ class PMRCacheService:
             
             if cached:
                 logger.debug(f"Cache hit for template {template_id}")
-                return json.loads(cached)
+                return loads(cached)
             
             return None
             
@@ -3,9 +3,11 @@ PMR Performance Optimizer
 Implements lazy loading, caching strategies, and performance monitoring for Enhanced PMR
 """
 
+import json
+import hashlib
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Set
 from datetime import datetime, timedelta
 from uuid import UUID
 from decimal import Decimal
@@ -15,6 +17,34 @@ from performance_optimization import CacheManager, PerformanceMonitor, create_ca
 logger = logging.getLogger(__name__)
 
 
+# Project data inputs each PMR section is computed from
+SECTION_INPUTS: Dict[str, tuple] = {
+    'ai_insights': ('budget', 'risks', 'schedule', 'metrics'),
+    'budget_simulation': ('budget',),
+    'schedule_simulation': ('schedule',),
+    'real_time_metrics': ('budget', 'schedule', 'risks', 'milestones', 'metrics'),
+}
+
+# Sections computed from the results of other sections
+SECTION_DEPENDENCIES: Dict[str, tuple] = {
+    'executive_summary': ('ai_insights', 'budget_simulation', 'schedule_simulation', 'real_time_metrics'),
+}
+
+
+def fingerprint_data(data: Any) -> str:
+    """Stable short hash of JSON-compatible data (rows, parameters)"""
+    serialized = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()[:16]
+
+
+def section_inputs(section_id: str) -> Set[str]:
+    """All data inputs of a section, including those of the sections it depends on"""
+    inputs = set(SECTION_INPUTS.get(section_id, ()))
+    for dependency in SECTION_DEPENDENCIES.get(section_id, ()):
+        inputs |= section_inputs(dependency)
+    return inputs
+
+
 class PMRPerformanceOptimizer:
     """
     Performance optimization service for Enhanced PMR
@@ -33,6 +63,7 @@ class PMRPerformanceOptimizer:
             'ai_insights': 180,          # 3 minutes
             'monte_carlo': 600,          # 10 minutes
             'sections': 120,             # 2 minutes
+            'fingerprinted_sections': 3600,  # 1 hour (invalidated by input changes)
             'templates': 1800,           # 30 minutes
             'collaboration': 30,         # 30 seconds (real-time)
             'export_jobs': 60            # 1 minute
@@ -119,32 +150,142 @@ class PMRPerformanceOptimizer:
         self,
         report_id: UUID,
         section_id: str,
-        section_data: Dict[str, Any],
-        ttl: Optional[int] = None
+        section_data: Any,
+        ttl: Optional[int] = None,
+        input_fingerprints: Optional[Dict[str, str]] = None,
+        parameters: Optional[Dict[str, Any]] = None
     ) -> bool:
-        """Cache individual section for lazy loading"""
+        """
+        Cache individual section for lazy loading
+        
+        When input fingerprints are given, the section is stored as a versioned
+        entry together with the fingerprint of the inputs it was computed from,
+        so it can be reused until one of those inputs changes.
+        """
         try:
             cache_key = create_cache_key('pmr', 'section', str(report_id), section_id)
-            ttl = ttl or self.CACHE_TTL['sections']
             
-            return await self.cache.set(cache_key, section_data, ttl)
+            if input_fingerprints is None:
+                ttl = ttl or self.CACHE_TTL['sections']
+                return await self.cache.set(cache_key, section_data, ttl)
+            
+            previous = await self.get_section_entry(report_id, section_id)
+            inputs = {
+                name: input_fingerprints.get(name)
+                for name in sorted(section_inputs(section_id))
+            }
+            entry = {
+                'section_id': section_id,
+                'section_version': (previous['section_version'] + 1) if previous else 1,
+                'fingerprint': self.section_fingerprint(section_id, input_fingerprints, parameters),
+                'inputs': inputs,
+                'data': section_data,
+                'cached_at': datetime.utcnow().isoformat()
+            }
+            ttl = ttl or self.CACHE_TTL['fingerprinted_sections']
+            
+            return await self.cache.set(cache_key, entry, ttl)
         except Exception as e:
             logger.error(f"Failed to cache section: {e}")
             return False
     
     async def get_cached_section(
+        self,
+        report_id: UUID,
+        section_id: str,
+        input_fingerprints: Optional[Dict[str, str]] = None,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Any]:
+        """
+        Get cached section
+        
+        With input fingerprints, a versioned entry is only returned if it was
+        computed from the same inputs and parameters; otherwise None is returned
+        and the section has to be recomputed.
+        """
+        try:
+            cache_key = create_cache_key('pmr', 'section', str(report_id), section_id)
+            cached = await self.cache.get(cache_key)
+            
+            if not self._is_section_entry(cached):
+                return cached if input_fingerprints is None else None
+            
+            if input_fingerprints is not None:
+                expected = self.section_fingerprint(section_id, input_fingerprints, parameters)
+                if cached['fingerprint'] != expected:
+                    logger.debug(f"Section {section_id} for {report_id} is stale")
+                    return None
+            
+            return cached['data']
+        except Exception as e:
+            logger.error(f"Failed to get cached section: {e}")
+            return None
+    
+    async def get_section_entry(
         self,
         report_id: UUID,
         section_id: str
     ) -> Optional[Dict[str, Any]]:
-        """Get cached section"""
+        """Get the versioned cache entry of a section, including its fingerprints"""
         try:
             cache_key = create_cache_key('pmr', 'section', str(report_id), section_id)
-            return await self.cache.get(cache_key)
+            cached = await self.cache.get(cache_key)
+            return cached if self._is_section_entry(cached) else None
         except Exception as e:
-            logger.error(f"Failed to get cached section: {e}")
+            logger.error(f"Failed to get section entry: {e}")
             return None
     
+    async def invalidate_sections(
+        self,
+        report_id: UUID,
+        changed_inputs: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Invalidate the cached sections affected by changed inputs
+        
+        Args:
+            report_id: Report (or project) the sections are cached for
+            changed_inputs: Changed data inputs such as 'budget' or 'risks';
+                None invalidates every section
+            
+        Returns:
+            IDs of the invalidated sections
+        """
+        try:
+            all_sections = set(SECTION_INPUTS) | set(SECTION_DEPENDENCIES)
+            if changed_inputs is None:
+                affected = all_sections
+            else:
+                changed = set(changed_inputs)
+                affected = {s for s in all_sections if section_inputs(s) & changed}
+            
+            for section_id in affected:
+                await self.cache.delete(
+                    create_cache_key('pmr', 'section', str(report_id), section_id)
+                )
+            
+            logger.info(f"Invalidated sections {sorted(affected)} for {report_id}")
+            return sorted(affected)
+        except Exception as e:
+            logger.error(f"Failed to invalidate sections: {e}")
+            return []
+    
+    def section_fingerprint(
+        self,
+        section_id: str,
+        input_fingerprints: Dict[str, str],
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Fingerprint of the inputs and parameters a section is computed from"""
+        inputs = {
+            name: input_fingerprints.get(name)
+            for name in sorted(section_inputs(section_id))
+        }
+        return fingerprint_data({'inputs': inputs, 'parameters': parameters or {}})
+    
+    def _is_section_entry(self, cached: Any) -> bool:
+        return isinstance(cached, dict) and 'section_version' in cached and 'fingerprint' in cached
+    
     async def cache_ai_insights(
         self,
         report_id: UUID,
@@ -512,4 +653,4 @@ class PMRPerformanceOptimizer:
 
 
 # Export
-__all__ = ['PMRPerformanceOptimizer']
+__all__ = ['PMRPerformanceOptimizer', 'SECTION_INPUTS', 'SECTION_DEPENDENCIES', 'fingerprint_data', 'section_inputs']
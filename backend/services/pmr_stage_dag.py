@@ -0,0 +1,156 @@
+"""
+PMR Stage DAG - Runs report generation stages as a dependency graph
+Independent stages run concurrently; each stage starts as soon as its dependencies complete
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Stage callables receive the results of completed stages, keyed by stage name
+StageRunner = Callable[[Dict[str, Any]], Awaitable[Any]]
+StageCallback = Callable[[str, Any, float], Awaitable[None]]
+
+
+@dataclass
+class PMRStage:
+    """A single report generation stage and the stages it depends on"""
+    name: str
+    run: StageRunner
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageTiming:
+    """Start and end offsets of a stage relative to the start of the DAG run"""
+    started_at: float
+    finished_at: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class DAGRunResult:
+    """Results and timings of a completed DAG run"""
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    total_time: float = 0.0
+
+    @property
+    def critical_stage_time(self) -> float:
+        """Duration of the longest single stage"""
+        return max((t.duration for t in self.timings.values()), default=0.0)
+
+
+class PMRStageDAG:
+    """
+    Dependency graph of report generation stages
+
+    Every stage runs in its own task and awaits only the stages it depends on,
+    so end-to-end latency approaches the longest dependency chain rather than
+    the sum of all stages. An optional callback is awaited when each stage
+    completes, before its dependents start, which is where sections are
+    persisted and announced.
+    """
+
+    def __init__(self, on_stage_complete: Optional[StageCallback] = None):
+        self._stages: Dict[str, PMRStage] = {}
+        self.on_stage_complete = on_stage_complete
+
+    def add_stage(
+        self,
+        name: str,
+        run: StageRunner,
+        depends_on: Optional[List[str]] = None
+    ) -> "PMRStageDAG":
+        """Register a stage; returns the DAG for chaining"""
+        if name in self._stages:
+            raise ValueError(f"Stage {name} is already registered")
+        self._stages[name] = PMRStage(name=name, run=run, depends_on=tuple(depends_on or ()))
+        return self
+
+    @property
+    def stage_names(self) -> List[str]:
+        return list(self._stages)
+
+    def validate(self) -> None:
+        """Raise ValueError for unknown dependencies or cycles"""
+        for stage in self._stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self._stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle involving {name}")
+            visiting.add(name)
+            for dependency in self._stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._stages:
+            visit(name)
+
+    async def run(self) -> DAGRunResult:
+        """
+        Run all stages, each as soon as its dependencies have completed
+
+        Raises:
+            ValueError: If the graph is invalid
+            Exception: The first stage failure; stages that have not finished are cancelled
+        """
+        self.validate()
+
+        run_result = DAGRunResult()
+        start = time.time()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: PMRStage):
+            if stage.depends_on:
+                await asyncio.gather(*(tasks[d] for d in stage.depends_on))
+
+            stage_start = time.time()
+            result = await stage.run(run_result.results)
+            run_result.results[stage.name] = result
+            run_result.timings[stage.name] = StageTiming(
+                started_at=stage_start - start,
+                finished_at=time.time() - start
+            )
+
+            if self.on_stage_complete:
+                await self.on_stage_complete(
+                    stage.name, result, run_result.timings[stage.name].duration
+                )
+            return result
+
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            run_result.total_time = time.time() - start
+
+        logger.debug(
+            "PMR stage DAG completed in %.3fs: %s",
+            run_result.total_time,
+            {name: round(t.duration, 3) for name, t in run_result.timings.items()}
+        )
+        return run_result
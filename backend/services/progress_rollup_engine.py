@@ -0,0 +1,173 @@
+"""
+Progress Rollup Engine
+
+Applies progress changes to a task or WBS tree held in memory:
+- Loads the tree once (one row per task/element with its parent)
+- Recomputes only the ancestors of changed nodes, bottom-up
+- Returns every ancestor whose progress or status changed, for one bulk write
+
+Tasks are rolled up effort-weighted (planned_effort_hours, default weight 1)
+and truncated to whole percent; WBS elements use the simple average of their
+children, rounded to whole percent.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _task_status(progress: int, current_status: Optional[str]) -> Optional[str]:
+    """Parent task status after rollup; unchanged unless started or complete"""
+    from models.schedule import TaskStatus
+
+    if progress == 100:
+        return TaskStatus.COMPLETED.value
+    if progress > 0:
+        return TaskStatus.IN_PROGRESS.value
+    return current_status
+
+
+class ProgressRollupEngine:
+    """
+    In-memory progress tree for one or more schedules.
+
+    Use for_tasks() or for_wbs() to get the rollup rules of each hierarchy.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        parent_key: str,
+        weight_key: Optional[str] = None,
+        round_progress: Callable[[float], int] = lambda value: int(round(value)),
+        status_rule: Optional[Callable[[int, Optional[str]], Optional[str]]] = None,
+        childless_progress: Optional[float] = None
+    ):
+        """
+        Args:
+            rows: Tree rows with id, parent, progress_percentage and optional weight/status
+            parent_key: Column holding the parent ID
+            weight_key: Column holding the child weight (None for a simple average)
+            round_progress: Conversion of the rolled-up value to stored progress
+            status_rule: Optional status of a parent given its new progress and current status
+            childless_progress: Progress of a recomputed parent that no longer has
+                children (None leaves it unchanged)
+        """
+        self.weight_key = weight_key
+        self.round_progress = round_progress
+        self.status_rule = status_rule
+        self.childless_progress = childless_progress
+
+        self.parents: Dict[str, Optional[str]] = {}
+        self.progress: Dict[str, float] = {}
+        self.weights: Dict[str, float] = {}
+        self.statuses: Dict[str, Optional[str]] = {}
+        self.children: Dict[str, List[str]] = {}
+
+        for row in rows:
+            node_id = str(row["id"])
+            parent_id = row.get(parent_key)
+            self.parents[node_id] = str(parent_id) if parent_id else None
+            self.progress[node_id] = row.get("progress_percentage") or 0
+            self.weights[node_id] = float(row.get(weight_key) or 1) if weight_key else 1.0
+            self.statuses[node_id] = row.get("status")
+
+        for node_id, parent_id in self.parents.items():
+            if parent_id in self.parents:
+                self.children.setdefault(parent_id, []).append(node_id)
+
+        self._depths: Dict[str, int] = {}
+
+    @classmethod
+    def for_tasks(cls, rows: Iterable[Dict[str, Any]]) -> "ProgressRollupEngine":
+        """Effort-weighted task rollup, as in ScheduleManager.calculate_task_rollup_progress"""
+        return cls(
+            rows,
+            parent_key="parent_task_id",
+            weight_key="planned_effort_hours",
+            round_progress=lambda value: int(round(value, 2)),
+            status_rule=_task_status,
+            childless_progress=0.0
+        )
+
+    @classmethod
+    def for_wbs(cls, rows: Iterable[Dict[str, Any]]) -> "ProgressRollupEngine":
+        """Simple-average WBS element rollup"""
+        return cls(rows, parent_key="parent_element_id")
+
+    def apply(self, changes: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+        """
+        Set the progress of changed nodes and roll it up to their ancestors.
+
+        Args:
+            changes: New progress percentage by node ID
+
+        Returns:
+            Changed ancestors: {id: {"progress_percentage": ..., "status": ...}}
+        """
+        ancestors = set()
+        for node_id, progress in changes.items():
+            node_id = str(node_id)
+            if node_id not in self.parents:
+                continue
+            self.progress[node_id] = progress
+            ancestors.update(self._ancestors(node_id))
+
+        return self._rollup(ancestors)
+
+    def recalculate_all(self) -> Dict[str, Dict[str, Any]]:
+        """Recompute every parent node; returns those whose values changed"""
+        return self._rollup(set(self.children))
+
+    def rollup_parents(self, parent_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Recompute the given parents and their ancestors (e.g. after a child changed or was removed)"""
+        ancestors = set()
+        for parent_id in parent_ids:
+            parent_id = str(parent_id)
+            if parent_id in self.parents:
+                ancestors.add(parent_id)
+                ancestors.update(self._ancestors(parent_id))
+        return self._rollup(ancestors)
+
+    def _rollup(self, node_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        # Deepest first, so each parent sees its children's new values
+        changed = {}
+        for node_id in sorted(node_ids, key=self._depth, reverse=True):
+            children = self.children.get(node_id)
+            if children:
+                total_weight = sum(self.weights[c] for c in children)
+                value = sum(self.progress[c] * self.weights[c] for c in children) / total_weight
+            elif self.childless_progress is not None:
+                value = self.childless_progress
+            else:
+                continue
+
+            progress = self.round_progress(value)
+            status = self.statuses[node_id]
+            if self.status_rule:
+                status = self.status_rule(progress, status)
+
+            if progress != self.progress[node_id] or status != self.statuses[node_id]:
+                changed[node_id] = {"progress_percentage": progress}
+                if self.status_rule:
+                    changed[node_id]["status"] = status
+            self.progress[node_id] = progress
+            self.statuses[node_id] = status
+
+        return changed
+
+    def _ancestors(self, node_id: str) -> List[str]:
+        ancestors = []
+        seen = {node_id}
+        parent_id = self.parents.get(node_id)
+        while parent_id in self.parents and parent_id not in seen:
+            ancestors.append(parent_id)
+            seen.add(parent_id)
+            parent_id = self.parents[parent_id]
+        return ancestors
+
+    def _depth(self, node_id: str) -> int:
+        if node_id not in self._depths:
+            self._depths[node_id] = len(self._ancestors(node_id))
+        return self._depths[node_id]
@@ -12,6 +12,7 @@ from uuid import UUID
 from supabase import Client
 
 from models.project_controls import ValidationResult
+from services.earned_value_engine import EarnedValueEngine, INDEX_PLACES, to_decimal
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -71,33 +72,51 @@ class ProjectControlsBaseService(ABC):
             logger.error(f"Failed to get work packages for {project_id}: {e}")
             return []
 
-    async def get_financial_data(self, project_id: UUID) -> Dict[str, Decimal]:
+    async def load_earned_value_engine(self, project_ids: List[UUID]) -> EarnedValueEngine:
+        """
+        Load projects, active work packages and financial tracking records of
+        the given projects in one query each.
+        """
+        ids = [str(project_id) for project_id in project_ids]
+        
+        projects_result = self.supabase.table('projects')\
+            .select('id, budget')\
+            .in_('id', ids)\
+            .execute()
+        
+        packages_result = self.supabase.table('work_packages')\
+            .select('*')\
+            .in_('project_id', ids)\
+            .eq('is_active', True)\
+            .execute()
+        
+        financial_result = self.supabase.table('financial_tracking')\
+            .select('project_id, actual_amount, date_incurred')\
+            .in_('project_id', ids)\
+            .execute()
+        
+        # Keep requested order; projects that do not exist have no budget
+        projects = {str(p['id']): p for p in projects_result.data or []}
+        return EarnedValueEngine.for_work_packages(
+            [projects.get(project_id, {'id': project_id, 'budget': 0}) for project_id in ids],
+            packages_result.data or [],
+            financial_result.data or [],
+            minimum_index=self.minimum_cpi_threshold
+        )
+
+    async def get_financial_data(self, project_id: UUID,
+                                 engine: Optional[EarnedValueEngine] = None) -> Dict[str, Decimal]:
         """Get current financial data for a project"""
         try:
-            # Get actual costs from financial tracking
-            financial_result = self.supabase.table('financial_tracking')\
-                .select('actual_amount')\
-                .eq('project_id', str(project_id))\
-                .execute()
-            
-            actual_cost = Decimal('0')
-            if financial_result.data:
-                actual_cost = sum(Decimal(str(record['actual_amount'] or 0)) 
-                                for record in financial_result.data)
-            
-            # Get budget from project
-            project_data = await self.get_project_data(project_id)
-            budget = Decimal(str(project_data.get('budget', 0))) if project_data else Decimal('0')
-            
-            # Get earned value from work packages
-            work_packages = await self.get_work_packages(project_id)
-            earned_value = sum(Decimal(str(wp.get('earned_value', 0))) for wp in work_packages)
+            engine = engine or await self.load_earned_value_engine([project_id])
+            snapshot = engine.compute().snapshot(engine.group_position(str(project_id)))
             
             return {
-                'budget_at_completion': budget,
-                'actual_cost': actual_cost,
-                'earned_value': earned_value,
-                'planned_value': budget  # Simplified - would need schedule data for accurate PV
+                'budget_at_completion': snapshot['budget_at_completion'],
+                'actual_cost': snapshot['actual_cost'],
+                'earned_value': snapshot['earned_value'],
+                # Work package budgets phased over their dates, scaled to the project budget
+                'planned_value': snapshot['planned_value']
             }
             
         except Exception as e:
@@ -109,6 +128,67 @@ class ProjectControlsBaseService(ABC):
                 'planned_value': Decimal('0')
             }
 
+    async def get_portfolio_earned_value(self, project_ids: List[UUID],
+                                         status_dates: Optional[List[date]] = None) -> Dict[str, Any]:
+        """
+        Earned value dashboard for many projects, computed in one pass.
+        
+        Args:
+            project_ids: Projects to include
+            status_dates: Period end dates for trends (today only if None);
+                earned value is only known at the latest one
+            
+        Returns:
+            Dictionary with per-project metrics and portfolio totals at the last status date
+        """
+        try:
+            engine = await self.load_earned_value_engine(project_ids)
+            metrics = engine.compute(sorted(status_dates) if status_dates else None)
+            
+            projects = []
+            for position, project_id in enumerate(metrics.group_ids):
+                snapshot = metrics.snapshot(position)
+                projects.append({
+                    'project_id': project_id,
+                    **{key: float(value) for key, value in snapshot.items() if isinstance(value, Decimal)},
+                    'estimate_at_completion': {
+                        method: float(value) for method, value in snapshot['estimate_at_completion'].items()
+                    },
+                    'estimate_to_complete': {
+                        method: float(value) for method, value in snapshot['estimate_to_complete'].items()
+                    },
+                    'performance_status': self.determine_performance_status(
+                        snapshot['cost_performance_index'], snapshot['schedule_performance_index']
+                    ),
+                    'periods': metrics.period_series(position) if status_dates else []
+                })
+            
+            totals = {
+                'budget_at_completion': metrics.budget_at_completion.sum(),
+                'planned_value': metrics.planned_value[:, -1].sum(),
+                'earned_value': metrics.earned_value[:, -1].sum(),
+                'actual_cost': metrics.actual_cost[:, -1].sum()
+            }
+            portfolio_cpi = totals['earned_value'] / totals['actual_cost'] if totals['actual_cost'] > 0 else 1.0
+            portfolio_spi = totals['earned_value'] / totals['planned_value'] if totals['planned_value'] > 0 else 1.0
+            
+            return {
+                'status_date': metrics.status_dates[-1].isoformat(),
+                'projects': projects,
+                'portfolio': {
+                    **{key: float(to_decimal(value)) for key, value in totals.items()},
+                    'cost_performance_index': float(to_decimal(portfolio_cpi, INDEX_PLACES)),
+                    'schedule_performance_index': float(to_decimal(portfolio_spi, INDEX_PLACES)),
+                    'estimate_at_completion': float(to_decimal(
+                        metrics.estimate_at_completion['current_performance'][:, -1].sum()
+                    ))
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to calculate portfolio earned value: {e}")
+            raise RuntimeError(f"Failed to calculate portfolio earned value: {str(e)}")
+
     def calculate_performance_indices(self, planned_value: Decimal, earned_value: Decimal, 
                                     actual_cost: Decimal, budget_at_completion: Decimal) -> Dict[str, Decimal]:
         """Calculate standard earned value performance indices"""
@@ -14,6 +14,7 @@ import logging
 
 from config.database import supabase
 from models.change_management import ChangeRequestResponse
+from services.share_link_cache import get_share_resolution_cache
 
 logger = logging.getLogger(__name__)
 
@@ -339,6 +340,7 @@ class ProjectIntegrationService:
             
             # Update project
             update_result = self.db.table("projects").update(update_data).eq("id", project_id).execute()
+            await get_share_resolution_cache().invalidate_project(project_id)
             
             # Log baseline update
             if update_result.data:
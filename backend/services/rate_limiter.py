@@ -0,0 +1,276 @@
+"""
+Sliding-window-counter rate limiting
+
+Each key keeps two counters - the current and the previous fixed window -
+and a request is admitted while
+
+    previous * (1 - elapsed / window) + current + cost <= limit
+
+which approximates a true sliding window in O(1) memory per key, without
+per-request timestamps. Backends:
+- RedisRateLimitBackend: one atomic Lua script per check, shared by all workers
+- MemoryRateLimitBackend: process-local, entries evicted once idle for two windows
+
+The slowapi limiter in performance_optimization uses the same algorithm
+("sliding-window-counter" in the limits library) over the same storage URI.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Key prefixes of the limiters sharing a backend
+GUEST_KEY_PREFIX = "ratelimit:guest"
+API_KEY_PREFIX = "ratelimit:api"
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    count: float  # Weighted number of requests in the sliding window
+    limit: int
+    window_seconds: int
+    retry_after: float  # Seconds until a request of the same cost is admitted (0 if allowed)
+    window_age: float  # Seconds since the oldest counted window started
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - math.ceil(self.count))
+
+
+def sliding_window(previous: int, current: int, elapsed: float, window: int,
+                   limit: int, cost: int) -> Tuple[bool, float, float]:
+    """
+    Evaluate a sliding window counter.
+
+    Args:
+        previous: Requests counted in the previous window
+        current: Requests counted in the current window
+        elapsed: Seconds elapsed in the current window
+        window: Window size in seconds
+        limit: Maximum weighted requests per window
+        cost: Weight of the request being checked
+
+    Returns:
+        (allowed, weighted count before this request, retry after seconds)
+    """
+    weight = 1.0 - elapsed / window
+    count = previous * weight + current
+    if count + cost <= limit:
+        return True, count, 0.0
+
+    if current + cost > limit:
+        # Not admissible until the current window becomes the previous one
+        # and its weight has decayed enough
+        decay = 1.0 - (limit - cost) / current if current else 1.0
+        return False, count, window - elapsed + window * max(0.0, decay)
+
+    # Admissible once the previous window has decayed enough
+    needed_weight = (limit - current - cost) / previous
+    return False, count, max(0.0, (weight - needed_weight) * window)
+
+
+class MemoryRateLimitBackend:
+    """
+    Process-local counters.
+
+    Entries are kept in least-recently-used order, so expired ones are evicted
+    from the front in amortized O(1) on every check.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time, max_keys: int = 100000):
+        self.clock = clock
+        self.max_keys = max_keys
+        # key -> [window index, current count, previous count, expires at]
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def hit(self, key: str, limit: int, window: int, cost: int = 1, record: bool = True) -> RateLimitResult:
+        """Count a request of the given cost against a key if it is within the limit"""
+        now = self.clock()
+        index, elapsed = divmod(now, window)
+
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            previous, current = self._counts(entry, index)
+
+            allowed, count, retry_after = sliding_window(previous, current, elapsed, window, limit, cost)
+            if record:
+                if allowed:
+                    current += cost
+                if entry is None:
+                    if len(self._entries) >= self.max_keys:
+                        self._entries.popitem(last=False)
+                    entry = self._entries[key] = [0, 0, 0, 0]
+                else:
+                    self._entries.move_to_end(key)
+                entry[:] = [index, current, previous, (index + 2) * window]
+
+        return RateLimitResult(allowed, count, limit, window, retry_after,
+                               elapsed + window if previous else elapsed)
+
+    def reset(self, prefix: str = "") -> None:
+        """Drop the counters of every key starting with prefix"""
+        with self._lock:
+            if not prefix:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[3] > now:
+                break
+            del self._entries[key]
+
+    @staticmethod
+    def _counts(entry: Optional[List[float]], index: float) -> Tuple[int, int]:
+        if entry is None:
+            return 0, 0
+        if entry[0] == index:
+            return entry[2], entry[1]
+        if entry[0] == index - 1:
+            return entry[1], 0
+        return 0, 0
+
+
+# KEYS[1]: counter hash; ARGV: limit, window, cost, record (0 or 1)
+# Uses the server clock so every worker sees the same windows.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local record = ARGV[4] == '1'
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local index = math.floor(now / window)
+local elapsed = now - index * window
+
+local state = redis.call('HMGET', KEYS[1], 'w', 'c', 'p')
+local stored = tonumber(state[1])
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if stored ~= index then
+    if stored == index - 1 then previous = current else previous = 0 end
+    current = 0
+end
+
+local weight = 1 - elapsed / window
+local count = previous * weight + current
+local allowed = 0
+if count + cost <= limit then
+    allowed = 1
+end
+if record then
+    redis.call('HSET', KEYS[1], 'w', index, 'c', current + allowed * cost, 'p', previous)
+    redis.call('EXPIREAT', KEYS[1], (index + 2) * window)
+end
+return {allowed, previous, current, tostring(elapsed)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Counters shared by all workers, updated by one atomic Lua script per check"""
+
+    def __init__(self, client):
+        self.client = client
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, key: str, limit: int, window: int, cost: int = 1, record: bool = True) -> RateLimitResult:
+        """Count a request of the given cost against a key if it is within the limit"""
+        allowed, previous, current, elapsed = self._script(
+            keys=[key], args=[limit, window, cost, int(record)]
+        )
+        previous, current, elapsed = int(previous), int(current), float(elapsed)
+        _, count, retry_after = sliding_window(previous, current, elapsed, window, limit, cost)
+        return RateLimitResult(bool(int(allowed)), count, limit, window,
+                               0.0 if int(allowed) else retry_after,
+                               elapsed + window if previous else elapsed)
+
+    def reset(self, prefix: str = "") -> None:
+        """Drop the counters of every key starting with prefix"""
+        keys = list(self.client.scan_iter(match=f"{prefix}*", count=500))
+        if keys:
+            self.client.delete(*keys)
+
+
+class RateLimiter:
+    """
+    A named limit (e.g. 10 requests per 60 seconds) over a backend.
+
+    Backend errors fail open: availability of share links and the API takes
+    precedence over enforcing the limit.
+    """
+
+    def __init__(self, limit: int, window_seconds: int, backend=None, key_prefix: str = "ratelimit"):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self.key_prefix = key_prefix
+
+    def key(self, *parts: str) -> str:
+        return ":".join((self.key_prefix, *(str(part) for part in parts)))
+
+    def hit(self, *parts: str, cost: int = 1, record: bool = True) -> RateLimitResult:
+        """Count a request against the key built from parts"""
+        try:
+            return self.backend.hit(self.key(*parts), self.limit, self.window_seconds, cost, record)
+        except Exception as e:
+            logger.error(f"Rate limit backend error: {e}")
+            return RateLimitResult(True, 0.0, self.limit, self.window_seconds, 0.0, 0.0)
+
+    def peek(self, *parts: str) -> RateLimitResult:
+        """Whether a request would be admitted for the key built from parts, without counting it"""
+        return self.hit(*parts, record=False)
+
+    def reset(self) -> None:
+        """Drop the counters of this limiter"""
+        self.backend.reset(self.key_prefix)
+
+
+_backend = None
+_backend_lock = Lock()
+
+
+def storage_uri() -> str:
+    """Storage URI shared by the guest and API limiters"""
+    return settings.REDIS_URL or "memory://"
+
+
+def get_rate_limit_backend():
+    """Process-wide backend: Redis when REDIS_URL is reachable, in-memory otherwise"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend()
+    return _backend
+
+
+def _create_backend():
+    if settings.REDIS_URL:
+        try:
+            import redis
+
+            client = redis.from_url(settings.REDIS_URL, socket_connect_timeout=2, socket_timeout=2)
+            client.ping()
+            logger.info("Rate limiting uses Redis")
+            return RedisRateLimitBackend(client)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for rate limiting, using in-memory counters: {e}")
+    return MemoryRateLimitBackend()
@@ -4,25 +4,15 @@ Provides caching strategies for frequently accessed reports and data
 """
 
 import os
-import json
 import logging
 from typing import Any, Optional, Dict, List
 from datetime import datetime, timedelta
-from decimal import Decimal
 import redis
 from redis.exceptions import RedisError
 
-logger = logging.getLogger(__name__)
-
+from utils.json_codec import dumps, encoded, loads
 
-class DecimalEncoder(json.JSONEncoder):
-    """Custom JSON encoder for Decimal types"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+logger = logging.getLogger(__name__)
 
 
 class RedisCacheService:
@@ -73,10 +63,29 @@ class RedisCacheService:
             value = self.client.get(key)
             if value:
                 logger.debug(f"Cache HIT: {key}")
-                return json.loads(value)
+                return loads(value)
             logger.debug(f"Cache MISS: {key}")
             return None
-        except (RedisError, json.JSONDecodeError) as e:
+        except (RedisError, ValueError) as e:
+            logger.error(f"Cache get error for key {key}: {e}")
+            return None
+    
+    def get_encoded(self, key: str) -> Optional[bytes]:
+        """
+        Get the stored JSON of a value without decoding it
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            JSON bytes, ready to be sent with EncodedJSONResponse, or None
+        """
+        if not self.enabled or not self.client:
+            return None
+        
+        try:
+            return encoded(self.client.get(key))
+        except RedisError as e:
             logger.error(f"Cache get error for key {key}: {e}")
             return None
     
@@ -101,7 +110,7 @@ class RedisCacheService:
             return False
         
         try:
-            serialized = json.dumps(value, cls=DecimalEncoder)
+            serialized = dumps(value)
             self.client.setex(key, ttl, serialized)
             logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
             return True
@@ -0,0 +1,510 @@
+"""
+Request metrics core
+
+Single place where request latencies are recorded. The performance tracker,
+the API performance monitor, the admin endpoints and the Prometheus /metrics
+exposition all read from it:
+- one HDR histogram per method and route template (GET /api/projects/{id},
+  not the raw path), giving p50/p95/p99/p99.9 from a few KB per route
+- time-bucketed counters (10 second buckets over the last 5 minutes) for
+  request and error rates
+- recording takes no lock: each thread records into its own shard, and
+  readers merge the shards into a MetricsSnapshot
+- each worker publishes its snapshot to Redis; cluster_snapshot() merges the
+  snapshots of all live workers, so any worker can serve cluster-wide metrics
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from utils.hdr_histogram import DEFAULT_PERCENTILES, HdrHistogram
+from utils.json_codec import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Route label of requests that matched no route, so unknown paths cannot
+# create a series each
+UNMATCHED_ROUTE = "<unmatched>"
+WORKER_KEY_PREFIX = "metrics:worker"
+
+# Latencies are recorded in microseconds
+MICROSECONDS = 1_000_000
+RATE_WINDOW_SECONDS = 60
+# Bucket bounds of the Prometheus histogram, in seconds
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SeriesKey = Tuple[str, str]
+
+
+class RouteSeries:
+    """Latency histogram, status counts and rate buckets of one route, for one thread"""
+
+    __slots__ = ("histogram", "errors", "status", "rate_epochs", "rate_counts", "rate_errors")
+
+    def __init__(self, rate_buckets: int):
+        self.histogram = HdrHistogram()
+        self.errors = 0
+        self.status: Dict[str, int] = {}
+        self.rate_epochs = [-1] * rate_buckets
+        self.rate_counts = [0] * rate_buckets
+        self.rate_errors = [0] * rate_buckets
+
+    def record(self, micros: int, status_code: int, epoch: int) -> None:
+        self.histogram.record(micros)
+        status_class = f"{status_code // 100}xx"
+        self.status[status_class] = self.status.get(status_class, 0) + 1
+        error = status_code >= 400
+        if error:
+            self.errors += 1
+
+        slot = epoch % len(self.rate_epochs)
+        if self.rate_epochs[slot] != epoch:
+            self.rate_epochs[slot] = epoch
+            self.rate_counts[slot] = 0
+            self.rate_errors[slot] = 0
+        self.rate_counts[slot] += 1
+        if error:
+            self.rate_errors[slot] += 1
+
+
+class SeriesTotals:
+    """Merged metrics of one route across threads and workers"""
+
+    __slots__ = ("histogram", "errors", "status", "rates")
+
+    def __init__(self):
+        self.histogram = HdrHistogram()
+        self.errors = 0
+        self.status: Dict[str, int] = {}
+        # epoch -> [requests, errors]
+        self.rates: Dict[int, List[int]] = {}
+
+    def add_series(self, series: RouteSeries) -> None:
+        self.histogram.merge(series.histogram)
+        self.errors += series.errors
+        for status_class, count in list(series.status.items()):
+            self.status[status_class] = self.status.get(status_class, 0) + count
+        for epoch, count, errors in zip(series.rate_epochs, series.rate_counts, series.rate_errors):
+            if epoch >= 0:
+                self._add_rate(epoch, count, errors)
+
+    def merge(self, other: "SeriesTotals") -> None:
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        for status_class, count in other.status.items():
+            self.status[status_class] = self.status.get(status_class, 0) + count
+        for epoch, (count, errors) in other.rates.items():
+            self._add_rate(epoch, count, errors)
+
+    def _add_rate(self, epoch: int, count: int, errors: int) -> None:
+        totals = self.rates.setdefault(epoch, [0, 0])
+        totals[0] += count
+        totals[1] += errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "histogram": self.histogram.to_dict(),
+            "errors": self.errors,
+            "status": dict(self.status),
+            "rates": [[epoch, count, errors] for epoch, (count, errors) in sorted(self.rates.items())]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SeriesTotals":
+        totals = cls()
+        totals.histogram = HdrHistogram.from_dict(data.get("histogram") or {})
+        totals.errors = data.get("errors", 0)
+        totals.status = dict(data.get("status") or {})
+        for epoch, count, errors in data.get("rates") or []:
+            totals._add_rate(epoch, count, errors)
+        return totals
+
+
+class MetricsSnapshot:
+    """Merged request metrics of one or more threads or workers"""
+
+    def __init__(self, bucket_seconds: int, workers: Optional[List[str]] = None):
+        self.bucket_seconds = bucket_seconds
+        self.workers: List[str] = list(workers or [])
+        self.series: Dict[SeriesKey, SeriesTotals] = {}
+
+    def totals(self, method: str, route: str) -> SeriesTotals:
+        key = (method, route)
+        totals = self.series.get(key)
+        if totals is None:
+            totals = self.series[key] = SeriesTotals()
+        return totals
+
+    def merge(self, other: "MetricsSnapshot") -> "MetricsSnapshot":
+        for (method, route), totals in other.series.items():
+            self.totals(method, route).merge(totals)
+        self.workers.extend(worker for worker in other.workers if worker not in self.workers)
+        return self
+
+    @property
+    def total_requests(self) -> int:
+        return sum(totals.histogram.count for totals in self.series.values())
+
+    @property
+    def total_errors(self) -> int:
+        return sum(totals.errors for totals in self.series.values())
+
+    def overall(self) -> SeriesTotals:
+        """All routes merged"""
+        overall = SeriesTotals()
+        for totals in self.series.values():
+            overall.merge(totals)
+        return overall
+
+    def rate(self, totals: SeriesTotals, now: Optional[float] = None) -> Tuple[float, float]:
+        """Requests and errors per second over the last minute"""
+        now = time.time() if now is None else now
+        current = int(now // self.bucket_seconds)
+        window = max(1, RATE_WINDOW_SECONDS // self.bucket_seconds)
+        oldest = current - window + 1
+        requests = errors = 0
+        for epoch, (count, error_count) in totals.rates.items():
+            if oldest <= epoch <= current:
+                requests += count
+                errors += error_count
+        elapsed = max(now - oldest * self.bucket_seconds, 1e-9)
+        return requests / elapsed, errors / elapsed
+
+    def summarize(
+        self,
+        totals: SeriesTotals,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Count, error rate, latency statistics (seconds) and rates of one series"""
+        histogram = totals.histogram
+        values = histogram.percentiles(percentiles)
+        requests_per_second, errors_per_second = self.rate(totals, now)
+        summary = {
+            "count": histogram.count,
+            "errors": totals.errors,
+            "error_rate": round(totals.errors / histogram.count * 100, 2) if histogram.count else 0.0,
+            "avg": histogram.mean / MICROSECONDS,
+            "min": (histogram.min or 0) / MICROSECONDS,
+            "max": histogram.max / MICROSECONDS,
+            "requests_per_second": round(requests_per_second, 4),
+            "errors_per_second": round(errors_per_second, 4),
+            "status": dict(totals.status)
+        }
+        for percentile, value in values.items():
+            summary[percentile_label(percentile)] = value / MICROSECONDS
+        return summary
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """summarize() of every series, keyed by "METHOD route" """
+        return {
+            f"{method} {route}": self.summarize(totals, now=now)
+            for (method, route), totals in sorted(self.series.items(), key=lambda item: (item[0][1], item[0][0]))
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "workers": self.workers,
+            "series": [
+                {"method": method, "route": route, **totals.to_dict()}
+                for (method, route), totals in self.series.items()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetricsSnapshot":
+        snapshot = cls(data.get("bucket_seconds", 10), data.get("workers"))
+        for series in data.get("series") or []:
+            snapshot.totals(series["method"], series["route"]).merge(SeriesTotals.from_dict(series))
+        return snapshot
+
+
+def percentile_label(percentile: float) -> str:
+    """50 -> "p50", 99.9 -> "p999" """
+    return "p" + f"{percentile:g}".replace(".", "")
+
+
+class RequestMetrics:
+    """
+    Per-worker request metrics.
+
+    record() is called on every request and takes no lock: each thread
+    writes to its own shard of RouteSeries. snapshot() merges the shards.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 10,
+        rate_buckets: int = 30,
+        clock: Callable[[], float] = time.time
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.rate_buckets = rate_buckets
+        self._clock = clock
+        self._local = threading.local()
+        self._shards: List[Dict[SeriesKey, RouteSeries]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[SeriesKey, RouteSeries]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def record(self, method: str, route: str, status_code: int, duration: float) -> None:
+        """Record a request; duration in seconds"""
+        shard = self._shard()
+        key = (method, route)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = RouteSeries(self.rate_buckets)
+        series.record(
+            int(duration * MICROSECONDS + 0.5),
+            status_code,
+            int(self._clock() // self.bucket_seconds)
+        )
+
+    def snapshot(self, worker: Optional[str] = None) -> MetricsSnapshot:
+        with self._lock:
+            shards = list(self._shards)
+        snapshot = MetricsSnapshot(self.bucket_seconds, [worker or worker_id()])
+        for shard in shards:
+            for (method, route), series in list(shard.items()):
+                snapshot.totals(method, route).add_series(series)
+        return snapshot
+
+    def series_keys(self) -> List[SeriesKey]:
+        with self._lock:
+            shards = list(self._shards)
+        return sorted({key for shard in shards for key in list(shard)})
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class MetricsPublisher:
+    """
+    Publishes this worker's snapshot to Redis at an interval.
+
+    Snapshots expire after three intervals, so workers that went away drop
+    out of cluster_snapshot().
+    """
+
+    def __init__(
+        self,
+        metrics: RequestMetrics,
+        client,
+        interval: float = 15.0,
+        key_prefix: str = WORKER_KEY_PREFIX
+    ):
+        self.metrics = metrics
+        self.client = client
+        self.interval = interval
+        self.key_prefix = key_prefix
+        self.worker = worker_id()
+        self.key = f"{key_prefix}:{self.worker}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self) -> None:
+        snapshot = self.metrics.snapshot(self.worker)
+        self.client.set(self.key, dumps(snapshot.to_dict()), ex=max(1, int(self.interval * 3)))
+
+    def cluster_snapshot(self) -> MetricsSnapshot:
+        """This worker's live metrics merged with the last published snapshot of every other worker"""
+        snapshot = self.metrics.snapshot(self.worker)
+        for key in self.client.scan_iter(match=f"{self.key_prefix}:*", count=100):
+            key = key.decode() if isinstance(key, bytes) else key
+            if key == self.key:
+                continue
+            raw = self.client.get(key)
+            if raw:
+                snapshot.merge(MetricsSnapshot.from_dict(loads(raw)))
+        return snapshot
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-publisher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop publishing and remove this worker's snapshot"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.client.delete(self.key)
+        except Exception as e:
+            logger.warning(f"Failed to remove metrics snapshot of {self.worker}: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.publish()
+            except Exception as e:
+                logger.warning(f"Failed to publish request metrics: {e}")
+            self._stop.wait(self.interval)
+
+
+# Process-wide request metrics, recorded by PerformanceMiddleware
+request_metrics = RequestMetrics()
+
+_publisher: Optional[MetricsPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def start_metrics_publisher() -> bool:
+    """Publish this worker's metrics to Redis when REDIS_URL is reachable"""
+    global _publisher
+    if not settings.REDIS_URL:
+        return False
+    with _publisher_lock:
+        if _publisher is None:
+            try:
+                import redis
+
+                client = redis.from_url(settings.REDIS_URL, socket_connect_timeout=2, socket_timeout=2)
+                client.ping()
+                _publisher = MetricsPublisher(request_metrics, client)
+            except Exception as e:
+                logger.warning(f"Redis unavailable, metrics are reported per worker: {e}")
+                return False
+        _publisher.start()
+    return True
+
+
+def stop_metrics_publisher() -> None:
+    global _publisher
+    with _publisher_lock:
+        if _publisher is not None:
+            _publisher.stop()
+            _publisher = None
+
+
+def cluster_snapshot() -> MetricsSnapshot:
+    """Metrics of all workers when published to Redis, of this worker otherwise"""
+    publisher = _publisher
+    if publisher is not None:
+        try:
+            return publisher.cluster_snapshot()
+        except Exception as e:
+            logger.warning(f"Failed to read cluster metrics, reporting this worker only: {e}")
+    return request_metrics.snapshot()
+
+
+# Prometheus / OpenMetrics exposition
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(
+    snapshot: MetricsSnapshot,
+    openmetrics: bool = False,
+    namespace: str = "ppm",
+    now: Optional[float] = None
+) -> str:
+    """
+    Text exposition of request metrics: request counters by status class, a
+    latency histogram with PROMETHEUS_BUCKETS, latency percentiles as a
+    summary, and request and error rates over the last minute.
+    """
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        # OpenMetrics names counter families without the _total suffix
+        if openmetrics and kind == "counter" and name.endswith("_total"):
+            name = name[:-len("_total")]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    series = sorted(snapshot.series.items(), key=lambda item: (item[0][1], item[0][0]))
+    requests = f"{namespace}_http_requests_total"
+    duration = f"{namespace}_http_request_duration_seconds"
+    latency = f"{namespace}_http_request_latency_seconds"
+    rate = f"{namespace}_http_requests_per_second"
+    error_rate = f"{namespace}_http_errors_per_second"
+
+    family(requests, "counter", "HTTP requests by route template and status class.")
+    for (method, route), totals in series:
+        for status_class, count in sorted(totals.status.items()):
+            lines.append(f"{requests}{_labels(method=method, route=route, status=status_class)} {count}")
+
+    family(duration, "histogram", "HTTP request latency in seconds.")
+    bounds = [int(bound * MICROSECONDS) for bound in PROMETHEUS_BUCKETS]
+    for (method, route), totals in series:
+        histogram = totals.histogram
+        for bound, count in zip(PROMETHEUS_BUCKETS, histogram.cumulative_counts(bounds)):
+            lines.append(f"{duration}_bucket{_labels(method=method, route=route, le=_number(bound))} {count}")
+        lines.append(f"{duration}_bucket{_labels(method=method, route=route, le='+Inf')} {histogram.count}")
+        lines.append(f"{duration}_sum{_labels(method=method, route=route)} {_number(histogram.total / MICROSECONDS)}")
+        lines.append(f"{duration}_count{_labels(method=method, route=route)} {histogram.count}")
+
+    family(latency, "summary", "HTTP request latency percentiles in seconds, from HDR histograms.")
+    for (method, route), totals in series:
+        histogram = totals.histogram
+        for percentile, value in histogram.percentiles(DEFAULT_PERCENTILES).items():
+            quantile = f"{percentile / 100:g}"
+            lines.append(
+                f"{latency}{_labels(method=method, route=route, quantile=quantile)} {_number(value / MICROSECONDS)}"
+            )
+        lines.append(f"{latency}_sum{_labels(method=method, route=route)} {_number(histogram.total / MICROSECONDS)}")
+        lines.append(f"{latency}_count{_labels(method=method, route=route)} {histogram.count}")
+
+    family(rate, "gauge", "HTTP requests per second over the last minute.")
+    rates = [((method, route), snapshot.rate(totals, now)) for (method, route), totals in series]
+    for (method, route), (requests_per_second, _) in rates:
+        lines.append(f"{rate}{_labels(method=method, route=route)} {_number(round(requests_per_second, 6))}")
+
+    family(error_rate, "gauge", "HTTP 4xx and 5xx responses per second over the last minute.")
+    for (method, route), (_, errors_per_second) in rates:
+        lines.append(f"{error_rate}{_labels(method=method, route=route)} {_number(round(errors_per_second, 6))}")
+
+    family(f"{namespace}_metrics_workers", "gauge", "Workers whose metrics are included.")
+    lines.append(f"{namespace}_metrics_workers {len(snapshot.workers)}")
+    return "\n".join(lines) + "\n"
+
+
+def render_metrics(openmetrics: bool = False) -> str:
+    """
+    Exposition of the cluster-wide request metrics, followed by the metrics
+    of the prometheus_client default registry when it is installed.
+    """
+    body = render_prometheus(cluster_snapshot(), openmetrics=openmetrics)
+    try:
+        if openmetrics:
+            from prometheus_client.openmetrics.exposition import generate_latest
+        else:
+            from prometheus_client import generate_latest
+        return body + generate_latest().decode()
+    except ImportError:
+        return body + ("# EOF\n" if openmetrics else "")
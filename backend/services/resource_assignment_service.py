@@ -22,6 +22,7 @@ from models.schedule import (
     ResourceAssignmentCreate, ResourceAssignmentResponse,
     ResourceUtilizationReport
 )
+from services.resource_utilization_engine import ResourceUtilizationEngine
 
 logger = logging.getLogger(__name__)
 
@@ -145,65 +146,12 @@ class ResourceAssignmentService:
             List of detected conflicts
         """
         try:
-            # Build query for assignments
-            query = self.db.table("task_resource_assignments").select("""
-                id, task_id, resource_id, allocation_percentage, 
-                assignment_start_date, assignment_end_date,
-                tasks!inner(id, schedule_id, name, wbs_code),
-                resources!inner(id, name, capacity, availability)
-            """)
-            
-            # Filter by schedule through tasks
-            if schedule_id:
-                query = query.eq("tasks.schedule_id", str(schedule_id))
-            
-            # Filter by resource if specified
-            if resource_id:
-                query = query.eq("resource_id", str(resource_id))
-            
-            # Execute query
-            assignments_result = query.execute()
-            
-            if not assignments_result.data:
-                return []
-            
-            assignments = assignments_result.data
-            
-            # Filter by date range if specified
-            if date_range_start or date_range_end:
-                filtered_assignments = []
-                for assignment in assignments:
-                    assign_start = date.fromisoformat(assignment["assignment_start_date"])
-                    assign_end = date.fromisoformat(assignment["assignment_end_date"])
-                    
-                    # Check if assignment overlaps with date range
-                    if date_range_start and assign_end < date_range_start:
-                        continue
-                    if date_range_end and assign_start > date_range_end:
-                        continue
-                    
-                    filtered_assignments.append(assignment)
-                
-                assignments = filtered_assignments
-            
-            # Group assignments by resource and detect conflicts
-            conflicts = []
-            resource_assignments = {}
-            
-            for assignment in assignments:
-                resource_id = assignment["resource_id"]
-                if resource_id not in resource_assignments:
-                    resource_assignments[resource_id] = []
-                resource_assignments[resource_id].append(assignment)
-            
-            # Check each resource for conflicts
-            for resource_id, resource_assigns in resource_assignments.items():
-                resource_conflicts = await self._detect_resource_specific_conflicts(
-                    resource_id, resource_assigns
-                )
-                conflicts.extend(resource_conflicts)
+            assignments = await self._get_schedule_assignments(
+                schedule_id, resource_id, date_range_start, date_range_end
+            )
             
-            return conflicts
+            # All resources are checked at once on a resource x day load matrix
+            return ResourceUtilizationEngine(assignments).detect_conflicts()
             
         except Exception as e:
             logger.error(f"Error detecting resource conflicts: {e}")
@@ -225,8 +173,10 @@ class ResourceAssignmentService:
             Dict with leveling suggestions
         """
         try:
-            # First detect all conflicts
-            conflicts = await self.detect_resource_conflicts(schedule_id)
+            # First detect all conflicts, keeping the load matrix for rescheduling
+            assignments = await self._get_schedule_assignments(schedule_id)
+            engine = ResourceUtilizationEngine(assignments)
+            conflicts = engine.detect_conflicts()
             
             if not conflicts:
                 return {
@@ -254,7 +204,7 @@ class ResourceAssignmentService:
                 
                 elif conflict["type"] == ResourceConflictType.DOUBLE_BOOKING.value:
                     # Suggest rescheduling one of the conflicting tasks
-                    suggestion = await self._generate_rescheduling_suggestion(conflict, tasks)
+                    suggestion = await self._generate_rescheduling_suggestion(conflict, tasks, engine)
                     if suggestion:
                         suggestions.append(suggestion)
             
@@ -362,13 +312,12 @@ class ResourceAssignmentService:
                 # Estimate based on allocation percentages (rough calculation)
                 utilization_percentage = min(total_allocation, 100)
             
-            # Detect conflicts for this resource
-            resource_conflicts = await self.detect_resource_conflicts(
-                schedule_id=None,  # Check across all schedules
-                resource_id=resource_id,
-                date_range_start=date_range_start,
-                date_range_end=date_range_end
-            )
+            # Detect conflicts for this resource across all schedules from the
+            # assignments already loaded
+            resource_conflicts = ResourceUtilizationEngine(
+                [{**assignment, "resource_id": str(resource_id)} for assignment in assignments],
+                resource_names={str(resource_id): resource_data["name"]}
+            ).detect_conflicts()
             
             conflict_descriptions = [
                 f"{conflict['type']}: {conflict['description']}" 
@@ -566,6 +515,9 @@ class ResourceAssignmentService:
                 if assignment.get("actual_hours"):
                     resource_info["total_actual_hours"] += assignment["actual_hours"]
             
+            engine = ResourceUtilizationEngine(assignments)
+            peak_loads = engine.peak_loads()
+            
             # Calculate utilization for each resource
             resource_utilization = []
             for resource_id, resource_info in resource_data.items():
@@ -586,11 +538,12 @@ class ResourceAssignmentService:
                     "total_planned_hours": resource_info["total_planned_hours"],
                     "total_actual_hours": resource_info["total_actual_hours"],
                     "utilization_percentage": round(utilization_pct, 2),
-                    "is_overallocated": utilization_pct > 100
+                    "is_overallocated": utilization_pct > 100,
+                    **peak_loads.get(str(resource_id), {})
                 })
             
             # Detect conflicts
-            conflicts = await self.detect_resource_conflicts(schedule_id)
+            conflicts = engine.detect_conflicts()
             
             return {
                 "schedule_id": str(schedule_id),
@@ -606,6 +559,46 @@ class ResourceAssignmentService:
     
     # Private helper methods
     
+    async def _get_schedule_assignments(
+        self,
+        schedule_id: Optional[UUID],
+        resource_id: Optional[UUID] = None,
+        date_range_start: Optional[date] = None,
+        date_range_end: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Get assignments with task and resource info, optionally filtered by resource and date range."""
+        # Build query for assignments
+        query = self.db.table("task_resource_assignments").select("""
+            id, task_id, resource_id, allocation_percentage, 
+            assignment_start_date, assignment_end_date,
+            tasks!inner(id, schedule_id, name, wbs_code),
+            resources!inner(id, name, capacity, availability)
+        """)
+        
+        # Filter by schedule through tasks
+        if schedule_id:
+            query = query.eq("tasks.schedule_id", str(schedule_id))
+        
+        # Filter by resource if specified
+        if resource_id:
+            query = query.eq("resource_id", str(resource_id))
+        
+        assignments = query.execute().data or []
+        
+        # Keep assignments that overlap the date range
+        if date_range_start:
+            assignments = [
+                a for a in assignments
+                if date.fromisoformat(a["assignment_end_date"]) >= date_range_start
+            ]
+        if date_range_end:
+            assignments = [
+                a for a in assignments
+                if date.fromisoformat(a["assignment_start_date"]) <= date_range_end
+            ]
+        
+        return assignments
+    
     def _convert_assignment_to_response(self, assignment_data: Dict[str, Any]) -> ResourceAssignmentResponse:
         """Convert database assignment record to ResourceAssignmentResponse model."""
         return ResourceAssignmentResponse(
@@ -637,65 +630,12 @@ class ResourceAssignmentService:
         Returns:
             List of conflicts detected
         """
-        conflicts = []
-        
         if not assignments:
-            return conflicts
+            return []
         
-        # Get resource capacity information
-        resource_info = assignments[0]["resources"]  # All assignments have same resource
-        resource_capacity = resource_info.get("capacity", 40)
-        resource_availability = resource_info.get("availability", 100)
-        
-        # Check for overallocation
-        total_allocation = sum(assignment["allocation_percentage"] for assignment in assignments)
-        
-        if total_allocation > 100:
-            conflicts.append({
-                "type": ResourceConflictType.OVERALLOCATION.value,
-                "resource_id": resource_id,
-                "resource_name": resource_info["name"],
-                "total_allocation": total_allocation,
-                "excess_allocation": total_allocation - 100,
-                "description": f"Resource {resource_info['name']} is overallocated at {total_allocation}%",
-                "affected_tasks": [assignment["task_id"] for assignment in assignments],
-                "severity": "high" if total_allocation > 150 else "medium"
-            })
-        
-        # Check for date overlaps (double booking)
-        for i, assignment1 in enumerate(assignments):
-            for assignment2 in assignments[i+1:]:
-                start1 = date.fromisoformat(assignment1["assignment_start_date"])
-                end1 = date.fromisoformat(assignment1["assignment_end_date"])
-                start2 = date.fromisoformat(assignment2["assignment_start_date"])
-                end2 = date.fromisoformat(assignment2["assignment_end_date"])
-                
-                # Check for overlap
-                if start1 <= end2 and start2 <= end1:
-                    overlap_start = max(start1, start2)
-                    overlap_end = min(end1, end2)
-                    overlap_days = (overlap_end - overlap_start).days + 1
-                    
-                    combined_allocation = assignment1["allocation_percentage"] + assignment2["allocation_percentage"]
-                    
-                    if combined_allocation > 100:
-                        conflicts.append({
-                            "type": ResourceConflictType.DOUBLE_BOOKING.value,
-                            "resource_id": resource_id,
-                            "resource_name": resource_info["name"],
-                            "task1_id": assignment1["task_id"],
-                            "task1_name": assignment1["tasks"]["name"],
-                            "task2_id": assignment2["task_id"],
-                            "task2_name": assignment2["tasks"]["name"],
-                            "overlap_start": overlap_start.isoformat(),
-                            "overlap_end": overlap_end.isoformat(),
-                            "overlap_days": overlap_days,
-                            "combined_allocation": combined_allocation,
-                            "description": f"Resource {resource_info['name']} has overlapping assignments with {combined_allocation}% allocation",
-                            "severity": "high" if combined_allocation > 150 else "medium"
-                        })
-        
-        return conflicts
+        return ResourceUtilizationEngine(
+            {**assignment, "resource_id": resource_id} for assignment in assignments
+        ).detect_conflicts()
     
     async def _generate_overallocation_suggestion(
         self,
@@ -768,7 +708,8 @@ class ResourceAssignmentService:
     async def _generate_rescheduling_suggestion(
         self,
         conflict: Dict[str, Any],
-        tasks: List[Dict[str, Any]]
+        tasks: List[Dict[str, Any]],
+        engine: Optional[ResourceUtilizationEngine] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Generate suggestion for resolving double booking conflict.
@@ -776,6 +717,8 @@ class ResourceAssignmentService:
         Args:
             conflict: Conflict information
             tasks: List of all tasks in the schedule
+            engine: Optional load matrix of the schedule, used to find the
+                earliest start at which the rescheduled task fits
             
         Returns:
             Suggestion dictionary or None
@@ -796,12 +739,25 @@ class ResourceAssignmentService:
                 return None
             
             # Determine which task should be rescheduled (prefer lower priority)
-            task1_priority = priority_order = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+            priority_order = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+            task1_priority = priority_order.get(task1.get("priority", "medium"), 1)
             task2_priority = priority_order.get(task2.get("priority", "medium"), 1)
             
             primary_task = task1 if task1_priority >= task2_priority else task2
             reschedule_task = task2 if task1_priority >= task2_priority else task1
             
+            suggested_delay_days = overlap_days + 1
+            suggested_start_date = None
+            assignment_id = conflict.get(
+                "assignment2_id" if reschedule_task is task2 else "assignment1_id"
+            )
+            if engine is not None and assignment_id:
+                current_start, _ = engine.assignment_dates(assignment_id)
+                feasible_start = engine.earliest_feasible_start(assignment_id)
+                if feasible_start:
+                    suggested_delay_days = (feasible_start - current_start).days
+                    suggested_start_date = feasible_start.isoformat()
+            
             return {
                 "type": "reschedule_task",
                 "conflict_id": f"{task1_id}_{task2_id}",
@@ -811,7 +767,8 @@ class ResourceAssignmentService:
                         "action": "delay_task",
                         "task_id": reschedule_task["id"],
                         "task_name": reschedule_task["name"],
-                        "suggested_delay_days": overlap_days + 1,
+                        "suggested_delay_days": suggested_delay_days,
+                        "suggested_start_date": suggested_start_date,
                         "reason": f"Lower priority than {primary_task['name']}"
                     }
                 ],
@@ -0,0 +1,394 @@
+"""
+Resource Optimization Backend - Sparse LP model for resource-to-project allocation
+
+Builds the cost-minimizing allocation model only over resource/project pairs
+that pass skill matching, using a skill index instead of one variable and one
+constraint per (resource, project) pair. Constraint matrices are assembled in
+sparse form and solved with HiGHS in a worker process under a time budget.
+Re-optimization reuses the previous solution when it is still optimal for the
+changed model.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from utils.resource_calculations import calculate_advanced_skill_match_score
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZER_WORKERS = int(os.getenv("RESOURCE_OPTIMIZER_WORKERS", "1"))
+OPTIMIZER_TIME_LIMIT_SECONDS = float(os.getenv("RESOURCE_OPTIMIZER_TIME_LIMIT_SECONDS", "30"))
+# Allowance on top of the solver time limit for worker start-up and transfer
+WORKER_TIMEOUT_MARGIN_SECONDS = 10.0
+# Previous solutions kept for warm starts (one per organization)
+WARM_START_MAX_ENTRIES = 32
+
+_optimizer_pool: Optional[ProcessPoolExecutor] = None
+
+# scipy linprog status codes mapped to the solver status names used by the agents
+SOLVER_STATUS = {
+    0: "Optimal",
+    1: "Not Solved",
+    2: "Infeasible",
+    3: "Unbounded",
+    4: "Undefined"
+}
+
+FEASIBILITY_TOLERANCE = 1e-6
+OPTIMALITY_TOLERANCE = 1e-7
+
+
+def _get_optimizer_pool() -> Optional[ProcessPoolExecutor]:
+    """Get or create the shared optimizer process pool"""
+    global _optimizer_pool
+    if _optimizer_pool is None and OPTIMIZER_WORKERS > 0:
+        _optimizer_pool = ProcessPoolExecutor(max_workers=OPTIMIZER_WORKERS)
+    return _optimizer_pool
+
+
+def _normalize_skill(skill: str) -> str:
+    return str(skill).lower().strip()
+
+
+class SkillIndex:
+    """Inverted index from normalized skill to the resources that have it"""
+
+    def __init__(self, resources: List[Dict[str, Any]]):
+        self.resources = resources
+        self._postings: Dict[str, np.ndarray] = {}
+
+        postings: Dict[str, List[int]] = {}
+        for index, resource in enumerate(resources):
+            for skill in {_normalize_skill(s) for s in resource.get('skills') or []}:
+                postings.setdefault(skill, []).append(index)
+        self._postings = {skill: np.array(ids) for skill, ids in postings.items()}
+
+    def candidates(
+        self,
+        required_skills: List[str],
+        min_skill_match: float = 1.0
+    ) -> List[Tuple[int, float]]:
+        """
+        Resources covering at least min_skill_match of the required skills
+
+        Returns:
+            (resource index, skill match score) pairs
+        """
+        required = list(dict.fromkeys(_normalize_skill(s) for s in required_skills or []))
+        if not required:
+            return [(index, 1.0) for index in range(len(self.resources))]
+
+        postings = [self._postings[s] for s in required if s in self._postings]
+        if not postings:
+            return []
+
+        # Count how many required skills each resource has
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.resources))
+        needed = max(1, math.ceil(min_skill_match * len(required) - 1e-9))
+
+        candidates = []
+        for index in np.flatnonzero(counts >= needed):
+            score = calculate_advanced_skill_match_score(
+                required_skills, self.resources[index].get('skills') or []
+            )['match_score']
+            if score >= min_skill_match - 1e-9:
+                candidates.append((int(index), score))
+        return candidates
+
+
+@dataclass
+class AllocationProblem:
+    """
+    Sparse allocation LP: minimize Σ cost × hours over skill-matched pairs
+
+    Row i < n_resources bounds the hours allocated to resource i by its
+    available hours; the remaining rows require each project to receive at
+    least its required hours (written as -Σ hours ≤ -required).
+    """
+    resource_ids: List[str]
+    project_ids: List[str]
+    pair_resource: np.ndarray
+    pair_project: np.ndarray
+    skill_scores: np.ndarray
+    costs: np.ndarray
+    available_hours: np.ndarray
+    required_hours: np.ndarray
+    upper_bound: Optional[float] = None
+    unstaffable_projects: Tuple[str, ...] = ()
+
+    @property
+    def n_variables(self) -> int:
+        return len(self.costs)
+
+    @property
+    def n_pairs(self) -> int:
+        """Number of (resource, project) pairs before skill pruning"""
+        return len(self.resource_ids) * len(self.project_ids)
+
+    def constraint_matrix(self) -> sparse.csr_matrix:
+        n_resources = len(self.resource_ids)
+        rows = np.concatenate([self.pair_resource, n_resources + self.pair_project])
+        cols = np.tile(np.arange(self.n_variables), 2)
+        data = np.concatenate([np.ones(self.n_variables), -np.ones(self.n_variables)])
+        return sparse.csr_matrix(
+            (data, (rows, cols)),
+            shape=(n_resources + len(self.project_ids), self.n_variables)
+        )
+
+    def rhs(self) -> np.ndarray:
+        return np.concatenate([self.available_hours, -self.required_hours])
+
+    def variable_upper_bounds(self) -> np.ndarray:
+        bound = np.inf if self.upper_bound is None else float(self.upper_bound)
+        return np.full(self.n_variables, bound)
+
+    def pair_keys(self) -> List[Tuple[str, str]]:
+        return [
+            (self.resource_ids[r], self.project_ids[p])
+            for r, p in zip(self.pair_resource, self.pair_project)
+        ]
+
+
+@dataclass
+class AllocationSolution:
+    """Solver outcome; allocations are hours per variable of the problem"""
+    status: str
+    allocations: Optional[np.ndarray] = None
+    objective: Optional[float] = None
+    row_duals: Optional[np.ndarray] = None
+    solve_time: float = 0.0
+    warm_started: bool = False
+    message: str = ""
+
+
+def build_allocation_problem(
+    resources: List[Dict[str, Any]],
+    projects: List[Dict[str, Any]],
+    constraints: Optional[Dict[str, Any]] = None
+) -> AllocationProblem:
+    """
+    Build the sparse allocation model
+
+    Only pairs whose resource covers the project's required skills (or at least
+    constraints['min_skill_match'] of them) become variables.
+    """
+    constraints = constraints or {}
+    min_skill_match = float(constraints.get('min_skill_match', 1.0))
+    index = SkillIndex(resources)
+
+    pair_resource, pair_project, skill_scores = [], [], []
+    unstaffable = []
+    for project_index, project in enumerate(projects):
+        candidates = index.candidates(project.get('required_skills', []), min_skill_match)
+        if not candidates:
+            unstaffable.append(project['id'])
+        for resource_index, score in candidates:
+            pair_resource.append(resource_index)
+            pair_project.append(project_index)
+            skill_scores.append(score)
+
+    pair_resource = np.array(pair_resource, dtype=int)
+    rates = np.array([
+        r.get('hourly_rate', r.get('cost_per_hour', 100)) for r in resources
+    ], dtype=float)
+
+    return AllocationProblem(
+        resource_ids=[r['id'] for r in resources],
+        project_ids=[p['id'] for p in projects],
+        pair_resource=pair_resource,
+        pair_project=np.array(pair_project, dtype=int),
+        skill_scores=np.array(skill_scores, dtype=float),
+        costs=rates[pair_resource] if len(pair_resource) else np.zeros(0),
+        available_hours=np.array([
+            r.get('available_hours', r.get('capacity', 160)) for r in resources
+        ], dtype=float),
+        required_hours=np.array([
+            p.get('required_hours', p.get('estimated_effort', 160)) for p in projects
+        ], dtype=float),
+        upper_bound=constraints.get('max_allocation_per_resource'),
+        unstaffable_projects=tuple(unstaffable)
+    )
+
+
+def solve_allocation_problem(
+    problem: AllocationProblem,
+    time_limit: float = OPTIMIZER_TIME_LIMIT_SECONDS
+) -> AllocationSolution:
+    """Solve the allocation LP with HiGHS; runs in a worker process"""
+    start = time.time()
+
+    # A project without any skilled resource cannot receive its hours
+    if any(
+        problem.required_hours[problem.project_ids.index(p)] > 0
+        for p in problem.unstaffable_projects
+    ):
+        return AllocationSolution(status="Infeasible", message="No skilled resources for some projects")
+
+    if problem.n_variables == 0:
+        return AllocationSolution(
+            status="Optimal", allocations=np.zeros(0), objective=0.0,
+            row_duals=np.zeros(len(problem.resource_ids) + len(problem.project_ids))
+        )
+
+    result = linprog(
+        problem.costs,
+        A_ub=problem.constraint_matrix(),
+        b_ub=problem.rhs(),
+        bounds=np.column_stack([np.zeros(problem.n_variables), problem.variable_upper_bounds()]),
+        method="highs",
+        options={"time_limit": time_limit}
+    )
+
+    status = SOLVER_STATUS.get(result.status, "Undefined")
+    solution = AllocationSolution(status=status, solve_time=time.time() - start, message=result.message)
+    if status == "Optimal":
+        solution.allocations = result.x
+        solution.objective = float(result.fun)
+        solution.row_duals = result.ineqlin.marginals
+    return solution
+
+
+def reuse_previous_solution(
+    problem: AllocationProblem,
+    previous_problem: AllocationProblem,
+    previous_solution: AllocationSolution
+) -> Optional[AllocationSolution]:
+    """
+    Warm start: map the previous optimal allocation and duals onto the changed
+    model by resource and project ID and return them if they still satisfy the
+    optimality conditions (primal and dual feasibility, complementary slackness).
+
+    Returns:
+        The reused solution, or None if the model has to be solved again
+    """
+    if previous_solution.status != "Optimal" or previous_solution.row_duals is None:
+        return None
+    if problem.unstaffable_projects:
+        return None
+
+    start = time.time()
+    previous_allocations = dict(zip(previous_problem.pair_keys(), previous_solution.allocations))
+    allocations = np.array([previous_allocations.get(key, 0.0) for key in problem.pair_keys()])
+
+    n_previous_resources = len(previous_problem.resource_ids)
+    resource_duals = dict(zip(previous_problem.resource_ids, previous_solution.row_duals[:n_previous_resources]))
+    project_duals = dict(zip(previous_problem.project_ids, previous_solution.row_duals[n_previous_resources:]))
+    row_duals = np.array(
+        [resource_duals.get(r, 0.0) for r in problem.resource_ids] +
+        [project_duals.get(p, 0.0) for p in problem.project_ids]
+    )
+
+    matrix = problem.constraint_matrix()
+    rhs = problem.rhs()
+    upper = problem.variable_upper_bounds()
+    tolerance = FEASIBILITY_TOLERANCE * max(1.0, float(np.abs(rhs).max(initial=0.0)))
+
+    # Primal feasibility
+    slack = rhs - matrix @ allocations
+    if (slack < -tolerance).any() or (allocations > upper + tolerance).any():
+        return None
+
+    # Dual feasibility and complementary slackness on the constraint rows
+    binding = row_duals < -OPTIMALITY_TOLERANCE
+    if (row_duals > OPTIMALITY_TOLERANCE).any() or (slack[binding] > tolerance).any():
+        return None
+
+    # Reduced costs: non-negative at zero, non-positive at the upper bound, zero in between
+    reduced_costs = problem.costs - matrix.T @ row_duals
+    at_lower = allocations <= tolerance
+    at_upper = allocations >= upper - tolerance
+    if (reduced_costs[at_lower & ~at_upper] < -OPTIMALITY_TOLERANCE).any():
+        return None
+    if (reduced_costs[at_upper & ~at_lower] > OPTIMALITY_TOLERANCE).any():
+        return None
+    if (np.abs(reduced_costs[~at_lower & ~at_upper]) > OPTIMALITY_TOLERANCE).any():
+        return None
+
+    return AllocationSolution(
+        status="Optimal",
+        allocations=allocations,
+        objective=float(problem.costs @ allocations),
+        row_duals=row_duals,
+        solve_time=time.time() - start,
+        warm_started=True
+    )
+
+
+class ResourceOptimizationBackend:
+    """
+    Builds and solves allocation models off the event loop
+
+    The last optimal solution per warm start key (e.g. organization) is kept so
+    that re-optimization after small changes can skip the solver when the
+    previous allocation is still optimal.
+    """
+
+    def __init__(self, time_limit: Optional[float] = None):
+        self.time_limit = time_limit or OPTIMIZER_TIME_LIMIT_SECONDS
+        self._previous: Dict[str, Tuple[AllocationProblem, AllocationSolution]] = {}
+
+    async def optimize(
+        self,
+        resources: List[Dict[str, Any]],
+        projects: List[Dict[str, Any]],
+        constraints: Optional[Dict[str, Any]] = None,
+        warm_start_key: Optional[str] = None
+    ) -> Tuple[AllocationProblem, AllocationSolution]:
+        """
+        Build the sparse model and solve it, warm-starting from the previous
+        solution for the same key when possible
+
+        Returns:
+            Tuple of (problem, solution)
+        """
+        constraints = constraints or {}
+        time_limit = float(constraints.get('time_limit_seconds', self.time_limit))
+        problem = build_allocation_problem(resources, projects, constraints)
+
+        previous = self._previous.get(warm_start_key) if warm_start_key else None
+        solution = reuse_previous_solution(problem, *previous) if previous else None
+
+        if solution is None:
+            solution = await self._solve(problem, time_limit)
+
+        if warm_start_key and solution.status == "Optimal":
+            self._previous.pop(warm_start_key, None)
+            self._previous[warm_start_key] = (problem, solution)
+            while len(self._previous) > WARM_START_MAX_ENTRIES:
+                self._previous.pop(next(iter(self._previous)))
+
+        logger.debug(
+            "Resource optimization: %s, %d of %d pairs, %.3fs%s",
+            solution.status, problem.n_variables, problem.n_pairs, solution.solve_time,
+            " (warm start)" if solution.warm_started else ""
+        )
+        return problem, solution
+
+    async def _solve(self, problem: AllocationProblem, time_limit: float) -> AllocationSolution:
+        """Solve in the optimizer process pool, falling back to a thread"""
+        loop = asyncio.get_running_loop()
+        pool = _get_optimizer_pool()
+        try:
+            if pool is not None:
+                future = loop.run_in_executor(pool, solve_allocation_problem, problem, time_limit)
+            else:
+                future = asyncio.to_thread(solve_allocation_problem, problem, time_limit)
+            # HiGHS stops itself at the time limit; the margin covers process start-up
+            return await asyncio.wait_for(future, timeout=time_limit + WORKER_TIMEOUT_MARGIN_SECONDS)
+        except asyncio.TimeoutError:
+            return AllocationSolution(status="Not Solved", message="Optimization time budget exceeded")
+        except Exception as e:
+            if pool is None:
+                raise
+            logger.warning(f"Optimizer worker unavailable, solving in a thread: {e}")
+            return await asyncio.to_thread(solve_allocation_problem, problem, time_limit)
@@ -0,0 +1,475 @@
+"""
+Resource Utilization Engine
+
+Builds a resource x day allocation matrix from task resource assignments and
+answers conflict questions for all resources at once:
+- Daily allocation timelines built with cumulative-sum sweeps
+- Overallocation intervals and peak loads per resource
+- Double bookings (overlapping assignment pairs above capacity)
+- Incremental updates when a single assignment is added, changed or removed
+- Earliest start at which an assignment fits within capacity (for leveling)
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Allocation percentages are compared with a small tolerance for float sums
+ALLOCATION_EPSILON = 1e-9
+
+
+def _as_number(value: float) -> Any:
+    """Report whole-number allocations as ints, as stored in the database."""
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 4)
+
+
+def _as_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+class ResourceUtilizationEngine:
+    """
+    Resource x day allocation matrix for a set of assignments.
+
+    Each assignment contributes its allocation percentage to every day from
+    its start to its end date (inclusive). The matrix is built in one pass by
+    scattering +allocation at the start day and -allocation after the end day
+    and taking a cumulative sum along the day axis.
+    """
+
+    def __init__(
+        self,
+        assignments: Iterable[Dict[str, Any]],
+        capacity: float = 100.0,
+        resource_names: Optional[Dict[str, str]] = None
+    ):
+        """
+        Build the allocation matrix.
+
+        Args:
+            assignments: Assignment records with id, task_id, resource_id,
+                allocation_percentage, assignment_start_date and
+                assignment_end_date; optional tasks/resources joins supply names
+            capacity: Allocation percentage a resource can carry per day
+            resource_names: Optional resource names by resource ID
+        """
+        self.capacity = float(capacity)
+        self.resource_names: Dict[str, str] = dict(resource_names or {})
+
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._resource_rows: Dict[str, int] = {}
+        self._row_assignments: List[set] = []
+        self.origin: Optional[date] = None
+        self.load = np.zeros((0, 0))
+
+        records = [self._normalize(a) for a in assignments]
+        if not records:
+            return
+
+        for record in records:
+            self._records[record["id"]] = record
+            self._row_assignments[self._row_for(record["resource_id"])].add(record["id"])
+
+        starts = np.array([r["start"] for r in records], dtype="datetime64[D]")
+        ends = np.array([r["end"] for r in records], dtype="datetime64[D]")
+        origin = starts.min()
+        self.origin = origin.astype(date)
+        start_days = (starts - origin).astype(np.int64)
+        end_days = (ends - origin).astype(np.int64)
+        n_days = int(end_days.max()) + 1
+
+        rows = np.array([self._resource_rows[r["resource_id"]] for r in records])
+        allocations = np.array([r["allocation"] for r in records], dtype=float)
+        for record, start_day, end_day in zip(records, start_days, end_days):
+            record["start_day"] = int(start_day)
+            record["end_day"] = int(end_day)
+
+        sweep = np.zeros((len(self._resource_rows), n_days + 1))
+        np.add.at(sweep, (rows, start_days), allocations)
+        np.add.at(sweep, (rows, end_days + 1), -allocations)
+        self.load = np.cumsum(sweep, axis=1)[:, :n_days]
+
+    # ------------------------------------------------------------------
+    # Timeline queries
+    # ------------------------------------------------------------------
+
+    @property
+    def resource_ids(self) -> List[str]:
+        return list(self._resource_rows)
+
+    @property
+    def n_days(self) -> int:
+        return self.load.shape[1]
+
+    def day_to_date(self, day: int) -> date:
+        return self.origin + timedelta(days=int(day))
+
+    def assignment_dates(self, assignment_id: str) -> tuple:
+        """Start and end date of an assignment in the matrix."""
+        record = self._records.get(str(assignment_id))
+        if record is None:
+            raise ValueError(f"Assignment {assignment_id} not found")
+        return self.day_to_date(record["start_day"]), self.day_to_date(record["end_day"])
+
+    def timeline(self, resource_id: str) -> Dict[str, Any]:
+        """Daily allocation of a resource from the first to the last assignment day."""
+        row = self._resource_rows.get(str(resource_id))
+        if row is None or self.origin is None:
+            return {"resource_id": str(resource_id), "start_date": None, "allocations": []}
+
+        return {
+            "resource_id": str(resource_id),
+            "start_date": self.origin.isoformat(),
+            "allocations": [_as_number(v) for v in self.load[row]]
+        }
+
+    def peak_loads(self) -> Dict[str, Dict[str, Any]]:
+        """Peak daily allocation and the first day it occurs, per resource."""
+        if not self._resource_rows or self.n_days == 0:
+            return {}
+
+        peak_days = np.argmax(self.load, axis=1)
+        peaks = self.load[np.arange(self.load.shape[0]), peak_days]
+        return {
+            resource_id: {
+                "peak_allocation": _as_number(peaks[row]),
+                "peak_date": self.day_to_date(peak_days[row]).isoformat()
+            }
+            for resource_id, row in self._resource_rows.items()
+        }
+
+    def overallocation_intervals(
+        self,
+        resource_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Maximal runs of days on which a resource's allocation exceeds capacity.
+
+        Args:
+            resource_ids: Optional resources to check (default: all)
+
+        Returns:
+            Intervals with resource ID, start/end dates, length, peak allocation
+            and the assignments active during the interval
+        """
+        rows = self._rows(resource_ids)
+        if len(rows) == 0 or self.n_days == 0:
+            return []
+
+        over = self.load[rows] > self.capacity + ALLOCATION_EPSILON
+        edges = np.diff(np.pad(over.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        run_starts = np.argwhere(edges == 1)
+        run_ends = np.argwhere(edges == -1)
+
+        row_ids = {row: resource_id for resource_id, row in self._resource_rows.items()}
+        intervals = []
+        for (local_row, start_day), (_, end_day) in zip(run_starts, run_ends):
+            row = rows[local_row]
+            last_day = end_day - 1
+            intervals.append({
+                "resource_id": row_ids[row],
+                "start_date": self.day_to_date(start_day).isoformat(),
+                "end_date": self.day_to_date(last_day).isoformat(),
+                "days": int(end_day - start_day),
+                "peak_allocation": _as_number(self.load[row, start_day:end_day].max()),
+                "assignment_ids": self._active_assignments(row, start_day, last_day)
+            })
+        return intervals
+
+    def double_bookings(
+        self,
+        resource_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Pairs of overlapping assignments on the same resource whose combined
+        allocation exceeds capacity.
+
+        Assignments are sorted by resource and start day; for each assignment a
+        binary search finds the later-starting assignments that begin before it
+        ends, so only overlapping pairs are ever generated.
+        """
+        records = self._records_for(self._rows(resource_ids))
+        if len(records) < 2:
+            return []
+
+        rows = np.array([self._resource_rows[r["resource_id"]] for r in records])
+        starts = np.array([r["start_day"] for r in records])
+        ends = np.array([r["end_day"] for r in records])
+        allocations = np.array([r["allocation"] for r in records])
+
+        span = self.n_days + 1
+        order = np.lexsort((starts, rows))
+        rows, starts, ends, allocations = rows[order], starts[order], ends[order], allocations[order]
+        keys = rows * span + starts
+
+        upper = np.searchsorted(keys, rows * span + ends, side="right")
+        counts = upper - np.arange(len(keys)) - 1
+        if counts.sum() == 0:
+            return []
+
+        first = np.repeat(np.arange(len(keys)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = first + 1 + offsets
+
+        combined = allocations[first] + allocations[second]
+        booked = combined > self.capacity + ALLOCATION_EPSILON
+        first, second, combined = first[booked], second[booked], combined[booked]
+
+        bookings = []
+        for i, j, total in zip(first, second, combined):
+            record1, record2 = records[order[i]], records[order[j]]
+            overlap_start = max(starts[i], starts[j])
+            overlap_end = min(ends[i], ends[j])
+            bookings.append({
+                "resource_id": record1["resource_id"],
+                "assignment1": record1,
+                "assignment2": record2,
+                "overlap_start": self.day_to_date(overlap_start).isoformat(),
+                "overlap_end": self.day_to_date(overlap_end).isoformat(),
+                "overlap_days": int(overlap_end - overlap_start + 1),
+                "combined_allocation": _as_number(total)
+            })
+        return bookings
+
+    def detect_conflicts(
+        self,
+        resource_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Overallocation and double booking conflicts in the service's conflict format.
+
+        One overallocation conflict is reported per resource whose assignments
+        total more than capacity, as before; it also carries the peak daily
+        allocation and the intervals on which the resource is actually
+        overallocated (empty if the assignments never coincide).
+        """
+        from services.resource_assignment_service import ResourceConflictType
+
+        conflicts = []
+        rows = self._rows(resource_ids)
+        records = self._records_for(rows)
+        peaks = self.peak_loads()
+
+        totals = np.bincount(
+            [self._resource_rows[r["resource_id"]] for r in records],
+            weights=[r["allocation"] for r in records],
+            minlength=len(self._resource_rows)
+        ) if records else np.zeros(0)
+
+        intervals_by_resource: Dict[str, List[Dict[str, Any]]] = {}
+        for interval in self.overallocation_intervals(resource_ids):
+            intervals_by_resource.setdefault(interval["resource_id"], []).append(interval)
+
+        row_ids = {row: resource_id for resource_id, row in self._resource_rows.items()}
+        for row in rows:
+            resource_id = row_ids[row]
+            total = _as_number(totals[row])
+            intervals = intervals_by_resource.get(resource_id, [])
+            if total <= self.capacity and not intervals:
+                continue
+
+            name = self._resource_name(resource_id)
+            peak = peaks[resource_id]["peak_allocation"]
+            description = f"Resource {name} is overallocated at {total}%"
+            if intervals:
+                description += f" (peak {peak}% on {peaks[resource_id]['peak_date']})"
+            conflicts.append({
+                "type": ResourceConflictType.OVERALLOCATION.value,
+                "resource_id": resource_id,
+                "resource_name": name,
+                "total_allocation": total,
+                "excess_allocation": _as_number(total - self.capacity),
+                "peak_allocation": peak,
+                "peak_date": peaks[resource_id]["peak_date"],
+                "overallocated_days": sum(interval["days"] for interval in intervals),
+                "overallocation_intervals": intervals,
+                "description": description,
+                "affected_tasks": [
+                    self._records[a]["task_id"] for a in sorted(self._row_assignments[row])
+                ],
+                "severity": "high" if total > 150 else "medium"
+            })
+
+        for booking in self.double_bookings(resource_ids):
+            name = self._resource_name(booking["resource_id"])
+            record1, record2 = booking["assignment1"], booking["assignment2"]
+            combined = booking["combined_allocation"]
+            conflicts.append({
+                "type": ResourceConflictType.DOUBLE_BOOKING.value,
+                "resource_id": booking["resource_id"],
+                "resource_name": name,
+                "assignment1_id": record1["id"],
+                "assignment2_id": record2["id"],
+                "task1_id": record1["task_id"],
+                "task1_name": record1["task_name"],
+                "task2_id": record2["task_id"],
+                "task2_name": record2["task_name"],
+                "overlap_start": booking["overlap_start"],
+                "overlap_end": booking["overlap_end"],
+                "overlap_days": booking["overlap_days"],
+                "combined_allocation": combined,
+                "description": f"Resource {name} has overlapping assignments with {combined}% allocation",
+                "severity": "high" if combined > 150 else "medium"
+            })
+
+        return conflicts
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def add_assignment(self, assignment: Dict[str, Any]) -> None:
+        """Add one assignment, updating only its resource's row."""
+        record = self._normalize(assignment)
+        if record["id"] in self._records:
+            self.remove_assignment(record["id"])
+
+        row = self._row_for(record["resource_id"])
+        self._ensure_row_capacity()
+        start_day, end_day = self._ensure_days(record["start"], record["end"])
+        record["start_day"], record["end_day"] = start_day, end_day
+
+        self.load[row, start_day:end_day + 1] += record["allocation"]
+        self._records[record["id"]] = record
+        self._row_assignments[row].add(record["id"])
+
+    def update_assignment(self, assignment: Dict[str, Any]) -> None:
+        """Replace an assignment's dates or allocation."""
+        self.add_assignment(assignment)
+
+    def remove_assignment(self, assignment_id: str) -> bool:
+        """Remove one assignment; returns False if it is unknown."""
+        record = self._records.pop(str(assignment_id), None)
+        if record is None:
+            return False
+
+        row = self._resource_rows[record["resource_id"]]
+        self.load[row, record["start_day"]:record["end_day"] + 1] -= record["allocation"]
+        self._row_assignments[row].discard(record["id"])
+        return True
+
+    # ------------------------------------------------------------------
+    # Leveling support
+    # ------------------------------------------------------------------
+
+    def earliest_feasible_start(
+        self,
+        assignment_id: str,
+        not_before: Optional[date] = None
+    ) -> Optional[date]:
+        """
+        Earliest start date at or after not_before (default: the day after the
+        current start) at which the assignment, keeping its duration, fits
+        within capacity given all other assignments of its resource.
+
+        Returns:
+            The start date, or None if the assignment alone exceeds capacity
+        """
+        record = self._records.get(str(assignment_id))
+        if record is None:
+            raise ValueError(f"Assignment {assignment_id} not found")
+        if record["allocation"] > self.capacity + ALLOCATION_EPSILON:
+            return None
+
+        row = self._resource_rows[record["resource_id"]]
+        duration = record["end_day"] - record["start_day"] + 1
+
+        residual = self.load[row].copy()
+        residual[record["start_day"]:record["end_day"] + 1] -= record["allocation"]
+        # Days after the horizon are free, so a start at n_days always fits
+        residual = np.concatenate([residual, np.zeros(duration)])
+
+        window_peaks = np.lib.stride_tricks.sliding_window_view(residual, duration).max(axis=1)
+        fits = window_peaks + record["allocation"] <= self.capacity + ALLOCATION_EPSILON
+
+        first_day = record["start_day"] + 1
+        if not_before is not None:
+            first_day = max((not_before - self.origin).days, 0)
+        candidates = np.flatnonzero(fits[first_day:])
+        start_day = first_day + int(candidates[0]) if len(candidates) else max(first_day, self.n_days)
+        return self.day_to_date(start_day)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _normalize(self, assignment: Dict[str, Any]) -> Dict[str, Any]:
+        start = _as_date(assignment["assignment_start_date"])
+        end = _as_date(assignment["assignment_end_date"])
+        if end < start:
+            start, end = end, start
+
+        resource_id = str(assignment["resource_id"])
+        resource = assignment.get("resources") or {}
+        if resource.get("name") and resource_id not in self.resource_names:
+            self.resource_names[resource_id] = resource["name"]
+
+        task = assignment.get("tasks") or {}
+        return {
+            "id": str(assignment["id"]),
+            "task_id": assignment.get("task_id") or task.get("id"),
+            "task_name": task.get("name"),
+            "resource_id": resource_id,
+            "allocation": float(assignment["allocation_percentage"]),
+            "start": start,
+            "end": end
+        }
+
+    def _row_for(self, resource_id: str) -> int:
+        row = self._resource_rows.get(resource_id)
+        if row is None:
+            row = len(self._resource_rows)
+            self._resource_rows[resource_id] = row
+            self._row_assignments.append(set())
+        return row
+
+    def _ensure_row_capacity(self) -> None:
+        missing = len(self._resource_rows) - self.load.shape[0]
+        if missing > 0:
+            self.load = np.vstack([self.load, np.zeros((missing, self.n_days))])
+
+    def _ensure_days(self, start: date, end: date) -> tuple:
+        """Extend the day axis to cover [start, end]; returns their day indices."""
+        if self.origin is None:
+            self.origin = start
+        if start < self.origin:
+            shift = (self.origin - start).days
+            self.load = np.pad(self.load, ((0, 0), (shift, 0)))
+            for record in self._records.values():
+                record["start_day"] += shift
+                record["end_day"] += shift
+            self.origin = start
+
+        end_day = (end - self.origin).days
+        if end_day >= self.n_days:
+            self.load = np.pad(self.load, ((0, 0), (0, end_day + 1 - self.n_days)))
+        return (start - self.origin).days, end_day
+
+    def _rows(self, resource_ids: Optional[Iterable[str]]) -> np.ndarray:
+        if resource_ids is None:
+            return np.arange(len(self._resource_rows))
+        return np.array(
+            [self._resource_rows[str(r)] for r in resource_ids if str(r) in self._resource_rows],
+            dtype=int
+        )
+
+    def _records_for(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        if len(rows) == len(self._resource_rows):
+            return list(self._records.values())
+        wanted = set(rows.tolist())
+        return [r for r in self._records.values() if self._resource_rows[r["resource_id"]] in wanted]
+
+    def _active_assignments(self, row: int, start_day: int, end_day: int) -> List[str]:
+        return sorted(
+            assignment_id for assignment_id in self._row_assignments[row]
+            if self._records[assignment_id]["start_day"] <= end_day
+            and self._records[assignment_id]["end_day"] >= start_day
+        )
+
+    def _resource_name(self, resource_id: str) -> str:
+        return self.resource_names.get(resource_id, resource_id)
@@ -17,6 +17,7 @@ from cryptography.fernet import Fernet
 import hashlib
 import base64
 
+from monte_carlo.vectorized_sampling import create_generator, sample_occurrences, sample_triangular
 from roche_construction_models import (
     ShareablePermissions,
     ShareableURLResponse,
@@ -271,44 +272,61 @@ class MonteCarloEngine:
         risks: List[Dict[str, Any]], 
         config: SimulationConfig
     ) -> Tuple[np.ndarray, np.ndarray]:
-        """Run Monte Carlo iterations"""
+        """Run Monte Carlo iterations as one vectorized draw over all risks"""
         
         iterations = config.iterations
+        generator = create_generator(config.random_seed)
+        
+        probabilities = np.array([risk['probability'] for risk in risks], dtype=float)
+        impacts = np.array([risk['impact'] for risk in risks], dtype=float)
+        
+        occurrences = sample_occurrences(
+            generator, probabilities, iterations,
+            self._occurrence_correlation_matrix(risks, config.risk_correlation_matrix)
+        )
+        
         cost_results = np.zeros(iterations)
         schedule_results = np.zeros(iterations)
         
-        for i in range(iterations):
-            iteration_cost_impact = 0
-            iteration_schedule_impact = 0
-            
-            for risk in risks:
-                # Sample from probability distribution
-                if np.random.random() < risk['probability']:
-                    # Risk occurs - sample impact
-                    if config.include_cost_analysis:
-                        # Assume triangular distribution for cost impact
-                        min_cost = risk['impact'] * 0.5
-                        max_cost = risk['impact'] * 1.5
-                        most_likely = risk['impact']
-                        cost_impact = np.random.triangular(min_cost, most_likely, max_cost)
-                        iteration_cost_impact += cost_impact
-                    
-                    if config.include_schedule_analysis:
-                        # Assume schedule impact is proportional to cost impact
-                        # Convert to days (rough estimate)
-                        schedule_impact = risk['impact'] * 0.1  # 10% of cost impact as days
-                        schedule_impact = np.random.triangular(
-                            schedule_impact * 0.5, 
-                            schedule_impact, 
-                            schedule_impact * 1.5
-                        )
-                        iteration_schedule_impact += schedule_impact
-            
-            cost_results[i] = iteration_cost_impact
-            schedule_results[i] = iteration_schedule_impact
+        if config.include_cost_analysis:
+            # Assume triangular distribution for cost impact
+            cost_impacts = sample_triangular(
+                generator, impacts * 0.5, impacts, impacts * 1.5, occurrences.shape
+            )
+            cost_results = np.where(occurrences, cost_impacts, 0.0).sum(axis=1)
+        
+        if config.include_schedule_analysis:
+            # Assume schedule impact is proportional to cost impact
+            # Convert to days (rough estimate: 10% of cost impact as days)
+            schedule_modes = impacts * 0.1
+            schedule_impacts = sample_triangular(
+                generator, schedule_modes * 0.5, schedule_modes, schedule_modes * 1.5, occurrences.shape
+            )
+            schedule_results = np.where(occurrences, schedule_impacts, 0.0).sum(axis=1)
         
         return cost_results, schedule_results
     
+    def _occurrence_correlation_matrix(
+        self,
+        risks: List[Dict[str, Any]],
+        correlations: Optional[Dict[str, Dict[str, float]]]
+    ) -> Optional[np.ndarray]:
+        """Build the occurrence correlation matrix from the configured risk correlations"""
+        if not correlations:
+            return None
+        
+        risk_ids = [str(risk.get('id')) for risk in risks]
+        matrix = np.eye(len(risk_ids))
+        index_by_id = {risk_id: i for i, risk_id in enumerate(risk_ids)}
+        
+        for risk1_id, row in correlations.items():
+            for risk2_id, value in row.items():
+                i, j = index_by_id.get(str(risk1_id)), index_by_id.get(str(risk2_id))
+                if i is not None and j is not None and i != j:
+                    matrix[i, j] = matrix[j, i] = value
+        
+        return matrix
+    
     def _calculate_statistics(
         self, 
         cost_results: np.ndarray, 
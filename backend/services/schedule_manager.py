@@ -24,6 +24,7 @@ from models.schedule import (
     TaskCreate, TaskUpdate, TaskResponse, TaskProgressUpdate,
     TaskStatus, ScheduleWithTasksResponse, TaskHierarchyResponse
 )
+from services.progress_rollup_engine import ProgressRollupEngine
 
 logger = logging.getLogger(__name__)
 
@@ -271,7 +272,9 @@ class ScheduleManager:
             
             # If progress was updated, trigger parent rollup calculation
             if updates.progress_percentage is not None and existing_task.get("parent_task_id"):
-                await self._update_parent_progress_rollup(UUID(existing_task["parent_task_id"]))
+                await self._update_parent_progress_rollup(
+                    UUID(existing_task["parent_task_id"]), existing_task.get("schedule_id")
+                )
             
             return self._convert_task_to_response(updated_task)
             
@@ -386,23 +389,7 @@ class ScheduleManager:
                 raise ValueError(f"Invalid status transition from {current_status.value} to {new_status.value}")
             
             # Prepare update data
-            update_data = {
-                "progress_percentage": progress_data.progress_percentage,
-                "status": progress_data.status.value,
-                "updated_at": datetime.utcnow().isoformat()
-            }
-            
-            if progress_data.actual_start_date:
-                update_data["actual_start_date"] = progress_data.actual_start_date.isoformat()
-            
-            if progress_data.actual_end_date:
-                update_data["actual_end_date"] = progress_data.actual_end_date.isoformat()
-            
-            if progress_data.actual_effort_hours is not None:
-                update_data["actual_effort_hours"] = progress_data.actual_effort_hours
-                # Update remaining effort
-                planned_effort = existing_task.get("planned_effort_hours", 0) or 0
-                update_data["remaining_effort_hours"] = max(0, planned_effort - progress_data.actual_effort_hours)
+            update_data = self._build_progress_update(existing_task, progress_data)
             
             # Update task
             result = self.db.table("tasks").update(update_data).eq("id", str(task_id)).execute()
@@ -414,7 +401,9 @@ class ScheduleManager:
             
             # Trigger parent progress rollup if task has parent
             if existing_task.get("parent_task_id"):
-                await self._update_parent_progress_rollup(UUID(existing_task["parent_task_id"]))
+                await self._update_parent_progress_rollup(
+                    UUID(existing_task["parent_task_id"]), existing_task.get("schedule_id")
+                )
             
             return self._convert_task_to_response(updated_task)
             
@@ -590,40 +579,88 @@ class ScheduleManager:
         
         return new_status in valid_transitions.get(current_status, [])
     
-    async def _update_parent_progress_rollup(self, parent_task_id: UUID) -> None:
+    async def _update_parent_progress_rollup(
+        self,
+        parent_task_id: UUID,
+        schedule_id: Optional[str] = None
+    ) -> None:
         """
         Update parent task progress based on child task completion.
         
+        The schedule's task tree is loaded once and the parent and all of its
+        ancestors are recomputed in memory, then written in one bulk update.
+        
         Args:
             parent_task_id: ID of the parent task to update
+            schedule_id: ID of the schedule the task belongs to (looked up if not given)
         """
         try:
-            # Calculate rollup progress
-            rollup_progress = self.calculate_task_rollup_progress(parent_task_id)
-            
-            # Update parent task progress
-            update_data = {
-                "progress_percentage": int(rollup_progress),
-                "updated_at": datetime.utcnow().isoformat()
-            }
-            
-            # Update status based on progress
-            if rollup_progress == 100:
-                update_data["status"] = TaskStatus.COMPLETED.value
-            elif rollup_progress > 0:
-                update_data["status"] = TaskStatus.IN_PROGRESS.value
-            
-            result = self.db.table("tasks").update(update_data).eq("id", str(parent_task_id)).execute()
+            if not schedule_id:
+                parent_result = self.db.table("tasks").select("schedule_id").eq("id", str(parent_task_id)).execute()
+                if not parent_result.data:
+                    return
+                schedule_id = parent_result.data[0]["schedule_id"]
             
-            if result.data:
-                # Check if this parent has its own parent and continue rollup
-                parent_data = result.data[0]
-                if parent_data.get("parent_task_id"):
-                    await self._update_parent_progress_rollup(UUID(parent_data["parent_task_id"]))
+            rollup = self._load_progress_tree([schedule_id])
+            changes = rollup.rollup_parents([str(parent_task_id)])
+            self._write_task_progress([{"id": task_id, **fields} for task_id, fields in changes.items()])
             
         except Exception as e:
             logger.error(f"Error updating parent progress rollup for task {parent_task_id}: {e}")
     
+    def _load_progress_tree(self, schedule_ids: List[str]) -> ProgressRollupEngine:
+        """Load the task trees of the given schedules for progress rollup in one query."""
+        tasks_result = self.db.table("tasks").select(
+            "id, parent_task_id, progress_percentage, planned_effort_hours, status"
+        ).in_("schedule_id", [str(schedule_id) for schedule_id in schedule_ids]).execute()
+        
+        return ProgressRollupEngine.for_tasks(tasks_result.data or [])
+    
+    def _write_task_progress(self, updates: List[Dict[str, Any]]) -> None:
+        """
+        Write progress fields for many tasks in one statement.
+        
+        Args:
+            updates: Rows with the task id and the progress fields to set
+        """
+        if not updates:
+            return
+        
+        try:
+            self.db.rpc("bulk_update_task_progress", {"updates": updates}).execute()
+        except Exception as e:
+            logger.warning(f"Bulk task progress update failed, falling back to per-task updates: {e}")
+            for update in updates:
+                update_data = {k: v for k, v in update.items() if k != "id"}
+                update_data["updated_at"] = datetime.utcnow().isoformat()
+                self.db.table("tasks").update(update_data).eq("id", update["id"]).execute()
+    
+    def _build_progress_update(
+        self,
+        existing_task: Dict[str, Any],
+        progress_data: TaskProgressUpdate
+    ) -> Dict[str, Any]:
+        """Build the task update for a progress update."""
+        update_data = {
+            "progress_percentage": progress_data.progress_percentage,
+            "status": progress_data.status.value,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        
+        if progress_data.actual_start_date:
+            update_data["actual_start_date"] = progress_data.actual_start_date.isoformat()
+        
+        if progress_data.actual_end_date:
+            update_data["actual_end_date"] = progress_data.actual_end_date.isoformat()
+        
+        if progress_data.actual_effort_hours is not None:
+            update_data["actual_effort_hours"] = progress_data.actual_effort_hours
+            # Update remaining effort
+            planned_effort = existing_task.get("planned_effort_hours", 0) or 0
+            update_data["remaining_effort_hours"] = max(0, planned_effort - progress_data.actual_effort_hours)
+        
+        return update_data
+    
     async def get_schedule(self, schedule_id: UUID) -> Optional[ScheduleResponse]:
         """
         Get a single schedule by ID.
@@ -717,7 +754,7 @@ class ScheduleManager:
         """
         try:
             # Get task to check for children
-            task_result = self.db.table("tasks").select("id, parent_task_id").eq("id", str(task_id)).execute()
+            task_result = self.db.table("tasks").select("id, parent_task_id, schedule_id").eq("id", str(task_id)).execute()
             
             if not task_result.data:
                 return False
@@ -729,7 +766,9 @@ class ScheduleManager:
             
             # Update parent progress if task had a parent
             if task_data.get("parent_task_id"):
-                await self._update_parent_progress_rollup(UUID(task_data["parent_task_id"]))
+                await self._update_parent_progress_rollup(
+                    UUID(task_data["parent_task_id"]), task_data.get("schedule_id")
+                )
             
             return len(result.data) > 0 if result.data else False
             
@@ -829,7 +868,9 @@ class ScheduleManager:
             
             # Trigger parent progress rollup
             if existing_task.get("parent_task_id"):
-                await self._update_parent_progress_rollup(UUID(existing_task["parent_task_id"]))
+                await self._update_parent_progress_rollup(
+                    UUID(existing_task["parent_task_id"]), existing_task.get("schedule_id")
+                )
             
             return self._convert_task_to_response(updated_task)
             
@@ -959,6 +1000,11 @@ class ScheduleManager:
         """
         Update progress for multiple tasks in a single operation.
         
+        Changed tasks and their task trees are loaded once, parent progress is
+        rolled up in memory, and all task and parent changes are written in one
+        bulk update, so the number of database calls does not depend on the
+        number of tasks.
+        
         Args:
             progress_updates: List of progress update dictionaries
             updated_by: ID of the user updating progress
@@ -970,6 +1016,7 @@ class ScheduleManager:
             successful_updates = []
             failed_updates = []
             
+            parsed_updates = []
             for update in progress_updates:
                 try:
                     task_id = UUID(update["task_id"])
@@ -981,13 +1028,7 @@ class ScheduleManager:
                         actual_effort_hours=update.get("actual_effort_hours"),
                         notes=update.get("notes")
                     )
-                    
-                    updated_task = await self.update_task_progress(task_id, progress_data, updated_by)
-                    successful_updates.append({
-                        "task_id": str(task_id),
-                        "success": True,
-                        "updated_task": updated_task
-                    })
+                    parsed_updates.append((str(task_id), progress_data))
                     
                 except Exception as e:
                     failed_updates.append({
@@ -996,6 +1037,66 @@ class ScheduleManager:
                         "error": str(e)
                     })
             
+            if parsed_updates:
+                # Load all changed tasks in one query
+                existing_result = self.db.table("tasks").select("*").in_(
+                    "id", list({task_id for task_id, _ in parsed_updates})
+                ).execute()
+                existing_tasks = {task["id"]: task for task in existing_result.data or []}
+                
+                task_updates: Dict[str, Dict[str, Any]] = {}
+                for task_id, progress_data in parsed_updates:
+                    existing_task = existing_tasks.get(task_id)
+                    if not existing_task:
+                        failed_updates.append({"task_id": task_id, "success": False, "error": f"Task {task_id} not found"})
+                        continue
+                    
+                    current_status = TaskStatus(existing_task["status"])
+                    if not self._is_valid_status_transition(current_status, progress_data.status):
+                        failed_updates.append({
+                            "task_id": task_id,
+                            "success": False,
+                            "error": f"Invalid status transition from {current_status.value} to {progress_data.status.value}"
+                        })
+                        continue
+                    
+                    task_updates[task_id] = self._build_progress_update(existing_task, progress_data)
+                
+                if task_updates:
+                    # Roll up all changes through the affected task trees in memory
+                    rollup = self._load_progress_tree(
+                        list({existing_tasks[task_id]["schedule_id"] for task_id in task_updates})
+                    )
+                    parent_changes = rollup.apply({
+                        task_id: update_data["progress_percentage"]
+                        for task_id, update_data in task_updates.items()
+                    })
+                    
+                    writes = {
+                        task_id: {k: v for k, v in update_data.items() if k != "updated_at"}
+                        for task_id, update_data in task_updates.items()
+                    }
+                    for task_id, fields in parent_changes.items():
+                        writes.setdefault(task_id, {}).update(fields)
+                    
+                    self._write_task_progress([{"id": task_id, **fields} for task_id, fields in writes.items()])
+                    
+                    for task_id, update_data in task_updates.items():
+                        successful_updates.append({
+                            "task_id": task_id,
+                            "success": True,
+                            "updated_task": self._convert_task_to_response({
+                                **existing_tasks[task_id], **update_data, **parent_changes.get(task_id, {})
+                            })
+                        })
+                    
+                    for task_id, progress_data in parsed_updates:
+                        if task_id in task_updates:
+                            await self._create_progress_history_record(
+                                UUID(task_id), progress_data.progress_percentage,
+                                progress_data.status, progress_data.notes, updated_by
+                            )
+            
             return {
                 "total_updates": len(progress_updates),
                 "successful_updates": len(successful_updates),
@@ -1084,6 +1185,9 @@ class ScheduleManager:
         """
         Recalculate progress for all parent tasks in a schedule.
         
+        The task tree is loaded once, all parents are recomputed bottom-up in
+        memory and the changed ones are written in one bulk update.
+        
         Args:
             schedule_id: ID of the schedule
             
@@ -1091,34 +1195,22 @@ class ScheduleManager:
             Dict with recalculation results
         """
         try:
-            # Get all tasks with children
-            tasks_result = self.db.table("tasks").select("id, parent_task_id").eq("schedule_id", str(schedule_id)).execute()
+            rollup = self._load_progress_tree([str(schedule_id)])
             
-            if not tasks_result.data:
+            if not rollup.parents:
                 return {"updated_tasks": 0, "errors": []}
             
-            tasks = tasks_result.data
-            
-            # Find all parent tasks
-            parent_task_ids = set()
-            for task in tasks:
-                if task.get("parent_task_id"):
-                    parent_task_ids.add(UUID(task["parent_task_id"]))
+            changes = rollup.recalculate_all()
             
-            # Update progress for each parent task
-            updated_count = 0
             errors = []
-            
-            for parent_id in parent_task_ids:
-                try:
-                    await self._update_parent_progress_rollup(parent_id)
-                    updated_count += 1
-                except Exception as e:
-                    errors.append(f"Failed to update parent {parent_id}: {str(e)}")
+            try:
+                self._write_task_progress([{"id": task_id, **fields} for task_id, fields in changes.items()])
+            except Exception as e:
+                errors.append(f"Failed to update parent progress: {str(e)}")
             
             return {
-                "updated_tasks": updated_count,
-                "total_parents": len(parent_task_ids),
+                "updated_tasks": len(changes) if not errors else 0,
+                "total_parents": len(rollup.children),
                 "errors": errors
             }
             
@@ -0,0 +1,284 @@
+"""
+Share link payload cache and batched access logging
+
+Guest views of popular share links build the same sanitized project payload
+over and over. ShareResolutionCache keeps, per process, the
+permission-filtered payload keyed by project, permission level and the
+project's data version. The version is a token in the shared cache manager
+(Redis when configured), replaced on every project write, so a payload is
+no longer served by any worker once the project changed. Token validations
+are cached in the same shared cache manager by GuestAccessController, and
+the revoke, extend and suspend endpoints delete them.
+
+AccessLogBuffer takes access log writes off the request path: entries are
+queued in memory and written by a background thread in batches (one insert
+for the logs, one read and one update per share for the access counters).
+
+A cached guest view reads the validation and the project version from the
+cache manager and makes no database calls.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from cachetools import TTLCache
+
+from config.database import get_db
+from config.settings import settings
+from models.shareable_urls import FilteredProjectData
+from performance_optimization import CacheManager
+
+logger = logging.getLogger(__name__)
+
+
+class ShareResolutionCache:
+    """Filtered project payloads of share links, versioned by a project data version shared by all workers"""
+
+    # Versions outlive every payload; an expired version only causes a miss
+    VERSION_TTL = 86400
+
+    def __init__(
+        self,
+        cache_manager: Optional[CacheManager] = None,
+        payload_ttl: float = 300,
+        maxsize: int = 10000,
+        timer: Callable[[], float] = time.monotonic
+    ):
+        self.cache_manager = cache_manager or CacheManager()
+        self._payloads: TTLCache = TTLCache(maxsize=maxsize, ttl=payload_ttl, timer=timer)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def project_version(self, project_id: Any) -> str:
+        """
+        Current data version of a project.
+
+        Read the version before the project data: a payload built from that
+        data is cached under it and no longer served once a write replaces it.
+        """
+        key = f"share_project_version:{project_id}"
+        version = await self.cache_manager.get(key)
+        if not version:
+            version = uuid4().hex
+            await self.cache_manager.set(key, version, ttl=self.VERSION_TTL)
+        return version
+
+    def get_payload(
+        self,
+        project_id: Any,
+        permission_level: str,
+        version: str
+    ) -> Optional[FilteredProjectData]:
+        """Cached payload of a project at the given data version"""
+        key = (str(project_id), permission_level, version)
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return payload
+
+    def put_payload(
+        self,
+        project_id: Any,
+        permission_level: str,
+        version: str,
+        payload: FilteredProjectData
+    ) -> None:
+        """Cache a payload built from data read at the given version"""
+        with self._lock:
+            self._payloads[(str(project_id), permission_level, version)] = payload
+
+    async def invalidate_project(self, project_id: Any) -> None:
+        """
+        Start a new data version of a project; call after every write to it.
+
+        Payloads cached under the old version are no longer served by any
+        worker; this worker's are dropped right away.
+        """
+        await self.cache_manager.set(
+            f"share_project_version:{project_id}", uuid4().hex, ttl=self.VERSION_TTL
+        )
+        with self._lock:
+            project_id = str(project_id)
+            for key in [key for key in self._payloads.keys() if key[0] == project_id]:
+                self._payloads.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._payloads.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "payloads": len(self._payloads),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class AccessLogBuffer:
+    """
+    Share access logs written in batches by a background thread.
+
+    Entries beyond max_pending are dropped (oldest first) rather than
+    slowing down guest requests when the database falls behind.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        flush_interval: float = 2.0,
+        batch_size: int = 500,
+        max_pending: int = 50000
+    ):
+        self._db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Deque[Tuple[Dict[str, Any], bool]] = deque(maxlen=max_pending)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_db()
+
+    def add(
+        self,
+        share_id: str,
+        ip_address: str,
+        user_agent: Optional[str],
+        success: bool
+    ) -> None:
+        """Queue an access log entry"""
+        entry = {
+            "share_id": share_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "accessed_at": datetime.now(timezone.utc).isoformat(),
+            "is_suspicious": False,
+            "accessed_sections": []
+        }
+        self._pending.append((entry, success))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        self._ensure_flusher()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Write every queued entry now; returns the number of entries written"""
+        written = 0
+        with self._flush_lock:
+            while self._pending:
+                batch = self._drain()
+                try:
+                    self._write(batch)
+                    written += len(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.error(f"Failed to write {len(batch)} share access logs: {e}")
+                    break
+        self.written += written
+        return written
+
+    def close(self) -> None:
+        """Stop the flusher and write what is left"""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _drain(self) -> List[Tuple[Dict[str, Any], bool]]:
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            batch.append(self._pending.popleft())
+        return batch
+
+    def _write(self, batch: List[Tuple[Dict[str, Any], bool]]) -> None:
+        db = self.db
+        if not db:
+            raise RuntimeError("Database client not available")
+
+        db.table("share_access_logs").insert([entry for entry, _ in batch]).execute()
+
+        successes = Counter(entry["share_id"] for entry, success in batch if success)
+        if not successes:
+            return
+        last_access = {entry["share_id"]: entry for entry, success in batch if success}
+
+        shares = db.table("project_shares").select("id, access_count").in_(
+            "id", list(successes)
+        ).execute()
+        now = datetime.now(timezone.utc).isoformat()
+        for share in shares.data or []:
+            share_id = share["id"]
+            latest = last_access[share_id]
+            db.table("project_shares").update({
+                "access_count": (share.get("access_count") or 0) + successes[share_id],
+                "last_accessed_at": latest["accessed_at"],
+                "last_accessed_ip": latest["ip_address"],
+                "updated_at": now
+            }).eq("id", share_id).execute()
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None or self._closed:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="share-access-log-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._pending:
+                self.flush()
+
+
+_resolution_cache: Optional[ShareResolutionCache] = None
+_access_log_buffer: Optional[AccessLogBuffer] = None
+
+
+def get_share_resolution_cache() -> ShareResolutionCache:
+    """Process-wide share link payload cache, with versions and validations in Redis when configured"""
+    global _resolution_cache
+    if _resolution_cache is None:
+        _resolution_cache = ShareResolutionCache(CacheManager(settings.REDIS_URL))
+    return _resolution_cache
+
+
+def get_access_log_buffer() -> AccessLogBuffer:
+    """Process-wide share access log buffer"""
+    global _access_log_buffer
+    if _access_log_buffer is None:
+        _access_log_buffer = AccessLogBuffer()
+    return _access_log_buffer
+
+
+def close_access_log_buffer() -> None:
+    """Write pending access logs; called on application shutdown"""
+    global _access_log_buffer
+    if _access_log_buffer is not None:
+        _access_log_buffer.close()
+        _access_log_buffer = None
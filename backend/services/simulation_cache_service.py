@@ -17,6 +17,7 @@ import pickle
 import numpy as np
 
 from monte_carlo.models import SimulationResults
+from utils.json_codec import dumps, loads
 
 logger = logging.getLogger(__name__)
 
@@ -180,7 +181,7 @@ class SimulationCacheService:
             await self.redis_client.setex(
                 metadata_key,
                 ttl_seconds,
-                json.dumps(metadata).encode()
+                dumps(metadata)
             )
             
             logger.info(f"Cached simulation result {simulation_id} for project {project_id}")
@@ -346,7 +347,7 @@ class SimulationCacheService:
             queue_key = f"{self.QUEUE_PREFIX}pending"
             await self.redis_client.zadd(
                 queue_key,
-                {json.dumps(job_data): priority}
+                {dumps(job_data): priority}
             )
             
             # Store job details
@@ -354,7 +355,7 @@ class SimulationCacheService:
             await self.redis_client.setex(
                 job_key,
                 86400,  # 24 hour TTL for job data
-                json.dumps(job_data).encode()
+                dumps(job_data)
             )
             
             logger.info(f"Queued background simulation job {job_id} for project {project_id}")
@@ -385,7 +386,7 @@ class SimulationCacheService:
             
             # Parse job data
             job_json, priority = result[0]
-            job_data = json.loads(job_json)
+            job_data = loads(job_json)
             
             # Update job status
             job_key = f"{self.QUEUE_PREFIX}{job_data['job_id']}"
@@ -394,7 +395,7 @@ class SimulationCacheService:
             await self.redis_client.setex(
                 job_key,
                 86400,
-                json.dumps(job_data).encode()
+                dumps(job_data)
             )
             
             logger.info(f"Dequeued simulation job {job_data['job_id']}")
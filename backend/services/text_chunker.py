@@ -5,11 +5,17 @@ Splits documents into optimal chunks for embedding and retrieval
 
 import logging
 import re
-from typing import List, Optional, Dict, Any
+from bisect import bisect_left
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Paragraph separator: a blank line
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
 
 class ChunkingError(Exception):
     """Base exception for chunking errors"""
@@ -136,10 +142,10 @@ class TextChunker:
         Split text into chunks by token count with overlap.
         
         This method:
-        1. Encodes text into tokens
+        1. Encodes text into tokens once, keeping each token's character offset
         2. Splits into chunks of target size
         3. Adds overlap between adjacent chunks
-        4. Decodes back to text
+        4. Slices chunk text from the original text at the token offsets
         
         Args:
             text: Input text to chunk
@@ -156,62 +162,14 @@ class TextChunker:
             f"chunk_size={self.chunk_size}, overlap={self.overlap}"
         )
         
-        # Encode text to tokens
-        if self.encoder:
-            tokens = self.encoder.encode(text)
-        else:
-            # Fallback: approximate tokens (1 token ≈ 4 characters)
-            tokens = self._approximate_tokens(text)
-        
-        total_tokens = len(tokens)
-        logger.debug(f"Total tokens: {total_tokens}")
+        offsets = self._token_offsets(text)
+        logger.debug(f"Total tokens: {len(offsets)}")
         
-        chunks = []
-        chunk_index = 0
-        start_token = 0
-        
-        while start_token < total_tokens:
-            # Calculate end token for this chunk
-            end_token = min(start_token + self.chunk_size, total_tokens)
-            
-            # Extract chunk tokens
-            chunk_tokens = tokens[start_token:end_token]
-            
-            # Decode tokens back to text
-            if self.encoder:
-                chunk_text = self.encoder.decode(chunk_tokens)
-            else:
-                # Fallback: use character-based approximation
-                chars_per_token = len(text) / total_tokens
-                start_char = int(start_token * chars_per_token)
-                end_char = int(end_token * chars_per_token)
-                chunk_text = text[start_char:end_char]
-            
-            # Calculate character positions (approximate for token-based)
-            start_char = text.find(chunk_text[:50]) if len(chunk_text) >= 50 else 0
-            if start_char == -1:
-                start_char = 0
-            end_char = start_char + len(chunk_text)
-            
-            # Create chunk
-            chunk = Chunk(
-                content=chunk_text.strip(),
-                chunk_index=chunk_index,
-                token_count=len(chunk_tokens),
-                start_char=start_char,
-                end_char=end_char,
-                metadata=metadata.copy() if metadata else {}
+        chunks: List[Chunk] = []
+        for start_token, end_token in self._token_windows(0, len(offsets)):
+            self._append_span(
+                chunks, text, offsets, start_token, end_token, 0, len(text), metadata
             )
-            
-            chunks.append(chunk)
-            
-            # Move to next chunk with overlap
-            start_token = end_token - self.overlap
-            chunk_index += 1
-            
-            # Prevent infinite loop
-            if start_token >= total_tokens:
-                break
         
         logger.info(f"Created {len(chunks)} chunks from text")
         
@@ -226,11 +184,14 @@ class TextChunker:
         Split text at natural boundaries (paragraphs, sections) while respecting token limits.
         
         This method:
-        1. Splits text into paragraphs
+        1. Splits text into paragraphs, keeping their character spans
         2. Groups paragraphs into chunks that fit within token limit
         3. Preserves paragraph boundaries when possible
         4. Falls back to token-based splitting for oversized paragraphs
         
+        The text is encoded once; token counts of paragraphs and chunks are
+        looked up from the token offsets.
+        
         Args:
             text: Input text to chunk
             metadata: Optional metadata to attach to all chunks
@@ -246,106 +207,152 @@ class TextChunker:
             f"chunk_size={self.chunk_size}"
         )
         
-        # Split into paragraphs (double newline or more)
-        paragraphs = re.split(r'\n\s*\n', text)
-        paragraphs = [p.strip() for p in paragraphs if p.strip()]
+        offsets = self._token_offsets(text)
         
+        def first_token(char: int) -> int:
+            return bisect_left(offsets, char)
+        
+        paragraphs = self._paragraph_spans(text)
         logger.debug(f"Found {len(paragraphs)} paragraphs")
         
-        chunks = []
-        chunk_index = 0
-        current_chunk_text = []
-        current_chunk_tokens = 0
-        current_start_char = 0
+        chunks: List[Chunk] = []
+        # Paragraphs of the chunk being built: (start_char, end_char)
+        current: List[Tuple[int, int]] = []
+        
+        def flush() -> None:
+            if current:
+                start_char, end_char = current[0][0], current[-1][1]
+                self._append_span(
+                    chunks, text, offsets, first_token(start_char), first_token(end_char),
+                    start_char, end_char, metadata
+                )
         
-        for para_idx, paragraph in enumerate(paragraphs):
-            para_tokens = self._count_tokens(paragraph)
+        for para_start, para_end in paragraphs:
+            para_first, para_last = first_token(para_start), first_token(para_end)
             
             # If single paragraph exceeds chunk size, split it
-            if para_tokens > self.chunk_size:
-                # Save current chunk if it has content
-                if current_chunk_text:
-                    chunk_text = '\n\n'.join(current_chunk_text)
-                    chunk = self._create_chunk(
-                        chunk_text,
-                        chunk_index,
-                        current_chunk_tokens,
-                        current_start_char,
-                        metadata
+            if para_last - para_first > self.chunk_size:
+                flush()
+                current = []
+                for start_token, end_token in self._token_windows(para_first, para_last):
+                    self._append_span(
+                        chunks, text, offsets, start_token, end_token, para_start, para_end, metadata
                     )
-                    chunks.append(chunk)
-                    chunk_index += 1
-                    current_chunk_text = []
-                    current_chunk_tokens = 0
-                
-                # Split oversized paragraph using token-based chunking
-                para_chunks = self.chunk_by_tokens(paragraph, metadata)
-                for para_chunk in para_chunks:
-                    para_chunk.chunk_index = chunk_index
-                    para_chunk.start_char = text.find(para_chunk.content, current_start_char)
-                    if para_chunk.start_char == -1:
-                        para_chunk.start_char = current_start_char
-                    para_chunk.end_char = para_chunk.start_char + len(para_chunk.content)
-                    chunks.append(para_chunk)
-                    chunk_index += 1
-                    current_start_char = para_chunk.end_char
-                
                 continue
             
             # Check if adding this paragraph would exceed chunk size
-            if current_chunk_tokens + para_tokens > self.chunk_size and current_chunk_text:
-                # Save current chunk
-                chunk_text = '\n\n'.join(current_chunk_text)
-                chunk = self._create_chunk(
-                    chunk_text,
-                    chunk_index,
-                    current_chunk_tokens,
-                    current_start_char,
-                    metadata
-                )
-                chunks.append(chunk)
-                chunk_index += 1
+            if current and para_last - first_token(current[0][0]) > self.chunk_size:
+                flush()
                 
                 # Start new chunk with overlap
                 # Include last paragraph from previous chunk for overlap
-                if len(current_chunk_text) > 0:
-                    overlap_text = current_chunk_text[-1]
-                    overlap_tokens = self._count_tokens(overlap_text)
-                    
-                    if overlap_tokens <= self.overlap:
-                        current_chunk_text = [overlap_text]
-                        current_chunk_tokens = overlap_tokens
-                    else:
-                        current_chunk_text = []
-                        current_chunk_tokens = 0
-                else:
-                    current_chunk_text = []
-                    current_chunk_tokens = 0
-                
-                current_start_char = text.find(paragraph, current_start_char)
-                if current_start_char == -1:
-                    current_start_char = 0
+                overlap_start, overlap_end = current[-1]
+                current = []
+                if (
+                    first_token(overlap_end) - first_token(overlap_start) <= self.overlap
+                    and para_last - first_token(overlap_start) <= self.chunk_size
+                ):
+                    current = [(overlap_start, overlap_end)]
             
             # Add paragraph to current chunk
-            current_chunk_text.append(paragraph)
-            current_chunk_tokens += para_tokens
+            current.append((para_start, para_end))
         
         # Add final chunk if it has content
-        if current_chunk_text:
-            chunk_text = '\n\n'.join(current_chunk_text)
-            chunk = self._create_chunk(
-                chunk_text,
-                chunk_index,
-                current_chunk_tokens,
-                current_start_char,
-                metadata
-            )
-            chunks.append(chunk)
+        flush()
         
         logger.info(f"Created {len(chunks)} chunks preserving semantic boundaries")
         
         return chunks
     
+    def _token_offsets(self, text: str) -> List[int]:
+        """
+        Encode text once and return the character offset at which each token starts.
+        
+        Offsets follow tiktoken's decode_with_offsets: a token starting inside a
+        multi-byte character is attributed to that character.
+        
+        Args:
+            text: Text to encode
+            
+        Returns:
+            Character offset of every token, in order
+        """
+        if not self.encoder:
+            # Fallback: approximate tokens (1 token ≈ 4 characters)
+            return self._approximate_tokens(text)
+        
+        offsets = []
+        chars = 0
+        for token in self.encoder.decode_tokens_bytes(self.encoder.encode(text)):
+            if token.isascii():
+                offsets.append(chars)
+                chars += len(token)
+            else:
+                # UTF-8 continuation bytes (0b10xxxxxx) do not start a character
+                offsets.append(max(0, chars - (0x80 <= token[0] < 0xC0)))
+                chars += len(token.translate(None, UTF8_CONTINUATION_BYTES))
+        return offsets
+    
+    def _token_windows(self, first: int, last: int) -> Iterator[Tuple[int, int]]:
+        """Token ranges [start, end) of chunk_size tokens within [first, last), overlapping by overlap"""
+        start = first
+        while start < last:
+            end = min(start + self.chunk_size, last)
+            yield start, end
+            if end == last:
+                return
+            start = end - self.overlap
+    
+    def _append_span(
+        self,
+        chunks: List[Chunk],
+        text: str,
+        offsets: List[int],
+        start_token: int,
+        end_token: int,
+        span_start: int,
+        span_end: int,
+        metadata: Optional[Dict[str, Any]]
+    ) -> None:
+        """Append the chunk of tokens [start_token, end_token), clamped to a character span"""
+        start_char = max(span_start, offsets[start_token]) if start_token < len(offsets) else span_end
+        end_char = min(span_end, offsets[end_token]) if end_token < len(offsets) else span_end
+        
+        # Trim surrounding whitespace so text[start_char:end_char] == content
+        content = text[start_char:end_char]
+        stripped = content.strip()
+        if not stripped:
+            return
+        start_char += len(content) - len(content.lstrip())
+        
+        chunks.append(Chunk(
+            content=stripped,
+            chunk_index=len(chunks),
+            token_count=end_token - start_token,
+            start_char=start_char,
+            end_char=start_char + len(stripped),
+            metadata=metadata.copy() if metadata else {}
+        ))
+    
+    @staticmethod
+    def _paragraph_spans(text: str) -> List[Tuple[int, int]]:
+        """Character spans of the non-blank paragraphs of text, without surrounding whitespace"""
+        spans = []
+        start = 0
+        for match in PARAGRAPH_BREAK.finditer(text):
+            spans.append((start, match.start()))
+            start = match.end()
+        spans.append((start, len(text)))
+        
+        trimmed = []
+        for start, end in spans:
+            paragraph = text[start:end]
+            stripped = paragraph.strip()
+            if stripped:
+                start += len(paragraph) - len(paragraph.lstrip())
+                trimmed.append((start, start + len(stripped)))
+        return trimmed
+    
     def _create_chunk(
         self,
         text: str,
@@ -391,7 +398,7 @@ class TextChunker:
             text: Text to tokenize
             
         Returns:
-            List of pseudo-token IDs (character indices)
+            List of pseudo-token IDs (character indices, which are also their offsets)
         """
         # Simple approximation: treat every 4 characters as a token
         return list(range(0, len(text), 4))
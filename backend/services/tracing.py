@@ -0,0 +1,536 @@
+"""
+Request tracing
+
+Lightweight in-process tracing of where a request spends its time:
+- TracingMiddleware starts a trace per request; the trace is carried in a
+  context variable, so spans recorded anywhere while handling the request
+  (including threadpool endpoints and asyncio.to_thread calls) attach to it
+- Supabase queries, Redis commands, OpenAI/xAI calls (see
+  services/tracing_instrumentation.py) and Monte Carlo runs (traced()) are
+  recorded as spans; outside a request they are not recorded at all
+- each trace has a timing breakdown by kind (db, cache, llm, monte_carlo)
+  plus the application time outside any span (Python CPU and uninstrumented
+  I/O), returned to clients in a Server-Timing header when
+  TRACE_RESPONSE_HEADERS is set
+- N+1 detection: requests issuing more than N queries with the same shape
+  (table, operation, filtered columns) are flagged
+- slow, failed, N+1 and randomly sampled traces are kept in a ring buffer for
+  /api/admin/performance/traces and exported in OTLP/HTTP JSON format to a
+  collector when OTEL_EXPORTER_OTLP_ENDPOINT is set
+"""
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+from utils.json_codec import dumps
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+OTLP_KIND_INTERNAL = 1
+OTLP_KIND_SERVER = 2
+OTLP_KIND_CLIENT = 3
+CLIENT_SPAN_KINDS = frozenset(("db", "cache", "llm"))
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span_id", default=None)
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class Span:
+    """A timed operation within a trace; times are nanoseconds from the trace start"""
+
+    __slots__ = ("span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, kind: str, parent_id: Optional[str], start_ns: int, attributes: Dict[str, Any]):
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns
+        self.end_ns = start_ns
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": round(self.start_ns / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class Trace:
+    """Spans recorded while handling one request"""
+
+    def __init__(self, method: str, path: str, max_spans: int = 500):
+        self.trace_id = _new_id(16)
+        self.root_span_id = _new_id(8)
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.started_at = time.time_ns()
+        self._start = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        # Counted for every span, including those over max_spans
+        self.kind_totals: Dict[str, List[int]] = {}
+        self.statements: Dict[str, List[int]] = {}
+        self.sample_reasons: List[str] = []
+        self._lock = threading.Lock()
+
+    def elapsed_ns(self) -> int:
+        return time.perf_counter_ns() - self._start
+
+    @property
+    def duration_ms(self) -> float:
+        duration = self.duration_ns if self.duration_ns is not None else self.elapsed_ns()
+        return duration / 1e6
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.route or self.path}"
+
+    def add_span(self, span: Span) -> None:
+        duration = span.end_ns - span.start_ns
+        statement = span.attributes.get("db.statement") if span.kind == "db" else None
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+            totals = self.kind_totals.get(span.kind)
+            if totals is None:
+                totals = self.kind_totals[span.kind] = [0, 0]
+            totals[0] += 1
+            totals[1] += duration
+            if statement:
+                totals = self.statements.get(statement)
+                if totals is None:
+                    totals = self.statements[statement] = [0, 0]
+                totals[0] += 1
+                totals[1] += duration
+
+    def finish(self, route: Optional[str], status_code: Optional[int]) -> None:
+        self.duration_ns = self.elapsed_ns()
+        self.route = route
+        self.status_code = status_code
+
+    def breakdown(self) -> Dict[str, Any]:
+        """
+        Time per span kind, and application time: the part of the request
+        not covered by any span. Spans running concurrently are counted once
+        in the application time but each in its own kind.
+        """
+        total_ns = self.duration_ns if self.duration_ns is not None else self.elapsed_ns()
+        with self._lock:
+            kinds = {kind: {"count": n, "ms": round(ns / 1e6, 3)} for kind, (n, ns) in self.kind_totals.items()}
+            intervals = sorted((span.start_ns, span.end_ns) for span in self.spans)
+
+        covered = 0
+        current_start = current_end = None
+        for start, end in intervals:
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    covered += current_end - current_start
+                current_start, current_end = start, end
+            elif end > current_end:
+                current_end = end
+        if current_end is not None:
+            covered += current_end - current_start
+
+        return {
+            "total_ms": round(total_ns / 1e6, 3),
+            "application_ms": round(max(total_ns - covered, 0) / 1e6, 3),
+            "kinds": kinds
+        }
+
+    def n_plus_one(self, threshold: int) -> List[Dict[str, Any]]:
+        """Query shapes issued more than threshold times, most frequent first"""
+        with self._lock:
+            repeated = [
+                {"statement": statement, "count": n, "total_ms": round(ns / 1e6, 3)}
+                for statement, (n, ns) in self.statements.items()
+                if n > threshold
+            ]
+        return sorted(repeated, key=lambda item: item["count"], reverse=True)
+
+    def server_timing(self) -> str:
+        """Breakdown as a Server-Timing header value"""
+        breakdown = self.breakdown()
+        entries = [
+            f'{kind};dur={totals["ms"]};desc="{totals["count"]} calls"'
+            for kind, totals in breakdown["kinds"].items()
+        ]
+        entries.append(f'app;dur={breakdown["application_ms"]}')
+        entries.append(f'total;dur={breakdown["total_ms"]}')
+        return ", ".join(entries)
+
+    def summary(self, n_plus_one_threshold: int) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "method": self.method,
+            "route": self.route,
+            "path": self.path,
+            "status_code": self.status_code,
+            "started_at": datetime.fromtimestamp(self.started_at / 1e9, tz=timezone.utc).isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "span_count": len(self.spans) + self.dropped_spans,
+            "sample_reasons": self.sample_reasons,
+            "breakdown": self.breakdown(),
+            "n_plus_one": self.n_plus_one(n_plus_one_threshold)
+        }
+
+    def to_dict(self, n_plus_one_threshold: int) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        return {
+            **self.summary(n_plus_one_threshold),
+            "dropped_spans": self.dropped_spans,
+            "spans": [span.to_dict() for span in spans]
+        }
+
+
+class Tracer:
+    """
+    Records request traces and keeps the interesting ones.
+
+    A finished trace is kept when it is slower than slow_threshold seconds,
+    failed with a 5xx status, issued more than n_plus_one_threshold queries
+    of the same shape, or is picked by sample_rate.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = 1.0,
+        sample_rate: float = 0.0,
+        buffer_size: int = 200,
+        n_plus_one_threshold: int = 10,
+        max_spans: int = 500
+    ):
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_spans = max_spans
+        self.traces: Deque[Trace] = deque(maxlen=buffer_size)
+        self.exporter: Optional["OtlpExporter"] = None
+        self.stats = {"traces": 0, "sampled": 0, "slow": 0, "errors": 0, "n_plus_one": 0}
+        self._lock = threading.Lock()
+
+    # Traces
+
+    def start_trace(self, method: str, path: str) -> Tuple[Trace, contextvars.Token]:
+        trace = Trace(method, path, self.max_spans)
+        return trace, _current_trace.set(trace)
+
+    def finish_trace(
+        self,
+        trace: Trace,
+        token: contextvars.Token,
+        route: Optional[str] = None,
+        status_code: Optional[int] = None
+    ) -> bool:
+        """End the trace; returns whether it was kept"""
+        _current_trace.reset(token)
+        trace.finish(route, status_code)
+
+        reasons = []
+        if trace.duration_ns >= self.slow_threshold * 1e9:
+            reasons.append("slow")
+        if status_code is None or status_code >= 500:
+            reasons.append("errors")
+        repeated = trace.n_plus_one(self.n_plus_one_threshold)
+        if repeated:
+            reasons.append("n_plus_one")
+            logger.warning(
+                f"N+1 queries in {trace.name}: {repeated[0]['count']} x {repeated[0]['statement']}"
+            )
+        if not reasons and self.sample_rate and random.random() < self.sample_rate:
+            reasons.append("sampled")
+
+        with self._lock:
+            self.stats["traces"] += 1
+            for reason in reasons:
+                if reason in self.stats:
+                    self.stats[reason] += 1
+            if not reasons:
+                return False
+            self.stats["sampled"] += 1
+            trace.sample_reasons = reasons
+            self.traces.append(trace)
+
+        exporter = self.exporter
+        if exporter is not None:
+            exporter.enqueue(trace)
+        return True
+
+    @staticmethod
+    def current_trace() -> Optional[Trace]:
+        return _current_trace.get()
+
+    def recent(self, limit: int = 50, reason: Optional[str] = None) -> List[Trace]:
+        """Kept traces, newest first, optionally only those kept for a reason"""
+        with self._lock:
+            traces = list(self.traces)
+        traces.reverse()
+        if reason:
+            traces = [trace for trace in traces if reason in trace.sample_reasons]
+        return traces[:limit]
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            for trace in self.traces:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self.traces.clear()
+            for key in self.stats:
+                self.stats[key] = 0
+
+    # Spans
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Record the enclosed block as a span of the current trace.
+
+        Yields the span, whose attributes may be added to, or None outside a
+        request.
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        span = Span(name, kind, _current_span_id.get() or trace.root_span_id, trace.elapsed_ns(), attributes)
+        token = _current_span_id.set(span.span_id)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span_id.reset(token)
+            span.end_ns = trace.elapsed_ns()
+            trace.add_span(span)
+
+    def traced(self, kind: str = "internal", name: Optional[str] = None) -> Callable:
+        """Decorator recording each call of a function (sync or async) as a span"""
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if _current_trace.get() is None:
+                        return await func(*args, **kwargs)
+                    with self.span(span_name, kind):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if _current_trace.get() is None:
+                    return func(*args, **kwargs)
+                with self.span(span_name, kind):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+# OTLP export
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(traces: List[Trace], service_name: str = "ppm-backend") -> Dict[str, Any]:
+    """Traces as an OTLP/HTTP JSON ExportTraceServiceRequest"""
+    spans = []
+    for trace in traces:
+        started_at = trace.started_at
+        root_attributes = {
+            "http.method": trace.method,
+            "http.route": trace.route,
+            "http.target": trace.path,
+            "http.status_code": trace.status_code
+        }
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": trace.root_span_id,
+            "name": trace.name,
+            "kind": OTLP_KIND_SERVER,
+            "startTimeUnixNano": str(started_at),
+            "endTimeUnixNano": str(started_at + (trace.duration_ns or 0)),
+            "attributes": _otlp_attributes(root_attributes),
+            "status": {"code": 2 if trace.status_code is None or trace.status_code >= 500 else 1}
+        })
+        with trace._lock:
+            trace_spans = sorted(trace.spans, key=lambda span: span.start_ns)
+        for span in trace_spans:
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id,
+                "name": span.name,
+                "kind": OTLP_KIND_CLIENT if span.kind in CLIENT_SPAN_KINDS else OTLP_KIND_INTERNAL,
+                "startTimeUnixNano": str(started_at + span.start_ns),
+                "endTimeUnixNano": str(started_at + span.end_ns),
+                "attributes": _otlp_attributes({"ppm.span.kind": span.kind, **span.attributes}),
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+            }
+            spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}]
+        }]
+    }
+
+
+class OtlpExporter:
+    """
+    Sends kept traces to an OTLP/HTTP collector (POST {endpoint}/v1/traces)
+    in batches from a background thread. When the collector falls behind,
+    the oldest queued traces are dropped.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = "ppm-backend",
+        interval: float = 5.0,
+        max_queue: int = 1000,
+        timeout: float = 5.0
+    ):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.interval = interval
+        self.timeout = timeout
+        self.queue: Deque[Trace] = deque(maxlen=max_queue)
+        self.stats = {"exported": 0, "failed": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, trace: Trace) -> None:
+        self.queue.append(trace)
+
+    def flush(self) -> int:
+        """Export all queued traces; returns the number exported"""
+        batch = []
+        while self.queue:
+            try:
+                batch.append(self.queue.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return 0
+        try:
+            self.post(dumps(to_otlp(batch, self.service_name)))
+            self.stats["exported"] += len(batch)
+            return len(batch)
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logger.warning(f"Failed to export {len(batch)} traces to {self.url}: {e}")
+            return 0
+
+    def post(self, body: bytes) -> None:
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the export thread and send what is still queued"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+# Process-wide tracer, fed by TracingMiddleware
+tracer = Tracer(
+    slow_threshold=settings.TRACE_SLOW_REQUEST_SECONDS,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    buffer_size=settings.TRACE_BUFFER_SIZE,
+    n_plus_one_threshold=settings.TRACE_N_PLUS_ONE_THRESHOLD
+)
+traced = tracer.traced
+
+_exporter_lock = threading.Lock()
+
+
+def start_trace_exporter() -> bool:
+    """Export kept traces when OTEL_EXPORTER_OTLP_ENDPOINT is set"""
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return False
+    with _exporter_lock:
+        if tracer.exporter is None:
+            tracer.exporter = OtlpExporter(settings.OTEL_EXPORTER_OTLP_ENDPOINT)
+        tracer.exporter.start()
+    return True
+
+
+def stop_trace_exporter() -> None:
+    with _exporter_lock:
+        exporter, tracer.exporter = tracer.exporter, None
+    if exporter is not None:
+        exporter.stop()
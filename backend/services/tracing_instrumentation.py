@@ -0,0 +1,260 @@
+"""
+Tracing instrumentation of the database, cache and LLM clients
+
+Wraps the methods every call goes through, so no call site has to be
+changed:
+- Supabase: postgrest query builders' execute() (sync and async) as "db"
+  spans, with the query shape as db.statement for N+1 detection
+- Redis: execute_command() and pipeline execute() of the sync and asyncio
+  clients as "cache" spans
+- OpenAI-compatible clients (OpenAI and xAI Grok): chat completions and
+  embeddings as "llm" spans, with model and token usage
+
+The wrappers only record while a request is traced; otherwise they call the
+original method directly.
+"""
+
+import functools
+import inspect
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.tracing import Tracer, tracer as default_tracer
+
+logger = logging.getLogger(__name__)
+
+# Query parameters whose value is part of the query shape; for all others
+# (filters) only the operator is kept, e.g. id=eq.? for id=eq.42
+SHAPE_PARAMS = frozenset(("select", "order", "on_conflict", "columns"))
+HTTP_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+# (owner, attribute, original) of every wrapped method, for uninstrument()
+_patched: List[Tuple[Any, str, Callable]] = []
+
+
+def query_statement(http_method: str, path: str, params: Any) -> Tuple[str, str, str]:
+    """
+    Shape of a PostgREST query, without filter values.
+
+    Returns:
+        (statement, operation, table), e.g.
+        ("select projects id=eq.? select=id,name", "select", "projects")
+    """
+    table = str(path).lstrip("/")
+    if table.startswith("rpc/"):
+        operation, table = "rpc", table[4:]
+    else:
+        operation = HTTP_OPERATIONS.get(http_method, http_method.lower())
+
+    shape = []
+    items = params.multi_items() if hasattr(params, "multi_items") else list(dict(params or {}).items())
+    for key, value in sorted(items):
+        if key in SHAPE_PARAMS:
+            shape.append(f"{key}={value}")
+        elif key in ("limit", "offset"):
+            shape.append(f"{key}=?")
+        else:
+            shape.append(f"{key}={str(value).split('.', 1)[0]}.?")
+    statement = " ".join([operation, table] + shape)
+    return statement, operation, table
+
+
+def _patch(owner: Any, attribute: str, wrap: Callable[[Callable], Callable]) -> None:
+    original = owner.__dict__[attribute]
+    if getattr(original, "__traced__", False):
+        return
+    wrapper = wrap(original)
+    wrapper.__traced__ = True
+    setattr(owner, attribute, wrapper)
+    _patched.append((owner, attribute, original))
+
+
+def _wrapper(
+    original: Callable,
+    tracer: Tracer,
+    kind: str,
+    describe: Callable[..., Tuple[str, Dict[str, Any]]],
+    on_result: Optional[Callable[[Any, Any], None]] = None,
+    on_end: Optional[Callable[[Any], None]] = None
+) -> Callable:
+    """
+    Span-recording wrapper of a sync or async method.
+
+    describe(self, args, kwargs) names the span and gives its attributes;
+    on_result(span, result) adds attributes from the result; on_end(span)
+    runs after the span is recorded.
+    """
+    # Decorated coroutine functions (e.g. the OpenAI client's create()) are
+    # not coroutine functions themselves
+    if inspect.iscoroutinefunction(inspect.unwrap(original)):
+        @functools.wraps(original)
+        async def async_wrapper(self, *args, **kwargs):
+            if tracer.current_trace() is None:
+                return await original(self, *args, **kwargs)
+            name, attributes = describe(self, args, kwargs)
+            with tracer.span(name, kind, **attributes) as span:
+                result = await original(self, *args, **kwargs)
+                if on_result is not None:
+                    on_result(span, result)
+            if on_end is not None:
+                on_end(span)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        if tracer.current_trace() is None:
+            return original(self, *args, **kwargs)
+        name, attributes = describe(self, args, kwargs)
+        with tracer.span(name, kind, **attributes) as span:
+            result = original(self, *args, **kwargs)
+            if on_result is not None:
+                on_result(span, result)
+        if on_end is not None:
+            on_end(span)
+        return result
+
+    return wrapper
+
+
+# Supabase (PostgREST)
+
+def _describe_query(builder, args, kwargs) -> Tuple[str, Dict[str, Any]]:
+    statement, operation, table = query_statement(builder.http_method, builder.path, builder.params)
+    return f"supabase {operation} {table}", {
+        "db.system": "postgresql",
+        "db.operation": operation,
+        "db.sql.table": table,
+        "db.statement": statement
+    }
+
+
+def instrument_supabase(tracer: Tracer = default_tracer, monitor: Any = None) -> bool:
+    """
+    Trace Supabase queries.
+
+    Args:
+        tracer: Tracer to record spans in
+        monitor: Optional PerformanceMonitor; each traced query is also
+            passed to its record_database_query()
+    """
+    try:
+        from postgrest._async import request_builder as async_builders
+        from postgrest._sync import request_builder as sync_builders
+    except ImportError:
+        return False
+
+    on_end = None
+    if monitor is not None:
+        def on_end(span):
+            try:
+                monitor.record_database_query(
+                    f"{span.attributes['db.operation']} {span.attributes['db.sql.table']}", span.duration_ms
+                )
+            except Exception as e:
+                logger.debug(f"Failed to record database query: {e}")
+
+    # The maybe_single() builder calls the single() builder's execute()
+    for owner in (
+        sync_builders.SyncQueryRequestBuilder,
+        sync_builders.SyncSingleRequestBuilder,
+        async_builders.AsyncQueryRequestBuilder,
+        async_builders.AsyncSingleRequestBuilder
+    ):
+        _patch(owner, "execute", lambda original: _wrapper(original, tracer, "db", _describe_query, on_end=on_end))
+    return True
+
+
+# Redis
+
+def _describe_command(client, args, kwargs) -> Tuple[str, Dict[str, Any]]:
+    command = str(args[0]).upper() if args else "UNKNOWN"
+    attributes = {"db.system": "redis", "db.operation": command}
+    if len(args) > 1:
+        key = args[1].decode(errors="replace") if isinstance(args[1], bytes) else str(args[1])
+        attributes["db.statement"] = f"{command} {key.rsplit(':', 1)[0]}:*" if ":" in key else command
+    return f"redis {command}", attributes
+
+
+def _describe_pipeline(pipeline, args, kwargs) -> Tuple[str, Dict[str, Any]]:
+    return "redis PIPELINE", {
+        "db.system": "redis",
+        "db.operation": "PIPELINE",
+        "redis.commands": len(pipeline.command_stack)
+    }
+
+
+def instrument_redis(tracer: Tracer = default_tracer) -> bool:
+    """Trace commands of the sync and asyncio Redis clients"""
+    try:
+        import redis.asyncio.client as async_client
+        import redis.client as sync_client
+    except ImportError:
+        return False
+
+    # Pipelines only queue in execute_command() and send in execute()
+    for module in (sync_client, async_client):
+        _patch(module.Redis, "execute_command", lambda original: _wrapper(original, tracer, "cache", _describe_command))
+        _patch(module.Pipeline, "execute", lambda original: _wrapper(original, tracer, "cache", _describe_pipeline))
+    return True
+
+
+# OpenAI-compatible LLM APIs
+
+def _llm_system(resource) -> str:
+    base_url = str(getattr(getattr(resource, "_client", None), "base_url", "") or "")
+    return "xai" if "x.ai" in base_url else "openai"
+
+
+def _describe_llm(operation: str) -> Callable[..., Tuple[str, Dict[str, Any]]]:
+    def describe(resource, args, kwargs) -> Tuple[str, Dict[str, Any]]:
+        system = _llm_system(resource)
+        return f"{system} {operation}", {
+            "gen_ai.system": system,
+            "gen_ai.operation.name": operation,
+            "gen_ai.request.model": kwargs.get("model")
+        }
+
+    return describe
+
+
+def _record_usage(span, result) -> None:
+    usage = getattr(result, "usage", None)
+    if span is None or usage is None:
+        return
+    span.attributes["gen_ai.usage.input_tokens"] = getattr(usage, "prompt_tokens", None)
+    span.attributes["gen_ai.usage.output_tokens"] = getattr(usage, "completion_tokens", None)
+
+
+def instrument_openai(tracer: Tracer = default_tracer) -> bool:
+    """Trace chat completions and embeddings of the OpenAI client (also used for xAI Grok)"""
+    try:
+        from openai.resources.chat import completions
+        from openai.resources import embeddings
+    except ImportError:
+        return False
+
+    chat = _describe_llm("chat")
+    embed = _describe_llm("embeddings")
+    for owner in (completions.Completions, completions.AsyncCompletions):
+        _patch(owner, "create", lambda original: _wrapper(original, tracer, "llm", chat, on_result=_record_usage))
+    for owner in (embeddings.Embeddings, embeddings.AsyncEmbeddings):
+        _patch(owner, "create", lambda original: _wrapper(original, tracer, "llm", embed, on_result=_record_usage))
+    return True
+
+
+def instrument_libraries(tracer: Tracer = default_tracer, database_monitor: Any = None) -> Dict[str, bool]:
+    """Instrument all supported clients; returns which were instrumented"""
+    return {
+        "supabase": instrument_supabase(tracer, database_monitor),
+        "redis": instrument_redis(tracer),
+        "openai": instrument_openai(tracer)
+    }
+
+
+def uninstrument() -> None:
+    """Restore the original methods"""
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
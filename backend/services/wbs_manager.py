@@ -22,6 +22,7 @@ import json
 from decimal import Decimal
 
 from config.database import supabase
+from services.progress_rollup_engine import ProgressRollupEngine
 from models.schedule import (
     WBSElementCreate, WBSElementResponse, WBSHierarchy, WBSValidationResult
 )
@@ -588,7 +589,9 @@ class WBSManager:
             
             # Trigger parent progress rollup if element has parent
             if existing_element.get("parent_element_id"):
-                await self._update_parent_wbs_progress_rollup(UUID(existing_element["parent_element_id"]))
+                await self._update_parent_wbs_progress_rollup(
+                    UUID(existing_element["parent_element_id"]), existing_element.get("schedule_id")
+                )
             
             return self._convert_wbs_element_to_response(updated_element)
             
@@ -770,41 +773,50 @@ class WBSManager:
             logger.error(f"Error checking circular reference: {e}")
             return True  # Err on the side of caution
     
-    async def _update_parent_wbs_progress_rollup(self, parent_element_id: UUID) -> None:
+    async def _update_parent_wbs_progress_rollup(
+        self,
+        parent_element_id: UUID,
+        schedule_id: Optional[str] = None
+    ) -> None:
         """
         Update parent WBS element progress based on child element completion.
         
+        The schedule's WBS tree is loaded once, the parent and its ancestors are
+        recomputed in memory and all changed elements are written in one bulk update.
+        
         Args:
             parent_element_id: ID of the parent element to update
+            schedule_id: ID of the schedule the element belongs to (looked up if not given)
         """
         try:
-            # Get child elements
-            children_result = self.db.table("wbs_elements").select(
-                "progress_percentage"
-            ).eq("parent_element_id", str(parent_element_id)).execute()
-            
-            if not children_result.data:
-                return
-            
-            children = children_result.data
-            
-            # Calculate average progress (simple average for WBS elements)
-            total_progress = sum(child.get("progress_percentage", 0) for child in children)
-            average_progress = total_progress / len(children)
+            if not schedule_id:
+                parent_result = self.db.table("wbs_elements").select("schedule_id").eq(
+                    "id", str(parent_element_id)
+                ).execute()
+                if not parent_result.data:
+                    return
+                schedule_id = parent_result.data[0]["schedule_id"]
             
-            # Update parent progress
-            update_data = {
-                "progress_percentage": int(round(average_progress)),
-                "updated_at": datetime.utcnow().isoformat()
-            }
+            elements_result = self.db.table("wbs_elements").select(
+                "id, parent_element_id, progress_percentage"
+            ).eq("schedule_id", str(schedule_id)).execute()
             
-            result = self.db.table("wbs_elements").update(update_data).eq("id", str(parent_element_id)).execute()
+            # Simple average for WBS elements
+            rollup = ProgressRollupEngine.for_wbs(elements_result.data or [])
+            changes = rollup.rollup_parents([str(parent_element_id)])
+            if not changes:
+                return
             
-            if result.data:
-                # Check if this parent has its own parent and continue rollup
-                parent_data = result.data[0]
-                if parent_data.get("parent_element_id"):
-                    await self._update_parent_wbs_progress_rollup(UUID(parent_data["parent_element_id"]))
+            updates = [{"id": element_id, **fields} for element_id, fields in changes.items()]
+            try:
+                self.db.rpc("bulk_update_wbs_progress", {"updates": updates}).execute()
+            except Exception as e:
+                logger.warning(f"Bulk WBS progress update failed, falling back to per-element updates: {e}")
+                for update in updates:
+                    self.db.table("wbs_elements").update({
+                        "progress_percentage": update["progress_percentage"],
+                        "updated_at": datetime.utcnow().isoformat()
+                    }).eq("id", update["id"]).execute()
             
         except Exception as e:
             logger.error(f"Error updating parent WBS progress rollup for element {parent_element_id}: {e}")
@@ -1155,7 +1167,9 @@ class WBSManager:
             
             # Trigger parent progress rollup if element has parent
             if existing_element.get("parent_element_id"):
-                await self._update_parent_wbs_progress_rollup(UUID(existing_element["parent_element_id"]))
+                await self._update_parent_wbs_progress_rollup(
+                    UUID(existing_element["parent_element_id"]), existing_element.get("schedule_id")
+                )
             
             return self._convert_wbs_element_to_response(updated_element)
             
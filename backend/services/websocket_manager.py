@@ -1,32 +1,275 @@
 """
 WebSocket Connection Manager for Enhanced PMR
 Optimized for scalability with connection pooling and Redis pub/sub
+
+Broadcasts are serialized once and fanned out to bounded per-connection send
+queues. Each connection has its own writer task, so a slow client only delays
+its own queue; when a queue is full the slow consumer policy decides whether
+messages are coalesced, dropped or the connection is closed.
 """
 
 import os
 import json
 import logging
 import asyncio
-from typing import Dict, Set, Optional, Any, Callable
+import time
+from typing import Dict, Set, Optional, Any, Callable, List, Deque
 from datetime import datetime
 from uuid import UUID
 from fastapi import WebSocket, WebSocketDisconnect
-from collections import defaultdict
+from collections import defaultdict, deque
 import redis.asyncio as aioredis
 
+from services.websocket_optimizer import MessageBatch
+
 logger = logging.getLogger(__name__)
 
 
+# Slow consumer policies applied when a connection's send queue is full
+SLOW_CONSUMER_COALESCE = "coalesce"
+SLOW_CONSUMER_DROP_OLDEST = "drop_oldest"
+SLOW_CONSUMER_DISCONNECT = "disconnect"
+SLOW_CONSUMER_POLICIES = (
+    SLOW_CONSUMER_COALESCE,
+    SLOW_CONSUMER_DROP_OLDEST,
+    SLOW_CONSUMER_DISCONNECT
+)
+
+# Message types where only the latest pending message per user matters
+COALESCIBLE_MESSAGE_TYPES = {"cursor_position", "user_presence"}
+
+# Close code sent to clients disconnected for falling behind ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+def _coalesce_key(message: Dict[str, Any]) -> Optional[str]:
+    """Key under which pending copies of a message may be replaced by newer ones."""
+    message_type = message.get("type")
+    if message_type not in COALESCIBLE_MESSAGE_TYPES:
+        return None
+    return f"{message_type}:{message.get('user_id', '')}"
+
+
+def _batch_frame(payloads: List[str]) -> str:
+    """
+    Wrap already serialized messages in a batch frame.
+
+    Produces the same shape as WebSocketOptimizer batches without decoding and
+    re-encoding the individual messages.
+    """
+    return (
+        '{"type": "batch", "messages": [' + ", ".join(payloads) + '], '
+        f'"count": {len(payloads)}, "timestamp": "{datetime.utcnow().isoformat()}"}}'
+    )
+
+
+class QueuedFrame:
+    """A serialized message waiting in a connection's send queue"""
+
+    __slots__ = ("payload", "enqueued_at", "coalesce_key")
+
+    def __init__(self, payload: str, enqueued_at: float, coalesce_key: Optional[str] = None):
+        self.payload = payload
+        self.enqueued_at = enqueued_at
+        self.coalesce_key = coalesce_key
+
+
+class ConnectionSendQueue:
+    """
+    Bounded send queue drained by a dedicated writer task for one connection
+
+    Messages queued while the writer is busy are sent together as a single
+    batch frame (MessageBatch limits), so a burst costs one send per drain
+    instead of one per message.
+    """
+
+    def __init__(
+        self,
+        manager: "WebSocketConnectionManager",
+        websocket: WebSocket,
+        max_size: int,
+        policy: str,
+        batch_max_size: int,
+        batch_max_wait_ms: int,
+        send_timeout: float
+    ):
+        self.manager = manager
+        self.websocket = websocket
+        self.max_size = max_size
+        self.policy = policy
+        self.batch_max_size = batch_max_size
+        self.batch_max_wait_ms = batch_max_wait_ms
+        self.send_timeout = send_timeout
+
+        self.frames: Deque[QueuedFrame] = deque()
+        self.pending_by_key: Dict[str, QueuedFrame] = {}
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._writer())
+
+    def close(self):
+        """Stop the writer task and discard pending messages"""
+        self.closed = True
+        self.frames.clear()
+        self.pending_by_key.clear()
+        self._wakeup.set()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def enqueue(self, payload: str, enqueued_at: float, coalesce_key: Optional[str] = None) -> bool:
+        """
+        Add a serialized message to the queue without blocking
+
+        Returns:
+            False if the connection must be disconnected as a slow consumer
+        """
+        if self.closed:
+            return True
+
+        stats = self.manager.stats
+
+        if coalesce_key and self.policy == SLOW_CONSUMER_COALESCE:
+            pending = self.pending_by_key.get(coalesce_key)
+            if pending is not None:
+                # Keep the queue position and original latency start, send the latest state
+                pending.payload = payload
+                stats["messages_coalesced"] += 1
+                return True
+
+        if len(self.frames) >= self.max_size:
+            if self.policy == SLOW_CONSUMER_DISCONNECT:
+                return False
+
+            dropped = self.frames.popleft()
+            if dropped.coalesce_key and self.pending_by_key.get(dropped.coalesce_key) is dropped:
+                del self.pending_by_key[dropped.coalesce_key]
+            stats["messages_dropped"] += 1
+
+        frame = QueuedFrame(payload, enqueued_at, coalesce_key)
+        self.frames.append(frame)
+        if coalesce_key:
+            self.pending_by_key[coalesce_key] = frame
+        self._wakeup.set()
+        return True
+
+    def _take_frames(self, batch: MessageBatch, taken: List[QueuedFrame]):
+        while self.frames and len(batch.messages) < batch.max_size:
+            frame = self.frames.popleft()
+            if frame.coalesce_key and self.pending_by_key.get(frame.coalesce_key) is frame:
+                del self.pending_by_key[frame.coalesce_key]
+            batch.add_message(frame.payload)
+            taken.append(frame)
+
+    async def _collect_batch(self) -> List[QueuedFrame]:
+        """Take pending frames, waiting up to batch_max_wait_ms for more"""
+        batch = MessageBatch(max_size=self.batch_max_size, max_wait_ms=self.batch_max_wait_ms)
+        taken: List[QueuedFrame] = []
+        self._take_frames(batch, taken)
+
+        while not batch.is_ready() and not self.closed:
+            remaining = self.batch_max_wait_ms / 1000 - (
+                datetime.utcnow() - batch.created_at
+            ).total_seconds()
+            if remaining <= 0:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            self._take_frames(batch, taken)
+
+        return taken
+
+    async def _writer(self):
+        """Drain the queue to the WebSocket until the connection closes"""
+        try:
+            while not self.closed:
+                if not self.frames:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                frames = await self._collect_batch()
+                if not frames:
+                    continue
+
+                if len(frames) == 1:
+                    text = frames[0].payload
+                else:
+                    text = _batch_frame([frame.payload for frame in frames])
+                    self.manager.stats["batched_frames"] += 1
+
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=self.send_timeout)
+
+                sent_at = time.time()
+                self.manager.stats["total_messages"] += len(frames)
+                for frame in frames:
+                    self.manager._record_broadcast_latency(sent_at - frame.enqueued_at)
+
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning("WebSocket send timed out, disconnecting slow consumer")
+            self.manager.stats["slow_consumers_disconnected"] += 1
+            await self.manager.disconnect(self.websocket)
+        except WebSocketDisconnect:
+            await self.manager.disconnect(self.websocket)
+        except Exception as e:
+            logger.error(f"Error sending message to connection: {e}")
+            await self.manager.disconnect(self.websocket)
+
+
 class WebSocketConnectionManager:
     """
     Manages WebSocket connections for real-time PMR collaboration
     Supports horizontal scaling via Redis pub/sub
     """
     
-    def __init__(self, redis_url: Optional[str] = None):
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        send_queue_size: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        batch_max_size: Optional[int] = None,
+        batch_max_wait_ms: Optional[int] = None,
+        send_timeout: float = 10.0,
+        latency_sample_size: int = 10000
+    ):
         """Initialize WebSocket manager"""
         self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
         
+        # Per-connection send queue configuration
+        self.send_queue_size = send_queue_size or int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        self.slow_consumer_policy = slow_consumer_policy or os.getenv(
+            "WS_SLOW_CONSUMER_POLICY", SLOW_CONSUMER_COALESCE
+        )
+        if self.slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            logger.warning(
+                f"Unknown slow consumer policy {self.slow_consumer_policy}, using {SLOW_CONSUMER_COALESCE}"
+            )
+            self.slow_consumer_policy = SLOW_CONSUMER_COALESCE
+        self.batch_max_size = batch_max_size or int(os.getenv("WS_SEND_BATCH_MAX_SIZE", "20"))
+        self.batch_max_wait_ms = (
+            batch_max_wait_ms if batch_max_wait_ms is not None
+            else int(os.getenv("WS_SEND_BATCH_MAX_WAIT_MS", "0"))
+        )
+        self.send_timeout = send_timeout
+        
+        # Send queues: WebSocket -> ConnectionSendQueue
+        self.send_queues: Dict[WebSocket, ConnectionSendQueue] = {}
+        
+        # Recent broadcast latencies (enqueue to send completion) in seconds
+        self.broadcast_latencies: Deque[float] = deque(maxlen=latency_sample_size)
+        
         # Active connections: report_id -> set of WebSocket connections
         self.active_connections: Dict[str, Set[WebSocket]] = defaultdict(set)
         
@@ -49,7 +292,11 @@ class WebSocketConnectionManager:
             "total_connections": 0,
             "total_messages": 0,
             "total_broadcasts": 0,
-            "connection_errors": 0
+            "connection_errors": 0,
+            "messages_dropped": 0,
+            "messages_coalesced": 0,
+            "batched_frames": 0,
+            "slow_consumers_disconnected": 0
         }
     
     async def initialize_redis(self):
@@ -96,8 +343,10 @@ class WebSocketConnectionManager:
             # Extract report_id from channel name
             report_id = channel.split(':')[-1]
             
-            # Broadcast to local connections
-            await self._broadcast_to_local_connections(report_id, data)
+            # Broadcast the already serialized payload to local connections
+            await self._broadcast_to_local_connections(
+                report_id, data, payload=message['data']
+            )
             
         except Exception as e:
             logger.error(f"Error handling Redis message: {e}")
@@ -125,6 +374,19 @@ class WebSocketConnectionManager:
         try:
             await websocket.accept()
             
+            # Start the connection's writer before anything is queued for it
+            send_queue = ConnectionSendQueue(
+                manager=self,
+                websocket=websocket,
+                max_size=self.send_queue_size,
+                policy=self.slow_consumer_policy,
+                batch_max_size=self.batch_max_size,
+                batch_max_wait_ms=self.batch_max_wait_ms,
+                send_timeout=self.send_timeout
+            )
+            self.send_queues[websocket] = send_queue
+            send_queue.start()
+            
             # Register connection
             self.active_connections[report_id].add(websocket)
             self.user_presence[report_id][user_id] = websocket
@@ -169,6 +431,13 @@ class WebSocketConnectionManager:
             websocket: WebSocket connection to disconnect
         """
         try:
+            # Stop the writer task; disconnect may be reached more than once
+            send_queue = self.send_queues.pop(websocket, None)
+            if send_queue is None and websocket not in self.connection_metadata:
+                return
+            if send_queue is not None:
+                send_queue.close()
+            
             # Get connection metadata
             metadata = self.connection_metadata.get(websocket, {})
             report_id = metadata.get("report_id")
@@ -179,7 +448,7 @@ class WebSocketConnectionManager:
                 self.active_connections[report_id].discard(websocket)
                 
                 # Remove from user presence
-                if user_id and user_id in self.user_presence[report_id]:
+                if user_id and self.user_presence[report_id].get(user_id) is websocket:
                     del self.user_presence[report_id][user_id]
                 
                 # Cleanup empty sets
@@ -219,13 +488,31 @@ class WebSocketConnectionManager:
                 for user_id, ws in self.user_presence[report_id].items()
             ]
             
-            await websocket.send_json({
+            self._enqueue(websocket, json.dumps({
                 "type": "user_presence",
                 "active_users": active_users,
                 "timestamp": datetime.utcnow().isoformat()
-            })
+            }), time.time())
         except Exception as e:
             logger.error(f"Error sending user presence: {e}")
+
+    def _enqueue(
+        self,
+        websocket: WebSocket,
+        payload: str,
+        enqueued_at: float,
+        coalesce_key: Optional[str] = None
+    ) -> bool:
+        """
+        Queue a serialized message for a connection
+
+        Returns:
+            False if the connection is a slow consumer that must be disconnected
+        """
+        send_queue = self.send_queues.get(websocket)
+        if send_queue is None:
+            return True
+        return send_queue.enqueue(payload, enqueued_at, coalesce_key)
     
     # ========================================================================
     # Message Broadcasting
@@ -240,21 +527,27 @@ class WebSocketConnectionManager:
         """
         Broadcast message to all connections for a report
         
+        The message is serialized once; the same payload is published to Redis
+        and queued for every local connection. The call returns after queueing
+        and does not wait for any client.
+        
         Args:
             report_id: Report UUID
             message: Message dictionary to broadcast
             exclude: Optional WebSocket to exclude from broadcast
         """
         try:
+            payload = json.dumps(message)
+            
             # Publish to Redis for multi-instance support
             if self.redis_enabled and self.redis_client:
                 await self.redis_client.publish(
                     f'pmr:collaboration:{report_id}',
-                    json.dumps(message)
+                    payload
                 )
             
             # Broadcast to local connections
-            await self._broadcast_to_local_connections(report_id, message, exclude)
+            await self._broadcast_to_local_connections(report_id, message, exclude, payload=payload)
             
             self.stats["total_broadcasts"] += 1
             
@@ -265,30 +558,43 @@ class WebSocketConnectionManager:
         self,
         report_id: str,
         message: Dict[str, Any],
-        exclude: Optional[WebSocket] = None
+        exclude: Optional[WebSocket] = None,
+        payload: Optional[str] = None
     ):
-        """Broadcast message to local WebSocket connections"""
+        """Queue a message on the send queues of local WebSocket connections"""
         if report_id not in self.active_connections:
             return
         
-        disconnected = []
+        if payload is None:
+            payload = json.dumps(message)
+        coalesce_key = _coalesce_key(message)
+        enqueued_at = time.time()
+        
+        slow_consumers = []
         
         for connection in self.active_connections[report_id]:
             if connection == exclude:
                 continue
             
-            try:
-                await connection.send_json(message)
-                self.stats["total_messages"] += 1
-            except WebSocketDisconnect:
-                disconnected.append(connection)
-            except Exception as e:
-                logger.error(f"Error sending message to connection: {e}")
-                disconnected.append(connection)
+            if not self._enqueue(connection, payload, enqueued_at, coalesce_key):
+                slow_consumers.append(connection)
         
-        # Cleanup disconnected connections
-        for connection in disconnected:
-            await self.disconnect(connection)
+        # Disconnect consumers that fell too far behind
+        for connection in slow_consumers:
+            await self._disconnect_slow_consumer(connection)
+    
+    async def _disconnect_slow_consumer(self, websocket: WebSocket):
+        """Close a connection whose send queue overflowed"""
+        self.stats["slow_consumers_disconnected"] += 1
+        logger.warning(
+            f"Disconnecting slow WebSocket consumer: "
+            f"user={self.connection_metadata.get(websocket, {}).get('user_id')}"
+        )
+        await self.disconnect(websocket)
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
     
     async def send_to_user(
         self,
@@ -307,11 +613,30 @@ class WebSocketConnectionManager:
         try:
             if report_id in self.user_presence and user_id in self.user_presence[report_id]:
                 websocket = self.user_presence[report_id][user_id]
-                await websocket.send_json(message)
-                self.stats["total_messages"] += 1
+                if not self._enqueue(websocket, json.dumps(message), time.time(), _coalesce_key(message)):
+                    await self._disconnect_slow_consumer(websocket)
         except Exception as e:
             logger.error(f"Error sending message to user {user_id}: {e}")
     
+    def _record_broadcast_latency(self, latency_seconds: float):
+        self.broadcast_latencies.append(latency_seconds)
+    
+    def get_broadcast_latency_stats(self) -> Dict[str, Any]:
+        """Get percentiles of recent broadcast latencies (queue to send completion)"""
+        sorted_latencies = sorted(self.broadcast_latencies)
+        count = len(sorted_latencies)
+        if count == 0:
+            return {"count": 0, "avg_ms": 0, "p50_ms": 0, "p95_ms": 0, "p99_ms": 0, "max_ms": 0}
+        
+        return {
+            "count": count,
+            "avg_ms": round(sum(sorted_latencies) / count * 1000, 2),
+            "p50_ms": round(sorted_latencies[count // 2] * 1000, 2),
+            "p95_ms": round(sorted_latencies[min(int(count * 0.95), count - 1)] * 1000, 2),
+            "p99_ms": round(sorted_latencies[min(int(count * 0.99), count - 1)] * 1000, 2),
+            "max_ms": round(sorted_latencies[-1] * 1000, 2)
+        }
+    
     # ========================================================================
     # Message Handling
     # ========================================================================
@@ -391,7 +716,11 @@ class WebSocketConnectionManager:
             **self.stats,
             "active_reports": len(self.active_connections),
             "active_connections": self.get_total_connections(),
-            "redis_enabled": self.redis_enabled
+            "redis_enabled": self.redis_enabled,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "queued_messages": sum(len(q) for q in self.send_queues.values()),
+            "max_queue_depth": max((len(q) for q in self.send_queues.values()), default=0),
+            "broadcast_latency": self.get_broadcast_latency_stats()
         }
     
     def get_report_info(self, report_id: str) -> Dict[str, Any]:
@@ -442,7 +771,11 @@ class WebSocketConnectionManager:
         """Shutdown WebSocket manager and cleanup resources"""
         logger.info("Shutting down WebSocket manager...")
         
-        # Close all active connections
+        # Stop writer tasks and close all active connections
+        for send_queue in list(self.send_queues.values()):
+            send_queue.close()
+        self.send_queues.clear()
+        
         for report_id, connections in list(self.active_connections.items()):
             for websocket in list(connections):
                 try:
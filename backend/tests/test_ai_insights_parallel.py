@@ -0,0 +1,158 @@
+"""
+Unit tests for parallel AI insight generation.
+
+Tests that category data is prefetched once, that category completions run
+concurrently under the configured limit, that completions are memoized on
+their prompt inputs, and that per-category latency and token metrics are kept.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from models.pmr import AIInsightCategory
+from services.ai_insights_engine import AIInsightsEngine
+
+COMPLETION_DELAY = 0.2
+
+RESPONSE = json.dumps([{
+    "type": "recommendation",
+    "title": "Tighten cost control",
+    "content": "Costs trend above plan",
+    "priority": "high",
+    "recommended_actions": ["Review change orders"]
+}])
+
+
+class FakeCompletions:
+    """Blocking completions client that records concurrency."""
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(COMPLETION_DELAY)
+        with self.lock:
+            self.active -= 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=RESPONSE))],
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=50, total_tokens=150)
+        )
+
+
+def make_engine(max_concurrent_requests=4):
+    engine = AIInsightsEngine.__new__(AIInsightsEngine)
+    engine.model = "gpt-4"
+    engine.temperature = 0.7
+    engine.max_tokens = 2000
+    engine.confidence_threshold = 0.7
+    engine.max_concurrent_requests = max_concurrent_requests
+    engine.memo_ttl_seconds = 3600
+    engine.memo_max_entries = 256
+    engine._completion_memo = {}
+    engine.category_metrics = {}
+
+    completions = FakeCompletions()
+    engine.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    # Every query returns a single project/financial row
+    response = SimpleNamespace(data=[{
+        "name": "Alpha", "status": "active", "priority": "high",
+        "planned_cost": 100.0, "actual_cost": 120.0, "schedule_performance_index": 0.9
+    }] * 3)
+    engine.supabase = MagicMock()
+    engine.supabase.table.return_value.select.return_value.eq.return_value.order.return_value \
+        .limit.return_value.execute.return_value = response
+    engine.supabase.table.return_value.select.return_value.eq.return_value \
+        .execute.return_value = response
+    return engine, completions
+
+
+def generate(engine, categories=None):
+    return asyncio.run(engine.generate_insights(uuid4(), uuid4(), categories=categories))
+
+
+def test_categories_are_generated_concurrently():
+    engine, completions = make_engine()
+
+    start = time.time()
+    insights = generate(engine)
+    elapsed = time.time() - start
+
+    assert completions.calls == 4 and completions.max_active == 4
+    assert elapsed < COMPLETION_DELAY * 2
+    assert [i.category for i in insights] == [
+        AIInsightCategory.budget, AIInsightCategory.schedule,
+        AIInsightCategory.resource, AIInsightCategory.risk
+    ]
+
+
+def test_concurrency_limit_is_respected():
+    engine, completions = make_engine(max_concurrent_requests=2)
+
+    generate(engine)
+
+    assert completions.calls == 4
+    assert completions.max_active == 2
+
+
+def test_category_data_is_prefetched_once_per_table():
+    engine, _ = make_engine()
+
+    generate(engine)
+
+    tables = [c.args[0] for c in engine.supabase.table.call_args_list]
+    for table in ("financial_data", "schedule_data", "resource_allocations", "risks", "projects"):
+        assert tables.count(table) == 1
+
+
+def test_unchanged_prompts_reuse_memoized_completions():
+    engine, completions = make_engine()
+
+    first = generate(engine, [AIInsightCategory.budget])
+    second = generate(engine, [AIInsightCategory.budget])
+
+    assert completions.calls == 1
+    assert [i.title for i in second] == [i.title for i in first]
+    assert second[0].report_id != first[0].report_id
+
+    # A changed prompt input needs a new completion
+    engine.temperature = 0.2
+    generate(engine, [AIInsightCategory.budget])
+    assert completions.calls == 2
+
+
+def test_per_category_latency_and_token_metrics():
+    engine, _ = make_engine()
+
+    generate(engine, [AIInsightCategory.budget, AIInsightCategory.risk])
+    generate(engine, [AIInsightCategory.budget])
+
+    metrics = engine.get_metrics()
+    budget = metrics["categories"]["budget"]
+    assert budget["requests"] == 2 and budget["memo_hits"] == 1
+    assert budget["total_tokens"] == 150 and budget["prompt_tokens"] == 100
+    assert budget["memo_hit_rate"] == 0.5
+    assert metrics["categories"]["risk"]["average_latency_ms"] >= COMPLETION_DELAY * 1000
+    assert metrics["max_concurrent_requests"] == 4
+
+
+def test_memo_evicts_oldest_entries_when_full():
+    engine, _ = make_engine()
+    engine.memo_max_entries = 2
+
+    for i in range(3):
+        engine._memoize_completion(f"key{i}", "response", {})
+
+    assert list(engine._completion_memo) == ["key1", "key2"]
@@ -0,0 +1,222 @@
+"""
+Unit tests for the pooled async data-access layer.
+
+Tests that queries run without blocking the event loop, that the pool bounds
+concurrency and reports saturation, that exhausted pools time out, and that
+the PostgREST backend keeps the query-builder API over a pooled HTTP/2 client.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from config.async_database import (
+    DatabasePoolTimeout,
+    PostgrestAsyncDatabase,
+    ThreadedAsyncDatabase
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class SlowQuery:
+    """Synchronous builder whose execute() blocks like a network round trip."""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    @property
+    def not_(self):
+        self.filters.append("not")
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            self.db.running += 1
+            self.db.peak = max(self.db.peak, self.db.running)
+        time.sleep(self.db.delay)
+        with self.db.lock:
+            self.db.running -= 1
+        if self.db.fail:
+            raise Exception("connection reset")
+        return MagicMock(data=[{"table": self.table, "filters": self.filters}])
+
+
+class SlowClient:
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return SlowQuery(self, name)
+
+
+def test_queries_do_not_block_the_event_loop():
+    db = ThreadedAsyncDatabase(SlowClient(delay=0.1), {"max_size": 20})
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        start = time.time()
+        await asyncio.gather(*(db.table("projects").select("*").execute() for _ in range(20)))
+        elapsed = time.time() - start
+        ticking.cancel()
+        return elapsed, ticks
+
+    elapsed, ticks = run(scenario())
+
+    # 20 queries of 100ms ran concurrently, and the loop kept serving other tasks
+    assert elapsed < 1.0
+    assert ticks >= 5
+
+
+def test_pool_bounds_concurrency_and_reports_saturation():
+    client = SlowClient(delay=0.05)
+    db = ThreadedAsyncDatabase(client, {"max_size": 3})
+
+    async def scenario():
+        observed = []
+
+        async def watch():
+            for _ in range(5):
+                await asyncio.sleep(0.02)
+                observed.append(db.get_pool_metrics())
+
+        await asyncio.gather(watch(), *(db.table("tasks").select("*").execute() for _ in range(12)))
+        return observed
+
+    observed = run(scenario())
+    metrics = db.get_pool_metrics()
+
+    assert client.peak == 3
+    assert any(m["saturated"] and m["in_use"] == 3 and m["utilization"] == 1.0 for m in observed)
+    assert metrics["backend"] == "threaded"
+    assert metrics["in_use"] == 0 and metrics["waiting"] == 0
+    assert metrics["peak_in_use"] == 3
+    assert metrics["peak_waiting"] == 9
+    assert metrics["total_queries"] == 12
+    assert metrics["waited_queries"] == 9
+    assert metrics["max_wait_ms"] > 0
+
+
+def test_exhausted_pool_times_out():
+    db = ThreadedAsyncDatabase(SlowClient(delay=0.3), {"max_size": 1, "timeout": 0.05})
+
+    async def scenario():
+        return await asyncio.gather(
+            db.table("tasks").select("*").execute(),
+            db.table("tasks").select("*").execute(),
+            return_exceptions=True
+        )
+
+    first, second = run(scenario())
+
+    assert first.data[0]["table"] == "tasks"
+    assert isinstance(second, DatabasePoolTimeout)
+    assert db.get_pool_metrics()["timeouts"] == 1
+    assert db.get_pool_metrics()["total_queries"] == 1
+
+
+def test_failed_queries_release_their_connection():
+    db = ThreadedAsyncDatabase(SlowClient(delay=0, fail=True), {"max_size": 1})
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(Exception, match="connection reset"):
+                await db.table("tasks").select("*").execute()
+
+    run(scenario())
+
+    metrics = db.get_pool_metrics()
+    assert metrics["failed_queries"] == 3
+    assert metrics["in_use"] == 0
+
+
+def test_builder_chain_is_passed_through():
+    db = ThreadedAsyncDatabase(SlowClient(delay=0))
+
+    query = db.table("projects").select("*").eq("status", "active").not_.eq("health", "red")
+    result = run(query.execute())
+
+    assert result.data == [{"table": "projects", "filters": [("status", "active"), "not", ("health", "red")]}]
+
+
+def test_postgrest_backend_uses_pooled_http2_client():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[{"id": "p1", "name": "Apollo"}])
+
+    db = PostgrestAsyncDatabase(
+        "https://example.supabase.co/rest/v1",
+        "service-key",
+        {"max_size": 7, "min_size": 2, "max_inactive_connection_lifetime": 120},
+        transport=httpx.MockTransport(handler)
+    )
+
+    async def scenario():
+        try:
+            response = await db.table("projects").select("id,name").eq("status", "active").limit(5).execute()
+            await db.rpc("bulk_update_task_progress", {"updates": []}).execute()
+            return response
+        finally:
+            await db.aclose()
+
+    response = run(scenario())
+
+    assert response.data == [{"id": "p1", "name": "Apollo"}]
+    select, rpc = requests
+    assert select.method == "GET"
+    assert select.url.path == "/rest/v1/projects"
+    assert select.url.params["select"] == "id,name"
+    assert select.url.params["status"] == "eq.active"
+    assert select.url.params["limit"] == "5"
+    assert select.headers["apikey"] == "service-key"
+    assert select.headers["authorization"] == "Bearer service-key"
+    assert rpc.method == "POST"
+    assert rpc.url.path == "/rest/v1/rpc/bulk_update_task_progress"
+    assert json.loads(rpc.content) == {"updates": []}
+    assert db.get_pool_metrics()["total_queries"] == 2
+
+
+def test_postgrest_connection_limits_follow_pool_config():
+    db = PostgrestAsyncDatabase(
+        "https://example.supabase.co/rest/v1",
+        "key",
+        {"max_size": 9, "min_size": 4, "max_inactive_connection_lifetime": 30}
+    )
+
+    pool = db.client.session._transport._pool
+
+    assert pool._max_connections == 9
+    assert pool._max_keepalive_connections == 4
+    assert pool._keepalive_expiry == 30
+    assert pool._http2 is True
+    run(db.aclose())
@@ -0,0 +1,263 @@
+"""
+Unit Tests: Audit Ingestion Stream
+
+Tests batching, acknowledgement, backpressure and dead-lettering of
+services/audit_ingestion_stream.py against the in-memory stream backend.
+
+Requirements: 7.8
+"""
+
+import pytest
+import os
+import sys
+from uuid import uuid4
+from unittest.mock import MagicMock, AsyncMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.audit_ingestion_stream import (
+    AuditIngestionStream,
+    AuditIngestionConsumer,
+    AuditIngestionBackpressureError,
+    InMemoryStreamBackend
+)
+from services.audit_ml_service import EventClassification
+
+
+def make_event(event_type="budget_change"):
+    return {
+        "id": str(uuid4()),
+        "event_type": event_type,
+        "entity_type": "project",
+        "entity_id": str(uuid4()),
+        "action_details": {"budget_change_percentage": 15},
+        "severity": "info",
+        "timestamp": "2026-01-05T10:00:00",
+        "tenant_id": str(uuid4())
+    }
+
+
+def make_supabase(fail_ids=None):
+    """Supabase mock whose upsert fails for bulk writes containing fail_ids."""
+    fail_ids = set(fail_ids or [])
+    client = MagicMock()
+    client.bulk_payloads = []
+
+    def upsert(payload, **kwargs):
+        client.bulk_payloads.append(payload)
+        rows = payload if isinstance(payload, list) else [payload]
+        query = MagicMock()
+        if any(row["id"] in fail_ids for row in rows):
+            query.execute.side_effect = Exception("insert failed")
+        else:
+            query.execute.return_value = MagicMock(data=rows)
+        return query
+
+    client.table.return_value.upsert.side_effect = upsert
+    return client
+
+
+def make_ml_service():
+    classification = EventClassification(
+        category="Financial Impact",
+        category_confidence=0.9,
+        risk_level="High",
+        risk_confidence=0.8,
+        tags=["Financial Impact: High"]
+    )
+    ml_service = MagicMock()
+    ml_service.classify_events_batch = AsyncMock(
+        side_effect=lambda events: [classification] * len(events)
+    )
+    return ml_service
+
+
+async def make_stream(**kwargs):
+    stream = AuditIngestionStream(backend=InMemoryStreamBackend(), **kwargs)
+    await stream.connect()
+    return stream
+
+
+@pytest.mark.asyncio
+async def test_consumer_processes_batch_with_single_bulk_write():
+    stream = await make_stream()
+    events = [make_event() for _ in range(25)]
+    await stream.publish_batch(events)
+
+    supabase = make_supabase()
+    consumer = AuditIngestionConsumer(
+        stream=stream,
+        ml_service=make_ml_service(),
+        supabase_client=supabase,
+        batch_size=100
+    )
+    handled = await consumer.process_next_batch()
+
+    assert handled == 25
+    assert len(supabase.bulk_payloads) == 1
+    stored = supabase.bulk_payloads[0]
+    assert [row["id"] for row in stored] == [e["id"] for e in events]
+    assert all(row["category"] == "Financial Impact" for row in stored)
+    assert all(row["risk_level"] == "High" for row in stored)
+    assert "financial_impact_high" in stored[0]["tags"]
+    consumer.ml_service.classify_events_batch.assert_awaited_once()
+
+    # Stored messages are acknowledged and removed from the backlog
+    assert (await stream.get_stream_stats())["backlog"] == 0
+    metrics = consumer.get_metrics()
+    assert metrics["events_stored"] == 25
+    assert metrics["stages"]["classification"]["events"] == 25
+    assert metrics["stages"]["storage"]["events"] == 25
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limits_messages_per_pull():
+    stream = await make_stream()
+    await stream.publish_batch([make_event() for _ in range(7)])
+
+    consumer = AuditIngestionConsumer(stream=stream, supabase_client=make_supabase(), batch_size=3)
+
+    assert await consumer.process_next_batch() == 3
+    assert await consumer.process_next_batch() == 3
+    assert await consumer.process_next_batch() == 1
+    assert await consumer.process_next_batch() == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_event_is_isolated_retried_and_dead_lettered():
+    stream = await make_stream()
+    good, bad = make_event(), make_event()
+    await stream.publish_batch([good, bad])
+
+    supabase = make_supabase(fail_ids=[bad["id"]])
+    consumer = AuditIngestionConsumer(
+        stream=stream,
+        supabase_client=supabase,
+        claim_idle_ms=0,
+        max_deliveries=2
+    )
+
+    # First delivery: bulk write fails, row-by-row stores the good event only
+    assert await consumer.process_next_batch() == 1
+    assert (await stream.get_stream_stats())["backlog"] == 1
+
+    # Second delivery via reclaim still fails
+    assert await consumer.process_next_batch() == 0
+
+    # Third delivery exceeds max_deliveries and is dead-lettered
+    assert await consumer.process_next_batch() == 1
+    stats = await stream.get_stream_stats()
+    assert stats["backlog"] == 0
+    assert stats["dead_lettered"] == 1
+    assert consumer.get_metrics()["events_dead_lettered"] == 1
+
+
+@pytest.mark.asyncio
+async def test_undecodable_message_is_dead_lettered():
+    stream = await make_stream()
+    await stream.backend.xadd(stream.EVENT_STREAM, {"event": "{not json"})
+
+    consumer = AuditIngestionConsumer(stream=stream, supabase_client=make_supabase())
+
+    assert await consumer.process_next_batch() == 1
+    assert (await stream.get_stream_stats())["dead_lettered"] == 1
+
+
+@pytest.mark.asyncio
+async def test_publish_applies_backpressure_when_backlog_is_full():
+    stream = await make_stream(max_backlog=5, backpressure_timeout=0.05, backpressure_poll_interval=0.01)
+    await stream.publish_batch([make_event() for _ in range(5)])
+
+    with pytest.raises(AuditIngestionBackpressureError):
+        await stream.publish(make_event())
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_is_one_round_trip():
+    stream = await make_stream()
+    backend = stream.backend
+    calls = []
+    xlen, pipeline = backend.xlen, backend.pipeline
+
+    async def counting_xlen(*args, **kwargs):
+        calls.append("xlen")
+        return await xlen(*args, **kwargs)
+
+    def counting_pipeline(*args, **kwargs):
+        calls.append("pipeline")
+        return pipeline(*args, **kwargs)
+
+    backend.xlen, backend.pipeline = counting_xlen, counting_pipeline
+    message_ids = await stream.publish_batch([make_event() for _ in range(1000)])
+    backend.xlen, backend.pipeline = xlen, pipeline
+
+    assert calls == ["xlen", "pipeline"]
+    assert len(set(message_ids)) == 1000
+    assert await backend.xlen(stream.EVENT_STREAM) == 1000
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_generated_once_per_batch():
+    stream = await make_stream()
+    await stream.publish_batch([make_event() for _ in range(4)])
+
+    embedding_service = MagicMock()
+    embedding_service._build_content_text.side_effect = lambda row: row["id"]
+    embedding_service.generate_embeddings_batch = AsyncMock(return_value=[[0.1] * 3] * 4)
+    supabase = make_supabase()
+
+    consumer = AuditIngestionConsumer(
+        stream=stream,
+        embedding_service=embedding_service,
+        supabase_client=supabase
+    )
+    await consumer.process_next_batch()
+
+    embedding_service.generate_embeddings_batch.assert_awaited_once()
+    assert all(row["embedding"] == [0.1] * 3 for row in supabase.bulk_payloads[0])
+
+
+@pytest.mark.asyncio
+async def test_started_consumer_scores_published_events(monkeypatch):
+    import asyncio
+    import numpy as np
+    import services.audit_ingestion_stream as ingestion
+    import services.audit_ml_service as audit_ml_service
+
+    stream = await make_stream()
+    ml_service = make_ml_service()
+    ml_service.load_models = AsyncMock()
+    ml_service.initialize_redis = AsyncMock()
+    anomaly_service = MagicMock(is_trained=True)
+    anomaly_service.feature_extractor.extract_batch_features = AsyncMock(
+        side_effect=lambda rows: np.zeros((len(rows), 3))
+    )
+    anomaly_service._compute_calibrated_scores_batch.side_effect = lambda matrix: (
+        [0.91] * len(matrix), [True] * len(matrix)
+    )
+    supabase = make_supabase()
+
+    monkeypatch.setattr(ingestion, "get_ingestion_stream", AsyncMock(return_value=stream))
+    monkeypatch.setattr(audit_ml_service, "AuditMLService", lambda supabase_client: ml_service)
+    monkeypatch.setattr("services.audit_anomaly_service.anomaly_service", anomaly_service)
+    monkeypatch.setattr("config.database.supabase", supabase)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    # Without a running consumer, callers insert the events themselves
+    assert await ingestion.publish_audit_events([make_event()]) is None
+
+    assert await ingestion.start_ingestion_consumer(batch_size=50)
+    try:
+        events = [make_event() for _ in range(10)]
+        assert len(await ingestion.publish_audit_events(events)) == 10
+        for _ in range(100):
+            if ingestion.get_consumer_metrics()["events_stored"] == 10:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await ingestion.stop_ingestion_consumer()
+
+    stored = supabase.bulk_payloads[0]
+    assert [row["id"] for row in stored] == [e["id"] for e in events]
+    assert all(row["anomaly_score"] == 0.91 and row["is_anomaly"] for row in stored)
+    assert ingestion.get_consumer_metrics() is None
+    assert await ingestion.publish_audit_events([make_event()]) is None
@@ -0,0 +1,190 @@
+"""
+Unit Tests: Batched Audit ML Classification
+
+Tests that classify_events_batch matches per-event classification, resolves
+cache hits with a single MGET and that trained models are shared per process.
+
+Requirements: 4.1, 4.2, 4.3, 7.10
+"""
+
+import pytest
+import os
+import sys
+import json
+import random
+from unittest.mock import MagicMock, AsyncMock
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services import audit_ml_service as audit_ml_module
+from services.audit_ml_service import AuditMLService, EventClassification
+
+
+EVENT_TYPES = [
+    ("budget_change", "Financial Impact"),
+    ("permission_change", "Security Change"),
+    ("resource_assignment", "Resource Allocation"),
+    ("risk_created", "Risk Event"),
+    ("report_generated", "Compliance Action"),
+]
+
+
+def make_events(count, seed=7):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        event_type, category = EVENT_TYPES[i % len(EVENT_TYPES)]
+        events.append({
+            "id": f"event-{i}",
+            "event_type": event_type,
+            "entity_type": rng.choice(["project", "resource", "risk", "budget"]),
+            "action_details": {
+                "description": f"{event_type.replace('_', ' ')} for item {rng.randint(1, 20)}",
+                "budget_change_percentage": rng.choice([2, 15, 30])
+            },
+            "severity": rng.choice(["info", "warning", "critical"]),
+            "timestamp": f"2026-01-{(i % 28) + 1:02d}T{i % 24:02d}:00:00",
+            "category": category,
+            "risk_level": rng.choice(["Low", "Medium", "High", "Critical"])
+        })
+    return events
+
+
+async def make_trained_service(model_dir):
+    service = AuditMLService(supabase_client=MagicMock())
+    service.model_dir = str(model_dir)
+    service._store_model_metadata = AsyncMock()
+    await service.train_classifiers(make_events(150))
+    assert service.is_trained
+    return service
+
+
+@pytest.mark.asyncio
+async def test_batch_features_match_single_event_features(tmp_path):
+    trained_service = await make_trained_service(tmp_path)
+    events = make_events(20, seed=3)
+    events[2]["action_details"] = "plain text details"
+    events[3]["timestamp"] = None
+    events[4]["performance_metrics"] = {"execution_time": 12}
+
+    batch = await trained_service.extract_features_batch(events)
+    single = np.array([await trained_service.extract_features(e) for e in events])
+
+    assert batch.shape == single.shape
+    assert np.allclose(batch, single)
+
+
+@pytest.mark.asyncio
+async def test_batch_classification_matches_classify_event(tmp_path):
+    trained_service = await make_trained_service(tmp_path)
+    events = make_events(30, seed=11)
+
+    batch = await trained_service.classify_events_batch(events)
+    single = [await trained_service.classify_event(e) for e in events]
+
+    assert len(batch) == len(events)
+    for batch_result, single_result in zip(batch, single):
+        assert batch_result.category == single_result.category
+        assert batch_result.risk_level == single_result.risk_level
+        assert batch_result.tags == single_result.tags
+        assert batch_result.category_confidence == pytest.approx(single_result.category_confidence)
+        assert batch_result.risk_confidence == pytest.approx(single_result.risk_confidence)
+
+
+@pytest.mark.asyncio
+async def test_batch_classification_uses_single_mget_and_pipeline(tmp_path):
+    trained_service = await make_trained_service(tmp_path)
+    events = make_events(6, seed=5)
+    cached = EventClassification(
+        category="Risk Event",
+        category_confidence=0.99,
+        risk_level="Critical",
+        risk_confidence=0.97,
+        tags=["cached"]
+    )
+
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis_client = MagicMock()
+    redis_client.mget = AsyncMock(
+        return_value=[json.dumps(cached.to_dict()) if i % 2 == 0 else None for i in range(6)]
+    )
+    redis_client.pipeline.return_value = pipe
+    trained_service.redis_client = redis_client
+    trained_service.redis_enabled = True
+
+    results = await trained_service.classify_events_batch(events)
+
+    redis_client.mget.assert_awaited_once()
+    assert redis_client.mget.await_args.args[0] == [
+        trained_service._generate_cache_key(e) for e in events
+    ]
+    assert [r.tags == ["cached"] for r in results] == [True, False] * 3
+
+    # Only the three misses are written back, in one pipelined round trip
+    assert pipe.setex.call_count == 3
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_untrained_batch_uses_rule_based_classification():
+    service = AuditMLService(supabase_client=MagicMock())
+    events = make_events(5)
+
+    results = await service.classify_events_batch(events)
+
+    assert [r.category for r in results] == [category for _, category in EVENT_TYPES]
+    assert all(r.category_confidence == 0.5 for r in results)
+    assert await service.classify_events_batch([]) == []
+
+
+@pytest.mark.asyncio
+async def test_models_are_loaded_once_per_process(tmp_path, monkeypatch):
+    trained_service = await make_trained_service(tmp_path)
+    audit_ml_module._SHARED_MODELS.clear()
+
+    first = AuditMLService(supabase_client=MagicMock())
+    first.model_dir = trained_service.model_dir
+    await first.load_models()
+    assert first.is_trained
+
+    load_bundle = MagicMock(side_effect=AssertionError("models reloaded from disk"))
+    second = AuditMLService(supabase_client=MagicMock())
+    second.model_dir = trained_service.model_dir
+    monkeypatch.setattr(second, "_load_model_bundle", load_bundle)
+    await second.load_models()
+
+    assert second.is_trained
+    assert second.category_classifier is first.category_classifier
+    assert second.feature_vectorizer is first.feature_vectorizer
+
+    events = make_events(10, seed=9)
+    first_results = await first.classify_events_batch(events)
+    second_results = await second.classify_events_batch(events)
+    assert [r.to_dict() for r in first_results] == [r.to_dict() for r in second_results]
+
+
+@pytest.mark.asyncio
+async def test_retraining_swaps_in_new_models_without_touching_shared_ones(tmp_path):
+    trained_service = await make_trained_service(tmp_path)
+    reader = AuditMLService(supabase_client=MagicMock())
+    reader.model_dir = trained_service.model_dir
+    await reader.load_models()
+    old_classifier = reader.category_classifier
+    old_vocabulary = dict(reader.feature_vectorizer.vocabulary_)
+    events = make_events(10, seed=9)
+    before = [r.to_dict() for r in await reader.classify_events_batch(events)]
+
+    await trained_service.train_classifiers(make_events(150, seed=5))
+
+    # The reader keeps its consistent bundle; new instances get the new one
+    assert reader.category_classifier is old_classifier
+    assert reader.feature_vectorizer.vocabulary_ == old_vocabulary
+    assert [r.to_dict() for r in await reader.classify_events_batch(events)] == before
+    assert trained_service.category_classifier is not old_classifier
+
+    fresh = AuditMLService(supabase_client=MagicMock())
+    fresh.model_dir = trained_service.model_dir
+    await fresh.load_models()
+    assert fresh.category_classifier is trained_service.category_classifier
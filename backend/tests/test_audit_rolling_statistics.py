@@ -0,0 +1,194 @@
+"""
+Unit Tests: Rolling Audit Statistics
+
+Tests incremental maintenance, sliding-window expiry, persistence and
+recovery from incomplete persisted state of services/audit_rolling_statistics.py.
+
+Requirements: 1.2
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime, timedelta
+from uuid import uuid4
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.audit_rolling_statistics import (
+    AuditRollingStatistics,
+    BUCKETS_TABLE,
+    WATERMARK_TABLE
+)
+
+
+NOW = datetime(2026, 3, 31, 12, 0, 0)
+
+
+def make_event(event_type="user_login", user_id="u1", entity_id="e1", age=timedelta(hours=1)):
+    timestamp = (NOW - age).isoformat()
+    return {
+        "id": str(uuid4()),
+        "event_type": event_type,
+        "user_id": user_id,
+        "entity_type": "project",
+        "entity_id": entity_id,
+        "timestamp": timestamp,
+        "created_at": timestamp
+    }
+
+
+def make_bucket_row():
+    return {
+        "bucket_start": (NOW - timedelta(days=2)).replace(minute=0).isoformat(),
+        "event_count": 3,
+        "event_type_counts": {"budget_change": 3},
+        "user_counts": {"u9": 3},
+        "entity_counts": {"project:e9": 3}
+    }
+
+
+def test_incremental_counts_match_full_recount():
+    stats = AuditRollingStatistics()
+    events = [
+        make_event("user_login", "u1", "e1"),
+        make_event("user_login", "u2", "e1", age=timedelta(days=3)),
+        make_event("budget_change", "u1", "e2", age=timedelta(days=10)),
+        make_event("budget_change", None, None, age=timedelta(days=20)),
+    ]
+    assert stats.add_events(events, now=NOW) == 4
+
+    context = stats.historical_context()
+    assert context["event_type_frequencies"] == {"user_login": 2, "budget_change": 2}
+    assert context["event_type_total"] == 4
+    assert context["entity_access_patterns"] == {"project:e1": 2, "project:e2": 1, "project": 1}
+    assert context["entity_type_counts"] == {"project": 4}
+    assert context["entity_access_total"] == 4
+    assert context["user_activity_stats"]["u1"]["events_per_day"] == pytest.approx(2 / 30)
+    assert "u3" not in context["user_activity_stats"]
+
+
+def test_events_outside_window_are_ignored():
+    stats = AuditRollingStatistics()
+    assert not stats.add_event(make_event(age=timedelta(days=31)), now=NOW)
+    assert stats.total_events == 0
+
+
+def test_expiry_subtracts_buckets_that_slide_out():
+    stats = AuditRollingStatistics()
+    stats.add_events([
+        make_event("old_event", "u1", "e1", age=timedelta(days=29, hours=23)),
+        make_event("user_login", "u2", "e2"),
+    ], now=NOW)
+
+    removed = stats.expire(now=NOW + timedelta(hours=3))
+
+    assert removed == 1
+    assert stats.event_type_counts == {"user_login": 1}
+    assert stats.user_counts == {"u2": 1}
+    assert stats.entity_counts == {"project:e2": 1}
+    assert stats.total_events == 1
+    assert stats.total_entity_accesses == 1
+
+
+def test_persisted_buckets_restore_identical_state():
+    original = AuditRollingStatistics()
+    original.add_events([
+        make_event("user_login", "u1", "e1"),
+        make_event("budget_change", "u2", "e2", age=timedelta(days=5)),
+    ], now=NOW)
+    rows = [bucket.to_row() for bucket in original._buckets.values()]
+
+    restored = AuditRollingStatistics()
+    restored.load_buckets(rows, now=NOW)
+
+    assert restored.event_type_counts == original.event_type_counts
+    assert restored.user_counts == original.user_counts
+    assert restored.entity_counts == original.entity_counts
+    assert restored.total_events == original.total_events
+
+
+def make_client():
+    client = MagicMock()
+    tables = {}
+
+    def table(name):
+        if name not in tables:
+            query = MagicMock()
+            for method in ("select", "gte", "eq", "or_", "order", "limit", "lt", "delete", "upsert"):
+                getattr(query, method).return_value = query
+            tables[name] = query
+        return tables[name]
+
+    client.table.side_effect = table
+    return client, table
+
+
+@pytest.mark.asyncio
+async def test_refresh_reads_only_events_after_watermark():
+    new_events = [make_event("user_login", "u1", "e1", age=timedelta(minutes=5))]
+    persisted_rows = [make_bucket_row()]
+
+    client, table = make_client()
+    table(BUCKETS_TABLE).execute.return_value = MagicMock(data=persisted_rows)
+    table(WATERMARK_TABLE).execute.return_value = MagicMock(data=[{
+        "watermark_created_at": (NOW - timedelta(hours=1)).isoformat(),
+        "watermark_event_id": str(uuid4())
+    }])
+    table("roche_audit_logs").execute.return_value = MagicMock(data=new_events)
+
+    stats = AuditRollingStatistics(supabase_client=client)
+    await stats.refresh(now=NOW)
+
+    logs_query = table("roche_audit_logs")
+    logs_query.or_.assert_called_once()
+    logs_query.gte.assert_not_called()
+    assert stats.event_type_counts == {"budget_change": 3, "user_login": 1}
+
+    upserted_rows = table(BUCKETS_TABLE).upsert.call_args[0][0]
+    assert len(upserted_rows) == 1
+    watermark_row = table(WATERMARK_TABLE).upsert.call_args[0][0]
+    assert watermark_row["watermark_event_id"] == new_events[0]["id"]
+
+
+
+@pytest.mark.asyncio
+async def test_buckets_without_watermark_are_rebuilt_not_double_counted():
+    # The persisted bucket holds the same events the full scan reads again
+    events = [make_event("budget_change", "u9", "e9", age=timedelta(days=2)) for _ in range(3)]
+    client, table = make_client()
+    table(BUCKETS_TABLE).execute.return_value = MagicMock(data=[make_bucket_row()])
+    table(WATERMARK_TABLE).execute.return_value = MagicMock(data=[])
+    table("roche_audit_logs").execute.return_value = MagicMock(data=events)
+
+    stats = AuditRollingStatistics(supabase_client=client)
+    await stats.refresh(now=NOW)
+
+    table("roche_audit_logs").gte.assert_called_once()
+    assert stats.event_type_counts == {"budget_change": 3}
+    assert stats.total_events == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_retried_without_counting_or_persisting():
+    client, table = make_client()
+    table(BUCKETS_TABLE).execute.side_effect = ConnectionError("buckets unavailable")
+    table(WATERMARK_TABLE).execute.return_value = MagicMock(data=[{
+        "watermark_created_at": (NOW - timedelta(hours=1)).isoformat(),
+        "watermark_event_id": str(uuid4())
+    }])
+
+    stats = AuditRollingStatistics(supabase_client=client)
+    await stats.refresh(now=NOW)
+
+    assert not stats.is_loaded and stats.watermark is None and stats.total_events == 0
+    table("roche_audit_logs").execute.assert_not_called()
+    table(BUCKETS_TABLE).upsert.assert_not_called()
+    table(WATERMARK_TABLE).upsert.assert_not_called()
+
+    table(BUCKETS_TABLE).execute.side_effect = None
+    table(BUCKETS_TABLE).execute.return_value = MagicMock(data=[make_bucket_row()])
+    table("roche_audit_logs").execute.return_value = MagicMock(data=[])
+    await stats.refresh(now=NOW)
+
+    assert stats.is_loaded and stats.event_type_counts == {"budget_change": 3}
@@ -17,6 +17,7 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from services.audit_anomaly_pipeline import AnomalyPipelineError
 from services.audit_scheduled_jobs import AuditScheduledJobs
 from services.audit_scheduler import AuditScheduler
 
@@ -101,7 +102,7 @@ async def test_anomaly_detection_job_executes_successfully(scheduled_jobs):
         'anomaly_score': 0.85
     }
     
-    scheduled_jobs.anomaly_service.detect_anomalies = AsyncMock(return_value=[mock_anomaly])
+    scheduled_jobs.anomaly_pipeline.run = AsyncMock(return_value=[mock_anomaly])
     scheduled_jobs.anomaly_service.generate_alert = AsyncMock(return_value={'id': uuid4()})
     
     # Mock integration hub
@@ -112,16 +113,8 @@ async def test_anomaly_detection_job_executes_successfully(scheduled_jobs):
     # Execute job
     await scheduled_jobs.run_anomaly_detection()
     
-    # Verify anomaly detection was called with correct time range
-    scheduled_jobs.anomaly_service.detect_anomalies.assert_called_once()
-    call_args = scheduled_jobs.anomaly_service.detect_anomalies.call_args
-    
-    # Verify time range is approximately last 24 hours
-    start_time = call_args.kwargs['start_time']
-    end_time = call_args.kwargs['end_time']
-    time_diff = end_time - start_time
-    
-    assert 23.5 <= time_diff.total_seconds() / 3600 <= 24.5, "Time range should be approximately 24 hours"
+    # Verify the incremental pipeline processed new events once
+    scheduled_jobs.anomaly_pipeline.run.assert_awaited_once()
     
     # Verify alert generation was called
     scheduled_jobs.anomaly_service.generate_alert.assert_called_once_with(mock_anomaly)
@@ -145,7 +138,7 @@ async def test_anomaly_detection_job_sends_notifications(scheduled_jobs):
         'anomaly_score': 0.85
     }
     
-    scheduled_jobs.anomaly_service.detect_anomalies = AsyncMock(return_value=[mock_anomaly])
+    scheduled_jobs.anomaly_pipeline.run = AsyncMock(return_value=[mock_anomaly])
     scheduled_jobs.anomaly_service.generate_alert = AsyncMock(return_value={'id': uuid4()})
     
     # Mock active integrations
@@ -187,8 +180,8 @@ async def test_anomaly_detection_job_handles_errors_gracefully(scheduled_jobs):
     
     Requirements: 1.1
     """
-    # Mock anomaly detection to raise an exception
-    scheduled_jobs.anomaly_service.detect_anomalies = AsyncMock(
+    # Mock the anomaly pipeline to raise an exception
+    scheduled_jobs.anomaly_pipeline.run = AsyncMock(
         side_effect=Exception("Database connection failed")
     )
     
@@ -197,6 +190,30 @@ async def test_anomaly_detection_job_handles_errors_gracefully(scheduled_jobs):
         await scheduled_jobs.run_anomaly_detection()
 
 
+@pytest.mark.asyncio
+async def test_anomalies_stored_before_pipeline_failure_are_alerted(scheduled_jobs):
+    """
+    Test that anomalies of windows stored before a pipeline failure still
+    get alerts, and the failure is reported.
+    
+    Requirements: 1.4
+    """
+    mock_anomaly = Mock()
+    mock_anomaly.id = uuid4()
+    mock_anomaly.audit_event = {'tenant_id': str(uuid4())}
+    
+    scheduled_jobs.anomaly_pipeline.run = AsyncMock(
+        side_effect=AnomalyPipelineError("Failed to fetch audit events", anomalies=[mock_anomaly])
+    )
+    scheduled_jobs.anomaly_service.generate_alert = AsyncMock(return_value={'id': uuid4()})
+    scheduled_jobs._send_anomaly_notifications = AsyncMock()
+    
+    with pytest.raises(AnomalyPipelineError):
+        await scheduled_jobs.run_anomaly_detection()
+    
+    scheduled_jobs.anomaly_service.generate_alert.assert_called_once_with(mock_anomaly)
+
+
 # ============================================================================
 # Test: Embedding Generation Job
 # ============================================================================
@@ -551,7 +568,7 @@ async def test_job_continues_after_individual_anomaly_failure(scheduled_jobs):
     for anomaly in anomalies:
         anomaly.__dict__ = {'id': anomaly.id, 'audit_event': anomaly.audit_event}
     
-    scheduled_jobs.anomaly_service.detect_anomalies = AsyncMock(return_value=anomalies)
+    scheduled_jobs.anomaly_pipeline.run = AsyncMock(return_value=anomalies)
     
     # Mock alert generation to fail on second anomaly
     scheduled_jobs.anomaly_service.generate_alert = AsyncMock(
@@ -0,0 +1,231 @@
+"""
+Unit tests for batched multi-scenario simulation and comparison.
+
+Tests that a baseline and its variants share random streams, that paired
+comparisons and mitigation values are reported in one result, and that a batch
+costs less than simulating each scenario on its own.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from monte_carlo.batch_scenario_runner import BatchScenarioRunner
+from monte_carlo.engine import MonteCarloEngine
+from monte_carlo.models import (
+    Risk, RiskCategory, ImpactType, ProbabilityDistribution, DistributionType,
+    MitigationStrategy, RiskModification, Scenario
+)
+from monte_carlo.results_analyzer import SimulationResultsAnalyzer
+from monte_carlo.scenario_generator import ScenarioGenerator
+from monte_carlo.vectorized_sampling import RiskSampleMatrix
+
+
+def make_risks(count=4):
+    """Create cost risks with mitigation strategies and one schedule risk."""
+    risks = []
+    for i in range(count):
+        impact_type = ImpactType.SCHEDULE if i == count - 1 else ImpactType.COST
+        risks.append(Risk(
+            id=f"RISK_{i:03d}",
+            name=f"Risk {i}",
+            category=RiskCategory.COST if impact_type == ImpactType.COST else RiskCategory.SCHEDULE,
+            impact_type=impact_type,
+            probability_distribution=ProbabilityDistribution(
+                distribution_type=DistributionType.TRIANGULAR,
+                parameters={"min": 0.1, "mode": 0.4, "max": 1.0}
+            ),
+            baseline_impact=10000.0 * (i + 1) if impact_type == ImpactType.COST else 20.0,
+            mitigation_strategies=[
+                MitigationStrategy(
+                    id=f"MIT_{i}_{j}", name=f"Mitigation {i}.{j}", description="",
+                    cost=500.0 * (j + 1), effectiveness=0.2 * (j + 1), implementation_time=10
+                )
+                for j in range(3)
+            ]
+        ))
+    return risks
+
+
+def make_baseline(risks):
+    return Scenario(id="baseline", name="Baseline", description="", risks=risks)
+
+
+def test_variants_share_random_streams_with_baseline():
+    """Variants are evaluated on the baseline's random draws, iteration by iteration."""
+    generator = ScenarioGenerator()
+    risks = make_risks()
+    baseline = make_baseline(risks)
+    unchanged = generator.create_scenario(risks, {}, name="Unchanged")
+    reshaped = generator.create_scenario(
+        risks, {"RISK_001": RiskModification(parameter_changes={"max": 2.0})}, name="Reshaped"
+    )
+
+    outcomes = BatchScenarioRunner().simulate(
+        baseline, [unchanged, reshaped], iterations=5000, random_seed=21
+    )
+
+    assert outcomes['cost'].shape == (3, 5000)
+    assert np.array_equal(outcomes['cost'][0], outcomes['cost'][1])
+
+    # A changed distribution re-transforms the same uniforms
+    standalone = RiskSampleMatrix.draw(reshaped.risks, 5000, random_seed=21)
+    expected = standalone.evaluate(standalone.impact_weights(reshaped.risks))
+    assert np.allclose(outcomes['cost'][2], expected['cost'][0])
+    assert np.all(outcomes['cost'][2] >= outcomes['cost'][0])
+
+
+def test_batch_run_reports_pairwise_comparisons_and_mitigation_value():
+    """One run returns statistics, all pairwise comparisons and mitigation values."""
+    generator = ScenarioGenerator()
+    risks = make_risks()
+    baseline = make_baseline(risks)
+    variants = [
+        generator.create_mitigated_scenario(baseline, {"RISK_002": f"MIT_2_{j}"}, name=f"Plan {j}")
+        for j in range(3)
+    ]
+
+    results = generator.compare_scenarios_batch(baseline, variants, iterations=5000, random_seed=4)
+
+    assert results['scenarios_simulated'] == 4
+    assert [s['name'] for s in results['scenarios']] == ["Baseline", "Plan 0", "Plan 1", "Plan 2"]
+    assert len(results['pairwise_comparisons']) == 6
+
+    first = results['pairwise_comparisons'][0]
+    assert first['scenario_a_id'] == "baseline"
+    assert first['cost_difference']['mean_difference'] < 0
+    assert first['statistical_significance']['paired_t_test'] < 0.05
+    assert first['cost_difference']['probability_b_lower'] == 1.0
+
+    values = results['mitigation_value']
+    assert [v['mitigations_applied'] for v in values] == [{"RISK_002": f"MIT_2_{j}"} for j in range(3)]
+    for value in values:
+        assert value['expected_value'] == pytest.approx(
+            value['expected_cost_reduction'] - value['mitigation_cost']
+        )
+    assert values[2]['expected_cost_reduction'] > values[0]['expected_cost_reduction']
+
+
+def test_simulate_mitigation_strategies_ranks_by_expected_value():
+    """All strategies of a risk are simulated in one batch and ranked by expected value."""
+    generator = ScenarioGenerator()
+    baseline = make_baseline(make_risks())
+
+    results = generator.simulate_mitigation_strategies(baseline, "RISK_001", iterations=2000, random_seed=8)
+
+    expected_values = [v['expected_value'] for v in results['mitigation_value']]
+    assert len(expected_values) == 3
+    assert expected_values == sorted(expected_values, reverse=True)
+    assert len(results['pairwise_comparisons']) == 3
+
+    with pytest.raises(ValueError):
+        generator.simulate_mitigation_strategies(baseline, "UNKNOWN")
+
+
+def test_paired_comparison_of_identical_outcomes():
+    """Identical paired outcomes are reported as not significant."""
+    outcomes = np.linspace(1.0, 2.0, 100)
+    result = SimulationResultsAnalyzer().compare_paired_outcomes(outcomes, outcomes.copy())
+
+    assert result['paired_t_p_value'] == 1.0
+    assert result['wilcoxon_p_value'] == 1.0
+    assert result['paired_confidence_interval_95'] == (0.0, 0.0)
+
+
+def test_incompatible_variant_is_rejected():
+    """Variants must only contain baseline risks with unchanged impact types."""
+    risks = make_risks()
+    extra = make_risks(5)
+    baseline = make_baseline(risks)
+    variant = Scenario(id="v", name="Extra", description="", risks=extra)
+
+    with pytest.raises(ValueError):
+        BatchScenarioRunner().simulate(baseline, [variant], iterations=1000)
+
+
+def test_batch_costs_less_than_one_standalone_simulation():
+    """Ten variants together cost less than a single engine run of the baseline."""
+    generator = ScenarioGenerator()
+    risks = make_risks(20)
+    baseline = make_baseline(risks)
+    variants = [
+        generator.create_mitigated_scenario(baseline, {f"RISK_{k:03d}": f"MIT_{k}_0"}, name=f"Plan {k}")
+        for k in range(10)
+    ]
+
+    start = time.time()
+    MonteCarloEngine().run_simulation(risks, iterations=10000, random_seed=1)
+    standalone_time = time.time() - start
+
+    start = time.time()
+    results = generator.compare_scenarios_batch(
+        baseline, variants, iterations=10000, random_seed=1, include_pairwise=False
+    )
+    batch_time = time.time() - start
+
+    assert results['scenarios_simulated'] == 11
+    assert batch_time < standalone_time
+
+
+def make_batch_request(variant_count, **overrides):
+    from routers.simulations import BatchScenarioComparisonRequest
+
+    return BatchScenarioComparisonRequest(
+        base_risks=[{
+            "id": "RISK_000", "name": "Vendor delay", "category": "cost", "impact_type": "cost",
+            "distribution_type": "triangular",
+            "distribution_parameters": {"min": 0.1, "mode": 0.4, "max": 1.0},
+            "baseline_impact": 10000.0,
+            "mitigation_strategies": [
+                {"id": f"MIT_{j}", "name": f"Mitigation {j}", "cost": 500.0, "effectiveness": 0.2 * (j + 1)}
+                for j in range(3)
+            ]
+        }],
+        variants=[
+            {"name": f"Plan {j}", "modifications": {"RISK_000": {"mitigation_applied": f"MIT_{j % 3}"}}}
+            for j in range(variant_count)
+        ],
+        iterations=5000,
+        random_seed=4,
+        **overrides
+    )
+
+
+def test_batch_endpoint_compares_with_baseline_off_the_event_loop():
+    """The endpoint runs the simulation in a thread and skips pairwise comparisons by default."""
+    import asyncio
+
+    from routers.simulations import compare_scenarios_batch
+
+    async def call_with_ticker():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        response = await compare_scenarios_batch(make_batch_request(3), current_user={"user_id": "u1"})
+        task.cancel()
+        return response, ticks
+
+    response, ticks = asyncio.run(call_with_ticker())
+
+    assert response['scenarios_simulated'] == 4
+    assert len(response['pairwise_comparisons']) == 3
+    assert all(c['scenario_a_id'] == response['scenarios'][0]['scenario_id'] for c in response['pairwise_comparisons'])
+    # The event loop kept running other tasks during the simulation
+    assert ticks > 10
+
+
+def test_batch_request_limits_pairwise_comparisons():
+    from pydantic import ValidationError
+    from routers.simulations import MAX_PAIRWISE_VARIANTS
+
+    assert make_batch_request(MAX_PAIRWISE_VARIANTS, include_pairwise=True).include_pairwise
+    with pytest.raises(ValidationError, match="include_pairwise"):
+        make_batch_request(MAX_PAIRWISE_VARIANTS + 1, include_pairwise=True)
+    assert not make_batch_request(MAX_PAIRWISE_VARIANTS + 1).include_pairwise
@@ -0,0 +1,341 @@
+"""
+Unit tests for the shared earned value engine.
+
+Tests that vectorized PV/EV/AC, performance indices and EAC/ETC methods match
+the per-element Decimal formulas, that dated actuals are accumulated per
+period, that current progress is only reported at the latest period, that
+the project controls and baseline services load their data once per
+calculation, and that a portfolio dashboard is computed quickly.
+"""
+
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from services.baseline_manager import BaselineManager
+from services.earned_value_engine import EarnedValueEngine, to_decimal
+from services.eac_calculator_service import EACCalculatorService
+from services.etc_calculator_service import ETCCalculatorService
+
+STATUS_DATE = date(2024, 6, 30)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def random_portfolio(n_projects, packages_per_project, seed=5):
+    rng = np.random.default_rng(seed)
+    projects, packages, costs = [], [], []
+    for p in range(n_projects):
+        project_id = f"p{p}"
+        budgets = rng.integers(10_000, 200_000, packages_per_project)
+        projects.append({"id": project_id, "budget": float(budgets.sum() * rng.uniform(0.9, 1.1))})
+        for w in range(packages_per_project):
+            start = date(2024, 1, 1) + timedelta(days=int(rng.integers(0, 300)))
+            percent = float(rng.choice([0, 10, 35.5, 60, 100]))
+            packages.append({
+                "id": f"{project_id}-wp{w}",
+                "project_id": project_id,
+                "name": f"Package {w}",
+                "budget": float(budgets[w]),
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=int(rng.integers(10, 200)))).isoformat(),
+                "percent_complete": percent,
+                "actual_cost": float(budgets[w] * percent / 100 * rng.uniform(0.7, 1.4)),
+                "earned_value": float(budgets[w] * percent / 100),
+                "is_active": True
+            })
+            costs.append({
+                "project_id": project_id,
+                "actual_amount": float(rng.integers(1_000, 50_000)),
+                "date_incurred": (date(2024, 1, 1) + timedelta(days=int(rng.integers(0, 365)))).isoformat()
+            })
+    return projects, packages, costs
+
+
+def reference_bottom_up_etc(work_packages):
+    """Reference: the previous per-package Decimal loop."""
+    total_etc = Decimal('0')
+    for wp in work_packages:
+        budget = Decimal(str(wp.get('budget', 0)))
+        percent_complete = Decimal(str(wp.get('percent_complete', 0))) / 100
+        actual_cost = Decimal(str(wp.get('actual_cost', 0)))
+        if percent_complete >= 1:
+            continue
+        remaining_budget = budget * (1 - percent_complete)
+        if actual_cost > 0 and percent_complete > 0:
+            wp_cpi = budget * percent_complete / actual_cost
+            total_etc += remaining_budget / wp_cpi if wp_cpi > 0 else remaining_budget
+        else:
+            total_etc += remaining_budget
+    return total_etc
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, {value}))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append((column, set(values)))
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def insert(self, row):
+        self.db.inserts.append((self.table, row))
+        return self
+
+    def execute(self):
+        self.db.calls.append(self.table)
+        rows = [
+            row for row in self.db.rows.get(self.table, [])
+            if all(row.get(column) in values for column, values in self.filters)
+        ]
+        return MagicMock(data=rows)
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.inserts = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def test_project_metrics_match_decimal_formulas():
+    projects, packages, costs = random_portfolio(30, 8)
+    engine = EarnedValueEngine.for_work_packages(projects, packages, costs)
+    metrics = engine.compute([STATUS_DATE])
+
+    for position, project in enumerate(projects):
+        snapshot = metrics.snapshot(position)
+        own = [wp for wp in packages if wp["project_id"] == project["id"]]
+        bac = Decimal(str(project["budget"]))
+        ev = sum(Decimal(str(wp["earned_value"])) for wp in own)
+        ac = sum(Decimal(str(c["actual_amount"])) for c in costs
+                 if c["project_id"] == project["id"] and c["date_incurred"] <= STATUS_DATE.isoformat())
+        planned_fraction = sum(
+            Decimal(str(wp["budget"])) * Decimal(min(max(
+                ((STATUS_DATE - date.fromisoformat(wp["start_date"])).days + 1) /
+                ((date.fromisoformat(wp["end_date"]) - date.fromisoformat(wp["start_date"])).days + 1),
+                0), 1))
+            for wp in own
+        ) / sum(Decimal(str(wp["budget"])) for wp in own)
+        pv = bac * planned_fraction
+        cpi = ev / ac if ac > 0 else Decimal(1)
+        spi = ev / pv if pv > 0 else Decimal(1)
+
+        assert snapshot["earned_value"] == ev.quantize(Decimal("0.01"), ROUND_HALF_UP)
+        assert snapshot["actual_cost"] == ac.quantize(Decimal("0.01"), ROUND_HALF_UP)
+        assert float(snapshot["planned_value"]) == pytest.approx(float(pv), abs=0.01)
+        assert float(snapshot["cost_performance_index"]) == pytest.approx(float(cpi), abs=1e-4)
+        assert float(snapshot["schedule_performance_index"]) == pytest.approx(float(spi), abs=1e-4)
+
+        eac_cpi = ac + (bac - ev) / cpi if cpi > Decimal("0.1") else ac + bac - ev
+        eac_cpi_spi = ac + (bac - ev) / (cpi * spi) if cpi * spi > Decimal("0.1") else ac + bac - ev
+        estimates = snapshot["estimate_at_completion"]
+        assert float(estimates["current_performance"]) == pytest.approx(float(eac_cpi), abs=0.01)
+        assert float(estimates["budget_performance"]) == pytest.approx(float(eac_cpi_spi), abs=0.01)
+        assert float(snapshot["estimate_to_complete"]["bottom_up"]) == \
+            pytest.approx(float(reference_bottom_up_etc(own)), abs=0.01)
+        assert snapshot["variance_at_completion"]["bottom_up"] == \
+            snapshot["budget_at_completion"] - estimates["bottom_up"]
+
+
+def test_actual_cost_accumulates_per_period():
+    engine = EarnedValueEngine.for_work_packages(
+        [{"id": "p1", "budget": 1000}],
+        [{"id": "wp1", "project_id": "p1", "budget": 1000, "start_date": "2024-01-01",
+          "end_date": "2024-04-30", "percent_complete": 50, "actual_cost": 0, "earned_value": 500}],
+        [
+            {"project_id": "p1", "actual_amount": 100, "date_incurred": "2024-01-15"},
+            {"project_id": "p1", "actual_amount": 200, "date_incurred": "2024-02-10"},
+            {"project_id": "p1", "actual_amount": 400, "date_incurred": "2024-05-02"}
+        ]
+    )
+
+    # Status dates in any order
+    periods = [date(2024, 2, 29), date(2024, 1, 31), date(2024, 3, 31)]
+    metrics = engine.compute(periods)
+
+    assert metrics.actual_cost[0].tolist() == [300, 100, 300]
+    assert metrics.planned_value[0].tolist() == pytest.approx([1000 * 60 / 121, 1000 * 31 / 121, 1000 * 91 / 121])
+    # Current metrics include every recorded cost
+    assert engine.compute().actual_cost[0, 0] == 700
+
+
+def test_earned_value_trend_only_reports_progress_at_the_latest_period():
+    engine = EarnedValueEngine.for_work_packages(
+        [{"id": "p1", "budget": 100}],
+        [{"id": "wp1", "project_id": "p1", "budget": 100, "start_date": "2026-01-01",
+          "end_date": "2026-12-31", "percent_complete": 50, "actual_cost": 0, "earned_value": 50}],
+        [
+            {"project_id": "p1", "actual_amount": 10, "date_incurred": "2026-01-20"},
+            {"project_id": "p1", "actual_amount": 30, "date_incurred": "2026-05-10"},
+            {"project_id": "p1", "actual_amount": 20, "date_incurred": "2026-09-15"}
+        ]
+    )
+
+    periods = engine.compute([date(2026, 6, 1), date(2026, 2, 1), date(2026, 10, 1)]).period_series()
+
+    assert [p["actual_cost"] for p in periods] == [40, 10, 60]
+    assert [p["planned_value"] for p in periods] == pytest.approx([41.64, 8.77, 75.07], abs=0.01)
+    # Current progress is not the progress of earlier periods
+    for past in periods[:2]:
+        assert past["earned_value"] is None
+        assert past["schedule_performance_index"] is None and past["cost_performance_index"] is None
+        assert past["to_complete_performance_index"] is None
+        assert set(past["estimate_at_completion"].values()) == {None}
+        assert set(past["estimate_to_complete"].values()) == {None}
+    latest = periods[2]
+    assert latest["earned_value"] == 50
+    assert latest["schedule_performance_index"] == pytest.approx(50 / 75.07, abs=1e-4)
+    assert latest["cost_performance_index"] == pytest.approx(50 / 60, abs=1e-4)
+    assert latest["estimate_at_completion"]["current_performance"] == pytest.approx(60 + 50 / (50 / 60), abs=0.01)
+
+
+def test_trend_without_dated_costs_has_no_past_actual_cost():
+    engine = EarnedValueEngine.for_tasks(
+        [{"id": "t1", "planned_start_date": "2026-01-01", "planned_end_date": "2026-12-31",
+          "planned_effort_hours": 100}],
+        [{"id": "t1", "progress_percentage": 50, "actual_effort_hours": 40}],
+        "s1"
+    )
+
+    metrics = engine.compute([date(2026, 2, 1), date(2026, 10, 1)])
+
+    assert np.isnan(metrics.actual_cost[0, 0]) and metrics.actual_cost[0, 1] == 40
+    assert np.isnan(metrics.earned_value[0, 0]) and metrics.earned_value[0, 1] == 50
+
+
+def test_to_decimal_rounds_half_up_from_shortest_repr():
+    assert to_decimal(2.675) == Decimal("2.68")
+    assert to_decimal(1.00005, 4) == Decimal("1.0001")
+    assert to_decimal(np.float64(-0.125)) == Decimal("-0.13")
+
+
+def test_compare_eac_methods_loads_project_data_once():
+    projects, packages, costs = random_portfolio(1, 12)
+    db = FakeDatabase({"projects": projects, "work_packages": packages, "financial_tracking": costs})
+    service = EACCalculatorService(db)
+
+    result = run(service.compare_eac_methods("p0", management_etc=Decimal("50000")))
+
+    assert len(result["calculations"]) == 4
+    reads = [table for table in db.calls if table != "calculation_audit_log"]
+    assert sorted(reads) == ["financial_tracking", "projects", "work_packages"]
+
+    bottom_up = next(c for c in result["calculations"] if c.calculation_method == "bottom_up")
+    actual_cost = sum(Decimal(str(c["actual_amount"])) for c in costs)
+    expected = actual_cost + reference_bottom_up_etc(packages)
+    assert Decimal(str(bottom_up.result_value)) == expected.quantize(Decimal("0.01"), ROUND_HALF_UP)
+
+
+def test_weighted_etc_matches_decimal_average():
+    projects, packages, costs = random_portfolio(1, 6)
+    db = FakeDatabase({"projects": projects, "work_packages": packages, "financial_tracking": costs})
+    service = ETCCalculatorService(db)
+    engine = run(service.load_earned_value_engine(["p0"]))
+
+    calculations = [
+        run(service.calculate_bottom_up_etc("p0", engine=engine)),
+        run(service.calculate_performance_based_etc("p0", engine=engine))
+    ]
+    result = run(service.calculate_weighted_etc("p0", calculations))
+
+    weights = [Decimal(str(service.method_weights[c.calculation_method])) for c in calculations]
+    adjusted = [w * Decimal(str(c.confidence_level)) for w, c in zip(weights, calculations)]
+    expected = sum(Decimal(str(c.result_value)) * a for c, a in zip(calculations, adjusted)) / sum(adjusted)
+    assert Decimal(str(result.result_value)) == expected.quantize(Decimal("0.01"), ROUND_HALF_UP)
+    assert result.input_parameters["methods_used"] == ["bottom_up", "performance_based"]
+
+
+def test_baseline_task_metrics_match_previous_loop():
+    rng = np.random.default_rng(2)
+    baseline_tasks, current_tasks = [], []
+    for i in range(50):
+        start = date(2024, 5, 1) + timedelta(days=int(rng.integers(0, 90)))
+        end = start + timedelta(days=int(rng.integers(0, 40)))
+        baseline_tasks.append({
+            "id": f"t{i}", "planned_start_date": start.isoformat(), "planned_end_date": end.isoformat(),
+            "planned_effort_hours": float(rng.integers(0, 100)) or None, "duration_days": 1
+        })
+        if i % 10:
+            current_tasks.append({
+                "id": f"t{i}", "schedule_id": "s1", "name": f"Task {i}", "wbs_code": f"1.{i}",
+                "progress_percentage": int(rng.integers(0, 101)),
+                "actual_effort_hours": float(rng.integers(0, 120))
+            })
+    db = FakeDatabase({
+        "schedule_baselines": [{
+            "id": "b1", "schedule_id": "s1", "is_approved": True,
+            "baseline_data": json.dumps({"snapshot": {"tasks": baseline_tasks}})
+        }],
+        "tasks": current_tasks
+    })
+    manager = BaselineManager.__new__(BaselineManager)
+    manager.db = db
+
+    result = run(manager.calculate_earned_value_metrics("s1", status_date=STATUS_DATE))
+
+    current = {t["id"]: t for t in current_tasks}
+    expected_pv = {}
+    for task in baseline_tasks:
+        if task["id"] not in current:
+            continue
+        start = date.fromisoformat(task["planned_start_date"])
+        end = date.fromisoformat(task["planned_end_date"])
+        effort = task["planned_effort_hours"] or 0
+        if STATUS_DATE >= end:
+            expected_pv[task["id"]] = effort
+        elif STATUS_DATE >= start:
+            expected_pv[task["id"]] = effort * min(100, ((STATUS_DATE - start).days + 1) / ((end - start).days + 1) * 100) / 100
+        else:
+            expected_pv[task["id"]] = 0
+
+    assert [m["task_id"] for m in result["task_metrics"]] == list(expected_pv)
+    for metric in result["task_metrics"]:
+        assert metric["planned_value"] == pytest.approx(expected_pv[metric["task_id"]], abs=0.005)
+    assert result["summary_metrics"]["planned_value"] == pytest.approx(sum(expected_pv.values()), abs=0.01)
+    assert db.calls == ["schedule_baselines", "tasks"]
+
+
+def test_portfolio_dashboard_is_fast():
+    projects, packages, costs = random_portfolio(500, 20)
+    db = FakeDatabase({"projects": projects, "work_packages": packages, "financial_tracking": costs})
+    service = EACCalculatorService(db)
+    periods = [date(2024, month, 28) for month in range(1, 13)]
+
+    start = time.time()
+    dashboard = run(service.get_portfolio_earned_value([p["id"] for p in projects], periods))
+    elapsed = time.time() - start
+
+    assert len(dashboard["projects"]) == 500
+    assert len(dashboard["projects"][0]["periods"]) == 12
+    assert dashboard["portfolio"]["earned_value"] == pytest.approx(
+        sum(wp["earned_value"] for wp in packages), abs=0.01
+    )
+    assert len(db.calls) == 3
+    assert elapsed < 1.0
@@ -0,0 +1,212 @@
+"""
+Unit tests for the compiled in-memory feature flag evaluator.
+
+Tests that compiled evaluators give the same results as the per-check rules
+for every status and rollout strategy, that checks after the first load make
+no database calls, that writes and version changes reach the snapshot, and
+that a check stays in the sub-microsecond range.
+"""
+
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from models.feature_flags import FeatureFlagStatus, FeatureFlagUpdate
+from services.feature_flag_evaluator import percentage_bucket
+from services.feature_flag_service import FeatureFlagService
+
+
+def flag_row(name, status="enabled", strategy="all_users", percentage=None,
+             user_ids=None, roles=None, updated_at="2024-01-01T00:00:00+00:00"):
+    return {
+        "id": str(uuid4()),
+        "name": name,
+        "description": f"{name} feature",
+        "status": status,
+        "rollout_strategy": strategy,
+        "rollout_percentage": percentage,
+        "allowed_user_ids": user_ids,
+        "allowed_roles": roles,
+        "metadata": {"owner": "platform"},
+        "created_by": str(UUID(int=1)),
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": updated_at
+    }
+
+
+class FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.columns = None
+        self.pending = None
+
+    def select(self, columns):
+        self.columns = columns
+        return self
+
+    def update(self, data):
+        self.pending = data
+        return self
+
+    def eq(self, column, value):
+        row = next(r for r in self.db.rows if r[column] == value)
+        row.update(self.pending)
+        self.result = [row]
+        return self
+
+    def execute(self):
+        self.db.calls.append(self.columns or "update")
+        if self.pending is not None:
+            return MagicMock(data=self.result)
+        if self.columns == "*":
+            return MagicMock(data=[dict(r) for r in self.db.rows])
+        return MagicMock(data=[{"id": r["id"], "updated_at": r["updated_at"]} for r in self.db.rows])
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+
+USER_A = UUID(int=101)
+USER_B = UUID(int=202)
+
+ROWS = [
+    flag_row("all"),
+    flag_row("off", status="disabled"),
+    flag_row("old", status="deprecated", strategy="user_list", user_ids=[str(USER_A)]),
+    flag_row("beta_list", status="beta", strategy="user_list", user_ids=[str(USER_A)]),
+    flag_row("roles", strategy="role_based", roles=["admin", "project_manager"]),
+    flag_row("roles_empty", strategy="role_based", roles=[]),
+    flag_row("half", strategy="percentage", percentage=50),
+    flag_row("unset", strategy="percentage")
+]
+
+
+def reference_check(row, user_id, roles):
+    """The per-check rules of the previous database-backed implementation."""
+    if row["status"] in ("disabled", "deprecated"):
+        return False
+    strategy = row["rollout_strategy"]
+    if strategy == "all_users":
+        return True
+    if strategy == "user_list":
+        return bool(user_id) and bool(row["allowed_user_ids"]) and str(user_id) in row["allowed_user_ids"]
+    if strategy == "role_based":
+        return bool(roles) and bool(row["allowed_roles"]) and any(r in row["allowed_roles"] for r in roles)
+    if strategy == "percentage":
+        if not user_id or row["rollout_percentage"] is None:
+            return False
+        return percentage_bucket(str(user_id), row["name"]) < row["rollout_percentage"]
+
+
+@pytest.mark.parametrize("user_id,roles", [
+    (USER_A, None),
+    (USER_B, ["viewer"]),
+    (USER_B, ["viewer", "project_manager"]),
+    (None, ["admin"]),
+    (None, None)
+])
+def test_compiled_flags_match_reference_rules(user_id, roles):
+    service = FeatureFlagService(FakeDatabase([dict(r) for r in ROWS]))
+
+    for row in ROWS:
+        result = service.check_feature_enabled(row["name"], user_id, roles)
+        assert result.is_enabled == reference_check(row, user_id, roles), row["name"]
+        assert result.feature_name == row["name"]
+
+    assert service.evaluate_all(user_id, roles) == {
+        row["name"]: reference_check(row, user_id, roles) for row in ROWS
+    }
+    missing = service.check_feature_enabled("missing", user_id, roles)
+    assert not missing.is_enabled and missing.reason == "Feature flag not found"
+
+
+def test_percentage_rollout_matches_previous_hash():
+    service = FeatureFlagService(FakeDatabase([dict(r) for r in ROWS]))
+    users = [uuid4() for _ in range(2000)]
+
+    enabled = [service.is_feature_enabled("half", user) for user in users]
+
+    assert enabled == [service._hash_user_for_percentage(str(u), "half") < 50 for u in users]
+    assert 850 < sum(enabled) < 1150
+    result = service.check_feature_enabled("half", users[0])
+    assert result.reason == f"User {'in' if enabled[0] else 'not in'} 50% rollout"
+    assert result.metadata == {"owner": "platform"}
+
+
+def test_checks_make_no_database_calls_after_load():
+    db = FakeDatabase([dict(r) for r in ROWS])
+    service = FeatureFlagService(db, refresh_interval=3600)
+
+    for _ in range(100):
+        service.check_feature_enabled("roles", USER_A, ["admin"])
+        service.evaluate_all(USER_B, ["viewer"])
+
+    assert db.calls == ["*"]
+
+
+def test_writes_and_version_changes_reach_snapshot():
+    db = FakeDatabase([dict(r) for r in ROWS])
+    service = FeatureFlagService(db, refresh_interval=3600)
+    assert service.is_feature_enabled("all", USER_A)
+
+    # Write through the service: applied immediately
+    flag_id = UUID(next(r["id"] for r in db.rows if r["name"] == "all"))
+    service.update_feature_flag(flag_id, FeatureFlagUpdate(status=FeatureFlagStatus.DISABLED))
+    assert not service.is_feature_enabled("all", USER_A)
+
+    # Unchanged version stamps: only the probe runs
+    db.calls.clear()
+    assert service.refresh() is False
+    assert db.calls == ["id,updated_at"]
+
+    # Written elsewhere: picked up by the next refresh
+    row = next(r for r in db.rows if r["name"] == "off")
+    row.update(status="enabled", updated_at=datetime(2024, 2, 1).isoformat())
+    assert service.refresh() is True
+    assert service.is_feature_enabled("off", USER_A)
+
+
+def test_stale_snapshot_is_refreshed_in_background():
+    db = FakeDatabase([dict(r) for r in ROWS])
+    service = FeatureFlagService(db, refresh_interval=0)
+    assert not service.is_feature_enabled("off")
+
+    row = next(r for r in db.rows if r["name"] == "off")
+    row.update(status="enabled", updated_at="2024-03-01T00:00:00+00:00")
+
+    # The stale snapshot answers while the refresh runs
+    service.is_feature_enabled("off")
+    deadline = time.time() + 2
+    while not service.is_feature_enabled("off") and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert service.is_feature_enabled("off")
+
+
+def test_check_is_sub_microsecond():
+    rows = [dict(r) for r in ROWS] + [
+        flag_row(f"flag_{i}", strategy="role_based", roles=[f"role_{i}", "admin"]) for i in range(50)
+    ]
+    service = FeatureFlagService(FakeDatabase(rows), refresh_interval=3600)
+    snapshot = service.get_snapshot()
+    user = snapshot.user(USER_A, ["viewer", "role_7"])
+    snapshot.check("half", user)
+
+    iterations = 20000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        snapshot.check("flag_7", user)
+        snapshot.check("half", user)
+    per_check = (time.perf_counter() - start) / (2 * iterations)
+
+    assert snapshot.check("flag_7", user).is_enabled
+    assert per_check < 1e-6
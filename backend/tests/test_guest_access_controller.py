@@ -13,6 +13,7 @@ from unittest.mock import Mock, AsyncMock, patch
 from uuid import uuid4
 
 from services.guest_access_controller import GuestAccessController
+from services.rate_limiter import MemoryRateLimitBackend, RateLimiter
 from models.shareable_urls import ShareLinkValidation
 
 
@@ -284,8 +285,13 @@ class TestGuestAccessController:
         result = controller.check_rate_limit(ip, "share-456")
         assert result is True
     
-    def test_check_rate_limit_sliding_window(self, controller):
+    def test_check_rate_limit_sliding_window(self, mock_db):
         """Test rate limit uses sliding window"""
+        clock = Mock(return_value=6000.0)
+        controller = GuestAccessController(
+            db_session=mock_db,
+            rate_limiter=RateLimiter(10, 60, backend=MemoryRateLimitBackend(clock=clock))
+        )
         ip = "192.168.1.1"
         share_id = "share-123"
         
@@ -296,14 +302,14 @@ class TestGuestAccessController:
         # 11th request should be blocked
         assert controller.check_rate_limit(ip, share_id) is False
         
-        # Manually age out old requests by manipulating storage
-        with controller._rate_limit_lock:
-            key = (ip, share_id)
-            now = datetime.now(timezone.utc).timestamp()
-            # Set first request to be 61 seconds ago (outside window)
-            controller._rate_limit_storage[key][0] = now - 61
+        # Half a window later, half of the earlier requests still count
+        clock.return_value = 6090.0
+        for i in range(5):
+            assert controller.check_rate_limit(ip, share_id) is True
+        assert controller.check_rate_limit(ip, share_id) is False
         
-        # Now request should succeed (only 9 requests in window)
+        # Once the requests are outside the window, all are available again
+        clock.return_value = 6300.0
         result = controller.check_rate_limit(ip, share_id)
         assert result is True
     
@@ -0,0 +1,196 @@
+"""
+Unit tests for the linear-time chunker and the pipelined batch ingestion.
+
+Tests that chunk offsets are exact (text[start_char:end_char] == content),
+also for repeated passages and multi-byte characters, that the text is
+encoded once, that batch ingestion overlaps documents within its
+concurrency bound and keeps result order, and that throughput is reported.
+"""
+
+import asyncio
+import time
+
+import pytest
+import tiktoken
+
+from services.document_parser import DocumentFormat, DocumentParser
+from services.ingestion_orchestrator import IngestionOrchestrator
+from services.text_chunker import TextChunker
+
+
+def byte_level_encoding():
+    """Small BPE encoding that needs no download"""
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in [b"th", b"he", b"the", b" the", b"in", b"er", b"an", b" a", b"ss", b"age"]:
+        ranks[merge] = len(ranks)
+    return tiktoken.Encoding(
+        name="test_bytes",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={}
+    )
+
+
+class CountingEncoding:
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.encoded = 0
+
+    def encode(self, text):
+        self.encoded += 1
+        return self.encoding.encode(text)
+
+    def decode_tokens_bytes(self, tokens):
+        return self.encoding.decode_tokens_bytes(tokens)
+
+
+def make_chunker(chunk_size=40, overlap=8):
+    chunker = TextChunker(chunk_size=chunk_size, overlap=overlap)
+    chunker.encoder = CountingEncoding(byte_level_encoding())
+    return chunker
+
+
+MANUAL = (
+    "Safety instructions: naïve café résumé — 日本語 für Übersicht.\n\n"
+    + "Repeat the passage. " * 30 + "\n\n"
+) * 6
+
+
+@pytest.mark.parametrize("preserve_boundaries", [False, True])
+def test_offsets_are_exact_for_repeated_and_multibyte_text(preserve_boundaries):
+    chunker = make_chunker()
+
+    chunks = chunker.chunk_text(MANUAL, preserve_boundaries=preserve_boundaries)
+
+    assert len(chunks) > 10
+    assert chunker.encoder.encoded == 1
+    for i, chunk in enumerate(chunks):
+        assert chunk.chunk_index == i
+        assert MANUAL[chunk.start_char:chunk.end_char] == chunk.content
+        assert chunk.token_count <= chunker.chunk_size
+    starts = [chunk.start_char for chunk in chunks]
+    assert starts == sorted(starts)
+    # Identical passages are located where they occur, not at their first occurrence
+    repeated = [chunk for chunk in chunks if chunk.content.startswith("Safety")]
+    assert len({chunk.start_char for chunk in repeated}) == len(repeated)
+
+
+def test_token_chunks_overlap_and_cover_text():
+    chunker = make_chunker(chunk_size=30, overlap=5)
+    text = " ".join(f"w{i}" for i in range(400))
+
+    chunks = chunker.chunk_by_tokens(text)
+
+    assert chunks[0].start_char == 0 and chunks[-1].end_char == len(text)
+    for current, following in zip(chunks, chunks[1:]):
+        assert following.start_char < current.end_char <= following.end_char
+    assert sum(chunk.token_count for chunk in chunks) == (
+        len(chunker.encoder.encoding.encode(text)) + chunker.overlap * (len(chunks) - 1)
+    )
+
+
+def test_approximate_offsets_without_tiktoken():
+    chunker = TextChunker(chunk_size=20, overlap=4)
+    chunker.encoder = None
+    text = "abc defg hij " * 50
+
+    chunks = chunker.chunk_by_tokens(text)
+
+    assert all(text[c.start_char:c.end_char] == c.content for c in chunks)
+    assert chunks[-1].end_char == len(text.rstrip())
+
+
+def test_chunking_is_linear_in_document_length():
+    chunker = make_chunker(chunk_size=256, overlap=32)
+
+    def duration(repeats):
+        text = "Repeat the passage about the same thing. " * repeats
+        start = time.perf_counter()
+        chunker.chunk_by_tokens(text)
+        return time.perf_counter() - start
+
+    duration(500)
+    assert duration(40000) < 40 * duration(4000) + 0.5
+
+
+class SlowEmbeddings:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def embed_batch_async(self, texts):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return [[float(len(text))] for text in texts]
+
+
+class MemoryVectorStore:
+    def __init__(self, fail_on=None):
+        self.chunks = {}
+        self.fail_on = fail_on
+
+    async def upsert_chunks(self, chunks):
+        if chunks and chunks[0].document_id == self.fail_on:
+            from services.vector_store import VectorStoreError
+            raise VectorStoreError("write failed")
+        for chunk in chunks:
+            self.chunks.setdefault(chunk.document_id, []).append(chunk)
+
+    async def delete_by_document_id(self, document_id):
+        return len(self.chunks.pop(document_id, []))
+
+
+def make_orchestrator(vector_store=None):
+    embeddings = SlowEmbeddings()
+    orchestrator = IngestionOrchestrator(
+        parser=DocumentParser(),
+        chunker=make_chunker(chunk_size=64, overlap=8),
+        embedding_service=embeddings,
+        vector_store=vector_store or MemoryVectorStore()
+    )
+    return orchestrator, embeddings
+
+
+def documents(n):
+    return [
+        {"id": f"doc-{i}", "content": f"# Manual {i}\n\n" + "Step one. " * 200,
+         "format": DocumentFormat.MARKDOWN, "pages": 2}
+        for i in range(n)
+    ]
+
+
+def test_batch_ingestion_pipelines_documents_within_bound():
+    orchestrator, embeddings = make_orchestrator()
+
+    start = time.perf_counter()
+    results = asyncio.run(orchestrator.batch_ingest_documents(documents(12), max_concurrency=3))
+    elapsed = time.perf_counter() - start
+
+    assert [r.document_id for r in results] == [f"doc-{i}" for i in range(12)]
+    assert all(r.success and r.chunks_created > 1 for r in results)
+    assert embeddings.peak == 3
+    assert elapsed < 12 * 0.05
+
+    stats = orchestrator.get_batch_stats()
+    assert stats.succeeded == 12 and stats.pages == 24
+    assert stats.documents_per_minute == pytest.approx(12 * 60 / stats.elapsed_seconds)
+    assert stats.pages_per_second == pytest.approx(24 / stats.elapsed_seconds)
+    assert stats.to_dict()["chunks"] == sum(r.chunks_created for r in results)
+
+
+def test_batch_ingestion_failure_handling():
+    store = MemoryVectorStore(fail_on="doc-0")
+    orchestrator, _ = make_orchestrator(store)
+
+    results = asyncio.run(orchestrator.batch_ingest_documents(documents(4), max_concurrency=1))
+    assert [r.success for r in results] == [False, True, True, True]
+    assert "doc-0" not in store.chunks
+
+    orchestrator, _ = make_orchestrator(MemoryVectorStore(fail_on="doc-0"))
+    results = asyncio.run(orchestrator.batch_ingest_documents(
+        documents(20), continue_on_error=False, max_concurrency=1
+    ))
+    assert not results[0].success
+    assert len(results) < 20
@@ -0,0 +1,186 @@
+"""
+Unit tests for the shared orjson response and cache codec.
+
+Tests that the codec encodes the types handlers and caches produce (UUID,
+Decimal, datetime, NumPy, Pydantic models) the way FastAPI's default
+pipeline does, that FastJSONResponse bypasses jsonable_encoder, and that
+cached payloads are served as stored without decoding.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field
+
+from performance_optimization import CacheManager
+from services.redis_cache_service import RedisCacheService
+from utils.json_codec import (
+    EncodedJSONResponse,
+    FastJSONResponse,
+    dumps,
+    loads,
+    register_response_models,
+    serializer_for
+)
+
+
+class Status(str, Enum):
+    active = "active"
+    closed = "closed"
+
+
+class LineItem(BaseModel):
+    id: UUID
+    amount: Decimal
+    status: Status
+    due: Optional[date] = None
+    display_name: str = Field(alias="displayName")
+
+
+class Hierarchy(BaseModel):
+    project_id: UUID
+    items: List[LineItem]
+    generated_at: datetime
+
+
+def make_hierarchy(n=3):
+    return Hierarchy(
+        project_id=UUID(int=1),
+        generated_at=datetime(2024, 5, 1, 12, 30, 15, 250000),
+        items=[
+            LineItem(id=UUID(int=i + 10), amount=Decimal("1234.50") + i, status=Status.active,
+                     due=date(2024, 6, i + 1), displayName=f"Item {i}")
+            for i in range(n)
+        ]
+    )
+
+
+def test_plain_values_match_jsonable_encoder():
+    value = {
+        "id": UUID(int=5),
+        "amount": Decimal("10.25"),
+        "at": datetime(2024, 1, 2, 3, 4, 5),
+        "on": date(2024, 1, 2),
+        "status": Status.closed,
+        "tags": {"a"},
+        "nested": [{"id": UUID(int=6), "model": make_hierarchy(1)}]
+    }
+
+    assert loads(dumps(value)) == jsonable_encoder(value)
+
+
+def test_numpy_values_are_encoded_without_tolist():
+    outcomes = np.linspace(0, 1, 5)
+    value = {
+        "outcomes": outcomes,
+        "mean": outcomes.mean(),
+        "count": np.int64(5),
+        "percentiles": {10: np.float64(0.1), 90: np.float64(0.9)}
+    }
+
+    assert loads(dumps(value)) == {
+        "outcomes": outcomes.tolist(),
+        "mean": 0.5,
+        "count": 5,
+        "percentiles": {"10": 0.1, "90": 0.9}
+    }
+
+
+def test_models_use_compiled_serializer_with_response_model_output():
+    hierarchy = make_hierarchy()
+    register_response_models(Hierarchy)
+
+    app = FastAPI()
+
+    @app.get("/default", response_model=Hierarchy)
+    def default():
+        return hierarchy
+
+    @app.get("/fast", response_model=Hierarchy)
+    def fast():
+        return FastJSONResponse(hierarchy)
+
+    client = TestClient(app)
+
+    assert serializer_for.cache_info().currsize >= 2
+    assert client.get("/fast").json() == client.get("/default").json()
+    assert loads(dumps([hierarchy, hierarchy])) == [client.get("/default").json()] * 2
+
+
+def test_unknown_types_fail_unless_fallback_given():
+    class Opaque:
+        def __str__(self):
+            return "opaque"
+
+    with pytest.raises(TypeError):
+        dumps({"value": Opaque()})
+    assert loads(dumps({"value": Opaque(), "ttl": timedelta(minutes=1)}, default=str)) == {
+        "value": "opaque", "ttl": 60.0
+    }
+
+
+def test_fast_response_skips_jsonable_encoder(monkeypatch):
+    calls = []
+    import fastapi.routing
+
+    original = fastapi.routing.jsonable_encoder
+    monkeypatch.setattr(fastapi.routing, "jsonable_encoder", lambda value, **kw: calls.append(1) or original(value, **kw))
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/default")
+    def default():
+        return {"amount": Decimal("1.5"), "id": UUID(int=3)}
+
+    @app.get("/direct")
+    def direct():
+        return FastJSONResponse({"amount": Decimal("1.5"), "id": UUID(int=3)})
+
+    client = TestClient(app)
+    expected = {"amount": 1.5, "id": str(UUID(int=3))}
+
+    assert client.get("/default").json() == expected
+    assert len(calls) == 1
+    assert client.get("/direct").json() == expected
+    assert len(calls) == 1
+
+
+def test_redis_cache_round_trips_and_serves_encoded_payload():
+    service = RedisCacheService.__new__(RedisCacheService)
+    service.enabled = True
+    store = {}
+    service.client = MagicMock()
+    service.client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    # Redis clients created with decode_responses=True return str
+    service.client.get.side_effect = lambda key: store[key].decode() if key in store else None
+
+    report = {"id": UUID(int=9), "variance": Decimal("-12.30"), "created": datetime(2024, 2, 1)}
+    assert service.set("pmr:report:9", report)
+
+    assert service.get("pmr:report:9") == {
+        "id": str(UUID(int=9)), "variance": -12.3, "created": "2024-02-01T00:00:00"
+    }
+    payload = service.get_encoded("pmr:report:9")
+    assert payload == dumps(report)
+    assert service.get_encoded("missing") is None
+
+
+def test_cache_manager_encoded_payload_from_memory_fallback():
+    manager = CacheManager()
+    asyncio.run(manager.set("dashboard:u1", {"total": Decimal("3"), "cache_status": "cached"}))
+
+    payload = asyncio.run(manager.get_encoded("dashboard:u1"))
+    response = EncodedJSONResponse(payload)
+
+    assert response.body == b'{"total":3.0,"cache_status":"cached"}'
+    assert response.media_type == "application/json"
@@ -0,0 +1,192 @@
+"""
+Unit tests for keyset pagination and column projection of list endpoints.
+
+Tests that the default response keeps its plain list shape, that walking
+next_cursor returns every row exactly once in order (also across equal sort
+values), that fields= is pushed down to the select, and that the PostgREST
+query carries the keyset condition, ordering, limit and estimated count.
+"""
+
+import re
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from postgrest import SyncPostgrestClient
+
+from utils.pagination import KeysetPage, PageParams, decode_cursor, encode_cursor
+
+
+ROWS = [
+    {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        # Pairs of rows share a timestamp to exercise the tie-breaker
+        "created_at": f"2024-01-{1 + i // 2:02d}T00:00:00+00:00",
+        "name": f"Project {i}",
+        "budget": i * 1000,
+        "metadata": {"tags": ["a", "b"], "owner": {"id": i}}
+    }
+    for i in range(25)
+]
+
+
+class FakeQuery:
+    """In-memory table query understanding the calls KeysetPage makes."""
+
+    def __init__(self, rows, log):
+        self.rows = rows
+        self.log = log
+        self.columns = "*"
+        self.count = None
+        self.orders = []
+        self.keyset = None
+        self.row_limit = None
+
+    def select(self, columns, count=None):
+        self.columns = columns
+        self.count = count
+        self.log.append(("select", columns, count))
+        return self
+
+    def order(self, column, desc=False):
+        for term in column.split(","):
+            self.orders.append((term.split(".")[0], desc))
+        return self
+
+    def or_(self, filters):
+        self.log.append(("or", filters))
+        match = re.fullmatch(r'(\w+)\.(lt|gt)\."(.*)",and\(\w+\.eq\."(.*)",(\w+)\.(?:lt|gt)\."(.*)"\)', filters)
+        column, op, value, _, key, key_value = match.groups()
+        self.keyset = (column, op, value, key, key_value)
+        return self
+
+    def limit(self, size):
+        self.row_limit = size
+        return self
+
+    def execute(self):
+        rows = list(self.rows)
+        if self.keyset:
+            column, op, value, key, key_value = self.keyset
+            position = (value, key_value)
+            if op == "lt":
+                rows = [r for r in rows if (r[column], r[key]) < position]
+            else:
+                rows = [r for r in rows if (r[column], r[key]) > position]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda r: r[column], reverse=desc)
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        if self.columns != "*":
+            wanted = self.columns.split(",")
+            rows = [{k: r[k] for k in wanted} for r in rows]
+        return type("Response", (), {"data": rows, "count": len(self.rows) if self.count else None})
+
+
+def make_app(log):
+    app = FastAPI()
+
+    @app.get("/items")
+    async def list_items(params: PageParams = Depends()):
+        page = KeysetPage(params, sort_column="created_at")
+        response = page.apply(page.select(FakeQuery(ROWS, log))).execute()
+        return page.response(response.data, response.count)
+
+    return TestClient(app)
+
+
+def expected_order():
+    return sorted(ROWS, key=lambda r: (r["created_at"], r["id"]), reverse=True)
+
+
+def test_default_response_keeps_plain_list():
+    log = []
+    response = make_app(log).get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == sorted(ROWS, key=lambda r: r["created_at"], reverse=True)
+    assert log == [("select", "*", None)]
+
+
+def test_walking_cursors_returns_every_row_once_in_order():
+    client = make_app([])
+    seen = []
+    cursor = None
+    pages = 0
+
+    while True:
+        url = "/items?limit=4" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).json()
+        pages += 1
+        seen.extend(body["items"])
+        if not body["has_more"]:
+            assert body["next_cursor"] is None
+            break
+        cursor = body["next_cursor"]
+
+    assert pages == 7
+    assert [r["id"] for r in seen] == [r["id"] for r in expected_order()]
+
+
+def test_fields_are_pushed_down_and_projected():
+    log = []
+    client = make_app(log)
+
+    body = client.get("/items?limit=3&fields=name,budget&include_total=true").json()
+
+    assert log[0] == ("select", "name,budget,created_at,id", "estimated")
+    assert body["items"] == [{"name": r["name"], "budget": r["budget"]} for r in expected_order()[:3]]
+    assert body["total_count"] == 25
+    assert body["has_more"] is True
+    assert decode_cursor(body["next_cursor"]) == [expected_order()[2]["created_at"], expected_order()[2]["id"]]
+
+    # Projection alone keeps the plain list shape
+    listed = client.get("/items?fields=name").json()
+    assert listed[0] == {"name": expected_order()[0]["name"]}
+
+
+def test_invalid_parameters_are_rejected():
+    client = make_app([])
+
+    assert client.get("/items?cursor=not-a-cursor!").status_code == 400
+    assert client.get("/items?cursor=" + encode_cursor([1, 2]) + "x").status_code == 400
+    assert client.get("/items?fields=name,budget;drop").status_code == 400
+    assert client.get("/items?limit=0").status_code == 422
+    assert client.get("/items?limit=100000").status_code == 422
+
+
+def test_postgrest_query_carries_keyset_condition():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[], headers={"content-range": "0-0/1234"})
+
+    client = SyncPostgrestClient("https://example.supabase.co/rest/v1")
+    client.session = httpx.Client(
+        base_url="https://example.supabase.co/rest/v1",
+        headers=client.session.headers,
+        transport=httpx.MockTransport(handler)
+    )
+    params = PageParams(
+        limit=20,
+        cursor=encode_cursor(["2024-03-01T10:00:00+00:00", "abc"]),
+        fields="name",
+        include_total=True
+    )
+    page = KeysetPage(params, sort_column="date_incurred")
+
+    response = page.apply(page.select(client.table("financial_tracking")).eq("project_id", "p1")).execute()
+
+    query = requests[0].url.params
+    assert query["select"] == "name,date_incurred,id"
+    assert query["project_id"] == "eq.p1"
+    assert query["or"] == (
+        '(date_incurred.lt."2024-03-01T10:00:00+00:00",'
+        'and(date_incurred.eq."2024-03-01T10:00:00+00:00",id.lt."abc"))'
+    )
+    assert query["order"] == "date_incurred.desc,id.desc"
+    assert query["limit"] == "21"
+    assert "count=estimated" in requests[0].headers["prefer"]
+    assert response.count == 1234
@@ -0,0 +1,152 @@
+"""
+Unit tests for section-level incremental PMR regeneration.
+
+Tests that PMR sections are cached with the fingerprints of their inputs, that
+a data change only invalidates the sections computed from it, and that the
+optimized service recomputes only the affected sections.
+"""
+
+import asyncio
+from unittest.mock import patch
+from uuid import uuid4
+
+from performance_optimization import CacheManager, PerformanceMonitor
+from services.enhanced_pmr_service_optimized import EnhancedPMRServiceOptimized
+from services.pmr_performance_optimizer import PMRPerformanceOptimizer, section_inputs
+
+INPUTS = {
+    "budget": "b1", "risks": "r1", "schedule": "v3", "milestones": "m1", "metrics": "k1"
+}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_optimizer():
+    return PMRPerformanceOptimizer(CacheManager(), PerformanceMonitor())
+
+
+def make_service(fingerprints):
+    """Optimized service whose input fingerprints are read from a mutable dict."""
+    service = EnhancedPMRServiceOptimized.__new__(EnhancedPMRServiceOptimized)
+    service.section_cache = make_optimizer()
+    service._generation_fingerprints = {}
+
+    async def load_fingerprints(project_id):
+        return dict(fingerprints)
+
+    service._load_input_fingerprints = load_fingerprints
+    return service
+
+
+def test_summary_depends_on_all_section_inputs():
+    assert section_inputs("budget_simulation") == {"budget"}
+    assert section_inputs("executive_summary") == {
+        "budget", "risks", "schedule", "milestones", "metrics"
+    }
+
+
+def test_section_entries_are_versioned_and_checked_against_fingerprints():
+    optimizer = make_optimizer()
+    project_id = uuid4()
+
+    run(optimizer.cache_section(project_id, "budget_simulation", [0.8], input_fingerprints=INPUTS))
+    run(optimizer.cache_section(project_id, "budget_simulation", [0.9], input_fingerprints=INPUTS))
+
+    entry = run(optimizer.get_section_entry(project_id, "budget_simulation"))
+    assert entry["section_version"] == 2
+    assert entry["inputs"] == {"budget": "b1"}
+
+    assert run(optimizer.get_cached_section(
+        project_id, "budget_simulation", input_fingerprints=INPUTS
+    )) == [0.9]
+    # A risk change does not affect the budget simulation, a budget change does
+    assert run(optimizer.get_cached_section(
+        project_id, "budget_simulation", input_fingerprints={**INPUTS, "risks": "r2"}
+    )) == [0.9]
+    assert run(optimizer.get_cached_section(
+        project_id, "budget_simulation", input_fingerprints={**INPUTS, "budget": "b2"}
+    )) is None
+    # Different parameters are a different computation
+    assert run(optimizer.get_cached_section(
+        project_id, "budget_simulation", input_fingerprints=INPUTS, parameters={"iterations": 5}
+    )) is None
+
+
+def test_unversioned_sections_keep_lazy_loading_behaviour():
+    optimizer = make_optimizer()
+    report_id = uuid4()
+
+    run(optimizer.cache_section(report_id, "overview", {"section_id": "overview", "content": "x"}))
+
+    assert run(optimizer.get_cached_section(report_id, "overview"))["content"] == "x"
+    assert run(optimizer.get_section_entry(report_id, "overview")) is None
+
+
+def test_invalidation_only_drops_affected_sections():
+    optimizer = make_optimizer()
+    project_id = uuid4()
+    for section in ("budget_simulation", "schedule_simulation", "ai_insights", "executive_summary"):
+        run(optimizer.cache_section(project_id, section, section, input_fingerprints=INPUTS))
+
+    invalidated = run(optimizer.invalidate_sections(project_id, ["budget"]))
+
+    assert "schedule_simulation" not in invalidated
+    assert {"budget_simulation", "ai_insights", "executive_summary"} <= set(invalidated)
+    assert run(optimizer.get_section_entry(project_id, "schedule_simulation")) is not None
+    assert run(optimizer.get_section_entry(project_id, "budget_simulation")) is None
+
+
+def test_budget_edit_does_not_rerun_schedule_simulation():
+    fingerprints = dict(INPUTS)
+    service = make_service(fingerprints)
+    project_id = uuid4()
+    project_data = {"project_id": project_id, "current_budget": 1000000, "actual_cost": 800000}
+    kernels = []
+
+    async def run_kernel(kernel, *args):
+        kernels.append(kernel.__name__)
+        return kernel(*args)
+
+    async def simulate():
+        return await asyncio.gather(
+            service._simulate_budget_completion(project_data, 2000, 1),
+            service._simulate_schedule_variance(project_data, 2000, 1)
+        )
+
+    with patch.object(service, "_run_simulation_kernel", run_kernel):
+        first = run(simulate())
+        assert sorted(kernels) == ["_budget_completion_percentiles", "_schedule_variance_percentiles"]
+
+        kernels.clear()
+        assert run(simulate()) == first
+        assert kernels == []
+
+        fingerprints["budget"] = "b2"
+        project_data["actual_cost"] = 900000
+        second = run(simulate())
+        assert kernels == ["_budget_completion_percentiles"]
+        assert second[1] == first[1] and second[0] != first[0]
+
+
+def test_summary_is_reused_until_an_upstream_input_changes():
+    fingerprints = dict(INPUTS)
+    service = make_service(fingerprints)
+    project_id = uuid4()
+    calls = []
+    report = type("Report", (), {"ai_insights": [], "monte_carlo_analysis": None})()
+
+    async def generate_summary(self, report, project_id):
+        calls.append(project_id)
+        return f"Summary {len(calls)}"
+
+    with patch("services.enhanced_pmr_service.EnhancedPMRService._generate_executive_summary",
+               generate_summary):
+        assert run(service._generate_executive_summary(report, project_id)) == "Summary 1"
+        assert run(service._generate_executive_summary(report, project_id)) == "Summary 1"
+
+        fingerprints["milestones"] = "m2"
+        assert run(service._generate_executive_summary(report, project_id)) == "Summary 2"
+
+    assert len(calls) == 2
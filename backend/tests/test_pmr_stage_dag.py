@@ -0,0 +1,256 @@
+"""
+Unit tests for concurrent Enhanced PMR generation.
+
+Tests the stage dependency graph, that independent PMR sections run
+concurrently and are persisted and announced as each one completes, that a
+report whose generation fails is discarded, and that the simulation kernels
+run in the worker pool with the same result as inline.
+"""
+
+import asyncio
+import time
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from models.pmr import (
+    EnhancedPMRGenerationRequest, EnhancedPMRReport, MonteCarloResults, RealTimeMetrics
+)
+from services import enhanced_pmr_service
+from services.enhanced_pmr_service import EnhancedPMRService
+from services.pmr_stage_dag import PMRStageDAG
+
+STAGE_DELAY = 0.2
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_stage(name, delay, log):
+    async def stage(results):
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        return name
+    return stage
+
+
+def make_request(**overrides):
+    fields = dict(
+        project_id=uuid4(),
+        report_month=date(2024, 1, 1),
+        report_year=2024,
+        template_id=uuid4(),
+        title="January Report",
+        include_ai_insights=True,
+        include_monte_carlo=True,
+        enable_real_time_metrics=True
+    )
+    fields.update(overrides)
+    return EnhancedPMRGenerationRequest(**fields)
+
+
+def make_service(events):
+    """Service with stubbed stages that each take STAGE_DELAY seconds."""
+    service = EnhancedPMRService.__new__(EnhancedPMRService)
+    service.supabase = MagicMock()
+
+    async def create_base(request, user_id):
+        return EnhancedPMRReport(
+            project_id=request.project_id,
+            report_month=request.report_month,
+            report_year=request.report_year,
+            template_id=request.template_id,
+            title=request.title,
+            generated_by=user_id
+        )
+
+    async def insights(report_id, project_id, categories=None):
+        await asyncio.sleep(STAGE_DELAY)
+        return []
+
+    async def monte_carlo(project_id, iterations=1000, confidence_levels=None, random_seed=None):
+        await asyncio.sleep(STAGE_DELAY)
+        return MonteCarloResults(analysis_type="simplified", iterations=iterations)
+
+    async def metrics(project_id):
+        await asyncio.sleep(STAGE_DELAY)
+        return RealTimeMetrics(last_updated=datetime.utcnow())
+
+    async def summary(report, project_id):
+        events.append({"type": "summary_context",
+                       "has_monte_carlo": report.monte_carlo_analysis is not None,
+                       "has_metrics": report.real_time_metrics is not None})
+        await asyncio.sleep(STAGE_DELAY)
+        return "Summary"
+
+    async def publish(report_id, message):
+        events.append(message)
+
+    service._create_base_report = create_base
+    service._generate_ai_insights = insights
+    service._run_monte_carlo_analysis = monte_carlo
+    service._collect_real_time_metrics = metrics
+    service._generate_executive_summary = summary
+    service._publish_section_event = publish
+    return service
+
+
+def test_independent_stages_run_concurrently():
+    log = []
+    dag = PMRStageDAG()
+    dag.add_stage("base", make_stage("base", 0.05, log))
+    for name in ("a", "b", "c"):
+        dag.add_stage(name, make_stage(name, STAGE_DELAY, log), depends_on=["base"])
+    dag.add_stage("summary", make_stage("summary", 0.05, log), depends_on=["a", "b", "c"])
+
+    result = run(dag.run())
+
+    assert result.total_time < 0.1 + STAGE_DELAY * 1.75
+    assert log[:2] == [("start", "base"), ("end", "base")]
+    assert log[-2:] == [("start", "summary"), ("end", "summary")]
+    assert result.critical_stage_time >= STAGE_DELAY
+    assert result.results["summary"] == "summary"
+
+
+def test_invalid_graphs_are_rejected():
+    missing = PMRStageDAG().add_stage("a", make_stage("a", 0, []), depends_on=["unknown"])
+    with pytest.raises(ValueError):
+        run(missing.run())
+
+    cycle = PMRStageDAG()
+    cycle.add_stage("a", make_stage("a", 0, []), depends_on=["b"])
+    cycle.add_stage("b", make_stage("b", 0, []), depends_on=["a"])
+    with pytest.raises(ValueError):
+        cycle.validate()
+
+
+def test_stage_failure_cancels_pending_stages():
+    log = []
+
+    async def failing(results):
+        raise RuntimeError("insights failed")
+
+    dag = PMRStageDAG()
+    dag.add_stage("slow", make_stage("slow", 1.0, log))
+    dag.add_stage("failing", failing)
+    dag.add_stage("after", make_stage("after", 0, log), depends_on=["failing"])
+
+    start = time.time()
+    with pytest.raises(RuntimeError):
+        run(dag.run())
+
+    assert time.time() - start < 0.5
+    assert ("end", "slow") not in log and ("start", "after") not in log
+
+
+def test_pmr_latency_approaches_longest_section():
+    events = []
+    service = make_service(events)
+
+    start = time.time()
+    report = run(service.generate_enhanced_pmr(make_request(), uuid4()))
+    elapsed = time.time() - start
+
+    # Three parallel sections followed by the summary: two stage delays, not four
+    assert elapsed < STAGE_DELAY * 2.75
+    assert report.executive_summary == "Summary"
+    assert report.monte_carlo_enabled
+
+    # The summary is generated from the completed parallel sections
+    context = next(e for e in events if e["type"] == "summary_context")
+    assert context["has_monte_carlo"] and context["has_metrics"]
+
+
+def test_sections_are_persisted_and_announced_as_they_complete():
+    events = []
+    service = make_service(events)
+
+    report = run(service.generate_enhanced_pmr(make_request(), uuid4()))
+
+    events = [e for e in events if e["type"] != "summary_context"]
+    sections = [e["section"] for e in events if e["type"] == "section_ready"]
+    assert sections[0] == "base_report"
+    assert set(sections[1:4]) == {"ai_insights", "monte_carlo", "real_time_metrics"}
+    assert sections[4] == "executive_summary"
+    assert events[-1]["type"] == "report_ready"
+    assert all(e["report_id"] == str(report.id) for e in events)
+
+    tables = [c.args[0] for c in service.supabase.table.call_args_list]
+    assert tables[0] == "enhanced_pmr_reports"
+    assert {"monte_carlo_results", "pmr_real_time_metrics"} <= set(tables)
+    # No insights were generated, so nothing is inserted for them
+    assert "ai_insights" not in tables
+    # Summary and final fields are written to the stored report row
+    assert service.supabase.table.return_value.update.call_count == 2
+
+
+def test_disabled_sections_are_skipped():
+    events = []
+    service = make_service(events)
+    request = make_request(include_monte_carlo=False, enable_real_time_metrics=False)
+
+    run(service.generate_enhanced_pmr(request, uuid4()))
+
+    sections = [e["section"] for e in events if e["type"] == "section_ready"]
+    assert sections == ["base_report", "ai_insights", "executive_summary"]
+
+
+def test_simulation_kernel_matches_in_worker_process():
+    service = EnhancedPMRService.__new__(EnhancedPMRService)
+    project_data = {"current_budget": 1000000, "actual_cost": 800000, "financial_history": []}
+
+    pooled = run(service._simulate_budget_completion(project_data, 5000, random_seed=11))
+    with patch.object(enhanced_pmr_service, "SIMULATION_WORKERS", 0), \
+            patch.object(enhanced_pmr_service, "_simulation_pool", None):
+        inline = run(service._simulate_budget_completion(project_data, 5000, random_seed=11))
+
+    assert pooled == inline
+    budget = run(service._run_budget_simulation(None, project_data, 5000, random_seed=11))
+    assert budget == service._format_budget_percentiles(pooled)
+
+
+def test_monte_carlo_section_runs_kernels_in_the_pool():
+    service = EnhancedPMRService.__new__(EnhancedPMRService)
+    kernels = []
+
+    async def project_data(project_id):
+        return {"current_budget": 1000000, "actual_cost": 800000}
+
+    async def run_kernel(kernel, *args):
+        kernels.append(kernel)
+        return kernel(*args)
+
+    service._get_project_data_for_monte_carlo = project_data
+    service._run_simulation_kernel = run_kernel
+
+    results = run(service._run_monte_carlo_analysis(uuid4(), iterations=2000, random_seed=3))
+
+    assert results.analysis_type != "error"
+    assert set(kernels) == {
+        enhanced_pmr_service._budget_completion_percentiles,
+        enhanced_pmr_service._schedule_variance_percentiles
+    }
+
+
+def test_failed_generation_discards_the_stored_report():
+    events = []
+    service = make_service(events)
+
+    async def failing_summary(report, project_id):
+        raise RuntimeError("summary failed")
+
+    service._generate_executive_summary = failing_summary
+
+    with pytest.raises(RuntimeError):
+        run(service.generate_enhanced_pmr(make_request(), uuid4()))
+
+    report_id = next(e["report_id"] for e in events if e["type"] == "section_ready")
+    assert service.supabase.table.return_value.delete.call_count == 4
+    eq_calls = service.supabase.table.return_value.delete.return_value.eq.call_args_list
+    assert [c.args for c in eq_calls] == [("report_id", report_id)] * 3 + [("id", report_id)]
+    assert events[-1] == {"type": "report_failed", "report_id": report_id, "timestamp": events[-1]["timestamp"]}
+    assert not any(e["type"] == "report_ready" for e in events)
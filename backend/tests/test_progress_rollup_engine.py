@@ -0,0 +1,259 @@
+"""
+Unit tests for the in-memory progress rollup engine.
+
+Tests that task and WBS progress roll up through the whole hierarchy with the
+same rules as the previous per-parent recursion, that only changed ancestors
+are returned, and that bulk progress syncs and schedule recalculation use a
+constant number of database calls.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import numpy as np
+
+from services.progress_rollup_engine import ProgressRollupEngine
+from services.schedule_manager import ScheduleManager
+from services.wbs_manager import WBSManager
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def random_task_tree(n_tasks, seed=11):
+    """Random forest of tasks in one schedule; parents always precede children."""
+    rng = np.random.default_rng(seed)
+    tasks = []
+    for i in range(n_tasks):
+        parent = task_id(rng.integers(0, i)) if i and rng.random() < 0.9 else None
+        tasks.append({
+            "id": task_id(i),
+            "schedule_id": "s1",
+            "parent_task_id": parent,
+            "wbs_code": f"1.{i}",
+            "name": f"Task {i}",
+            "planned_start_date": "2024-01-01",
+            "planned_end_date": "2024-01-10",
+            "duration_days": 10,
+            "progress_percentage": int(rng.integers(0, 101)),
+            "planned_effort_hours": float(rng.integers(0, 80)) or None,
+            "status": "in_progress",
+            "is_critical": False,
+            "total_float_days": 0,
+            "free_float_days": 0,
+            "created_by": str(UUID(int=0)),
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z"
+        })
+    return tasks
+
+
+def task_id(i):
+    return str(UUID(int=int(i) + 1))
+
+
+def recursive_task_rollup(tasks, parent_id):
+    """Reference: the previous per-parent recursive effort-weighted rollup."""
+    by_id = {t["id"]: t for t in tasks}
+    while parent_id:
+        children = [t for t in tasks if t["parent_task_id"] == parent_id]
+        parent = by_id[parent_id]
+        if children:
+            total = sum(c["planned_effort_hours"] or 1 for c in children)
+            weighted = sum(c["progress_percentage"] * (c["planned_effort_hours"] or 1) for c in children)
+            parent["progress_percentage"] = int(round(weighted / total, 2))
+        else:
+            parent["progress_percentage"] = 0
+        if parent["progress_percentage"] == 100:
+            parent["status"] = "completed"
+        elif parent["progress_percentage"] > 0:
+            parent["status"] = "in_progress"
+        parent_id = parent["parent_task_id"]
+
+
+class FakeTable:
+    """Records calls against one table and returns canned rows."""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.filters = {}
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.filters[column] = set(values)
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = {value}
+        return self
+
+    def update(self, data):
+        self.db.row_updates.append(data)
+        return self
+
+    def execute(self):
+        self.db.calls += 1
+        rows = [
+            row for row in self.db.rows.get(self.name, [])
+            if all(row.get(column) in values for column, values in self.filters.items())
+        ]
+        return MagicMock(data=rows)
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+        self.rpc_calls = []
+        self.row_updates = []
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+        result = MagicMock()
+
+        def execute():
+            self.calls += 1
+            return MagicMock(data=len(params["updates"]))
+
+        result.execute.side_effect = execute
+        return result
+
+
+def make_manager(cls, rows):
+    manager = cls.__new__(cls)
+    manager.db = FakeDatabase(rows)
+    return manager
+
+
+def test_task_rollup_matches_recursive_rule():
+    tasks = random_task_tree(300)
+    expected = [dict(t) for t in tasks]
+    engine = ProgressRollupEngine.for_tasks(tasks)
+
+    changes = {task_id(250): 100, task_id(120): 0, task_id(299): 37}
+    result = engine.apply(changes)
+
+    by_id = {t["id"]: t for t in expected}
+    for changed_id, progress in changes.items():
+        by_id[changed_id]["progress_percentage"] = progress
+        recursive_task_rollup(expected, by_id[changed_id]["parent_task_id"])
+
+    for task in expected:
+        if task["id"] in changes:
+            continue
+        original = next(t for t in tasks if t["id"] == task["id"])
+        if task["progress_percentage"] != original["progress_percentage"] or task["status"] != original["status"]:
+            assert result[task["id"]] == {
+                "progress_percentage": task["progress_percentage"],
+                "status": task["status"]
+            }
+        else:
+            assert task["id"] not in result
+
+
+def test_wbs_rollup_uses_simple_average():
+    engine = ProgressRollupEngine.for_wbs([
+        {"id": "root", "parent_element_id": None, "progress_percentage": 0},
+        {"id": "a", "parent_element_id": "root", "progress_percentage": 0},
+        {"id": "b", "parent_element_id": "root", "progress_percentage": 50},
+        {"id": "a1", "parent_element_id": "a", "progress_percentage": 0},
+        {"id": "a2", "parent_element_id": "a", "progress_percentage": 0}
+    ])
+
+    result = engine.apply({"a1": 100, "a2": 45})
+
+    assert result == {"a": {"progress_percentage": 72}, "root": {"progress_percentage": 61}}
+
+
+def test_unchanged_ancestors_are_not_written():
+    engine = ProgressRollupEngine.for_tasks([
+        {"id": "p", "parent_task_id": None, "progress_percentage": 50, "status": "in_progress"},
+        {"id": "c1", "parent_task_id": "p", "progress_percentage": 40, "status": "in_progress"},
+        {"id": "c2", "parent_task_id": "p", "progress_percentage": 60, "status": "in_progress"}
+    ])
+
+    assert engine.apply({"c1": 60, "c2": 40}) == {}
+    assert engine.apply({"c1": 100, "c2": 100}) == {
+        "p": {"progress_percentage": 100, "status": "completed"}
+    }
+
+
+def test_cyclic_parents_do_not_loop():
+    engine = ProgressRollupEngine.for_wbs([
+        {"id": "a", "parent_element_id": "b", "progress_percentage": 0},
+        {"id": "b", "parent_element_id": "a", "progress_percentage": 0}
+    ])
+
+    assert engine.apply({"a": 80}) == {"b": {"progress_percentage": 80}}
+
+
+def test_bulk_progress_sync_uses_constant_database_calls():
+    tasks = random_task_tree(2000)
+    manager = make_manager(ScheduleManager, {"tasks": tasks})
+    leaves = [t for t in tasks if not any(c["parent_task_id"] == t["id"] for c in tasks)]
+    updates = [
+        {"task_id": t["id"], "progress_percentage": 100, "status": "completed"}
+        for t in leaves
+    ]
+    updates.append({"task_id": task_id(5000), "progress_percentage": 10, "status": "in_progress"})
+
+    result = run(manager.bulk_update_task_progress(updates, None))
+
+    assert result["successful_updates"] == len(leaves)
+    assert result["failed_updates"] == 1
+    # Load changed tasks, load the task tree, one bulk write
+    assert manager.db.calls == 3
+    assert len(manager.db.rpc_calls) == 1
+
+    name, params = manager.db.rpc_calls[0]
+    written = {row["id"]: row for row in params["updates"]}
+    assert name == "bulk_update_task_progress"
+    # All leaves complete: every task in the schedule ends completed at 100%
+    assert set(written) == {t["id"] for t in tasks}
+    assert all(row["progress_percentage"] == 100 and row["status"] == "completed" for row in written.values())
+
+
+def test_recalculate_all_parent_progress_writes_changed_parents_once():
+    tasks = [
+        {"id": "p", "schedule_id": "s1", "parent_task_id": None, "progress_percentage": 0,
+         "planned_effort_hours": 10, "status": "not_started"},
+        {"id": "c1", "schedule_id": "s1", "parent_task_id": "p", "progress_percentage": 100,
+         "planned_effort_hours": 30, "status": "completed"},
+        {"id": "c2", "schedule_id": "s1", "parent_task_id": "p", "progress_percentage": 0,
+         "planned_effort_hours": 10, "status": "not_started"},
+        {"id": "q", "schedule_id": "s1", "parent_task_id": None, "progress_percentage": 100,
+         "planned_effort_hours": 10, "status": "completed"},
+        {"id": "q1", "schedule_id": "s1", "parent_task_id": "q", "progress_percentage": 100,
+         "planned_effort_hours": 10, "status": "completed"}
+    ]
+    manager = make_manager(ScheduleManager, {"tasks": tasks})
+
+    result = run(manager.recalculate_all_parent_progress("s1"))
+
+    assert result == {"updated_tasks": 1, "total_parents": 2, "errors": []}
+    assert manager.db.calls == 2
+    assert manager.db.rpc_calls[0][1]["updates"] == [
+        {"id": "p", "progress_percentage": 75, "status": "in_progress"}
+    ]
+
+
+def test_failed_bulk_write_falls_back_to_row_updates():
+    elements = [
+        {"id": "root", "schedule_id": "s1", "parent_element_id": None, "progress_percentage": 0},
+        {"id": "a", "schedule_id": "s1", "parent_element_id": "root", "progress_percentage": 0},
+        {"id": "a1", "schedule_id": "s1", "parent_element_id": "a", "progress_percentage": 60}
+    ]
+    manager = make_manager(WBSManager, {"wbs_elements": elements})
+    manager.db.rpc = MagicMock(side_effect=Exception("function does not exist"))
+
+    run(manager._update_parent_wbs_progress_rollup("a", "s1"))
+
+    assert [u["progress_percentage"] for u in manager.db.row_updates] == [60, 60]
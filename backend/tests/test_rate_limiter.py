@@ -0,0 +1,132 @@
+"""
+Unit tests for the sliding-window-counter rate limiter.
+
+Tests the weighted window arithmetic and retry times, that in-memory state
+stays O(1) per key and idle keys are evicted, that checks are atomic under
+concurrent threads, that the Redis backend runs one script per check and
+maps its reply, and that backend errors fail open.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+import performance_optimization
+from services.rate_limiter import (
+    API_KEY_PREFIX,
+    MemoryRateLimitBackend,
+    RateLimiter,
+    RedisRateLimitBackend,
+    sliding_window
+)
+
+
+@pytest.mark.parametrize("previous,current,elapsed,expected", [
+    (0, 9, 0, (True, 9.0, 0.0)),
+    (0, 10, 10, (False, 10.0, 50.0 + 6.0)),
+    (10, 0, 30, (True, 5.0, 0.0)),
+    (10, 5, 30, (False, 10.0, 6.0)),
+    (20, 0, 59, (True, 20 / 60, 0.0))
+])
+def test_sliding_window_weights_previous_window(previous, current, elapsed, expected):
+    allowed, count, retry_after = sliding_window(previous, current, elapsed, 60, 10, 1)
+
+    assert allowed == expected[0]
+    assert count == pytest.approx(expected[1])
+    assert retry_after == pytest.approx(expected[2])
+
+
+def test_denied_request_is_admitted_after_retry_after():
+    clock = Mock(return_value=6000.0)
+    limiter = RateLimiter(10, 60, backend=MemoryRateLimitBackend(clock=clock))
+
+    for _ in range(10):
+        assert limiter.hit("1.2.3.4", "share").allowed
+    denied = limiter.hit("1.2.3.4", "share")
+    assert not denied.allowed
+
+    clock.return_value = 6000.0 + denied.retry_after - 0.5
+    assert not limiter.peek("1.2.3.4", "share").allowed
+    clock.return_value = 6000.0 + denied.retry_after + 0.01
+    assert limiter.hit("1.2.3.4", "share").allowed
+
+
+def test_memory_backend_keeps_constant_state_and_evicts_idle_keys():
+    clock = Mock(return_value=0.0)
+    backend = MemoryRateLimitBackend(clock=clock)
+    limiter = RateLimiter(10, 60, backend=backend)
+
+    for _ in range(1000):
+        limiter.hit("1.2.3.4", "share")
+    assert len(backend) == 1
+    assert backend._entries["ratelimit:1.2.3.4:share"] == [0.0, 10, 0, 120.0]
+
+    for i in range(500):
+        limiter.hit(f"10.0.{i // 256}.{i % 256}", "share")
+    assert len(backend) == 501
+
+    # Idle for two windows: evicted by the next check
+    clock.return_value = 121.0
+    limiter.hit("1.2.3.4", "other")
+    assert len(backend) == 1
+
+
+def test_peek_does_not_count_and_reset_is_scoped_to_prefix():
+    backend = MemoryRateLimitBackend()
+    guests = RateLimiter(2, 60, backend=backend, key_prefix="ratelimit:guest")
+    api = RateLimiter(2, 60, backend=backend, key_prefix="ratelimit:api")
+
+    guests.hit("ip", "share")
+    api.hit("ip")
+    for _ in range(5):
+        assert guests.peek("ip", "share").count == 1
+
+    guests.reset()
+
+    assert guests.peek("ip", "share").count == 0
+    assert api.peek("ip").count == 1
+
+
+def test_concurrent_checks_admit_exactly_the_limit():
+    limiter = RateLimiter(100, 60)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: limiter.hit("ip", "share").allowed, range(1000)))
+
+    assert sum(results) == 100
+
+
+def test_redis_backend_runs_one_script_per_check():
+    client = MagicMock()
+    script = client.register_script.return_value
+    script.return_value = [0, 10, 5, b"30.0"]
+    limiter = RateLimiter(10, 60, backend=RedisRateLimitBackend(client), key_prefix="ratelimit:guest")
+
+    result = limiter.hit("1.2.3.4", "share")
+
+    script.assert_called_once_with(keys=["ratelimit:guest:1.2.3.4:share"], args=[10, 60, 1, 1])
+    assert not result.allowed
+    assert result.count == pytest.approx(10.0)
+    assert result.retry_after == pytest.approx(6.0)
+    assert result.window_age == pytest.approx(90.0)
+
+    script.return_value = [1, 0, 3, b"12.5"]
+    result = limiter.peek("1.2.3.4", "share")
+    assert script.call_args.kwargs["args"] == [10, 60, 1, 0]
+    assert result.allowed and result.remaining == 7
+
+
+def test_backend_errors_fail_open():
+    backend = Mock()
+    backend.hit.side_effect = ConnectionError("redis down")
+    limiter = RateLimiter(1, 60, backend=backend)
+
+    assert all(limiter.hit("ip").allowed for _ in range(3))
+
+
+def test_api_limiter_uses_sliding_window_counter():
+    limiter = performance_optimization.limiter
+
+    assert type(limiter._limiter).__name__ == "SlidingWindowCounterRateLimiter"
+    assert limiter._key_prefix == API_KEY_PREFIX
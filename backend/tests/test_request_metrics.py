@@ -0,0 +1,248 @@
+"""
+Unit tests for the request metrics core.
+
+Tests HDR histogram precision and merging, lock-free recording from many
+threads, that requests are recorded by route template, bucketed rates,
+cross-worker aggregation through Redis snapshots, and that the Prometheus
+and OpenMetrics expositions parse.
+"""
+
+import random
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client.openmetrics.parser import text_string_to_metric_families as parse_openmetrics
+from prometheus_client.parser import text_string_to_metric_families as parse_prometheus
+
+from middleware.performance_tracker import PerformanceMiddleware, PerformanceTracker
+from performance_optimization import PerformanceMonitor
+from services.request_metrics import (
+    UNMATCHED_ROUTE,
+    MetricsPublisher,
+    MetricsSnapshot,
+    RequestMetrics,
+    render_prometheus
+)
+from utils.hdr_histogram import HdrHistogram, bucket_bounds, bucket_index
+
+
+def test_buckets_cover_values_with_one_percent_precision():
+    for value in list(range(5000)) + [random.randrange(1, 10 ** 10) for _ in range(5000)]:
+        lower, upper = bucket_bounds(bucket_index(value))
+        assert lower <= value <= upper
+        assert upper - lower <= max(value, 1) / 128
+
+
+def test_percentiles_match_exact_values():
+    rng = random.Random(7)
+    values = [int(rng.lognormvariate(10, 1.2)) for _ in range(20000)]
+    histogram = HdrHistogram()
+    for value in values:
+        histogram.record(value)
+
+    ordered = sorted(values)
+    for percentile, value in histogram.percentiles((50, 95, 99, 99.9)).items():
+        exact = ordered[int(len(ordered) * percentile / 100 + 0.5) - 1]
+        assert value == pytest.approx(exact, rel=0.01)
+    assert histogram.min == ordered[0] and histogram.max == ordered[-1]
+    assert histogram.mean == pytest.approx(sum(values) / len(values))
+    assert len(histogram.counts) < 3000
+
+
+def test_merged_histograms_equal_one_histogram():
+    values = [random.randrange(0, 5_000_000) for _ in range(3000)]
+    whole, parts = HdrHistogram(), [HdrHistogram() for _ in range(3)]
+    for i, value in enumerate(values):
+        whole.record(value)
+        parts[i % 3].record(value)
+
+    merged = HdrHistogram.from_dict(parts[0].to_dict()).merge(parts[1]).merge(parts[2])
+
+    assert merged.to_dict() == whole.to_dict()
+
+
+def test_concurrent_recording_loses_no_requests():
+    metrics = RequestMetrics()
+
+    def worker():
+        for i in range(5000):
+            metrics.record("GET", "/api/projects/{project_id}", 500 if i % 10 == 0 else 200, 0.002)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = metrics.snapshot()
+    totals = snapshot.totals("GET", "/api/projects/{project_id}")
+    assert snapshot.total_requests == 40000
+    assert totals.errors == 4000
+    assert totals.status == {"2xx": 36000, "5xx": 4000}
+
+
+def test_record_overhead_is_microseconds():
+    metrics = RequestMetrics()
+    start = time.perf_counter()
+    for i in range(100000):
+        metrics.record("GET", "/api/projects", 200, 0.001 + i % 100 / 1000)
+    assert (time.perf_counter() - start) / 100000 < 20e-6
+
+
+def test_requests_are_recorded_by_route_template():
+    tracker = PerformanceTracker(metrics=RequestMetrics())
+    app = FastAPI()
+    app.add_middleware(PerformanceMiddleware, tracker=tracker)
+
+    @app.get("/api/projects/{project_id}")
+    async def get_project(project_id: str):
+        return {"id": project_id}
+
+    client = TestClient(app)
+    for project_id in range(25):
+        assert client.get(f"/api/projects/{project_id}").status_code == 200
+    assert client.get("/api/unknown/1").status_code == 404
+    client.get("/health")
+
+    stats = tracker.get_stats()["endpoint_stats"]
+    assert set(stats) == {"GET /api/projects/{project_id}", f"GET {UNMATCHED_ROUTE}"}
+    project_stats = stats["GET /api/projects/{project_id}"]
+    assert project_stats["total_requests"] == 25
+    assert project_stats["min_duration"] <= project_stats["p50_duration"] <= project_stats["p999_duration"]
+    assert project_stats["p999_duration"] <= project_stats["max_duration"]
+    assert stats[f"GET {UNMATCHED_ROUTE}"]["error_rate"] == 100.0
+
+
+def test_rates_come_from_time_buckets():
+    clock = Mock(return_value=1000.0)
+    metrics = RequestMetrics(bucket_seconds=10, rate_buckets=30, clock=clock)
+
+    for second in range(0, 120):
+        clock.return_value = 1000.0 + second
+        for _ in range(2):
+            metrics.record("GET", "/api/risks", 200, 0.01)
+        if second % 4 == 0:
+            metrics.record("GET", "/api/risks", 503, 0.01)
+
+    snapshot = metrics.snapshot()
+    totals = snapshot.totals("GET", "/api/risks")
+    requests_per_second, errors_per_second = snapshot.rate(totals, now=1120.0)
+    assert requests_per_second == pytest.approx(2.25, rel=0.05)
+    assert errors_per_second == pytest.approx(0.25, rel=0.1)
+    # Old buckets are reused rather than kept
+    assert len(totals.rates) <= 30
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def scan_iter(self, match, count=None):
+        prefix = match.rstrip("*")
+        return [key.encode() for key in list(self.values) if key.startswith(prefix)]
+
+
+def test_workers_aggregate_through_published_snapshots():
+    redis = FakeRedis()
+    workers = []
+    for worker in range(3):
+        metrics = RequestMetrics()
+        for i in range(100):
+            metrics.record("POST", "/api/reports", 200, (worker + 1) * 0.1 + i / 10000)
+        publisher = MetricsPublisher(metrics, redis, interval=15)
+        publisher.worker = f"worker-{worker}"
+        publisher.key = f"{publisher.key_prefix}:{publisher.worker}"
+        publisher.publish()
+        workers.append((metrics, publisher))
+
+    metrics, publisher = workers[0]
+    metrics.record("POST", "/api/reports", 500, 0.05)
+    snapshot = publisher.cluster_snapshot()
+
+    assert sorted(snapshot.workers) == ["worker-0", "worker-1", "worker-2"]
+    summary = snapshot.summary()["POST /api/reports"]
+    assert summary["count"] == 301 and summary["errors"] == 1
+    assert summary["min"] == pytest.approx(0.05) and summary["max"] == pytest.approx(0.3099, rel=0.01)
+    assert 0.2 <= summary["p50"] <= 0.21
+
+    publisher.stop()
+    assert "metrics:worker:worker-0" not in redis.values
+
+
+def make_snapshot():
+    metrics = RequestMetrics()
+    for i in range(200):
+        metrics.record("GET", '/api/projects/{project_id}', 200 if i % 20 else 404, i / 1000)
+    metrics.record("DELETE", "/api/projects/{project_id}", 204, 0.02)
+    return metrics.snapshot()
+
+
+def test_prometheus_exposition_parses():
+    snapshot = make_snapshot()
+    families = {family.name: family for family in parse_prometheus(render_prometheus(snapshot))}
+
+    counts = {
+        (s.labels["method"], s.labels["status"]): s.value
+        for s in families["ppm_http_requests"].samples
+    }
+    assert counts == {("GET", "2xx"): 190, ("GET", "4xx"): 10, ("DELETE", "2xx"): 1}
+
+    buckets = [
+        s for s in families["ppm_http_request_duration_seconds"].samples
+        if s.name.endswith("_bucket") and s.labels["method"] == "GET"
+    ]
+    values = [s.value for s in buckets]
+    assert values == sorted(values) and values[-1] == 200
+    assert buckets[-1].labels["le"] == "+Inf"
+
+    quantiles = {
+        s.labels["quantile"]: s.value
+        for s in families["ppm_http_request_latency_seconds"].samples
+        if "quantile" in s.labels and s.labels["method"] == "GET"
+    }
+    assert quantiles["0.99"] == pytest.approx(0.198, rel=0.01)
+    assert set(quantiles) == {"0.5", "0.95", "0.99", "0.999"}
+
+
+def test_openmetrics_exposition_parses():
+    text = render_prometheus(make_snapshot(), openmetrics=True) + "# EOF\n"
+
+    families = {family.name: family for family in parse_openmetrics(text)}
+
+    assert families["ppm_http_requests"].type == "counter"
+    assert families["ppm_http_request_latency_seconds"].type == "summary"
+
+
+def test_snapshot_round_trips_through_json():
+    snapshot = make_snapshot()
+
+    restored = MetricsSnapshot.from_dict(snapshot.to_dict())
+
+    assert restored.summary(now=0) == snapshot.summary(now=0)
+
+
+def test_performance_monitor_reads_the_shared_metrics():
+    metrics = RequestMetrics()
+    monitor = PerformanceMonitor(metrics)
+    assert monitor.get_performance_summary() == {"message": "No performance data available"}
+
+    for i in range(1, 101):
+        metrics.record("GET", "/api/portfolios", 200, i / 1000)
+
+    summary = monitor.get_performance_summary()
+    assert summary["total_requests"] == 100
+    assert summary["p95_response_time_ms"] == pytest.approx(95, rel=0.01)
+    assert "GET /api/portfolios" in summary["endpoint_stats"]
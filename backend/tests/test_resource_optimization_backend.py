@@ -0,0 +1,185 @@
+"""
+Unit tests for the sparse resource optimization backend.
+
+Tests that skill matching prunes the model to matched pairs, that the sparse
+model reaches the same optimum as the dense PuLP formulation, that
+re-optimization warm-starts from a still-optimal previous solution, and that
+solving runs in a worker process under a time budget.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pulp
+import pytest
+
+from services import resource_optimization_backend
+from services.resource_optimization_backend import (
+    ResourceOptimizationBackend, build_allocation_problem, solve_allocation_problem
+)
+
+SKILLS = ["python", "java", "sql", "aws", "docker", "react", "go", "excel"]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def random_organization(n_resources, n_projects, seed=3):
+    rng = np.random.default_rng(seed)
+    resources = [{
+        "id": f"r{i}",
+        "name": f"Resource {i}",
+        "skills": list(rng.choice(SKILLS, 3, replace=False)),
+        "hourly_rate": float(rng.integers(50, 200)),
+        "available_hours": 160
+    } for i in range(n_resources)]
+    projects = [{
+        "id": f"p{i}",
+        "name": f"Project {i}",
+        "required_skills": list(rng.choice(SKILLS, 1)),
+        "required_hours": float(rng.integers(20, 120))
+    } for i in range(n_projects)]
+    return resources, projects
+
+
+def dense_pulp_objective(resources, projects):
+    """Reference: one PuLP variable per (resource, project) pair."""
+    model = pulp.LpProblem("Reference", pulp.LpMinimize)
+    x = {
+        (r["id"], p["id"]): pulp.LpVariable(f"x_{r['id']}_{p['id']}", lowBound=0)
+        for r in resources for p in projects
+    }
+    model += pulp.lpSum(r["hourly_rate"] * x[(r["id"], p["id"])] for r in resources for p in projects)
+    for r in resources:
+        model += pulp.lpSum(x[(r["id"], p["id"])] for p in projects) <= r["available_hours"]
+    for p in projects:
+        model += pulp.lpSum(x[(r["id"], p["id"])] for r in resources) >= p["required_hours"]
+        for r in resources:
+            if not set(p["required_skills"]) <= set(r["skills"]):
+                model += x[(r["id"], p["id"])] == 0
+    model.solve(pulp.PULP_CBC_CMD(msg=0))
+    return pulp.LpStatus[model.status], pulp.value(model.objective)
+
+
+def test_skill_index_prunes_unmatched_pairs():
+    resources = [
+        {"id": "r1", "skills": ["Python", "SQL"], "hourly_rate": 100},
+        {"id": "r2", "skills": ["java"], "hourly_rate": 80},
+        {"id": "r3", "skills": ["python"], "hourly_rate": 90}
+    ]
+    projects = [
+        {"id": "p1", "required_skills": ["python", "sql"], "required_hours": 10},
+        {"id": "p2", "required_skills": ["python"], "required_hours": 10},
+        {"id": "p3", "required_skills": ["rust"], "required_hours": 10}
+    ]
+
+    problem = build_allocation_problem(resources, projects)
+
+    pairs = set(problem.pair_keys())
+    assert pairs == {("r1", "p1"), ("r1", "p2"), ("r3", "p2")}
+    assert problem.n_pairs == 9
+    assert problem.unstaffable_projects == ("p3",)
+    assert problem.constraint_matrix().nnz == 2 * len(pairs)
+
+    # Partial skill coverage admits more pairs, scored by coverage
+    partial = build_allocation_problem(resources, projects, {"min_skill_match": 0.5})
+    assert ("r3", "p1") in set(partial.pair_keys())
+    assert sorted(partial.skill_scores) == [0.5, 1.0, 1.0, 1.0]
+
+
+def test_sparse_model_matches_dense_formulation():
+    resources, projects = random_organization(12, 6)
+
+    solution = solve_allocation_problem(build_allocation_problem(resources, projects))
+    status, objective = dense_pulp_objective(resources, projects)
+
+    assert solution.status == status == "Optimal"
+    assert solution.objective == pytest.approx(objective, rel=1e-6)
+
+
+def test_unstaffable_project_is_infeasible_without_solving():
+    resources, projects = random_organization(4, 2)
+    projects.append({"id": "px", "required_skills": ["cobol"], "required_hours": 40})
+
+    with patch.object(resource_optimization_backend, "linprog") as solver:
+        solution = solve_allocation_problem(build_allocation_problem(resources, projects))
+
+    assert solution.status == "Infeasible"
+    solver.assert_not_called()
+
+
+def test_reoptimization_warm_starts_from_previous_solution():
+    resources, projects = random_organization(20, 8)
+    backend = ResourceOptimizationBackend()
+
+    problem, first = run(backend.optimize(resources, projects, warm_start_key="org"))
+    assert first.status == "Optimal" and not first.warm_started
+
+    # A more expensive unused resource does not change the optimum
+    used = set(problem.pair_resource[first.allocations > 0])
+    unused = next(i for i in range(len(resources)) if i not in used)
+    resources[unused]["hourly_rate"] += 50
+    _, second = run(backend.optimize(resources, projects, warm_start_key="org"))
+    assert second.warm_started
+    assert second.objective == pytest.approx(first.objective)
+
+    # A cheaper resource does: the model is solved again
+    resources[unused]["hourly_rate"] = 1
+    problem, third = run(backend.optimize(resources, projects, warm_start_key="org"))
+    assert not third.warm_started
+    assert third.objective == pytest.approx(solve_allocation_problem(problem).objective)
+    assert third.objective < first.objective
+
+    # Other organizations never reuse the solution
+    _, other = run(backend.optimize(resources, projects, warm_start_key="other-org"))
+    assert not other.warm_started
+
+
+def test_worker_process_matches_inline_solve():
+    resources, projects = random_organization(30, 10)
+    backend = ResourceOptimizationBackend()
+
+    _, pooled = run(backend.optimize(resources, projects))
+    with patch.object(resource_optimization_backend, "OPTIMIZER_WORKERS", 0), \
+            patch.object(resource_optimization_backend, "_optimizer_pool", None):
+        _, inline = run(backend.optimize(resources, projects))
+
+    assert np.allclose(pooled.allocations, inline.allocations)
+
+
+def test_time_budget_is_enforced():
+    resources, projects = random_organization(4, 2)
+
+    def slow_solve(problem, time_limit):
+        time.sleep(1.0)
+
+    with patch.object(resource_optimization_backend, "OPTIMIZER_WORKERS", 0), \
+            patch.object(resource_optimization_backend, "_optimizer_pool", None), \
+            patch.object(resource_optimization_backend, "WORKER_TIMEOUT_MARGIN_SECONDS", 0), \
+            patch.object(resource_optimization_backend, "solve_allocation_problem", slow_solve):
+        async def optimize():
+            start = time.time()
+            _, solution = await ResourceOptimizationBackend().optimize(
+                resources, projects, {"time_limit_seconds": 0.1}
+            )
+            return solution, time.time() - start
+
+        solution, elapsed = run(optimize())
+
+    assert solution.status == "Not Solved"
+    assert elapsed < 0.5
+
+
+def test_large_organization_builds_sparse_model_quickly():
+    resources, projects = random_organization(2000, 500)
+
+    start = time.time()
+    problem = build_allocation_problem(resources, projects)
+    elapsed = time.time() - start
+
+    assert problem.n_pairs == 1_000_000
+    assert problem.n_variables < problem.n_pairs / 2
+    assert elapsed < 2.0
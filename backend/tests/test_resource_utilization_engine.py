@@ -0,0 +1,186 @@
+"""
+Unit tests for the resource utilization engine.
+
+Tests that the resource x day load matrix reports overallocation intervals,
+peak loads and double bookings for all resources at once, that it matches the
+pairwise double booking check, that single assignment changes update it
+incrementally, and that leveling suggestions use it.
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from services.resource_assignment_service import ResourceAssignmentService
+from services.resource_utilization_engine import ResourceUtilizationEngine
+
+BASE = date(2024, 1, 1)
+
+
+def assignment(assignment_id, resource_id, start, end, allocation, task_id=None):
+    return {
+        "id": assignment_id,
+        "task_id": task_id or f"task-{assignment_id}",
+        "resource_id": resource_id,
+        "allocation_percentage": allocation,
+        "assignment_start_date": (BASE + timedelta(days=start)).isoformat(),
+        "assignment_end_date": (BASE + timedelta(days=end)).isoformat(),
+        "tasks": {"id": task_id or f"task-{assignment_id}", "name": f"Task {assignment_id}"},
+        "resources": {"id": resource_id, "name": f"Resource {resource_id}"}
+    }
+
+
+def pairwise_double_bookings(assignments):
+    """Reference pairwise check, as previously done per resource."""
+    pairs = set()
+    for i, a in enumerate(assignments):
+        for b in assignments[i + 1:]:
+            if a["resource_id"] != b["resource_id"]:
+                continue
+            if a["assignment_start_date"] <= b["assignment_end_date"] and \
+                    b["assignment_start_date"] <= a["assignment_end_date"] and \
+                    a["allocation_percentage"] + b["allocation_percentage"] > 100:
+                pairs.add(frozenset((a["id"], b["id"])))
+    return pairs
+
+
+def random_program(n_assignments, n_resources, seed=7):
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, 365, n_assignments)
+    durations = rng.integers(1, 30, n_assignments)
+    allocations = rng.choice([25, 50, 75, 100], n_assignments)
+    resources = rng.integers(0, n_resources, n_assignments)
+    return [
+        assignment(f"a{i}", f"r{resources[i]}", int(starts[i]), int(starts[i] + durations[i]),
+                   int(allocations[i]))
+        for i in range(n_assignments)
+    ]
+
+
+def test_overallocation_is_reported_per_interval_with_peaks():
+    engine = ResourceUtilizationEngine([
+        assignment("a1", "r1", 0, 9, 60),
+        assignment("a2", "r1", 5, 14, 60),
+        assignment("a3", "r1", 20, 24, 80),
+        assignment("a4", "r1", 22, 23, 40),
+        assignment("a5", "r2", 0, 30, 100)
+    ])
+
+    intervals = engine.overallocation_intervals()
+    assert [(i["start_date"], i["end_date"], i["days"], i["peak_allocation"]) for i in intervals] == [
+        ("2024-01-06", "2024-01-10", 5, 120),
+        ("2024-01-23", "2024-01-24", 2, 120)
+    ]
+    assert intervals[0]["assignment_ids"] == ["a1", "a2"]
+
+    peaks = engine.peak_loads()
+    assert peaks["r1"] == {"peak_allocation": 120, "peak_date": "2024-01-06"}
+    assert peaks["r2"]["peak_allocation"] == 100
+
+    conflicts = engine.detect_conflicts()
+    overallocation = [c for c in conflicts if c["type"] == "overallocation"]
+    assert len(overallocation) == 1
+    assert overallocation[0]["resource_name"] == "Resource r1"
+    assert overallocation[0]["total_allocation"] == 240
+    assert overallocation[0]["peak_allocation"] == 120
+    assert overallocation[0]["overallocated_days"] == 7
+    assert overallocation[0]["affected_tasks"] == ["task-a1", "task-a2", "task-a3", "task-a4"]
+
+
+def test_sequential_assignments_have_no_overallocation_intervals():
+    # 180% in total, but never on the same day
+    engine = ResourceUtilizationEngine([
+        assignment("a1", "r1", 0, 4, 90),
+        assignment("a2", "r1", 5, 9, 90)
+    ])
+
+    conflicts = engine.detect_conflicts()
+
+    assert [c["type"] for c in conflicts] == ["overallocation"]
+    assert conflicts[0]["total_allocation"] == 180
+    assert conflicts[0]["peak_allocation"] == 90
+    assert conflicts[0]["overallocation_intervals"] == []
+
+
+def test_double_bookings_match_pairwise_check():
+    assignments = random_program(600, 20)
+    engine = ResourceUtilizationEngine(assignments)
+
+    bookings = [c for c in engine.detect_conflicts() if c["type"] == "double_booking"]
+    found = {frozenset((c["assignment1_id"], c["assignment2_id"])) for c in bookings}
+
+    assert found == pairwise_double_bookings(assignments)
+    assert len(bookings) == len(found)
+
+
+def test_incremental_updates_match_full_rebuild():
+    assignments = random_program(300, 10)
+    engine = ResourceUtilizationEngine(assignments)
+
+    changed = assignment("a5", "r3", -10, 400, 50)
+    added = assignment("new", "r99", 10, 12, 120)
+    engine.update_assignment(changed)
+    engine.add_assignment(added)
+    assert engine.remove_assignment("a7")
+
+    expected = [a for a in assignments if a["id"] not in ("a5", "a7")] + [changed, added]
+    rebuilt = ResourceUtilizationEngine(expected)
+
+    assert engine.origin == rebuilt.origin
+    for resource_id in rebuilt.resource_ids:
+        assert engine.timeline(resource_id) == rebuilt.timeline(resource_id)
+    assert engine.overallocation_intervals() == rebuilt.overallocation_intervals()
+
+
+def test_earliest_feasible_start_skips_busy_days():
+    engine = ResourceUtilizationEngine([
+        assignment("a1", "r1", 0, 9, 60),
+        assignment("a2", "r1", 5, 7, 60),
+        assignment("a3", "r1", 13, 14, 80)
+    ])
+
+    # a2 (3 days) fits after a1 ends, before a3 starts
+    assert engine.earliest_feasible_start("a2") == date(2024, 1, 11)
+    assert engine.earliest_feasible_start("a2", not_before=date(2024, 1, 13)) == date(2024, 1, 16)
+
+
+def test_leveling_suggests_start_from_load_matrix():
+    service = ResourceAssignmentService.__new__(ResourceAssignmentService)
+    service.db = MagicMock()
+    assignments = [
+        assignment("a1", "r1", 0, 9, 60, task_id="t1"),
+        assignment("a2", "r1", 5, 7, 60, task_id="t2")
+    ]
+    tasks = [
+        {"id": "t1", "name": "Design", "wbs_code": "1.1", "priority": "high"},
+        {"id": "t2", "name": "Review", "wbs_code": "1.2", "priority": "low"}
+    ]
+    service.db.table.return_value.select.return_value.eq.return_value.execute.return_value = \
+        MagicMock(data=tasks)
+    service.db.table.return_value.select.return_value.execute.return_value = \
+        MagicMock(data=assignments)
+
+    result = asyncio.run(service.suggest_resource_leveling(None))
+
+    assert result["conflicts_found"] == 2
+    reschedule = next(s for s in result["suggestions"] if s["type"] == "reschedule_task")
+    action = reschedule["suggested_actions"][0]
+    assert action["task_id"] == "t2"
+    assert action["suggested_start_date"] == "2024-01-11"
+    assert action["suggested_delay_days"] == 5
+
+
+def test_large_program_is_analysed_quickly():
+    assignments = random_program(20000, 500)
+
+    start = time.time()
+    engine = ResourceUtilizationEngine(assignments)
+    conflicts = engine.detect_conflicts()
+    elapsed = time.time() - start
+
+    assert conflicts
+    assert engine.load.shape == (500, engine.n_days)
+    assert elapsed < 5.0
@@ -0,0 +1,195 @@
+"""
+Unit tests for the common-random-numbers sensitivity engine.
+
+Tests the vectorized sampling core, tornado/spider/multi-variable evaluation
+against the shared sample matrix, and the ScenarioGenerator integration.
+"""
+
+import time
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from monte_carlo.engine import MonteCarloEngine, RiskInteractionTracker
+from monte_carlo.models import (
+    Risk, RiskCategory, ImpactType, ProbabilityDistribution, DistributionType,
+    CorrelationMatrix, Scenario
+)
+from monte_carlo.scenario_generator import ScenarioGenerator
+from monte_carlo.sensitivity_engine import SensitivityEngine
+from monte_carlo.vectorized_sampling import (
+    RiskSampleMatrix, transform_uniforms, correlation_adjustment_factors
+)
+
+
+def make_risks(count):
+    """Create cost and schedule risks with triangular impact distributions."""
+    risks = []
+    for i in range(count):
+        impact_type = ImpactType.SCHEDULE if i % 3 == 2 else ImpactType.COST
+        risks.append(Risk(
+            id=f"RISK_{i:03d}",
+            name=f"Risk {i}",
+            category=RiskCategory.COST if impact_type == ImpactType.COST else RiskCategory.SCHEDULE,
+            impact_type=impact_type,
+            probability_distribution=ProbabilityDistribution(
+                distribution_type=DistributionType.TRIANGULAR,
+                parameters={"min": 0.0, "mode": 0.2 + 0.01 * i, "max": 1.0}
+            ),
+            baseline_impact=1000.0 * (i + 1) if impact_type == ImpactType.COST else 5.0 + i
+        ))
+    return risks
+
+
+def make_scenario(risks):
+    return Scenario(id="base", name="Base", description="Base scenario", risks=risks)
+
+
+def test_transform_matches_scipy_inverse_cdfs():
+    """Inverse-CDF transforms agree with scipy's reference distributions."""
+    u = np.linspace(0.001, 0.999, 101)
+
+    triangular = ProbabilityDistribution(
+        DistributionType.TRIANGULAR, {"min": 2.0, "mode": 3.0, "max": 7.0}
+    )
+    expected = stats.triang.ppf(u, c=0.2, loc=2.0, scale=5.0)
+    assert np.allclose(transform_uniforms(triangular, u), expected)
+
+    lognormal = ProbabilityDistribution(
+        DistributionType.LOGNORMAL, {"mu": 0.5, "sigma": 0.3}
+    )
+    expected = stats.lognorm.ppf(u, s=0.3, scale=np.exp(0.5))
+    assert np.allclose(transform_uniforms(lognormal, u), expected)
+
+    bounded = ProbabilityDistribution(
+        DistributionType.NORMAL, {"mean": 0.0, "std": 1.0}, bounds=(-1.0, 1.0)
+    )
+    samples = transform_uniforms(bounded, u)
+    assert samples.min() == -1.0 and samples.max() == 1.0
+
+
+def test_correlation_factors_match_interaction_tracker():
+    """Vectorized adjustment factors reproduce RiskInteractionTracker."""
+    risks = make_risks(4)
+    correlations = CorrelationMatrix(
+        correlations={
+            ("RISK_000", "RISK_001"): 0.8,
+            ("RISK_001", "RISK_002"): -0.5,
+            ("RISK_000", "RISK_003"): 0.05
+        },
+        risk_ids=[r.id for r in risks]
+    )
+    tracker = RiskInteractionTracker(risks, correlations)
+
+    factors = correlation_adjustment_factors(risks, correlations)
+
+    current_impacts = {}
+    for risk, factor in zip(risks, factors):
+        adjusted = tracker.adjust_for_correlations(risk.id, 100.0, current_impacts, correlations)
+        assert adjusted == pytest.approx(100.0 * factor)
+        current_impacts[risk.id] = adjusted
+
+
+def test_baseline_matches_engine_distribution():
+    """The shared sample matrix reproduces the engine's outcome distribution."""
+    risks = make_risks(6)
+    engine_results = MonteCarloEngine().run_simulation(risks, iterations=20000, random_seed=7)
+
+    sensitivity = SensitivityEngine(risks, iterations=20000, random_seed=7)
+    baseline = sensitivity.baseline_summary()
+
+    assert baseline['cost']['mean'] == pytest.approx(np.mean(engine_results.cost_outcomes), rel=0.02)
+    assert baseline['schedule']['mean'] == pytest.approx(np.mean(engine_results.schedule_outcomes), rel=0.02)
+    assert baseline['cost']['p90'] == pytest.approx(np.percentile(engine_results.cost_outcomes, 90), rel=0.03)
+
+
+def test_tornado_equals_reweighted_scenarios():
+    """Scaling a risk's impact is exactly a column reweighting of the shared samples."""
+    risks = make_risks(5)
+    sensitivity = SensitivityEngine(risks, iterations=10000, random_seed=11)
+    tornado = sensitivity.tornado(["RISK_001", "UNKNOWN"], variation_range=0.2)
+
+    assert list(tornado) == ["RISK_001"]
+
+    matrix = sensitivity.sample_matrix
+    weights = matrix.impact_weights(risks)
+    weights[1] *= 1.2
+    expected_high = matrix.evaluate(weights)['cost'][0]
+
+    assert tornado["RISK_001"]['high']['cost']['mean'] == pytest.approx(expected_high.mean())
+    # The high-low swing is exactly 40% of the risk's mean contribution
+    contribution = (matrix.samples[:, 1] * 2000.0).mean()
+    assert tornado["RISK_001"]['cost_swing'] == pytest.approx(0.4 * contribution)
+
+
+def test_common_random_numbers_reduce_scenario_noise():
+    """Scenario deltas are far more stable with shared samples than with independent runs."""
+    risks = make_risks(6)
+    crn_deltas, independent_deltas = [], []
+
+    for seed in range(8):
+        crn = SensitivityEngine(risks, iterations=2000, random_seed=seed)
+        crn_deltas.append(crn.tornado(["RISK_000"])["RISK_000"]['cost_swing'])
+
+        low = RiskSampleMatrix.draw(risks, 2000, random_seed=100 + seed)
+        high = RiskSampleMatrix.draw(risks, 2000, random_seed=200 + seed)
+        low_weights = low.impact_weights(risks)
+        high_weights = high.impact_weights(risks)
+        low_weights[0] *= 0.8
+        high_weights[0] *= 1.2
+        independent_deltas.append(
+            high.evaluate(high_weights)['cost'].mean() - low.evaluate(low_weights)['cost'].mean()
+        )
+
+    assert np.std(crn_deltas) * 10 < np.std(independent_deltas)
+
+
+def test_forty_risk_tornado_runs_within_one_simulation():
+    """An 80-scenario tornado costs less than a single engine simulation."""
+    risks = make_risks(40)
+
+    start = time.time()
+    MonteCarloEngine().run_simulation(risks, iterations=10000, random_seed=3)
+    simulation_time = time.time() - start
+
+    start = time.time()
+    sensitivity = SensitivityEngine(risks, iterations=10000, random_seed=3)
+    tornado = sensitivity.tornado([r.id for r in risks])
+    tornado_time = time.time() - start
+
+    assert len(tornado) == 40
+    assert tornado_time < simulation_time
+
+
+def test_scenario_generator_sensitivity_with_engine():
+    """Engine-backed sensitivity keeps the existing result keys and adds outcomes."""
+    risks = make_risks(6)
+    generator = ScenarioGenerator()
+    scenario = make_scenario(risks)
+    variables = [r.id for r in risks]
+
+    plain = generator.perform_sensitivity_analysis(scenario, variables)
+    assert all('outcomes' not in result for result in plain.values())
+
+    sensitivity = generator.create_sensitivity_engine(scenario, iterations=10000, random_seed=5)
+    results = generator.perform_sensitivity_analysis(scenario, variables, sensitivity_engine=sensitivity)
+    assert set(plain["RISK_000"]) < set(results["RISK_000"])
+
+    tornado = generator.generate_tornado_diagram_data(results)
+    for key in ['variables', 'low_impacts', 'high_impacts', 'ranges', 'baseline_values']:
+        assert len(tornado[key]) == len(variables)
+    assert tornado['cost_swings'] == sorted(tornado['cost_swings'], reverse=True)
+    # The largest cost risk dominates the simulated cost outcome
+    assert tornado['variables'][0] == "RISK_004"
+
+    spider = generator.generate_spider_diagram_data(sensitivity, ["RISK_000", "RISK_002"])
+    assert spider['multipliers'] == [0.6, 0.8, 1.0, 1.2, 1.4]
+    assert spider['series']["RISK_000"]['cost_means'][2] == pytest.approx(spider['baseline_cost_mean'])
+    assert spider['series']["RISK_002"]['schedule_means'] == sorted(spider['series']["RISK_002"]['schedule_means'])
+
+    multi = generator.perform_multi_variable_sensitivity(
+        scenario, [{"RISK_000": 1.5, "RISK_001": 0.5}, {}], sensitivity_engine=sensitivity
+    )
+    assert multi["MultiVar_1"]['outcomes']['cost_mean_change'] == pytest.approx(0.0, abs=1e-6)
+    assert multi["MultiVar_0"]['outcomes']['cost']['mean'] != pytest.approx(spider['baseline_cost_mean'])
@@ -0,0 +1,221 @@
+"""
+Unit tests for cached share link resolution and batched access logging.
+
+Tests that a repeated guest view is served from the shared validation cache
+and the payload cache with no database calls, that revocations and project
+writes reach every worker, that a cached validation never outlives its link,
+and that the access log buffer writes logs and access counters in batches.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from uuid import UUID
+
+from models.shareable_urls import SharePermissionLevel
+from services.guest_access_controller import GuestAccessController
+from services.share_link_cache import AccessLogBuffer, ShareResolutionCache
+
+TOKEN = "t" * 64
+SHARE_ID = "00000000-0000-0000-0000-000000000011"
+PROJECT_ID = UUID(int=7)
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.payload = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def in_(self, column, values):
+        self.db.in_filters.append((self.table, list(values)))
+        return self
+
+    def insert(self, payload):
+        self.payload = payload
+        return self
+
+    def update(self, payload):
+        self.payload = payload
+        return self
+
+    def execute(self):
+        self.db.calls.append(self.table)
+        if self.payload is not None:
+            self.db.writes.append((self.table, self.payload))
+            return MagicMock(data=self.payload if isinstance(self.payload, list) else [self.payload])
+        return MagicMock(data=[dict(row) for row in self.db.rows.get(self.table, [])])
+
+
+class FakeDatabase:
+    def __init__(self, expires_at=None):
+        self.calls = []
+        self.writes = []
+        self.in_filters = []
+        self.rows = {
+            "project_shares": [{
+                "id": SHARE_ID,
+                "project_id": str(PROJECT_ID),
+                "token": TOKEN,
+                "permission_level": "view_only",
+                "expires_at": (expires_at or datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+                "is_active": True,
+                "revoked_at": None,
+                "access_count": 4
+            }],
+            "projects": [{
+                "id": str(PROJECT_ID),
+                "name": "Board Review",
+                "status": "active",
+                "budget": 1000000,
+                "internal_notes": "confidential"
+            }]
+        }
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+class FakeSharedCache:
+    """Stands in for the Redis cache manager shared by all workers"""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl=300):
+        self.values[key] = value
+        self.ttls[key] = ttl
+        return True
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+        return True
+
+
+def make_controller(db, cache, buffer=None):
+    return GuestAccessController(
+        db_session=db,
+        cache_manager=cache.cache_manager,
+        resolution_cache=cache,
+        access_log_buffer=buffer or AccessLogBuffer(db=db, flush_interval=3600)
+    )
+
+
+async def guest_view(controller):
+    validation = await controller.validate_token(TOKEN)
+    if not validation.is_valid:
+        return validation.error_message
+    data = await controller.get_filtered_project_data(
+        PROJECT_ID, SharePermissionLevel(validation.permission_level)
+    )
+    await controller.log_access_attempt(validation.share_id, "203.0.113.9", "Mozilla/5.0", True)
+    return data
+
+
+def test_cached_guest_view_makes_no_database_calls():
+    db = FakeDatabase()
+    cache = ShareResolutionCache(FakeSharedCache())
+    buffer = AccessLogBuffer(db=db, flush_interval=3600)
+
+    first = asyncio.run(guest_view(make_controller(db, cache, buffer)))
+    assert db.calls == ["project_shares", "projects"]
+    assert "budget" not in first.dict() and first.name == "Board Review"
+
+    db.calls.clear()
+    for _ in range(20):
+        # A new controller per request, as the router creates
+        assert asyncio.run(guest_view(make_controller(db, cache, buffer))) == first
+
+    assert db.calls == []
+    assert buffer.pending() == 21
+    assert cache.stats()["hits"] == 20
+
+
+def test_revocation_reaches_every_worker():
+    db = FakeDatabase()
+    shared = FakeSharedCache()
+    worker_a, worker_b = ShareResolutionCache(shared), ShareResolutionCache(shared)
+    asyncio.run(guest_view(make_controller(db, worker_a)))
+    asyncio.run(guest_view(make_controller(db, worker_b)))
+
+    # Revoked through worker A, as the revoke endpoint does
+    db.rows["project_shares"][0]["revoked_at"] = datetime.now(timezone.utc).isoformat()
+    asyncio.run(make_controller(db, worker_a).invalidate_token_cache(TOKEN))
+
+    assert asyncio.run(guest_view(make_controller(db, worker_b))) == "This share link has been revoked"
+
+
+def test_cached_validation_never_outlives_the_link():
+    db = FakeDatabase(expires_at=datetime.now(timezone.utc) + timedelta(seconds=20))
+    shared = FakeSharedCache()
+    asyncio.run(make_controller(db, ShareResolutionCache(shared)).validate_token(TOKEN))
+
+    assert 1 <= shared.ttls[f"share_token_validation:{TOKEN}"] <= 20
+
+
+def test_project_write_reaches_every_worker():
+    db = FakeDatabase()
+    shared = FakeSharedCache()
+    worker_a, worker_b = ShareResolutionCache(shared), ShareResolutionCache(shared)
+    asyncio.run(guest_view(make_controller(db, worker_a)))
+    asyncio.run(guest_view(make_controller(db, worker_b)))
+
+    # Written through worker A, which starts a new project version
+    db.rows["projects"][0]["name"] = "Renamed"
+    asyncio.run(worker_a.invalidate_project(PROJECT_ID))
+
+    db.calls.clear()
+    assert asyncio.run(guest_view(make_controller(db, worker_b))).name == "Renamed"
+    assert db.calls == ["projects"]
+
+
+def test_payloads_are_keyed_by_project_version():
+    cache = ShareResolutionCache(FakeSharedCache())
+    cache.put_payload(PROJECT_ID, "view_only", "v1", MagicMock())
+
+    assert cache.get_payload(PROJECT_ID, "view_only", "v2") is None
+    assert cache.get_payload(PROJECT_ID, "view_only", "v1") is not None
+    assert cache.get_payload(PROJECT_ID, "full_project", "v1") is None
+    assert asyncio.run(cache.project_version(PROJECT_ID)) == asyncio.run(cache.project_version(PROJECT_ID))
+
+
+def test_access_log_buffer_writes_in_batches():
+    db = FakeDatabase()
+    buffer = AccessLogBuffer(db=db, flush_interval=3600, batch_size=100)
+    for i in range(250):
+        buffer.add(SHARE_ID, f"198.51.100.{i % 4}", "Mozilla/5.0", success=i % 5 != 0)
+
+    assert buffer.flush() == 250
+
+    inserts = [payload for table, payload in db.writes if table == "share_access_logs"]
+    updates = [payload for table, payload in db.writes if table == "project_shares"]
+    assert [len(batch) for batch in inserts] == [100, 100, 50]
+    assert len(updates) == 3 and db.in_filters == [("project_shares", [SHARE_ID])] * 3
+    assert updates[0]["access_count"] == 4 + 80
+    assert updates[0]["last_accessed_ip"] == "198.51.100.3"
+    assert buffer.pending() == 0 and buffer.written == 250
+
+
+def test_access_log_buffer_flushes_in_background():
+    db = FakeDatabase()
+    buffer = AccessLogBuffer(db=db, flush_interval=0.05)
+
+    buffer.add(SHARE_ID, "198.51.100.1", None, success=False)
+    deadline = time.time() + 2
+    while buffer.pending() and time.time() < deadline:
+        time.sleep(0.01)
+    buffer.close()
+
+    assert db.calls == ["share_access_logs"]
+    assert buffer.written == 1
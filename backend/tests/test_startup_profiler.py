@@ -0,0 +1,185 @@
+"""
+Unit tests for lazy heavy-dependency loading and the startup profiler.
+
+Tests that lazily imported modules load on first use only, that importing the
+audit and visualization services no longer imports scikit-learn or
+matplotlib, that the database module makes no query at import, that import
+times are recorded with self and cumulative time until the warm-up finishes,
+and that warm-up tasks and the first request are reported.
+"""
+
+import asyncio
+import importlib
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.lazy_import import is_available, lazy_import, preload, registered_modules
+from utils.startup_profiler import FirstRequestMiddleware, StartupProfiler
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def module_dir(tmp_path, monkeypatch):
+    """Directory on sys.path for throwaway modules"""
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def write(name, source):
+        (tmp_path / f"{name}.py").write_text(textwrap.dedent(source))
+        return name
+
+    yield write
+    for name in [name for name in sys.modules if name.startswith("startup_test_")]:
+        del sys.modules[name]
+
+
+def test_lazy_module_is_imported_on_first_use(module_dir):
+    module_dir("startup_test_heavy", """
+        def answer():
+            return 42
+        def load(path):
+            return path
+    """)
+
+    heavy = lazy_import("startup_test_heavy")
+    assert "startup_test_heavy" not in sys.modules
+    assert registered_modules()["startup_test_heavy"] is False
+    assert lazy_import("startup_test_heavy") is heavy
+
+    assert heavy.answer() == 42
+    assert heavy.load("model.joblib") == "model.joblib"
+    assert "startup_test_heavy" in sys.modules
+    assert registered_modules()["startup_test_heavy"] is True
+
+
+def test_missing_optional_module_fails_on_use_not_import():
+    missing = lazy_import("startup_test_not_installed")
+
+    assert not is_available("startup_test_not_installed")
+    with pytest.raises(ImportError):
+        missing.anything
+    assert preload(["startup_test_not_installed"])["startup_test_not_installed"].startswith(
+        "ModuleNotFoundError"
+    )
+
+
+def test_heavy_services_do_not_import_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "import services.audit_ml_service, services.audit_anomaly_service\n"
+        "import services.audit_bias_detection_service, monte_carlo.visualization\n"
+        "print(sorted(m for m in ('sklearn', 'joblib', 'matplotlib') if m in sys.modules))\n"
+        "from services.audit_ml_service import ml_service\n"
+        "print(list(ml_service.risk_encoder.classes_))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=300
+    )
+
+    lines = result.stdout.strip().splitlines()
+    assert lines[-2] == "[]", result.stderr
+    assert lines[-1] == "['Critical', 'High', 'Low', 'Medium']"
+
+
+def test_database_module_makes_no_query_at_import():
+    from config import database
+
+    client = MagicMock()
+    with patch.object(database, "create_client", return_value=client):
+        assert database.create_supabase_client() is client
+    client.table.assert_not_called()
+
+    assert database.check_database_connection(client) is True
+    client.table.assert_called_once_with("portfolios")
+    client.table.side_effect = ConnectionError("unreachable")
+    assert database.check_database_connection(client) is False
+
+
+def test_import_timer_records_self_and_cumulative_time(module_dir):
+    module_dir("startup_test_child", """
+        import time
+        time.sleep(0.05)
+    """)
+    module_dir("startup_test_parent", """
+        import time
+        import startup_test_child
+        time.sleep(0.02)
+    """)
+    profiler = StartupProfiler()
+    profiler.install_import_timer()
+    try:
+        importlib.import_module("startup_test_parent")
+    finally:
+        profiler.uninstall_import_timer()
+
+    report = profiler.report()
+    slowest = {record["module"]: record for record in report["imports"]["slowest"]}
+    parent, child = slowest["startup_test_parent"], slowest["startup_test_child"]
+    assert child["self_seconds"] >= 0.05
+    assert parent["cumulative_seconds"] >= parent["self_seconds"] + child["cumulative_seconds"] - 0.001
+    assert 0.02 <= parent["self_seconds"] < 0.05
+    assert report["imports"]["total_seconds"] == pytest.approx(parent["cumulative_seconds"], abs=1e-3)
+
+    # Modules imported after startup are listed separately
+    profiler.mark("startup_complete")
+    module_dir("startup_test_late", "VALUE = 1\n")
+    profiler.install_import_timer()
+    try:
+        importlib.import_module("startup_test_late")
+    finally:
+        profiler.uninstall_import_timer()
+    assert profiler.report()["imports"]["after_startup"] == ["startup_test_late"]
+
+
+def test_warm_up_runs_after_startup_and_first_request_is_recorded():
+    profiler = StartupProfiler()
+    profiler.install_import_timer()
+    timer = profiler._timer
+    app = FastAPI()
+    app.add_middleware(FirstRequestMiddleware, profiler=profiler)
+
+    def failing():
+        raise ConnectionError("database unreachable")
+
+    @app.on_event("startup")
+    async def start_warm_up():
+        profiler.mark("startup_complete")
+        profiler.start_warm_up({"database": failing, "modules": lambda: {"numpy": 0.1}})
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        assert client.get("/ping").status_code == 200
+        deadline = time.time() + 5
+        while "warm_up_complete" not in profiler.report()["phases"] and time.time() < deadline:
+            time.sleep(0.01)
+        report = profiler.report()
+
+    assert report["first_request_path"] == "/ping"
+    assert report["time_to_first_request_seconds"] >= report["phases"]["startup_complete"]
+    assert report["warm_up"]["database"]["status"] == "failed"
+    assert "database unreachable" in report["warm_up"]["database"]["error"]
+    assert report["warm_up"]["modules"] == {
+        "status": "ok", "result": {"numpy": 0.1}, "seconds": report["warm_up"]["modules"]["seconds"]
+    }
+    # Imports after the warm-up are no longer timed
+    assert timer not in sys.meta_path
+
+
+def test_startup_endpoint_reports_profile():
+    from routers.admin_performance import get_startup_profile
+
+    profile = asyncio.run(get_startup_profile(top=3, current_user={"user_id": "admin"}))
+
+    assert len(profile["imports"]["slowest"]) <= 3
+    assert {"phases", "time_to_first_request_seconds", "warm_up", "lazy_modules"} <= set(profile)
@@ -0,0 +1,298 @@
+"""
+Unit tests for request tracing.
+
+Tests that Supabase queries, Redis commands, LLM calls and traced functions
+are recorded as spans of the current request only, the per-request timing
+breakdown and the Server-Timing header (only returned when enabled), N+1
+query detection, which traces are
+kept in the ring buffer, and the OTLP export format.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+import redis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
+from postgrest._sync.request_builder import SyncRequestBuilder
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from middleware.tracing import TracingMiddleware
+from services import tracing_instrumentation
+from services.tracing import OtlpExporter, Tracer, to_otlp
+from services.tracing_instrumentation import instrument_libraries, query_statement
+
+
+class FakeSession:
+    """Stands in for the PostgREST HTTP session"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def request(self, method, path, json=None, params=None, headers=None):
+        time.sleep(self.delay)
+        return httpx.Response(200, json=[{"id": 1}], request=httpx.Request(method, "http://db" + path))
+
+
+class FakeMonitor:
+    def __init__(self):
+        self.queries = []
+
+    def record_database_query(self, query_type, duration_ms):
+        self.queries.append((query_type, duration_ms))
+
+
+@pytest.fixture
+def tracer():
+    tracing_instrumentation.uninstrument()
+    tracer = Tracer(slow_threshold=10.0, n_plus_one_threshold=5)
+    yield tracer
+    tracing_instrumentation.uninstrument()
+
+
+def make_app(tracer, response_headers=False):
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, tracer=tracer, response_headers=response_headers)
+    return app
+
+
+def test_query_statement_drops_filter_values():
+    first = SyncRequestBuilder(FakeSession(), "/projects").select("id,name").eq("portfolio_id", "a").limit(5)
+    second = SyncRequestBuilder(FakeSession(), "/projects").select("id,name").eq("portfolio_id", "b").limit(9)
+
+    statement, operation, table = query_statement(first.http_method, first.path, first.params)
+
+    assert statement == "select projects limit=? portfolio_id=eq.? select=id,name"
+    assert (operation, table) == ("select", "projects")
+    assert query_statement(second.http_method, second.path, second.params)[0] == statement
+    update = SyncRequestBuilder(FakeSession(), "/risks").update({"status": "closed"}).eq("id", 1)
+    assert query_statement(update.http_method, update.path, update.params)[0] == "update risks id=eq.?"
+
+
+def test_queries_outside_requests_are_not_recorded(tracer):
+    monitor = FakeMonitor()
+    instrument_libraries(tracer, database_monitor=monitor)
+
+    assert SyncRequestBuilder(FakeSession(), "/projects").select("*").execute().data == [{"id": 1}]
+
+    assert tracer.stats["traces"] == 0 and monitor.queries == []
+
+
+def test_request_breakdown_and_n_plus_one_detection(tracer):
+    monitor = FakeMonitor()
+    instrument_libraries(tracer, database_monitor=monitor)
+    app = make_app(tracer, response_headers=True)
+
+    @app.get("/api/portfolios/{portfolio_id}/projects")
+    def list_projects(portfolio_id: str):
+        projects = SyncRequestBuilder(FakeSession(), "/projects").select("id").eq("portfolio_id", portfolio_id)
+        for project in range(8):
+            SyncRequestBuilder(FakeSession(0.001), "/risks").select("*").eq("project_id", project).execute()
+        SyncRequestBuilder(FakeSession(), "/portfolios").select("*").eq("id", portfolio_id).single().execute()
+        return projects.execute().data
+
+    response = TestClient(app).get("/api/portfolios/p1/projects")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith('db;dur=')
+    assert 'desc="10 calls"' in response.headers["server-timing"]
+    trace = tracer.get(response.headers["x-trace-id"])
+    assert trace.sample_reasons == ["n_plus_one"]
+    assert trace.route == "/api/portfolios/{portfolio_id}/projects"
+    assert trace.n_plus_one(tracer.n_plus_one_threshold) == [{
+        "statement": "select risks project_id=eq.? select=*",
+        "count": 8,
+        "total_ms": pytest.approx(trace.n_plus_one(5)[0]["total_ms"])
+    }]
+    breakdown = trace.breakdown()
+    assert breakdown["kinds"]["db"]["count"] == 10
+    assert breakdown["kinds"]["db"]["ms"] >= 8
+    assert breakdown["application_ms"] <= breakdown["total_ms"] - breakdown["kinds"]["db"]["ms"] + 0.01
+    assert len(monitor.queries) == 10 and monitor.queries[0][0] == "select risks"
+
+
+def test_timing_headers_are_not_returned_by_default(tracer):
+    tracer.slow_threshold = 0
+    app = make_app(tracer)
+
+    @app.get("/api/projects")
+    def list_projects():
+        with tracer.span("supabase select projects", "db"):
+            pass
+        return []
+
+    response = TestClient(app).get("/api/projects")
+
+    assert "server-timing" not in response.headers and "x-trace-id" not in response.headers
+    assert tracer.recent(1)[0].breakdown()["kinds"]["db"]["count"] == 1
+
+
+def test_only_slow_failed_and_sampled_traces_are_kept(tracer):
+    tracer.slow_threshold = 0.05
+    app = make_app(tracer)
+
+    @app.get("/fast")
+    async def fast():
+        return {}
+
+    @app.get("/slow")
+    async def slow():
+        with tracer.span("score portfolio", "internal"):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        return {}
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    client = TestClient(app, raise_server_exceptions=False)
+    client.get("/fast")
+    client.get("/slow")
+    client.get("/broken")
+
+    assert [trace.name for trace in tracer.recent()] == ["GET /broken", "GET /slow"]
+    slow_trace = tracer.recent(reason="slow")[0]
+    assert slow_trace.breakdown()["application_ms"] >= 45
+    assert slow_trace.to_dict(5)["spans"][0]["name"] == "score portfolio"
+    assert tracer.stats == {"traces": 3, "sampled": 2, "slow": 1, "errors": 1, "n_plus_one": 0}
+
+    tracer.sample_rate = 1.0
+    client.get("/fast")
+    assert tracer.recent(1)[0].sample_reasons == ["sampled"]
+
+
+def test_traced_functions_and_concurrent_spans(tracer):
+    @tracer.traced("monte_carlo")
+    def run_simulation(iterations):
+        time.sleep(0.02)
+        return iterations
+
+    @tracer.traced("llm", name="summarize")
+    async def summarize():
+        await asyncio.sleep(0.02)
+
+    assert run_simulation(10) == 10
+
+    async def handle():
+        trace, token = tracer.start_trace("POST", "/api/simulations")
+        await asyncio.to_thread(run_simulation, 10000)
+        await asyncio.gather(summarize(), summarize())
+        tracer.finish_trace(trace, token, "/api/simulations", 200)
+        return trace
+
+    trace = asyncio.run(handle())
+
+    breakdown = trace.breakdown()
+    assert breakdown["kinds"]["monte_carlo"]["count"] == 1
+    assert breakdown["kinds"]["llm"] == {"count": 2, "ms": pytest.approx(breakdown["kinds"]["llm"]["ms"])}
+    # The two summaries ran concurrently, so they cover about 20 ms, not 40
+    assert breakdown["total_ms"] - breakdown["application_ms"] < 60
+    assert {span.parent_id for span in trace.spans} == {trace.root_span_id}
+
+
+def test_monte_carlo_runs_are_traced():
+    from monte_carlo.engine import MonteCarloEngine
+
+    assert MonteCarloEngine.run_simulation.__wrapped__.__name__ == "run_simulation"
+
+
+def test_redis_commands_are_traced_with_errors(tracer):
+    instrument_libraries(tracer)
+    client = redis.Redis(port=1, socket_connect_timeout=0.2, retry=Retry(NoBackoff(), 0))
+
+    trace, token = tracer.start_trace("GET", "/api/shared/abc")
+    with pytest.raises(redis.ConnectionError):
+        client.get("share:link:abc")
+    assert client.pipeline().execute() == []
+    tracer.finish_trace(trace, token, "/api/shared/{token}", 200)
+
+    command, pipeline = trace.spans
+    assert command.name == "redis GET" and command.kind == "cache"
+    assert command.attributes["db.statement"] == "GET share:link:*"
+    assert command.error.startswith("ConnectionError")
+    assert pipeline.attributes["redis.commands"] == 0
+
+
+def test_llm_calls_record_model_and_usage(tracer):
+    instrument_libraries(tracer)
+
+    def handler(request):
+        return httpx.Response(200, json={
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "grok-beta",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15}
+        })
+
+    async def ask():
+        client = AsyncOpenAI(
+            api_key="test", base_url="https://api.x.ai/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        trace, token = tracer.start_trace("POST", "/api/ai/chat")
+        await client.chat.completions.create(model="grok-beta", messages=[{"role": "user", "content": "hi"}])
+        tracer.finish_trace(trace, token, "/api/ai/chat", 200)
+        return trace
+
+    span, = asyncio.run(ask()).spans
+
+    assert span.name == "xai chat" and span.kind == "llm"
+    assert span.attributes["gen_ai.request.model"] == "grok-beta"
+    assert span.attributes["gen_ai.usage.input_tokens"] == 12
+    assert span.attributes["gen_ai.usage.output_tokens"] == 3
+
+
+def test_kept_traces_are_exported_as_otlp(tracer):
+    sent = []
+    exporter = OtlpExporter("http://localhost:4318/")
+    exporter.post = sent.append
+    tracer.exporter = exporter
+    tracer.slow_threshold = 0
+
+    trace, token = tracer.start_trace("GET", "/api/projects/1")
+    with tracer.span("supabase select projects", "db", **{"db.statement": "select projects id=eq.?"}):
+        with tracer.span("score", "internal", weight=0.5):
+            pass
+    tracer.finish_trace(trace, token, "/api/projects/{project_id}", 200)
+
+    assert exporter.url == "http://localhost:4318/v1/traces"
+    assert exporter.flush() == 1 and exporter.flush() == 0
+    spans = json.loads(sent[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, db, score = spans
+    assert root["traceId"] == db["traceId"] == trace.trace_id and len(trace.trace_id) == 32
+    assert root["kind"] == 2 and root["name"] == "GET /api/projects/{project_id}"
+    assert db["kind"] == 3 and db["parentSpanId"] == root["spanId"]
+    assert score["parentSpanId"] == db["spanId"]
+    assert {"key": "weight", "value": {"doubleValue": 0.5}} in score["attributes"]
+    assert int(root["startTimeUnixNano"]) <= int(db["startTimeUnixNano"]) <= int(db["endTimeUnixNano"])
+    assert to_otlp([trace])["resourceSpans"][0]["scopeSpans"][0]["spans"] == spans
+
+    def unreachable(body):
+        raise ConnectionError("collector down")
+
+    exporter.post = unreachable
+    exporter.enqueue(trace)
+    assert exporter.flush() == 0 and exporter.stats == {"exported": 1, "failed": 1}
+
+
+def test_traces_endpoint_lists_kept_traces():
+    from routers.admin_performance import get_trace, get_traces
+    from services.tracing import tracer
+
+    trace, token = tracer.start_trace("GET", "/api/reports/1")
+    tracer.finish_trace(trace, token, "/api/reports/{report_id}", 503)
+
+    listing = asyncio.run(get_traces(limit=5, reason="errors", current_user={"user_id": "admin"}))
+    detail = asyncio.run(get_trace(trace.trace_id, format="json", current_user={"user_id": "admin"}))
+
+    assert listing["traces"][0]["trace_id"] == trace.trace_id
+    assert listing["traces"][0]["breakdown"]["application_ms"] >= 0
+    assert detail["status_code"] == 503 and detail["spans"] == []
@@ -0,0 +1,100 @@
+"""
+Unit tests for the service-level simulators built on the vectorized sampling core.
+
+Tests seeded reproducibility and the statistical behaviour of the Roche
+construction risk simulation and the Enhanced PMR budget/schedule simulations,
+plus the shared samplers they use.
+"""
+
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from monte_carlo.vectorized_sampling import (
+    create_generator, order_statistics, sample_occurrences, sample_triangular
+)
+from roche_construction_models import SimulationConfig
+from services.enhanced_pmr_service import EnhancedPMRService
+from services.roche_construction_services import MonteCarloEngine
+
+
+def make_risks():
+    return [
+        {"id": "r1", "probability": 0.5, "impact": 10000.0},
+        {"id": "r2", "probability": 0.2, "impact": 50000.0},
+        {"id": "r3", "probability": 0.9, "impact": 2000.0}
+    ]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_order_statistics_match_sorted_index_rule():
+    """Partial-sort order statistics equal sorted_values[int(n * q)]."""
+    values = create_generator(1).normal(size=2001)
+    fractions = [0.025, 0.1, 0.5, 0.9, 0.975]
+    expected = [sorted(values)[int(len(values) * q)] for q in fractions]
+    assert np.allclose(order_statistics(values, fractions), expected)
+
+
+def test_samplers_handle_degenerate_and_correlated_inputs():
+    generator = create_generator(2)
+    samples = sample_triangular(generator, np.array([0.0, 5.0]), np.array([0.0, 6.0]),
+                                np.array([0.0, 9.0]), (1000, 2))
+    assert np.all(samples[:, 0] == 0.0)
+    assert samples[:, 1].min() >= 5.0 and samples[:, 1].max() <= 9.0
+
+    correlated = sample_occurrences(generator, [0.5, 0.5], 20000, np.array([[1.0, 0.9], [0.9, 1.0]]))
+    independent = sample_occurrences(generator, [0.5, 0.5], 20000)
+    both_correlated = np.mean(correlated[:, 0] & correlated[:, 1])
+    both_independent = np.mean(independent[:, 0] & independent[:, 1])
+    assert both_correlated > both_independent + 0.1
+
+
+def test_roche_simulation_is_seeded_and_unbiased():
+    engine = MonteCarloEngine(supabase=None)
+    config = SimulationConfig(iterations=20000, random_seed=9)
+
+    cost_a, schedule_a = run(engine._run_monte_carlo_iterations(make_risks(), config))
+    cost_b, schedule_b = run(engine._run_monte_carlo_iterations(make_risks(), config))
+
+    assert np.array_equal(cost_a, cost_b) and np.array_equal(schedule_a, schedule_b)
+
+    expected_cost = sum(r["probability"] * r["impact"] for r in make_risks())
+    assert cost_a.mean() == pytest.approx(expected_cost, rel=0.03)
+    assert schedule_a.mean() == pytest.approx(expected_cost * 0.1, rel=0.03)
+
+
+def test_roche_simulation_respects_analysis_flags_and_correlations():
+    engine = MonteCarloEngine(supabase=None)
+    config = SimulationConfig(iterations=5000, include_schedule_analysis=False, random_seed=3)
+
+    cost, schedule = run(engine._run_monte_carlo_iterations(make_risks(), config))
+    assert np.all(schedule == 0) and cost.mean() > 0
+
+    correlated = SimulationConfig(
+        iterations=20000, random_seed=3,
+        risk_correlation_matrix={"r1": {"r2": 0.8}}
+    )
+    independent = SimulationConfig(iterations=20000, random_seed=3)
+    correlated_cost, _ = run(engine._run_monte_carlo_iterations(make_risks(), correlated))
+    independent_cost, _ = run(engine._run_monte_carlo_iterations(make_risks(), independent))
+    assert correlated_cost.std() > independent_cost.std()
+
+
+def test_pmr_budget_and_schedule_simulations_are_seeded():
+    service = EnhancedPMRService.__new__(EnhancedPMRService)
+    project_data = {"current_budget": 1000000, "actual_cost": 800000}
+
+    first = run(service._run_budget_simulation(None, project_data, 10000, random_seed=5))
+    second = run(service._run_budget_simulation(None, project_data, 10000, random_seed=5))
+    assert first == second
+    assert float(first["p50"]) == pytest.approx(0.8, abs=0.01)
+    assert first["p50"] < first["p80"] < first["p95"]
+
+    schedule = run(service._run_schedule_simulation(None, project_data, 10000, random_seed=5))
+    p50, p95 = (datetime.fromisoformat(schedule[k]) for k in ("p50", "p95"))
+    assert 20 < (p95 - p50).days < 30
@@ -0,0 +1,196 @@
+"""
+Unit Tests: WebSocket Broadcast Send Queues
+
+Tests single serialization, per-connection send queues, slow consumer policies,
+batching and latency metrics of services/websocket_manager.py.
+"""
+
+import pytest
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.websocket_manager import (
+    WebSocketConnectionManager,
+    SLOW_CONSUMER_DISCONNECT,
+    SLOW_CONSUMER_DROP_OLDEST,
+    SLOW_CONSUMER_COALESCE
+)
+
+
+class FakeWebSocket:
+    """WebSocket stand-in recording sent frames, optionally blocking on send."""
+
+    def __init__(self, blocked=False, delay=0.0):
+        self.sent = []
+        self.delay = delay
+        self.closed_with = None
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.unblocked.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+    def messages(self, message_type):
+        """Sent messages of a type, unwrapping batch frames."""
+        found = []
+        for frame in self.sent:
+            inner = frame["messages"] if frame["type"] == "batch" else [frame]
+            found.extend(m for m in inner if m["type"] == message_type)
+        return found
+
+
+async def connect_all(manager, report_id, sockets):
+    for index, websocket in enumerate(sockets):
+        await manager.connect(websocket, report_id, f"user-{index}")
+
+
+async def drain(manager, timeout=2.0):
+    """Wait until every send queue is empty and no more frames are being sent."""
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    last_sent = -1
+    while loop.time() < deadline:
+        queued = any(len(q) for q in manager.send_queues.values())
+        if not queued and manager.stats["total_messages"] == last_sent:
+            break
+        last_sent = manager.stats["total_messages"]
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_once_and_reaches_all_connections():
+    manager = WebSocketConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(20)]
+    await connect_all(manager, "report-1", sockets)
+    await drain(manager)
+
+    with patch("services.websocket_manager.json.dumps", wraps=json.dumps) as dumps:
+        await manager.broadcast_to_report("report-1", {"type": "section_update", "section": "summary"})
+        assert dumps.call_count == 1
+
+    await drain(manager)
+    assert all(len(ws.messages("section_update")) == 1 for ws in sockets)
+    assert manager.get_broadcast_latency_stats()["count"] > 0
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_does_not_stall_broadcast():
+    manager = WebSocketConnectionManager(send_queue_size=8, slow_consumer_policy=SLOW_CONSUMER_DROP_OLDEST)
+    slow = FakeWebSocket(blocked=True)
+    fast = [FakeWebSocket() for _ in range(5)]
+    await connect_all(manager, "report-1", [slow] + fast)
+
+    for i in range(50):
+        await asyncio.wait_for(
+            manager.broadcast_to_report("report-1", {"type": "section_update", "seq": i}),
+            timeout=0.1
+        )
+    await drain(manager)
+
+    # Fast clients get every update in order, possibly in batch frames
+    for websocket in fast:
+        assert [m["seq"] for m in websocket.messages("section_update")] == list(range(50))
+
+    # The slow client keeps only the newest messages
+    assert len(manager.send_queues[slow]) == 8
+    assert manager.stats["messages_dropped"] > 0
+
+    slow.unblocked.set()
+    await drain(manager)
+    assert [m["seq"] for m in slow.messages("section_update")][-1] == 49
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_removes_slow_consumer():
+    manager = WebSocketConnectionManager(send_queue_size=4, slow_consumer_policy=SLOW_CONSUMER_DISCONNECT)
+    slow = FakeWebSocket(blocked=True)
+    fast = FakeWebSocket()
+    await connect_all(manager, "report-1", [slow, fast])
+
+    for i in range(10):
+        await manager.broadcast_to_report("report-1", {"type": "section_update", "seq": i})
+        # Give the fast client's writer a chance to keep up
+        await asyncio.sleep(0.001)
+    await drain(manager)
+
+    assert slow not in manager.send_queues
+    assert manager.get_active_users("report-1") == ["user-1"]
+    assert slow.closed_with == 1013
+    assert manager.stats["slow_consumers_disconnected"] == 1
+    assert len(fast.messages("user_left")) == 1
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cursor_updates_are_coalesced_per_user():
+    manager = WebSocketConnectionManager(slow_consumer_policy=SLOW_CONSUMER_COALESCE)
+    viewer = FakeWebSocket(blocked=True)
+    await connect_all(manager, "report-1", [viewer])
+
+    for position in range(30):
+        await manager.broadcast_to_report(
+            "report-1",
+            {"type": "cursor_position", "user_id": "editor", "position": position}
+        )
+
+    viewer.unblocked.set()
+    await drain(manager)
+
+    cursors = viewer.messages("cursor_position")
+    assert [c["position"] for c in cursors] == [29]
+    assert manager.stats["messages_coalesced"] == 29
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queued_messages_are_sent_as_batch_frames():
+    manager = WebSocketConnectionManager(batch_max_size=10)
+    viewer = FakeWebSocket(blocked=True)
+    await connect_all(manager, "report-1", [viewer])
+
+    for i in range(25):
+        await manager.broadcast_to_report("report-1", {"type": "section_update", "seq": i})
+
+    viewer.unblocked.set()
+    await drain(manager)
+
+    batches = [frame for frame in viewer.sent if frame["type"] == "batch"]
+    assert batches and all(frame["count"] <= 10 for frame in batches)
+    assert [m["seq"] for m in viewer.messages("section_update")] == list(range(25))
+    assert manager.stats["total_messages"] >= 25
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_latency_with_500_editors():
+    manager = WebSocketConnectionManager()
+    sockets = [FakeWebSocket(delay=0.0005) for _ in range(500)]
+    await connect_all(manager, "report-1", sockets)
+    await drain(manager, timeout=10)
+    manager.broadcast_latencies.clear()
+
+    for i in range(10):
+        await manager.broadcast_to_report("report-1", {"type": "section_update", "seq": i})
+    await drain(manager, timeout=10)
+
+    stats = manager.get_broadcast_latency_stats()
+    assert stats["count"] == 5000
+    assert stats["p99_ms"] < 1000
+    assert manager.get_statistics()["broadcast_latency"]["p99_ms"] == stats["p99_ms"]
+    await manager.shutdown()
@@ -0,0 +1,175 @@
+"""
+HDR histogram for latency percentiles
+
+Log-linear histogram in the style of HdrHistogram: non-negative integer
+values (e.g. microseconds) are counted in buckets whose width grows with the
+value. The first 256 values get a bucket each; above that every power of two
+is split into 128 buckets, so a value is known to within 1/128 (< 1%) over
+the whole range. A latency of an hour needs about 3,300 counters, however
+many values are recorded.
+
+Histograms merge by adding counts, so per-thread or per-worker histograms
+aggregate without losing precision.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF_BITS = SUB_BUCKET_BITS - 1
+
+DEFAULT_PERCENTILES = (50.0, 95.0, 99.0, 99.9)
+
+
+def bucket_index(value: int) -> int:
+    """Index of the bucket counting a value"""
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    if shift <= 0:
+        return value
+    return (shift << SUB_BUCKET_HALF_BITS) + (value >> shift)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Lowest and highest value counted by a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    shift = (index >> SUB_BUCKET_HALF_BITS) - 1
+    sub_bucket = index - (shift << SUB_BUCKET_HALF_BITS)
+    return sub_bucket << shift, ((sub_bucket + 1) << shift) - 1
+
+
+class HdrHistogram:
+    """
+    Counts of integer values with < 1% relative error.
+
+    record() is not locked; give each writer thread its own histogram and
+    merge them for reading.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * SUB_BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+
+    def record(self, value: int, count: int = 1) -> None:
+        if value < 0:
+            value = 0
+        index = value if value < SUB_BUCKET_COUNT else bucket_index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += count
+        self.count += count
+        self.total += value * count
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def value_at_percentile(self, percentile: float) -> int:
+        return self.percentiles((percentile,))[percentile]
+
+    def percentiles(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[float, int]:
+        """
+        Values at the given percentiles, in one pass over the counts.
+
+        Like HdrHistogram, a percentile reports the highest value of its
+        bucket (capped at the maximum recorded value).
+        """
+        result = {percentile: 0 for percentile in percentiles}
+        if not self.count:
+            return result
+
+        targets = sorted(
+            (max(1, math.ceil(percentile / 100.0 * self.count)), percentile)
+            for percentile in percentiles
+        )
+        position = 0
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            running += bucket_count
+            while position < len(targets) and running >= targets[position][0]:
+                result[targets[position][1]] = min(bucket_bounds(index)[1], self.max)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def cumulative_counts(self, bounds: Iterable[int]) -> List[int]:
+        """
+        Number of values at or below each of the ascending bounds, counting
+        the buckets that lie entirely at or below the bound.
+        """
+        bounds = list(bounds)
+        result = []
+        running = 0
+        index = 0
+        counts = self.counts
+        for bound in bounds:
+            while index < len(counts) and bucket_bounds(index)[1] <= bound:
+                running += counts[index]
+                index += 1
+            result.append(running)
+        return result
+
+    def merge(self, other: "HdrHistogram") -> "HdrHistogram":
+        """Add the counts of another histogram to this one"""
+        counts = self.counts
+        if len(other.counts) > len(counts):
+            counts.extend([0] * (len(other.counts) - len(counts)))
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        return self
+
+    def copy(self) -> "HdrHistogram":
+        return HdrHistogram().merge(self)
+
+    def reset(self) -> None:
+        self.counts = [0] * SUB_BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def to_dict(self) -> Dict[str, object]:
+        """Compact form for snapshots: only non-empty buckets"""
+        return {
+            "buckets": [[index, n] for index, n in enumerate(self.counts) if n],
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "HdrHistogram":
+        histogram = cls()
+        buckets = data.get("buckets") or []
+        if buckets:
+            size = max(index for index, _ in buckets) + 1
+            if size > len(histogram.counts):
+                histogram.counts.extend([0] * (size - len(histogram.counts)))
+            for index, n in buckets:
+                histogram.counts[index] += n
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max", 0)
+        return histogram
@@ -0,0 +1,113 @@
+"""
+Shared JSON codec for API responses and caches
+
+orjson-based encoding used by FastJSONResponse and every cache service, so
+cached payloads can be written to the wire as stored:
+- UUID, datetime, date, Enum and dataclasses are encoded natively by orjson
+- NumPy arrays and scalars are encoded natively, without tolist()
+- Decimal is encoded as a number, like jsonable_encoder does
+- Pydantic models are encoded by their compiled serializers; hot response
+  models are registered up front so the first request does not build them
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Union
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Encode types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_python(value, mode="json", by_alias=True)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=None)
+def serializer_for(model_type: Any) -> Callable[[Any], bytes]:
+    """
+    Compiled JSON serializer for a model type (or e.g. List[Model]).
+
+    Output matches FastAPI's response_model serialization (by alias).
+    """
+    adapter = TypeAdapter(model_type)
+
+    def serialize(value: Any) -> bytes:
+        return adapter.dump_json(value, by_alias=True)
+
+    return serialize
+
+
+def register_response_models(*model_types: Any) -> None:
+    """Build the serializers of hot response models, and of lists of them, ahead of use"""
+    for model_type in model_types:
+        serializer_for(model_type)
+        serializer_for(List[model_type])
+
+
+def dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode a value as JSON bytes.
+
+    Args:
+        value: Value to encode
+        default: Fallback for types the codec cannot encode (e.g. str)
+    """
+    if isinstance(value, BaseModel):
+        return serializer_for(type(value))(value)
+    if isinstance(value, list) and value and isinstance(value[0], BaseModel):
+        model_type = type(value[0])
+        if all(type(item) is model_type for item in value):
+            return serializer_for(List[model_type])(value)
+    if default is None:
+        return orjson.dumps(value, default=_default, option=OPTIONS)
+
+    def with_fallback(obj: Any) -> Any:
+        try:
+            return _default(obj)
+        except TypeError:
+            return default(obj)
+
+    return orjson.dumps(value, default=with_fallback, option=OPTIONS)
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Decode JSON produced by dumps (or any JSON)"""
+    return orjson.loads(data)
+
+
+def encoded(data: Optional[Union[bytes, str]]) -> Optional[bytes]:
+    """Normalize a stored JSON payload (bytes, or str from decoding Redis clients) to bytes"""
+    if data is None or isinstance(data, bytes):
+        return data
+    return data.encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the shared codec"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSONResponse(Response):
+    """Response for a payload that is already JSON, e.g. read from a cache"""
+
+    media_type = "application/json"
@@ -0,0 +1,123 @@
+"""
+Deferred imports of heavy optional dependencies
+
+Modules like matplotlib and scikit-learn take seconds to import, but only a
+few endpoints use them. lazy_import() returns a stand-in that imports the
+module on first attribute access, so importing the routers that reference
+them stays cheap:
+
+    plt = lazy_import("matplotlib.pyplot")
+    ...
+    fig, ax = plt.subplots()  # matplotlib is imported here
+
+A missing dependency raises ImportError on first use instead of at startup.
+preload() imports every registered module, which the startup warm-up does in
+a background thread once the server accepts traffic.
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """
+    Module stand-in that imports the real module on first attribute access.
+
+    Its own members are prefixed with _lazy_ so they never hide attributes
+    of the module, e.g. joblib.load.
+    """
+
+    __slots__ = ("_lazy_name", "_lazy_module", "_lazy_lock")
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_module", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    @property
+    def _lazy_loaded(self) -> bool:
+        return self._lazy_module is not None
+
+    def _lazy_load(self):
+        """Import the module (once) and return it"""
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                module = self._lazy_module
+                if module is None:
+                    module = importlib.import_module(self._lazy_name)
+                    object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._lazy_load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_loaded else "not loaded"
+        return f"<lazy module '{self._lazy_name}' ({state})>"
+
+
+_registry: Dict[str, LazyModule] = {}
+_registry_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Stand-in for `import name`; the module is imported on first use"""
+    with _registry_lock:
+        module = _registry.get(name)
+        if module is None:
+            module = _registry[name] = LazyModule(name)
+        return module
+
+
+def is_available(name: str) -> bool:
+    """Whether a module can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def registered_modules() -> Dict[str, bool]:
+    """Registered lazy modules and whether each has been imported"""
+    with _registry_lock:
+        return {name: module._lazy_loaded for name, module in _registry.items()}
+
+
+def preload(names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Import lazy modules ahead of their first use.
+
+    Returns the import time in seconds per module, or the error message of
+    modules that could not be imported.
+    """
+    if names is not None:
+        modules = [lazy_import(name) for name in names]
+    else:
+        with _registry_lock:
+            modules = list(_registry.values())
+
+    results: Dict[str, Any] = {}
+    for module in modules:
+        if module._lazy_loaded:
+            continue
+        start = time.perf_counter()
+        try:
+            module._lazy_load()
+            results[module._lazy_name] = round(time.perf_counter() - start, 4)
+        except Exception as e:
+            logger.warning(f"Optional module {module._lazy_name} not preloaded: {e}")
+            results[module._lazy_name] = f"{type(e).__name__}: {e}"
+    return results
@@ -0,0 +1,231 @@
+"""
+Keyset pagination and column projection for list endpoints
+
+List endpoints opt in by taking PageParams as a dependency and building their
+query through a KeysetPage:
+
+    page = KeysetPage(params, sort_column="created_at")
+    query = page.select(supabase.table("projects"))
+    ...filters...
+    response = page.apply(query).execute()
+    return page.response(response.data, response.count)
+
+Without limit/cursor the endpoint keeps its plain list response. With them it
+returns {"items", "next_cursor", "has_more", "total_count"}, where
+next_cursor continues after the last row using the (sort column, id) key
+rather than an offset. fields= is pushed down to the select in both modes.
+Responses are streamed as rows are serialized with the shared JSON codec.
+
+The streamed response bypasses FastAPI's response_model: rows are sent as
+returned by the query (reduced to fields=), without validation. Endpoints
+using KeysetPage therefore declare no response_model and must select only
+columns that are safe to return.
+"""
+
+import base64
+import binascii
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+from postgrest.types import CountMethod
+
+from utils.json_codec import dumps, loads
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_CHUNK_ROWS = 200
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode keyset values as an opaque URL-safe cursor"""
+    raw = dumps(list(values), default=str)
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != 2:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma separated fields= parameter into column names"""
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    invalid = [name for name in names if not _FIELD_NAME.match(name)]
+    if invalid or not names:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(invalid) or fields}")
+    return names
+
+
+class PageParams:
+    """Pagination and projection query parameters (FastAPI dependency)"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables paginated response"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        fields: Optional[str] = Query(None, description="Comma separated columns to return"),
+        include_total: bool = Query(False, description="Include estimated total_count in paginated response")
+    ):
+        self.limit = limit
+        self.cursor = decode_cursor(cursor) if cursor else None
+        self.fields = parse_fields(fields)
+        self.include_total = include_total
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+    @property
+    def page_size(self) -> int:
+        return self.limit or DEFAULT_PAGE_SIZE
+
+
+class KeysetPage:
+    """Applies keyset pagination and projection of one request to a query"""
+
+    def __init__(
+        self,
+        params: PageParams,
+        sort_column: str = "created_at",
+        descending: bool = True,
+        key_column: str = "id",
+        source_fields: Sequence[str] = (),
+        computed_fields: Sequence[str] = ()
+    ):
+        """
+        Args:
+            params: Request parameters
+            sort_column: Non-null column the endpoint is ordered by
+            descending: Sort direction
+            key_column: Unique column breaking ties within sort_column
+            source_fields: Columns always selected because computed fields need them
+            computed_fields: Response fields added by the endpoint, never selected
+        """
+        self.params = params
+        self.sort_column = sort_column
+        self.descending = descending
+        self.key_column = key_column
+        self.source_fields = list(source_fields)
+        self.computed_fields = set(computed_fields)
+
+    @property
+    def paginated(self) -> bool:
+        return self.params.paginated
+
+    def columns(self) -> str:
+        """Select list for the requested fields plus the columns the page needs"""
+        if not self.params.fields:
+            return "*"
+        selected = [f for f in self.params.fields if f not in self.computed_fields]
+        selected += [self.sort_column, self.key_column, *self.source_fields]
+        return ",".join(dict.fromkeys(selected))
+
+    def select(self, table: Any) -> Any:
+        """Start the query on a table builder with projection and optional count"""
+        if self.paginated and self.params.include_total:
+            return table.select(self.columns(), count=CountMethod.estimated)
+        return table.select(self.columns())
+
+    def apply(self, query: Any) -> Any:
+        """Add ordering, the keyset condition of the cursor and the page limit"""
+        if not self.paginated:
+            return query.order(self.sort_column, desc=self.descending)
+
+        if self.params.cursor is not None:
+            sort_value, key_value = (_quote(value) for value in self.params.cursor)
+            op = "lt" if self.descending else "gt"
+            query = query.or_(
+                f"{self.sort_column}.{op}.{sort_value},"
+                f"and({self.sort_column}.eq.{sort_value},{self.key_column}.{op}.{key_value})"
+            )
+        # A single order parameter: each order() call adds a separate one
+        direction = ".desc" if self.descending else ""
+        query = query.order(f"{self.sort_column}{direction},{self.key_column}", desc=self.descending)
+        return query.limit(self.params.page_size + 1)
+
+    def project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce a row to the requested fields"""
+        if not self.params.fields:
+            return row
+        return {field: row[field] for field in self.params.fields if field in row}
+
+    def page(self, rows: List[Dict[str, Any]], total_count: Optional[int] = None) -> Dict[str, Any]:
+        """Page envelope for rows fetched with apply(); rows are not projected"""
+        rows = rows or []
+        has_more = len(rows) > self.params.page_size
+        rows = rows[:self.params.page_size]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor([last.get(self.sort_column), last.get(self.key_column)])
+        return {
+            "items": rows,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "total_count": total_count if self.params.include_total else None
+        }
+
+    def response(self, rows: List[Dict[str, Any]], total_count: Optional[int] = None) -> StreamingResponse:
+        """
+        Stream the plain list, or the page envelope when paginated.
+
+        Rows are not validated against the route's response_model.
+        """
+        if not self.paginated:
+            body = _stream_array(self.project(row) for row in rows or [])
+        else:
+            page = self.page(rows, total_count)
+            body = _stream_page(page, (self.project(row) for row in page.pop("items")))
+        return StreamingResponse(body, media_type="application/json")
+
+
+def _quote(value: Any) -> str:
+    """Quote a cursor value for a PostgREST logic filter"""
+    text = _json_default(value) if not isinstance(value, str) else value
+    escaped = str(text).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _stream_array(rows: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    yield b"["
+    chunk: List[bytes] = []
+    first = True
+    for row in rows:
+        chunk.append(dumps(row, default=str))
+        if len(chunk) >= STREAM_CHUNK_ROWS:
+            yield (b"" if first else b",") + b",".join(chunk)
+            chunk, first = [], False
+    if chunk:
+        yield (b"" if first else b",") + b",".join(chunk)
+    yield b"]"
+
+
+def _stream_page(meta: Dict[str, Any], rows: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    yield b'{"items":'
+    yield from _stream_array(rows)
+    for key, value in meta.items():
+        yield b"," + dumps(key) + b":" + dumps(value, default=str)
+    yield b"}"
@@ -0,0 +1,240 @@
+"""
+Startup profiling: import times, startup phases and time to first request
+
+StartupProfiler records, from the moment main.py starts loading:
+- how long every module took to import (self and cumulative time, like
+  `python -X importtime`), including modules loaded lazily by the warm-up;
+  the import timer is removed once the warm-up finishes, so later imports
+  don't pay for it
+- when startup phases completed, e.g. routers imported or startup finished
+- when the first request arrived
+- the outcome and duration of background warm-up tasks, which run once the
+  server accepts traffic instead of delaying it
+
+The import timer must be installed before anything else is imported, so this
+module only uses the standard library.
+"""
+
+import asyncio
+import importlib.abc
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder that times module execution.
+
+    It finds nothing itself: it asks the finders after it for the spec and
+    wraps the loader's exec_module for that one module.
+    """
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                self._wrap(spec)
+                return spec
+        return None
+
+    def _wrap(self, spec) -> None:
+        loader = spec.loader
+        # Built-in and frozen importers are classes shared by all their modules
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return
+        if "exec_module" in getattr(loader, "__dict__", {}):
+            return
+
+        exec_module = loader.exec_module
+        timing = self.profiler._timing
+
+        def timed_exec_module(module):
+            # Restore the loader's own method; a loader may be reused for other modules
+            loader.__dict__.pop("exec_module", None)
+            with timing(spec.name):
+                exec_module(module)
+
+        try:
+            loader.exec_module = timed_exec_module
+        except (AttributeError, TypeError):
+            pass
+
+
+class StartupProfiler:
+    """Import times, startup phases and warm-up results of this process"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.started_at = datetime.now(timezone.utc)
+        self._imports: Dict[str, Dict[str, Any]] = {}
+        self._phases: Dict[str, float] = {}
+        self._warmup: Dict[str, Dict[str, Any]] = {}
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._first_request: Optional[Dict[str, Any]] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._timer: Optional[_ImportTimer] = None
+
+    # Import timing
+
+    def install_import_timer(self) -> None:
+        """Time every module imported from now on"""
+        if self._timer is None:
+            self._timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._timer)
+
+    def uninstall_import_timer(self) -> None:
+        """Stop timing imports"""
+        if self._timer is not None:
+            try:
+                sys.meta_path.remove(self._timer)
+            except ValueError:
+                pass
+            self._timer = None
+
+    @contextmanager
+    def _timing(self, name: str):
+        stack: List[List[float]] = self._local.__dict__.setdefault("stack", [])
+        frame = [0.0]
+        stack.append(frame)
+        start = self._clock()
+        try:
+            yield
+        finally:
+            cumulative = self._clock() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += cumulative
+            with self._lock:
+                self._imports[name] = {
+                    "module": name,
+                    "self_seconds": cumulative - frame[0],
+                    "cumulative_seconds": cumulative,
+                    "nested": bool(stack),
+                    "after_startup": "startup_complete" in self._phases
+                }
+
+    # Phases
+
+    def mark(self, phase: str) -> float:
+        """Record that a startup phase completed; returns seconds since start"""
+        elapsed = self._clock() - self.started
+        with self._lock:
+            self._phases.setdefault(phase, elapsed)
+            return self._phases[phase]
+
+    def mark_first_request(self, path: Optional[str] = None) -> None:
+        if self._first_request is not None:
+            return
+        elapsed = self._clock() - self.started
+        with self._lock:
+            if self._first_request is None:
+                self._first_request = {"path": path, "seconds": elapsed}
+
+    @property
+    def first_request_seen(self) -> bool:
+        return self._first_request is not None
+
+    # Warm-up
+
+    async def warm_up(self, tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run warm-up tasks one after another in a worker thread, then stop
+        timing imports.
+
+        A failing task is recorded and does not stop the others.
+        """
+        for name, task in tasks.items():
+            self._warmup[name] = {"status": "running"}
+            start = self._clock()
+            try:
+                result = await asyncio.to_thread(task)
+                entry = {"status": "ok", "result": result}
+            except Exception as e:
+                logger.warning(f"Warm-up task {name} failed: {e}")
+                entry = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+            entry["seconds"] = round(self._clock() - start, 4)
+            self._warmup[name] = entry
+        self.mark("warm_up_complete")
+        self.uninstall_import_timer()
+        return dict(self._warmup)
+
+    def start_warm_up(self, tasks: Dict[str, Callable[[], Any]]) -> asyncio.Task:
+        """Schedule the warm-up on the running loop without waiting for it"""
+        self._warmup_task = asyncio.get_running_loop().create_task(self.warm_up(tasks))
+        return self._warmup_task
+
+    # Reporting
+
+    def report(self, top: int = 25) -> Dict[str, Any]:
+        """Startup timings, with the `top` slowest imports"""
+        with self._lock:
+            imports = list(self._imports.values())
+            phases = dict(self._phases)
+            first_request = dict(self._first_request) if self._first_request else None
+
+        by_package: Dict[str, float] = defaultdict(float)
+        for record in imports:
+            by_package[record["module"].split(".")[0]] += record["self_seconds"]
+
+        slowest = sorted(imports, key=lambda r: r["cumulative_seconds"], reverse=True)[:top]
+        return {
+            "started_at": self.started_at.isoformat(),
+            "uptime_seconds": round(self._clock() - self.started, 4),
+            "phases": {name: round(seconds, 4) for name, seconds in phases.items()},
+            "time_to_first_request_seconds": (
+                round(first_request["seconds"], 4) if first_request else None
+            ),
+            "first_request_path": first_request["path"] if first_request else None,
+            "imports": {
+                "modules": len(imports),
+                "total_seconds": round(sum(
+                    r["cumulative_seconds"] for r in imports if not r["nested"]
+                ), 4),
+                "after_startup": sorted(r["module"] for r in imports if r["after_startup"] and not r["nested"]),
+                "by_package": {
+                    name: round(seconds, 4)
+                    for name, seconds in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+                },
+                "slowest": [
+                    {
+                        "module": r["module"],
+                        "self_seconds": round(r["self_seconds"], 4),
+                        "cumulative_seconds": round(r["cumulative_seconds"], 4)
+                    }
+                    for r in slowest
+                ]
+            },
+            "warm_up": dict(self._warmup)
+        }
+
+
+class FirstRequestMiddleware:
+    """ASGI middleware that records when the first HTTP request arrives"""
+
+    def __init__(self, app, profiler: StartupProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not self.profiler.first_request_seen:
+            self.profiler.mark_first_request(scope.get("path"))
+        await self.app(scope, receive, send)
+
+
+# Global profiler instance, created when main.py starts loading
+startup_profiler = StartupProfiler()
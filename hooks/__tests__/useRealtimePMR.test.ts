@@ -0,0 +1,135 @@
+/**
+ * Unit Tests for useRealtimePMR Hook
+ *
+ * Tests that collaboration messages are applied whether the server sends
+ * them one per frame or coalesced into a batch frame.
+ */
+
+import { renderHook, waitFor, act } from '@testing-library/react'
+import { useRealtimePMR } from '../useRealtimePMR'
+
+class MockWebSocket {
+  static OPEN = 1
+  static CLOSED = 3
+  static lastInstance: MockWebSocket | null = null
+
+  onopen: (() => void) | null = null
+  onmessage: ((event: MessageEvent) => void) | null = null
+  onerror: ((event: Event) => void) | null = null
+  onclose: ((event: { code: number; reason: string }) => void) | null = null
+  readyState = 0
+  sentMessages: string[] = []
+
+  constructor(public url: string) {
+    MockWebSocket.lastInstance = this
+    setTimeout(() => {
+      this.readyState = MockWebSocket.OPEN
+      this.onopen?.()
+    }, 0)
+  }
+
+  send(data: string) {
+    this.sentMessages.push(data)
+  }
+
+  close() {
+    this.readyState = MockWebSocket.CLOSED
+    this.onclose?.({ code: 1000, reason: '' })
+  }
+
+  receive(data: any) {
+    this.onmessage?.(new MessageEvent('message', { data: JSON.stringify(data) }))
+  }
+}
+
+const originalWebSocket = global.WebSocket
+
+describe('useRealtimePMR', () => {
+  const timestamp = '2026-01-05T10:00:00'
+
+  beforeEach(() => {
+    MockWebSocket.lastInstance = null
+    global.WebSocket = MockWebSocket as any
+  })
+
+  afterAll(() => {
+    global.WebSocket = originalWebSocket
+  })
+
+  const renderConnected = async (callbacks: Record<string, jest.Mock> = {}) => {
+    const hook = renderHook(() => useRealtimePMR({
+      reportId: 'report-123',
+      userId: 'user-123',
+      userName: 'Test User',
+      accessToken: 'mock-token',
+      autoReconnect: false,
+      ...callbacks
+    }))
+    await waitFor(() => expect(hook.result.current[0].isConnected).toBe(true))
+    return hook
+  }
+
+  it('should apply single message frames', async () => {
+    const onUserJoined = jest.fn()
+    const { result } = await renderConnected({ onUserJoined })
+
+    act(() => {
+      MockWebSocket.lastInstance?.receive({
+        type: 'user_joined',
+        user_id: 'user-456',
+        timestamp,
+        data: { user_name: 'Another User', color: '#EF4444' }
+      })
+    })
+
+    expect(result.current[0].activeUsers.map(u => u.id)).toEqual(['user-456'])
+    expect(onUserJoined).toHaveBeenCalledTimes(1)
+  })
+
+  it('should apply every message of a batch frame in order', async () => {
+    const onUserJoined = jest.fn()
+    const onSectionUpdate = jest.fn()
+    const onCommentAdded = jest.fn()
+    const { result } = await renderConnected({ onUserJoined, onSectionUpdate, onCommentAdded })
+
+    act(() => {
+      MockWebSocket.lastInstance?.receive({
+        type: 'batch',
+        count: 4,
+        timestamp,
+        messages: [
+          { type: 'user_joined', user_id: 'user-456', timestamp, data: { user_name: 'Another User', color: '#EF4444' } },
+          { type: 'section_update', user_id: 'user-456', timestamp, data: { section_id: 'summary', content: 'Draft' } },
+          { type: 'cursor_position', user_id: 'user-456', timestamp, data: { user_name: 'Another User', section_id: 'summary', position: { x: 4, y: 2 }, color: '#EF4444' } },
+          { type: 'comment_add', user_id: 'user-456', timestamp, data: { comment_id: 'c1', user_name: 'Another User', content: 'Check this', section_id: 'summary' } }
+        ]
+      })
+    })
+
+    const [state] = result.current
+    expect(state.activeUsers.map(u => u.id)).toEqual(['user-456'])
+    expect(state.cursors.get('user-456')?.position).toEqual({ x: 4, y: 2 })
+    expect(state.comments.map(c => c.id)).toEqual(['c1'])
+    expect(onUserJoined).toHaveBeenCalledTimes(1)
+    expect(onSectionUpdate).toHaveBeenCalledWith('summary', 'Draft', 'user-456')
+    expect(onCommentAdded).toHaveBeenCalledTimes(1)
+  })
+
+  it('should apply a user leaving after joining in the same batch', async () => {
+    const { result } = await renderConnected()
+
+    act(() => {
+      MockWebSocket.lastInstance?.receive({
+        type: 'batch',
+        count: 2,
+        timestamp,
+        messages: [
+          { type: 'user_joined', user_id: 'user-456', timestamp, data: { user_name: 'Another User' } },
+          { type: 'user_left', user_id: 'user-456', timestamp, data: {} }
+        ]
+      })
+    })
+
+    expect(result.current[0].activeUsers).toEqual([])
+  })
+})
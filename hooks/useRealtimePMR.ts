@@ -41,6 +41,13 @@ export interface RealtimePMRActions {
   disconnect: () => void
 }
 
+interface CollaborationBatch {
+  type: 'batch'
+  messages: CollaborationEvent[]
+  count: number
+  timestamp: string
+}
+
 interface UseRealtimePMROptions {
   reportId: string
   userId: string
@@ -114,133 +121,137 @@ export function useRealtimePMR(options: UseRealtimePMROptions): [RealtimePMRStat
   // Handle incoming WebSocket messages
   const handleMessage = useCallback((event: MessageEvent) => {
     try {
-      const message: CollaborationEvent = JSON.parse(event.data)
+      const frame: CollaborationEvent | CollaborationBatch = JSON.parse(event.data)
+      // Messages that queued up for this connection arrive as one batch frame
+      const messages = frame.type === 'batch' ? frame.messages : [frame]
       
-      switch (message.type) {
-        case 'user_joined':
-          const newUser: ActiveUser = {
-            id: message.user_id,
-            name: message.data.user_name || 'Anonymous',
-            email: message.data.user_email,
-            color: message.data.color || getUserColor(),
-            lastActivity: message.timestamp
-          }
-          
-          setActiveUsers(prev => {
-            const exists = prev.some(u => u.id === message.user_id)
-            if (exists) return prev
-            return [...prev, newUser]
-          })
-          
-          onUserJoined?.(newUser)
-          break
-
-        case 'user_left':
-          setActiveUsers(prev => prev.filter(u => u.id !== message.user_id))
-          setCursors(prev => {
-            const newCursors = new Map(prev)
-            newCursors.delete(message.user_id)
-            return newCursors
-          })
-          onUserLeft?.(message.user_id)
-          break
-
-        case 'section_update':
-          if (message.user_id !== userId) {
-            onSectionUpdate?.(
-              message.data.section_id,
-              message.data.content,
-              message.user_id
-            )
-          }
-          break
+      for (const message of messages) {
+        switch (message.type) {
+          case 'user_joined':
+            const newUser: ActiveUser = {
+              id: message.user_id,
+              name: message.data.user_name || 'Anonymous',
+              email: message.data.user_email,
+              color: message.data.color || getUserColor(),
+              lastActivity: message.timestamp
+            }
+            
+            setActiveUsers(prev => {
+              const exists = prev.some(u => u.id === message.user_id)
+              if (exists) return prev
+              return [...prev, newUser]
+            })
+            
+            onUserJoined?.(newUser)
+            break
 
-        case 'cursor_position':
-          if (message.user_id !== userId) {
-            const cursorData: CursorPosition = {
+          case 'user_left':
+            setActiveUsers(prev => prev.filter(u => u.id !== message.user_id))
+            setCursors(prev => {
+              const newCursors = new Map(prev)
+              newCursors.delete(message.user_id)
+              return newCursors
+            })
+            onUserLeft?.(message.user_id)
+            break
+
+          case 'section_update':
+            if (message.user_id !== userId) {
+              onSectionUpdate?.(
+                message.data.section_id,
+                message.data.content,
+                message.user_id
+              )
+            }
+            break
+
+          case 'cursor_position':
+            if (message.user_id !== userId) {
+              const cursorData: CursorPosition = {
+                user_id: message.user_id,
+                user_name: message.data.user_name,
+                section_id: message.data.section_id,
+                position: message.data.position,
+                color: message.data.color
+              }
+              
+              setCursors(prev => {
+                const newCursors = new Map(prev)
+                newCursors.set(message.user_id, cursorData)
+                return newCursors
+              })
+            }
+            break
+
+          case 'comment_add':
+            const comment: Comment = {
+              id: message.data.comment_id,
               user_id: message.user_id,
               user_name: message.data.user_name,
+              content: message.data.content,
               section_id: message.data.section_id,
               position: message.data.position,
-              color: message.data.color
+              created_at: message.timestamp,
+              resolved: false
             }
             
-            setCursors(prev => {
-              const newCursors = new Map(prev)
-              newCursors.set(message.user_id, cursorData)
-              return newCursors
-            })
-          }
-          break
-
-        case 'comment_add':
-          const comment: Comment = {
-            id: message.data.comment_id,
-            user_id: message.user_id,
-            user_name: message.data.user_name,
-            content: message.data.content,
-            section_id: message.data.section_id,
-            position: message.data.position,
-            created_at: message.timestamp,
-            resolved: false
-          }
-          
-          setComments(prev => [...prev, comment])
-          onCommentAdded?.(comment)
-          break
-
-        case 'comment_resolve':
-          setComments(prev => prev.map(c => 
-            c.id === message.data.comment_id
-              ? { ...c, resolved: true, resolved_by: message.user_id, resolved_at: message.timestamp }
-              : c
-          ))
-          break
-
-        case 'conflict_detected':
-          const conflict: Conflict = {
-            id: message.data.conflict_id,
-            section_id: message.data.section_id,
-            conflicting_users: message.data.conflicting_users,
-            conflict_type: message.data.conflict_type,
-            original_content: message.data.original_content,
-            conflicting_changes: message.data.conflicting_changes,
-            resolved: false
-          }
-          
-          setConflicts(prev => [...prev, conflict])
-          onConflictDetected?.(conflict)
-          break
-
-        case 'conflict_resolved':
-          setConflicts(prev => prev.map(c => 
-            c.id === message.data.conflict_id
-              ? { 
-                  ...c, 
-                  resolved: true, 
-                  resolved_by: message.user_id, 
-                  resolved_at: message.timestamp,
-                  resolution_strategy: message.data.resolution_strategy
-                }
-              : c
-          ))
-          break
-
-        case 'sync':
-          // Handle full sync from server
-          if (message.data.active_users) {
-            setActiveUsers(message.data.active_users)
-          }
-          if (message.data.comments) {
-            setComments(message.data.comments)
-          }
-          if (message.data.conflicts) {
-            setConflicts(message.data.conflicts)
-          }
-          break
+            setComments(prev => [...prev, comment])
+            onCommentAdded?.(comment)
+            break
+
+          case 'comment_resolve':
+            setComments(prev => prev.map(c => 
+              c.id === message.data.comment_id
+                ? { ...c, resolved: true, resolved_by: message.user_id, resolved_at: message.timestamp }
+                : c
+            ))
+            break
+
+          case 'conflict_detected':
+            const conflict: Conflict = {
+              id: message.data.conflict_id,
+              section_id: message.data.section_id,
+              conflicting_users: message.data.conflicting_users,
+              conflict_type: message.data.conflict_type,
+              original_content: message.data.original_content,
+              conflicting_changes: message.data.conflicting_changes,
+              resolved: false
+            }
+            
+            setConflicts(prev => [...prev, conflict])
+            onConflictDetected?.(conflict)
+            break
+
+          case 'conflict_resolved':
+            setConflicts(prev => prev.map(c => 
+              c.id === message.data.conflict_id
+                ? { 
+                    ...c, 
+                    resolved: true, 
+                    resolved_by: message.user_id, 
+                    resolved_at: message.timestamp,
+                    resolution_strategy: message.data.resolution_strategy
+                  }
+                : c
+            ))
+            break
+
+          case 'sync':
+            // Handle full sync from server
+            if (message.data.active_users) {
+              setActiveUsers(message.data.active_users)
+            }
+            if (message.data.comments) {
+              setComments(message.data.comments)
+            }
+            if (message.data.conflicts) {
+              setConflicts(message.data.conflicts)
+            }
+            break
 
-        default:
-          console.warn('Unknown message type:', message.type)
+          default:
+            console.warn('Unknown message type:', message.type)
+        }
       }
     } catch (error) {
       console.error('Error handling WebSocket message:', error)